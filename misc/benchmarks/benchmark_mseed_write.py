@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark for writing multi-trace Mini-SEED files with and without parallel
+compression, compared to the former writer calling back into Python for
+every packed record.
+
+Usage: python benchmark_mseed_write.py [channels] [samples] [workers]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from obspy import Stream, Trace
+from obspy.core.util import NamedTemporaryFile
+from obspy.mseed.core import MST, writeMSEED
+from obspy.mseed.headers import clibmseed
+import ctypes as C
+import numpy as np
+import sys
+import time
+
+
+def writeMSEEDReference(stream, filename, encoding=11, reclen=512, **_kwargs):
+    """
+    Packing loop of the former writer as reference: a Python callback writes
+    every single record to the file. Only big endian records of int32 data
+    without Blockettes 100 and 1001 are supported.
+    """
+    f = open(filename, 'wb')
+    for trace in stream:
+        mst = MST(trace, trace.data, dataquality='D')
+        packedsamples = C.c_int()
+
+        def record_handler(record, reclen, _stream):
+            f.write(record[0:reclen])
+        recHandler = C.CFUNCTYPE(C.c_void_p, C.POINTER(C.c_char), C.c_int,
+                                 C.c_void_p)(record_handler)
+        msr = clibmseed.msr_init(None)
+        msr.contents.network = trace.stats.network
+        msr.contents.station = trace.stats.station
+        msr.contents.location = trace.stats.location
+        msr.contents.channel = trace.stats.channel
+        msr.contents.dataquality = 'D'
+        clibmseed.mst_pack(mst.mst, recHandler, None, reclen, encoding, 1,
+                           C.byref(packedsamples), 1, 0, msr)
+        clibmseed.msr_free(C.pointer(msr))
+        del mst, msr
+    f.close()
+
+
+def main(channels=1000, samples=100000, workers=4):
+    np.random.seed(42)
+    st = Stream()
+    for i in xrange(channels):
+        # random walk compresses similar to real data with Steim2
+        data = np.cumsum(np.random.randint(-50, 50, samples)).astype('int32')
+        tr = Trace(data=data)
+        tr.stats.station = 'S%04d' % i
+        tr.stats.sampling_rate = 100.0
+        st.append(tr)
+    print "%d channels x %d samples, STEIM2, 512 byte records" % (channels,
+                                                                  samples)
+    expected = None
+    for label, func, kwargs in [
+            ('reference', writeMSEEDReference, {}),
+            ('serial', writeMSEED, {}),
+            ('%d workers' % workers, writeMSEED, {'workers': workers})]:
+        with NamedTemporaryFile() as tf:
+            t = time.time()
+            func(st, tf.name, encoding=11, reclen=512, **kwargs)
+            elapsed = time.time() - t
+            tf.seek(0, 2)
+            records = tf.tell() // 512
+            tf.seek(0)
+            content = tf.read()
+        if expected is None:
+            expected = content
+        elif content != expected:
+            print "%s: file content differs from reference" % label
+        print "%-12s %8.2f s %12.0f records/s" % (label, elapsed,
+                                                  records / elapsed)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark comparing Fourier and polyphase resampling of long traces.
+
+Usage: python benchmark_resample.py [hours]
+
+Resamples a trace of the given length at 200 Hz to 40 Hz and a trace at
+100 Hz to 33.3 Hz, each with a round number of samples and one sample more.
+Lengths with large prime factors are the worst case of the Fourier method.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from obspy import Trace
+import numpy as np
+import sys
+import time
+
+
+def main(hours=1):
+    np.random.seed(42)
+    for df, new_df in [(200.0, 40.0), (100.0, 100.0 / 3)]:
+        npts = int(hours * 3600 * df)
+        # one sample more usually leaves a length with large prime factors
+        for n in [npts, npts + 1]:
+            data = np.random.randn(n)
+            print "%6.1f Hz -> %6.2f Hz, %d samples" % (df, new_df, n)
+            for method in ['fft', 'polyphase']:
+                tr = Trace(data=data.copy(), header={'sampling_rate': df})
+                t = time.time()
+                tr.resample(new_df, method=method)
+                print "    %-10s %8.3f s" % (method, time.time() - t)
+
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:]])
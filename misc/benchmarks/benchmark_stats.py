@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the per-trace overhead of headers: creating traces, updating
+the header fields which derive endtime, copying traces and the resident
+memory of many short traces.
+
+Usage: python benchmark_stats.py [traces]
+
+Run it on two revisions to compare Stats implementations.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from obspy import Trace, UTCDateTime
+import gc
+import numpy as np
+import resource
+import sys
+import time
+
+
+def _timeit(label, func, traces):
+    gc.collect()
+    t = time.time()
+    result = func()
+    elapsed = time.time() - t
+    print "%-28s %8.3f s %8.2f us/trace" % (label, elapsed,
+                                            elapsed / traces * 1e6)
+    return result
+
+
+def main(traces=50000):
+    data = np.zeros(10, dtype='int32')
+    header = {'network': 'BW', 'station': 'MANZ', 'channel': 'EHZ',
+              'sampling_rate': 100.0, 'starttime': UTCDateTime(2012, 1, 1)}
+    print "%d traces with %d samples" % (traces, len(data))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    st = _timeit('create traces',
+                 lambda: [Trace(data=data, header=dict(header))
+                          for _i in xrange(traces)], traces)
+    print "%-28s %8.0f bytes/trace" % (
+        'max. resident memory', (resource.getrusage(
+            resource.RUSAGE_SELF).ru_maxrss - rss) * 1024.0 / traces)
+
+    def _update():
+        for tr in st:
+            tr.stats.starttime += 1
+            tr.stats.sampling_rate = 50.0
+            tr.stats.npts = 20
+    _timeit('update starttime/rate/npts', _update, traces)
+    _timeit('read endtime', lambda: [tr.stats.endtime for tr in st], traces)
+    _timeit('Trace.copy()', lambda: [tr.copy() for tr in st], traces)
+    try:
+        _timeit('Trace.copy(data=False)',
+                lambda: [tr.copy(data=False) for tr in st], traces)
+    except TypeError:
+        # older revisions without the data keyword
+        pass
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
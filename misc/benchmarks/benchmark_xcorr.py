@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark for correlating all pairs of many traces with xcorr and with the
+frequency domain xcorrAllPairs.
+
+Usage: python benchmark_xcorr.py [traces] [samples] [max_lag]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from obspy.signal.cross_correlation import xcorr, xcorrAllPairs
+import numpy as np
+import sys
+import time
+
+
+def main(traces=100, samples=10000, max_lag=200):
+    np.random.seed(42)
+    data = np.random.randn(traces, samples).astype('float32')
+    pairs = traces * (traces - 1) // 2
+    print "%d traces x %d samples, max_lag %d, %d pairs" % (traces, samples,
+                                                            max_lag, pairs)
+    t = time.time()
+    for i in xrange(traces - 1):
+        for j in xrange(i + 1, traces):
+            xcorr(data[i], data[j], max_lag, full_xcorr=True)
+    elapsed = time.time() - t
+    print "%-14s %8.2f s %10.0f pairs/s" % ('xcorr', elapsed,
+                                            pairs / elapsed)
+    for block_size in [None, 10]:
+        t = time.time()
+        xcorrAllPairs(data, max_lag, block_size=block_size)
+        elapsed = time.time() - t
+        label = 'xcorrAllPairs' if block_size is None else \
+            'block_size %d' % block_size
+        print "%-14s %8.2f s %10.0f pairs/s" % (label, elapsed,
+                                                pairs / elapsed)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
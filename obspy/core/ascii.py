@@ -35,6 +35,7 @@ from StringIO import StringIO
 from obspy import Stream, Trace, UTCDateTime
 from obspy.core import Stats
 from obspy.core.util import AttribDict, loadtxt
+from obspy.core.util.base import _openFile
 import numpy as np
 
 
@@ -56,7 +57,8 @@ def isSLIST(filename):
     True
     """
     try:
-        temp = open(filename, 'rt').readline()
+        with _openFile(filename, 'rt') as fh:
+            temp = fh.readline()
     except:
         return False
     if not temp.startswith('TIMESERIES'):
@@ -81,7 +83,8 @@ def isTSPAIR(filename):
     True
     """
     try:
-        temp = open(filename, 'rt').readline()
+        with _openFile(filename, 'rt') as fh:
+            temp = fh.readline()
     except:
         return False
     if not temp.startswith('TIMESERIES'):
@@ -112,25 +115,24 @@ def readSLIST(filename, headonly=False, **kwargs):  # @UnusedVariable
     >>> from obspy import read
     >>> st = read('/path/to/slist.ascii')
     """
-    fh = open(filename, 'rt')
     # read file and split text into channels
     headers = {}
     key = None
-    for line in fh:
-        if line.isspace():
-            # blank line
-            continue
-        elif line.startswith('TIMESERIES'):
-            # new header line
-            key = line
-            headers[key] = StringIO()
-        elif headonly:
-            # skip data for option headonly
-            continue
-        elif key:
-            # data entry - may be written in multiple columns
-            headers[key].write(line.strip() + ' ')
-    fh.close()
+    with _openFile(filename, 'rt') as fh:
+        for line in fh:
+            if line.isspace():
+                # blank line
+                continue
+            elif line.startswith('TIMESERIES'):
+                # new header line
+                key = line
+                headers[key] = StringIO()
+            elif headonly:
+                # skip data for option headonly
+                continue
+            elif key:
+                # data entry - may be written in multiple columns
+                headers[key].write(line.strip() + ' ')
     # create ObsPy stream object
     stream = Stream()
     for header, data in headers.iteritems():
@@ -178,25 +180,24 @@ def readTSPAIR(filename, headonly=False, **kwargs):  # @UnusedVariable
     >>> from obspy import read
     >>> st = read('/path/to/tspair.ascii')
     """
-    fh = open(filename, 'rt')
     # read file and split text into channels
     headers = {}
     key = None
-    for line in fh:
-        if line.isspace():
-            # blank line
-            continue
-        elif line.startswith('TIMESERIES'):
-            # new header line
-            key = line
-            headers[key] = StringIO()
-        elif headonly:
-            # skip data for option headonly
-            continue
-        elif key:
-            # data entry - may be written in multiple columns
-            headers[key].write(line.strip().split()[-1] + ' ')
-    fh.close()
+    with _openFile(filename, 'rt') as fh:
+        for line in fh:
+            if line.isspace():
+                # blank line
+                continue
+            elif line.startswith('TIMESERIES'):
+                # new header line
+                key = line
+                headers[key] = StringIO()
+            elif headonly:
+                # skip data for option headonly
+                continue
+            elif key:
+                # data entry - may be written in multiple columns
+                headers[key].write(line.strip().split()[-1] + ' ')
     # create ObsPy stream object
     stream = Stream()
     for header, data in headers.iteritems():
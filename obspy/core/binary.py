@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""
+ObsPy binary container format
+
+``OBSPYBIN`` is a native binary format to save and reopen intermediate
+processing results of a :class:`~obspy.core.stream.Stream` at disk speed.
+The samples of each trace are stored as raw array in the byte order and data
+type of the trace, so files can be memory mapped and single traces or time
+ranges can be loaded without decoding the whole file.
+
+A file consists of
+
+* a file header of 32 bytes (little endian): the magic string
+  ``'OBSPYBIN'``, format version (uint16), reserved flags (uint16), number
+  of traces (uint32), offset and length of the extra header block (uint64
+  each),
+* a header table with one record per trace (see :const:`HEADER_DTYPE`)
+  holding the SEED identifiers, start time in nanoseconds, sampling rate,
+  calibration factor, number of samples, offset and data type of the samples,
+* the data arrays, each starting at an offset aligned to
+  :const:`ALIGNMENT` bytes, and
+* an optional extra header block containing all remaining header entries of
+  each trace, e.g. format specific headers or the processing history, as
+  pickled list of dictionaries.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from fnmatch import fnmatch
+from obspy import Stream, Trace, UTCDateTime
+from obspy.core.util.base import LazyData, _fromFile, _getFileSize, \
+    _openFile
+from struct import pack, unpack
+import cPickle
+import mmap as _mmap
+import numpy as np
+
+
+MAGIC = 'OBSPYBIN'
+VERSION = 1
+FILE_HEADER = '<8sHHIQQ'
+FILE_HEADER_SIZE = 32
+ALIGNMENT = 64
+
+HEADER_DTYPE = np.dtype([
+    ('network', 'S16'),
+    ('station', 'S16'),
+    ('location', 'S16'),
+    ('channel', 'S16'),
+    ('starttime', '<i8'),
+    ('sampling_rate', '<f8'),
+    ('calib', '<f8'),
+    ('npts', '<i8'),
+    ('offset', '<i8'),
+    ('dtype', 'S8'),
+])
+
+# header entries stored in the header table or derived from it
+TABLE_KEYS = ['network', 'station', 'location', 'channel', 'starttime',
+              'endtime', 'sampling_rate', 'delta', 'calib', 'npts',
+              '_format']
+
+
+def isOBSPYBIN(filename):
+    """
+    Checks whether a file is an ObsPy binary container file.
+
+    :type filename: str
+    :param filename: Name of the file to be checked.
+    :rtype: bool
+    :return: ``True`` if an ObsPy binary container file.
+
+    .. rubric:: Example
+
+    >>> isOBSPYBIN('/path/to/stream.obspybin')  # doctest: +SKIP
+    True
+    """
+    try:
+        with _openFile(filename) as fh:
+            magic = fh.read(8)
+    except:
+        return False
+    return magic == MAGIC
+
+
+def readOBSPYBIN(filename, headonly=False, starttime=None, endtime=None,
+                 sourcename=None, mmap=True, lazy=False,
+                 **kwargs):  # @UnusedVariable
+    """
+    Reads an ObsPy binary container file and returns an ObsPy Stream object.
+
+    .. warning::
+        This function should NOT be called directly, it registers via the
+        ObsPy :func:`~obspy.core.stream.read` function, call this instead.
+
+    :type filename: str
+    :param filename: ObsPy binary container file to be read.
+    :type headonly: bool, optional
+    :param headonly: If set to True, read only the header table.
+    :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`, optional
+    :param starttime: Only load samples at or after the starttime. Traces
+        ending before are skipped.
+    :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`, optional
+    :param endtime: Only load samples at or before the endtime. Traces
+        starting after are skipped.
+    :type sourcename: str, optional
+    :param sourcename: Only load traces whose SEED identifier
+        ``'network.station.location.channel'`` matches the given pattern,
+        which may contain wildcards, e.g. ``'BW.*.*.EH?'``.
+    :type mmap: bool, optional
+    :param mmap: If ``True``, the data arrays of a file given by name are
+        views into a private (copy-on-write) memory map of the file, so only
+        the pages actually accessed are loaded from disk and changes of the
+        data never reach the file. Data not stored in native byte order is
+        converted into a new array. Defaults to ``True``.
+    :type lazy: bool, optional
+    :param lazy: If ``True`` the waveform data of each trace is read on first
+        access of ``Trace.data``, see :class:`~obspy.core.util.base.LazyData`.
+    :rtype: :class:`~obspy.core.stream.Stream`
+    :return: A ObsPy Stream object.
+
+    Only the samples enclosing the time window given by ``starttime`` and
+    ``endtime`` are loaded from disk, the exact trimming is done by
+    :func:`~obspy.core.stream.read`.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read("/path/to/stream.obspybin",
+    ...           starttime=UTCDateTime(2009, 8, 24, 0, 20, 10),
+    ...           sourcename="BW.RJOB..EH?")  # doctest: +SKIP
+    """
+    # data can only be loaded lazily or mapped from files given by name
+    is_filename = isinstance(filename, basestring)
+    lazy = lazy and is_filename
+    mmap = mmap and is_filename and not lazy and not headonly
+    with _openFile(filename) as fh:
+        start = fh.tell()
+        table, extras = _readHeaderTable(fh)
+        if mmap:
+            buf = _mapFile(filename)
+        traces = []
+        for i, row in enumerate(table):
+            header = {}
+            if extras:
+                header.update(extras[i])
+            for key in ['network', 'station', 'location', 'channel']:
+                # codes longer than the table entries are kept in extras
+                header.setdefault(key, str(row[key]))
+            header['starttime'] = UTCDateTime._fromNs(int(row['starttime']))
+            header['sampling_rate'] = float(row['sampling_rate'])
+            header['calib'] = float(row['calib'])
+            header['npts'] = npts = int(row['npts'])
+            if sourcename and not fnmatch('.'.join(
+                    [header['network'], header['station'],
+                     header['location'], header['channel']]), sourcename):
+                continue
+            if headonly:
+                traces.append(Trace(header=header))
+                continue
+            # select samples of the requested time window
+            first, last = _selectSamples(header['starttime'],
+                                         header['sampling_rate'], npts,
+                                         starttime, endtime)
+            if first >= last and npts:
+                continue
+            if first:
+                header['starttime'] += first / header['sampling_rate']
+            header['npts'] = count = last - first
+            dtype = np.dtype(row['dtype'])
+            offset = int(row['offset']) + first * dtype.itemsize
+            if not count:
+                data = np.empty(0, dtype=dtype)
+                tr = Trace(header=header, data=_toNative(data))
+            elif lazy:
+                tr = Trace(header=header)
+                tr._setLazyData(LazyData(_readLazyData, filename, offset,
+                                         dtype.str, count))
+            elif mmap:
+                data = np.frombuffer(buf, dtype=dtype, count=count,
+                                     offset=offset)
+                tr = Trace(header=header, data=_toNative(data))
+            else:
+                fh.seek(start + offset, 0)
+                data = _fromFile(fh, dtype, count)
+                if len(data) != count:
+                    msg = "Cannot read all data points of trace %d" % i
+                    raise IOError(msg)
+                tr = Trace(header=header, data=_toNative(data))
+            traces.append(tr)
+    return Stream(traces=traces)
+
+
+def writeOBSPYBIN(stream, filename, byteorder=None,
+                  **kwargs):  # @UnusedVariable
+    """
+    Writes an ObsPy binary container file.
+
+    .. warning::
+        This function should NOT be called directly, it registers via the
+        the :meth:`~obspy.core.stream.Stream.write` method of an
+        ObsPy :class:`~obspy.core.stream.Stream` object, call this instead.
+
+    :type stream: :class:`~obspy.core.stream.Stream`
+    :param stream: The ObsPy Stream object to write.
+    :type filename: str
+    :param filename: Name of file to write.
+    :type byteorder: ``'<'``, ``'>'``, ``'='`` or ``None``, optional
+    :param byteorder: Byte order of the stored samples. Defaults to ``None``
+        which keeps the samples in native byte order, so they can be memory
+        mapped without conversion.
+
+    Any header entries besides the SEED identifiers, start time, sampling
+    rate, calibration factor and number of samples are stored in the extra
+    header block as pickle.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read()
+    >>> st.write("stream.obspybin", format="OBSPYBIN")  # doctest: +SKIP
+    """
+    if byteorder is None:
+        byteorder = '='
+    table = np.zeros(len(stream), dtype=HEADER_DTYPE)
+    arrays = []
+    extras = []
+    offset = FILE_HEADER_SIZE + table.nbytes
+    for i, tr in enumerate(stream):
+        data = np.asarray(tr.data)
+        if data.dtype.hasobject:
+            msg = "Object arrays can not be written to OBSPYBIN format."
+            raise TypeError(msg)
+        dtype = data.dtype.newbyteorder(byteorder)
+        data = np.require(data, dtype, ['C_CONTIGUOUS'])
+        extra = {}
+        for key, value in tr.stats.iteritems():
+            if key not in TABLE_KEYS:
+                extra[key] = value
+        for key in ['network', 'station', 'location', 'channel']:
+            value = tr.stats[key]
+            if len(value) > HEADER_DTYPE[key].itemsize:
+                extra[key] = value
+            else:
+                table[key][i] = value
+        offset += -offset % ALIGNMENT
+        table['starttime'][i] = tr.stats.starttime.ns
+        table['sampling_rate'][i] = tr.stats.sampling_rate
+        table['calib'][i] = tr.stats.calib
+        table['npts'][i] = len(data)
+        table['offset'][i] = offset
+        table['dtype'][i] = data.dtype.str
+        arrays.append((offset, data))
+        extras.append(extra)
+        offset += data.nbytes
+    if any(extras):
+        extra_block = cPickle.dumps(extras, protocol=2)
+    else:
+        extra_block = ''
+    if isinstance(filename, basestring):
+        fh = open(filename, 'wb')
+    else:
+        fh = filename
+    try:
+        fh.write(pack(FILE_HEADER, MAGIC, VERSION, 0, len(stream), offset,
+                      len(extra_block)))
+        fh.write(table.tostring())
+        position = FILE_HEADER_SIZE + table.nbytes
+        for data_offset, data in arrays:
+            fh.write('\x00' * (data_offset - position))
+            if isinstance(fh, file):
+                data.tofile(fh)
+            else:
+                fh.write(data.tostring())
+            position = data_offset + data.nbytes
+        fh.write(extra_block)
+    finally:
+        if isinstance(filename, basestring):
+            fh.close()
+
+
+def _readHeaderTable(fh):
+    """
+    Reads file header, header table and extra headers of an opened ObsPy
+    binary container file.
+
+    Returns the header table as NumPy structured array and the list of extra
+    header dictionaries, which is empty if the file has no extra headers.
+    """
+    start = fh.tell()
+    data = fh.read(FILE_HEADER_SIZE)
+    if len(data) != FILE_HEADER_SIZE:
+        raise IOError("File is too small for an OBSPYBIN file header.")
+    magic, version, _flags, ntraces, extra_offset, extra_length = \
+        unpack(FILE_HEADER, data)
+    if magic != MAGIC:
+        raise IOError("Not an OBSPYBIN file.")
+    if version > VERSION:
+        msg = "OBSPYBIN file version %d is not supported." % version
+        raise IOError(msg)
+    size = ntraces * HEADER_DTYPE.itemsize
+    data = fh.read(size)
+    if len(data) != size:
+        raise IOError("OBSPYBIN header table is truncated.")
+    table = np.fromstring(data, dtype=HEADER_DTYPE)
+    extras = []
+    if extra_length:
+        fh.seek(start + extra_offset, 0)
+        extras = cPickle.loads(fh.read(extra_length))
+    return table, extras
+
+
+def _selectSamples(t0, sampling_rate, npts, starttime=None, endtime=None):
+    """
+    Returns the range of sample indices ``[first, last)`` of a trace covering
+    the given time window including the samples enclosing its boundaries.
+    """
+    first = 0
+    last = npts
+    if not sampling_rate:
+        return first, last
+    if starttime is not None:
+        first = int(np.floor((starttime - t0) * sampling_rate))
+        first = min(max(first, 0), npts)
+    if endtime is not None:
+        last = int(np.ceil((endtime - t0) * sampling_rate)) + 1
+        last = min(max(last, 0), npts)
+    return first, last
+
+
+def _mapFile(filename):
+    """
+    Returns a private (copy-on-write) memory map of a whole file.
+
+    The map is closed once all arrays created from it are garbage collected.
+    """
+    with open(filename, 'rb') as fh:
+        # Empty files can not be memory mapped.
+        if _getFileSize(fh) == 0:
+            return ''
+        return _mmap.mmap(fh.fileno(), 0, access=_mmap.ACCESS_COPY)
+
+
+def _toNative(data):
+    """
+    Converts an array into native byte order if necessary.
+    """
+    if data.dtype.byteorder not in ('=', '|'):
+        data = np.require(data, data.dtype.newbyteorder('='))
+    return data
+
+
+def _readLazyData(filename, offset, dtype, count):
+    """
+    Reads the data samples of a single trace of an ObsPy binary container
+    file.
+    """
+    with open(filename, 'rb') as fh:
+        fh.seek(offset, 0)
+        data = np.fromfile(fh, dtype=dtype, count=count)
+    if len(data) != count:
+        msg = "Cannot read all data points from %s" % filename
+        raise IOError(msg)
+    return _toNative(data)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked processing of long waveform archives.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from obspy.core.stream import Stream, _globFiles, read
+from obspy.core.utcdatetime import UTCDateTime
+from obspy.core.util import getExampleFile
+import math
+
+
+class Pipeline(object):
+    """
+    Chain of processing steps applied chunk by chunk to long time spans.
+
+    Calling any :class:`~obspy.core.stream.Stream` method on a Pipeline
+    records the call instead of executing it. The recorded chain is later run
+    on consecutive chunks of data read from files, so arbitrarily long time
+    spans are processed while only a single chunk plus its overlap is kept in
+    memory.
+
+    Each chunk is read with ``overlap`` seconds of additional data on both
+    sides. The chain is applied to the extended chunk and the result is cut
+    back to the chunk, i.e. to all samples at or after its start and before
+    its end. Thus the output of consecutive chunks joins without duplicated
+    or missing samples. The overlap has to cover edge effects of the chain,
+    e.g. filter transients or tapered ends. Operations depending on the whole
+    chunk (e.g. detrending) can't be reproduced exactly and slightly differ
+    from processing the whole time span at once.
+
+    For chains changing the sampling rate (e.g. ``decimate``), chunk length
+    and overlap should be multiples of the new sampling interval, so the
+    output samples of all chunks lie on the same time grid.
+
+    .. rubric:: Example
+
+    >>> from obspy import UTCDateTime
+    >>> from obspy.core.pipeline import Pipeline
+    >>> pipeline = Pipeline()
+    >>> pipeline.merge(fill_value=0).detrend('linear')  # doctest: +ELLIPSIS
+    <obspy.core.pipeline.Pipeline object at 0x...>
+    >>> pipeline.filter('lowpass', freq=1.0)  # doctest: +ELLIPSIS
+    <obspy.core.pipeline.Pipeline object at 0x...>
+    >>> pipeline.decimate(10, no_filter=True)  # doctest: +ELLIPSIS
+    <obspy.core.pipeline.Pipeline object at 0x...>
+    >>> print pipeline
+    Pipeline with 4 step(s):
+        merge(fill_value=0)
+        detrend('linear')
+        filter('lowpass', freq=1.0)
+        decimate(10, no_filter=True)
+    >>> for chunk in pipeline.iterChunks("/path/to/test.mseed",
+    ...                                  UTCDateTime(2003, 5, 29, 2, 14),
+    ...                                  UTCDateTime(2003, 5, 29, 2, 17),
+    ...                                  chunk_length=60.0, overlap=10.0):
+    ...     print chunk[0]  # doctest: +ELLIPSIS
+    NL.HGN.00.BHZ | 2003-05-29T02:14:00.243400Z - ... | 4.0 Hz, 240 samples
+    NL.HGN.00.BHZ | 2003-05-29T02:15:00.243400Z - ... | 4.0 Hz, 240 samples
+    NL.HGN.00.BHZ | 2003-05-29T02:16:00.243400Z - ... | 4.0 Hz, 240 samples
+
+    Writing a year of a 200 Hz channel into daily files of 20 Hz data could
+    look like:
+
+    >>> pipeline.run("/archive/BW.RJOB..EHZ.*",
+    ...              UTCDateTime(2011, 1, 1), UTCDateTime(2012, 1, 1),
+    ...              "BW.RJOB..EHZ.%Y.%j.mseed", "MSEED",
+    ...              chunk_length=86400,
+    ...              overlap=600)  # doctest: +SKIP
+    """
+    def __init__(self):
+        self.steps = []
+
+    def __getattr__(self, name):
+        """
+        Returns a function recording a call of the Stream method ``name``.
+        """
+        if name.startswith('_') or not callable(getattr(Stream, name, None)):
+            msg = "'%s' object has no attribute '%s'" % \
+                (self.__class__.__name__, name)
+            raise AttributeError(msg)
+
+        def record(*args, **kwargs):
+            self.steps.append((name, args, kwargs))
+            return self
+        return record
+
+    def __str__(self):
+        """
+        Lists all recorded steps.
+        """
+        out = "Pipeline with %d step(s):" % len(self.steps)
+        for func, args, kwargs in self.steps:
+            params = [repr(arg) for arg in args]
+            params += ["%s=%r" % item for item in sorted(kwargs.items())]
+            name = getattr(func, '__name__', func)
+            out += "\n    %s(%s)" % (name, ", ".join(params))
+        return out
+
+    def apply(self, func, *args, **kwargs):
+        """
+        Records a call of an arbitrary function.
+
+        :type func: func
+        :param func: Function called as ``func(stream, *args, **kwargs)``. It
+            may either change the stream in place and return ``None`` or
+            return a new :class:`~obspy.core.stream.Stream`.
+        :return: The pipeline itself to allow chaining calls.
+        """
+        self.steps.append((func, args, kwargs))
+        return self
+
+    def process(self, stream):
+        """
+        Applies all recorded steps to the given stream.
+
+        :type stream: :class:`~obspy.core.stream.Stream`
+        :param stream: Stream to process. It may be changed in place.
+        :rtype: :class:`~obspy.core.stream.Stream`
+        :return: Processed stream.
+        """
+        for func, args, kwargs in self.steps:
+            if isinstance(func, basestring):
+                result = getattr(stream, func)(*args, **kwargs)
+            else:
+                result = func(stream, *args, **kwargs)
+            # methods returning a new stream (e.g. slice) replace it
+            if isinstance(result, Stream):
+                stream = result
+        return stream
+
+    def iterChunks(self, source, starttime, endtime, chunk_length=3600.0,
+                   overlap=60.0, **kwargs):
+        """
+        Runs the recorded steps over a time span chunk by chunk.
+
+        :type source: str or func
+        :param source: File name or glob pattern read by
+            :func:`~obspy.core.stream.read` or a function returning a
+            :class:`~obspy.core.stream.Stream` for a given start and end time
+            like ``source(starttime, endtime)``.
+        :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param starttime: Start of the time span to process.
+        :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param endtime: End of the time span to process.
+        :type chunk_length: float, optional
+        :param chunk_length: Length of a single chunk in seconds.
+        :type overlap: float, optional
+        :param overlap: Additional data in seconds which is read and
+            processed on both sides of every chunk and cut off afterwards.
+        :param kwargs: Additional keyword arguments passed to
+            :func:`~obspy.core.stream.read` if ``source`` is a file name.
+            With ``use_index=True`` only the records of each chunk are
+            decoded from Mini-SEED files, see
+            :func:`~obspy.mseed.util.getRecordIndex`.
+        :return: Generator yielding the processed
+            :class:`~obspy.core.stream.Stream` of every chunk containing any
+            data.
+
+        The time span covered by every file matching ``source`` is determined
+        once by reading its headers. Each chunk then only reads the files
+        overlapping with it.
+        """
+        if chunk_length <= 0 or overlap < 0:
+            msg = "chunk_length must be positive and overlap not negative."
+            raise ValueError(msg)
+        starttime = UTCDateTime(starttime)
+        endtime = UTCDateTime(endtime)
+        if isinstance(source, basestring):
+            spans = _fileSpans(source, kwargs.get('format'))
+        i = 0
+        while True:
+            t1 = starttime + i * chunk_length
+            if t1 >= endtime:
+                break
+            t2 = min(starttime + (i + 1) * chunk_length, endtime)
+            i += 1
+            if isinstance(source, basestring):
+                st = Stream()
+                for name, first, last in spans:
+                    if first > t2 + overlap or last < t1 - overlap:
+                        continue
+                    st += read(name, starttime=t1 - overlap,
+                               endtime=t2 + overlap, **kwargs)
+            else:
+                st = source(t1 - overlap, t2 + overlap)
+            if not st:
+                continue
+            st = _cropChunk(self.process(st), t1, t2)
+            if st:
+                yield st
+
+    def run(self, source, starttime, endtime, filename, format,
+            chunk_length=3600.0, overlap=60.0, read_kwargs=None, **kwargs):
+        """
+        Runs the recorded steps over a time span and writes every chunk into
+        a file.
+
+        :type filename: str
+        :param filename: Name of the output files. It is formatted with
+            :meth:`~obspy.core.utcdatetime.UTCDateTime.strftime` of the start
+            of each chunk, e.g. ``"BW.RJOB..EHZ.%Y.%j.mseed"``. Every chunk
+            has to result in a different file name, otherwise a
+            :class:`ValueError` is raised.
+        :type format: str
+        :param format: Format of the output files, see
+            :meth:`~obspy.core.stream.Stream.write`.
+        :type read_kwargs: dict, optional
+        :param read_kwargs: Additional keyword arguments passed to
+            :func:`~obspy.core.stream.read` if ``source`` is a file name.
+        :param kwargs: Additional keyword arguments passed to
+            :meth:`~obspy.core.stream.Stream.write`.
+        :rtype: list of str
+        :return: Names of all written files.
+
+        See :meth:`~obspy.core.pipeline.Pipeline.iterChunks` for the other
+        parameters.
+        """
+        filenames = []
+        for st in self.iterChunks(source, starttime, endtime,
+                                  chunk_length=chunk_length, overlap=overlap,
+                                  **(read_kwargs or {})):
+            name = min(tr.stats.starttime for tr in st).strftime(filename)
+            if name in filenames:
+                msg = "Chunks starting at %s result in the already " + \
+                    "written file name %s. Use a file name pattern " + \
+                    "resolving the chunk length."
+                raise ValueError(msg % (st[0].stats.starttime, name))
+            st.write(name, format, **kwargs)
+            filenames.append(name)
+        return filenames
+
+
+def _cropChunk(stream, starttime, endtime):
+    """
+    Cuts all traces to the samples at or after ``starttime`` and before
+    ``endtime``. Traces without any samples left are removed.
+    """
+    traces = []
+    for tr in stream:
+        sr = tr.stats.sampling_rate
+        start = tr.stats.starttime
+        # tolerance of a millionth sample for times given in float seconds
+        i1 = max(int(math.ceil((starttime - start) * sr - 1e-6)), 0)
+        i2 = int(math.ceil((endtime - start) * sr - 1e-6))
+        if i2 <= i1:
+            continue
+        tr.data = tr.data[i1:i2]
+        tr.stats.starttime = start + i1 * tr.stats.delta
+        traces.append(tr)
+    stream.traces = traces
+    return stream
+
+
+def _fileSpans(pathname, format=None):
+    """
+    Returns name, start time of the first and end time of the last sample of
+    all files matching a glob pattern, read via their headers.
+    """
+    if pathname.startswith('/path/to/'):
+        # same lookup of example files as in read()
+        try:
+            pathname = getExampleFile(pathname[9:])
+        except:
+            pass
+    files = _globFiles(pathname)
+    if not files:
+        raise IOError(2, "No file matching file pattern", pathname)
+    spans = []
+    for name in files:
+        st = read(name, format=format, headonly=True)
+        if not st:
+            continue
+        spans.append((name, min(tr.stats.starttime for tr in st),
+                      max(tr.stats.endtime for tr in st)))
+    return spans
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
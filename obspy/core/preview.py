@@ -11,7 +11,7 @@ Tools for creating and merging previews.
 from copy import copy
 from obspy.core.stream import Stream
 from obspy.core.trace import Trace
-from obspy.core.utcdatetime import UTCDateTime
+from obspy.core.utcdatetime import UTCDateTime, NS_PER_SECOND
 import numpy as np
 
 
@@ -221,3 +221,284 @@ def resamplePreview(trace, samples, method='accurate'):
         return npts - int(samples * step)
     else:
         raise NotImplementedError('Unknown method')
+
+
+class PreviewPyramid(object):
+    """
+    Multi-resolution minimum/maximum preview of a single channel.
+
+    For every level the minimum and maximum of all samples within
+    consecutive intervals of ``levels`` seconds are kept. The intervals are
+    aligned to multiples of their length since 1970-01-01, so previews of
+    different channels and appended data line up. Intervals without any data
+    hold NaN.
+
+    :type id: str
+    :param id: Trace id of the channel.
+    :type sampling_rate: float
+    :param sampling_rate: Sampling rate of the channel.
+    :type levels: tuple of float, optional
+    :param levels: Interval lengths in seconds, from fine to coarse. Each
+        interval needs to be an integer multiple of the previous one.
+
+    Data is added with :meth:`append` in any order and in chunks of any
+    size. The finest level is computed from the samples in a single
+    vectorised pass, all coarser levels from the level below, and only the
+    intervals touched by the new data are updated. :meth:`get` returns the
+    coarsest level still resolving a time range with the requested number
+    of points, thus the cost of displaying any time range is independent of
+    its length.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read()
+    >>> pyramid = PreviewPyramid(st[0].id, st[0].stats.sampling_rate,
+    ...                          levels=(1, 5, 10))
+    >>> pyramid.append(st[0])
+    >>> print pyramid  # doctest: +NORMALIZE_WHITESPACE
+    BW.RJOB..EHZ | 100.0 Hz | 3 level(s)
+        1 s: 2009-08-24T00:20:03.000000Z - 2009-08-24T00:20:33.000000Z
+        5 s: 2009-08-24T00:20:00.000000Z - 2009-08-24T00:20:35.000000Z
+        10 s: 2009-08-24T00:20:00.000000Z - 2009-08-24T00:20:40.000000Z
+    >>> starttime, delta, mins, maxs = pyramid.get(pixels=5)
+    >>> print starttime, delta, len(mins)
+    2009-08-24T00:20:00.000000Z 5.0 7
+    """
+    def __init__(self, id, sampling_rate, levels=(1, 10, 60, 600, 3600)):
+        self.id = id
+        self.sampling_rate = float(sampling_rate)
+        self.levels = tuple(levels)
+        intervals = [int(round(level * NS_PER_SECOND))
+                     for level in self.levels]
+        if not intervals or min(intervals) < 1:
+            msg = "At least one level with a positive interval is needed."
+            raise ValueError(msg)
+        for fine, coarse in zip(intervals[:-1], intervals[1:]):
+            if coarse <= fine or coarse % fine:
+                msg = "Each level needs to be an integer multiple of the " + \
+                    "previous one."
+                raise ValueError(msg)
+        self._intervals = intervals
+        # index of first stored interval since 1970-01-01 and number of
+        # stored intervals
+        self._offsets = [0] * len(intervals)
+        self._lengths = [0] * len(intervals)
+        # buffers of minima and maxima with spare capacity on both ends and
+        # index of the interval of their first element
+        self._bases = [0] * len(intervals)
+        self._mins = [np.empty(0, dtype='float64') for _i in intervals]
+        self._maxs = [np.empty(0, dtype='float64') for _i in intervals]
+
+    def __str__(self):
+        out = "%s | %.1f Hz | %d level(s)" % (self.id, self.sampling_rate,
+                                              len(self.levels))
+        for level, interval, offset, length in zip(
+                self.levels, self._intervals, self._offsets, self._lengths):
+            if not length:
+                out += "\n    %s s: empty" % level
+                continue
+            out += "\n    %s s: %s - %s" % (
+                level, UTCDateTime._fromNs(offset * interval),
+                UTCDateTime._fromNs((offset + length) * interval))
+        return out
+
+    def append(self, trace):
+        """
+        Adds the data of a trace to all levels.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: Trace with matching id and sampling rate. Masked
+            samples are ignored.
+        """
+        if trace.id != self.id or \
+                trace.stats.sampling_rate != self.sampling_rate:
+            msg = "Trace id or sampling rate differs from the preview."
+            raise ValueError(msg)
+        if not trace.stats.npts:
+            return
+        data = np.ma.filled(np.ma.asarray(trace.data, dtype='float64'),
+                            np.nan)
+        interval = self._intervals[0]
+        start_ns = trace.stats.starttime.ns
+        first = start_ns // interval
+        # interval of each sample relative to the first one
+        bins = np.floor(((start_ns - first * interval) +
+                         np.arange(len(data)) * (NS_PER_SECOND /
+                                                 self.sampling_rate)) /
+                        interval).astype('int64')
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(bins)) + 1])
+        mins = np.empty(bins[-1] + 1, dtype='float64')
+        mins.fill(np.nan)
+        maxs = mins.copy()
+        with np.errstate(invalid='ignore'):
+            mins[bins[starts]] = np.fmin.reduceat(data, starts)
+            maxs[bins[starts]] = np.fmax.reduceat(data, starts)
+        self._merge(0, first, mins, maxs)
+        # update coarser levels from the level below
+        last = first + len(mins) - 1
+        for level in xrange(1, len(self._intervals)):
+            factor = self._intervals[level] // self._intervals[level - 1]
+            first, last = first // factor, last // factor
+            mins, maxs = self._slice(level - 1, first * factor,
+                                     (last + 1) * factor)
+            with np.errstate(invalid='ignore'):
+                mins = np.fmin.reduce(mins.reshape(-1, factor), axis=1)
+                maxs = np.fmax.reduce(maxs.reshape(-1, factor), axis=1)
+            self._merge(level, first, mins, maxs, replace=True)
+
+    def get(self, starttime=None, endtime=None, pixels=1000):
+        """
+        Returns minima and maxima of a time range at a suitable resolution.
+
+        :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`,
+            optional
+        :param starttime: Start of the time range. Defaults to the start of
+            the preview.
+        :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`, optional
+        :param endtime: End of the time range. Defaults to the end of the
+            preview.
+        :type pixels: int, optional
+        :param pixels: Minimum number of points wanted for the time range.
+            The coarsest level providing at least this number of points is
+            used, or the finest level if none does.
+        :return: Tuple of start time of the first interval, interval length
+            in seconds, array of minima and array of maxima.
+        """
+        finest = self._intervals[0]
+        if starttime is None:
+            start_ns = self._offsets[0] * finest
+        else:
+            start_ns = UTCDateTime(starttime).ns
+        if endtime is None:
+            end_ns = (self._offsets[0] + self._lengths[0]) * finest
+        else:
+            end_ns = UTCDateTime(endtime).ns
+        for level in xrange(len(self._intervals) - 1, -1, -1):
+            interval = self._intervals[level]
+            first = start_ns // interval
+            last = -(-end_ns // interval)
+            if last - first >= pixels or level == 0:
+                break
+        mins, maxs = self._slice(level, first, last)
+        return (UTCDateTime._fromNs(first * interval),
+                float(self.levels[level]), mins, maxs)
+
+    def save(self, filename):
+        """
+        Writes the preview to a compressed NumPy ``.npz`` file.
+
+        The preview can be restored using
+        :meth:`~obspy.core.preview.PreviewPyramid.load`.
+
+        :type filename: str
+        :param filename: Name of the output file.
+        """
+        arrays = {'id': np.array(self.id),
+                  'sampling_rate': np.array(self.sampling_rate),
+                  'levels': np.array(self.levels, dtype='float64'),
+                  'offsets': np.array(self._offsets, dtype='int64')}
+        for level in xrange(len(self.levels)):
+            mins, maxs = self._stored(level)
+            arrays['mins_%d' % level] = mins
+            arrays['maxs_%d' % level] = maxs
+        with open(filename, 'wb') as fh:
+            np.savez_compressed(fh, **arrays)
+
+    @staticmethod
+    def load(filename):
+        """
+        Restores a preview written by
+        :meth:`~obspy.core.preview.PreviewPyramid.save`.
+
+        :type filename: str
+        :param filename: Name of the file.
+        :rtype: :class:`~obspy.core.preview.PreviewPyramid`
+        """
+        with open(filename, 'rb') as fh:
+            data = np.load(fh)
+            levels = [float(level) if level != int(level) else int(level)
+                      for level in data['levels']]
+            pyramid = PreviewPyramid(str(data['id']),
+                                     float(data['sampling_rate']), levels)
+            pyramid._offsets = [int(offset) for offset in data['offsets']]
+            pyramid._bases = list(pyramid._offsets)
+            for level in xrange(len(levels)):
+                pyramid._mins[level] = \
+                    data['mins_%d' % level].astype('float64')
+                pyramid._maxs[level] = \
+                    data['maxs_%d' % level].astype('float64')
+                pyramid._lengths[level] = len(pyramid._mins[level])
+        return pyramid
+
+    def _stored(self, level):
+        """
+        Returns views of the stored minima and maxima of a level.
+        """
+        i = self._offsets[level] - self._bases[level]
+        j = i + self._lengths[level]
+        return self._mins[level][i:j], self._maxs[level][i:j]
+
+    def _slice(self, level, first, last):
+        """
+        Returns minima and maxima of intervals ``first`` up to excluding
+        ``last`` of a level, padded with NaN outside the stored range.
+        """
+        mins = np.empty(max(last - first, 0), dtype='float64')
+        mins.fill(np.nan)
+        maxs = mins.copy()
+        offset = self._offsets[level]
+        i1 = max(first, offset)
+        i2 = min(last, offset + self._lengths[level])
+        if i2 > i1:
+            base = self._bases[level]
+            mins[i1 - first:i2 - first] = self._mins[level][i1 - base:
+                                                            i2 - base]
+            maxs[i1 - first:i2 - first] = self._maxs[level][i1 - base:
+                                                            i2 - base]
+        return mins, maxs
+
+    def _merge(self, level, first, mins, maxs, replace=False):
+        """
+        Merges minima and maxima of intervals starting at interval ``first``
+        into a level, extending the stored range as needed. Existing values
+        are combined with the new ones unless ``replace`` is set.
+
+        The buffers of a level grow by at least doubling their capacity,
+        so appending data piece by piece takes amortised constant time per
+        interval.
+        """
+        offset = self._offsets[level]
+        stored = self._lengths[level]
+        if not stored:
+            offset = first
+        new_offset = min(offset, first)
+        new_end = max(offset + stored, first + len(mins))
+        base = self._bases[level]
+        capacity = len(self._mins[level])
+        if new_offset < base or new_end > base + capacity:
+            old_mins, old_maxs = self._stored(level)
+            capacity = max(2 * capacity, new_end - new_offset)
+            # spare capacity on the side the level grows to
+            if stored and first < offset:
+                base = new_end - capacity
+            else:
+                base = new_offset
+            self._bases[level] = base
+            self._mins[level] = np.empty(capacity, dtype='float64')
+            self._mins[level].fill(np.nan)
+            self._maxs[level] = self._mins[level].copy()
+            i = offset - base
+            self._mins[level][i:i + stored] = old_mins
+            self._maxs[level][i:i + stored] = old_maxs
+        self._offsets[level] = new_offset
+        self._lengths[level] = new_end - new_offset
+        i = first - base
+        target_mins = self._mins[level][i:i + len(mins)]
+        target_maxs = self._maxs[level][i:i + len(mins)]
+        if replace:
+            target_mins[:] = mins
+            target_maxs[:] = maxs
+        else:
+            target_mins[:] = np.fmin(target_mins, mins)
+            target_maxs[:] = np.fmax(target_maxs, maxs)
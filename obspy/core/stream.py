@@ -9,13 +9,16 @@ Module for handling ObsPy Stream objects.
     (http://www.gnu.org/copyleft/lesser.html)
 """
 from glob import glob, has_magic
-from obspy.core.trace import Trace
+from itertools import izip
+from obspy.core.trace import Trace, _windowArray
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile, getExampleFile
-from obspy.core.util.base import ENTRY_POINTS, _readFromPlugin, \
-    _getFunctionFromEntryPoint
+from obspy.core.util.base import ENTRY_POINTS, INDEX_SUFFIX, \
+    _readFromPlugin, _getFunctionFromEntryPoint, _openFile, \
+    createEmptyDataChunk
 from obspy.core.util.decorator import uncompressFile, raiseIfMasked
 from pkg_resources import load_entry_point
+from StringIO import StringIO
 import cPickle
 import copy
 import fnmatch
@@ -26,9 +29,13 @@ import urllib2
 import warnings
 
 
+# filters whose functions handle two-dimensional arrays row by row
+BATCH_FILTERS = ['bandpass', 'bandstop', 'lowpass', 'highpass']
+
+
 def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
          endtime=None, nearest_sample=True, dtype=None, apply_calib=False,
-         **kwargs):
+         workers=None, worker_type='thread', **kwargs):
     """
     Read waveform files into an ObsPy Stream object.
 
@@ -43,11 +50,14 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     ``list``-like object of multiple ObsPy :class:`~obspy.core.trace.Trace`
     objects.
 
-    :type pathname_or_url: str or StringIO.StringIO, optional
-    :param pathname_or_url: String containing a file name or a URL or a open
-        file-like object. Wildcards are allowed for a file name. If this
-        attribute is omitted, an example :class:`~obspy.core.stream.Stream`
-        object will be returned.
+    :type pathname_or_url: str, StringIO.StringIO or bytearray, optional
+    :param pathname_or_url: String containing a file name or a URL, a open
+        file-like object or binary data given as ``bytearray``, ``buffer``
+        or ``memoryview``. Wildcards are allowed for a file name. File-like
+        objects, binary data and URLs are read in memory, temporary files are
+        only written for formats which need a file name. If this attribute is
+        omitted, an example
+        :class:`~obspy.core.stream.Stream` object will be returned.
     :type format: string, optional
     :param format: Format of the file to read, e.g. ``"GSE2"``, ``"MSEED"``,
         ``"SAC"``, ``"SEISAN"``, ``"WAV"``, ``"Q"``, ``"SH_ASC"``, etc. See
@@ -71,8 +81,24 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     :type apply_calib: bool, optional
     :param apply_calib: Automatically applies the calibration factor
         ``trace.stats.calib`` for each trace, if set. Defaults to ``False``.
+    :type workers: int, optional
+    :param workers: Number of concurrent workers used for decoding multiple
+        local files matched by a file name pattern. If set, files are read
+        by a pool of ``workers`` workers and the resulting traces are merged
+        back in the sorted order of the matched file names. As when reading
+        the files one after another, the error of the first unreadable file
+        is raised. Defaults to ``None`` which reads all files one after
+        another.
+    :type worker_type: str, optional
+    :param worker_type: Kind of pool used if ``workers`` is set, either
+        ``'thread'`` (default) or ``'process'``. Threads are sufficient for
+        formats decoded within the C libraries (e.g. MiniSEED, GSE2), while
+        processes help for readers implemented in pure Python.
     :param kwargs: Additional keyword arguments passed to the underlying
-        waveform reader method.
+        waveform reader method. The readers for MiniSEED, SAC, GSE2, SEG Y
+        and SU files accept ``lazy=True`` to read only the headers and decode
+        the data samples of a trace on first access of ``Trace.data``, see
+        :class:`~obspy.core.util.base.LazyData`.
     :return: An ObsPy :class:`~obspy.core.stream.Stream` object.
 
     .. rubric:: Basic Usage
@@ -121,6 +147,7 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     SEG2      :mod:`obspy.seg2`      :func:`obspy.seg2.seg2.readSEG2`
     WAV       :mod:`obspy.wav`       :func:`obspy.wav.core.readWAV`
     PICKLE    :mod:`obspy.core`      :func:`obspy.core.stream.readPICKLE`
+    OBSPYBIN  :mod:`obspy.core`      :func:`obspy.core.binary.readOBSPYBIN`
     DATAMARK  :mod:`obspy.datamark`  :func:`obspy.datamark.core.readDATAMARK`
     CSS       :mod:`obspy.css`       :func:`obspy.css.core.readCSS`
     ========  =====================  ========================================
@@ -199,6 +226,16 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
         >>> print(st)  # doctest: +ELLIPSIS
         1 Trace(s) in Stream:
         .RJOB..Z | 2005-08-31T02:33:59.999999Z - ... | 200.0 Hz, 2001 samples
+
+    (7) Reading many local files concurrently.
+
+        >>> from obspy import read  # doctest: +SKIP
+        >>> st = read("/path/to/archive/*.mseed", workers=4)  # doctest: +SKIP
+
+    (8) Reading binary data held in memory, e.g. received from a socket.
+
+        >>> data = bytearray(sock.recv(65536))  # doctest: +SKIP
+        >>> st = read(data, format="MSEED")  # doctest: +SKIP
     """
     # add default parameters to kwargs so sub-modules may handle them
     kwargs['starttime'] = starttime
@@ -217,33 +254,36 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     if pathname_or_url is None:
         # if no pathname or URL specified, return example stream
         st = _createExampleStream(headonly=headonly)
+    elif isinstance(pathname_or_url, (bytearray, buffer, memoryview)):
+        # binary data in memory
+        if isinstance(pathname_or_url, memoryview):
+            pathname_or_url = pathname_or_url.tobytes()
+        buf = StringIO(str(pathname_or_url))
+        st.extend(_readBuffer(buf, format, headonly, **kwargs).traces)
     elif not isinstance(pathname_or_url, basestring):
-        # not a string - we assume a file-like object
+        # not a string - we assume a file-like object which is handed to the
+        # waveform plugins directly
         pathname_or_url.seek(0)
-        try:
-            # first try reading directly
-            stream = _read(pathname_or_url, format, headonly, **kwargs)
-            st.extend(stream.traces)
-        except TypeError:
-            # if this fails, create a temporary file which is read directly
-            # from the file system
-            pathname_or_url.seek(0)
-            with NamedTemporaryFile() as fh:
-                fh.write(pathname_or_url.read())
-                st.extend(_read(fh.name, format, headonly, **kwargs).traces)
+        st.extend(_readBuffer(pathname_or_url, format, headonly,
+                              **kwargs).traces)
         pathname_or_url.seek(0)
     elif "://" in pathname_or_url:
-        # some URL
+        # some URL - keep the downloaded data in memory
         # extract extension if any
         suffix = os.path.basename(pathname_or_url).partition('.')[2] or '.tmp'
-        with NamedTemporaryFile(suffix=suffix) as fh:
-            fh.write(urllib2.urlopen(pathname_or_url).read())
-            st.extend(_read(fh.name, format, headonly, **kwargs).traces)
+        buf = StringIO(urllib2.urlopen(pathname_or_url).read())
+        st.extend(_readBuffer(buf, format, headonly, suffix=suffix,
+                              **kwargs).traces)
     else:
         # some file name
         pathname = pathname_or_url
-        for file in sorted(glob(pathname)):
-            st.extend(_read(file, format, headonly, **kwargs).traces)
+        files = _globFiles(pathname)
+        if workers and len(files) > 1:
+            st.extend(_readParallel(files, format, headonly, workers,
+                                    worker_type, **kwargs))
+        else:
+            for file in files:
+                st.extend(_read(file, format, headonly, **kwargs).traces)
         if len(st) == 0:
             # try to give more specific information why the stream is empty
             if has_magic(pathname) and not glob(pathname):
@@ -278,6 +318,16 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     return st
 
 
+def _globFiles(pathname):
+    """
+    Returns the sorted names of all files matching a glob pattern.
+
+    Sidecar files of Mini-SEED record indices are skipped.
+    """
+    return sorted(name for name in glob(pathname)
+                  if not name.endswith(INDEX_SUFFIX))
+
+
 @uncompressFile
 def _read(filename, format=None, headonly=False, **kwargs):
     """
@@ -291,6 +341,133 @@ def _read(filename, format=None, headonly=False, **kwargs):
     return stream
 
 
+def _readBuffer(buf, format=None, headonly=False, suffix='', **kwargs):
+    """
+    Reads an open file-like object into a ObsPy Stream object.
+
+    The object is handed to the waveform plugins directly. Plugins which
+    still need a real file name (e.g. CSS or Q data files) raise a TypeError,
+    the data is then written to a temporary file with the given suffix which
+    is read instead - data can't be loaded lazily from it.
+    """
+    position = buf.tell()
+    try:
+        return _read(buf, format, headonly, **kwargs)
+    except TypeError:
+        kwargs.pop('lazy', None)
+        buf.seek(position)
+        with NamedTemporaryFile(suffix=suffix) as fh:
+            fh.write(buf.read())
+            fh.flush()
+            return _read(fh.name, format, headonly, **kwargs)
+
+
+def _readWorker(args):
+    """
+    Reads a single file inside a worker of :func:`_readParallel`.
+
+    Any exception is caught and returned, so :func:`_readParallel` can raise
+    the error of the first unreadable file in the order of the file names.
+    """
+    filename, format, headonly, kwargs = args
+    try:
+        traces = _read(filename, format, headonly, **kwargs).traces
+    except Exception, e:
+        return [], e
+    return traces, None
+
+
+def _filterBatch(traces, type, workers=None, options={}):
+    """
+    Filters equal-length traces of the same sampling rate in one call.
+
+    The data of all traces is stacked into a two-dimensional array which is
+    filtered along its rows. Each trace gets its row of the result as new
+    data.
+
+    :type traces: list of :class:`~obspy.core.trace.Trace`
+    :param traces: Traces with identical sampling rate, number of samples
+        and data type.
+    :type type: str
+    :param type: Name of a filter listed in ``BATCH_FILTERS``.
+    :type workers: int, optional
+    :param workers: Number of threads filtering blocks of rows concurrently.
+    :param options: Keyword arguments passed on to the filter function.
+    """
+    df = traces[0].stats.sampling_rate
+    block = np.empty((len(traces), traces[0].stats.npts),
+                     dtype=traces[0].data.dtype)
+    for i, tr in enumerate(traces):
+        block[i] = tr.data
+    if workers and workers > 1 and len(traces) > 1:
+        # the filter loop of scipy releases the GIL, thus threads suffice
+        from multiprocessing.pool import ThreadPool
+        from obspy.signal import filter as signal_filter
+        # design the filter once here, the workers only apply it
+        design_options = options.copy()
+        zerophase = design_options.pop('zerophase', False)
+        design = getattr(signal_filter, '_%sDesign' % type)
+        filt = design(df=df, **design_options)
+        bounds = np.linspace(0, len(traces), min(int(workers), len(traces)) +
+                             1).astype('int')
+        chunks = [block[i:j] for i, j in izip(bounds[:-1], bounds[1:])]
+        pool = ThreadPool(len(chunks))
+        try:
+            results = pool.map(
+                lambda chunk: signal_filter._applyFilter(filt, chunk,
+                                                         zerophase),
+                chunks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        func = _getFunctionFromEntryPoint('filter', type)
+        results = [func(block, df=df, **options)]
+    rows = (row for result in results for row in result)
+    proc_info = "filter:%s:%s" % (type, options)
+    for tr, row in izip(traces, rows):
+        tr.data = row
+        tr._addProcessingInfo(proc_info)
+
+
+def _readParallel(files, format=None, headonly=False, workers=2,
+                  worker_type='thread', **kwargs):
+    """
+    Reads a list of files concurrently using a pool of workers.
+
+    :type files: list of str
+    :param files: File names to read.
+    :type workers: int
+    :param workers: Number of workers in the pool.
+    :type worker_type: str
+    :param worker_type: ``'thread'`` or ``'process'``.
+    :return: List of all traces in the order of the given files.
+
+    Like reading the files one after another, the exception of the first
+    unreadable file is raised.
+    """
+    if worker_type == 'thread':
+        from multiprocessing.pool import ThreadPool as Pool
+    elif worker_type == 'process':
+        from multiprocessing import Pool
+    else:
+        msg = "worker_type must be either 'thread' or 'process'"
+        raise ValueError(msg)
+    args = [(file, format, headonly, kwargs) for file in files]
+    pool = Pool(min(int(workers), len(files)))
+    traces = []
+    try:
+        # imap preserves the order of the given file names
+        for file_traces, error in pool.imap(_readWorker, args):
+            if error is not None:
+                raise error
+            traces.extend(file_traces)
+    finally:
+        pool.close()
+        pool.join()
+    return traces
+
+
 def _createExampleStream(headonly=False):
     """
     Create an example stream.
@@ -365,6 +542,7 @@ class Stream(object):
 
     def __init__(self, traces=None):
         self.traces = []
+        self._index = None
         if isinstance(traces, Trace):
             traces = [traces]
         if traces:
@@ -637,6 +815,7 @@ class Stream(object):
         """
         __setitem__ method of obspy.Stream objects.
         """
+        self._invalidateIndex()
         self.traces.__setitem__(index, trace)
 
     def __getitem__(self, index):
@@ -654,6 +833,7 @@ class Stream(object):
         """
         Passes on the __delitem__ method to the underlying list of traces.
         """
+        self._invalidateIndex()
         return self.traces.__delitem__(index)
 
     def __getslice__(self, i, j, k=1):
@@ -686,6 +866,7 @@ class Stream(object):
         .TEST..      | 1970-01-01T00:00:00.000000Z ... | 1.0 Hz, 0 samples
         """
         if isinstance(trace, Trace):
+            self._invalidateIndex()
             self.traces.append(trace)
         else:
             msg = 'Append only supports a single Trace object as an argument.'
@@ -721,14 +902,16 @@ class Stream(object):
                 if not isinstance(_i, Trace):
                     msg = 'Extend only accepts a list of Trace objects.'
                     raise TypeError(msg)
+            self._invalidateIndex()
             self.traces.extend(trace_list)
         elif isinstance(trace_list, Stream):
+            self._invalidateIndex()
             self.traces.extend(trace_list.traces)
         else:
             msg = 'Extend only supports a list of Trace objects as argument.'
             raise TypeError(msg)
 
-    def getGaps(self, min_gap=None, max_gap=None):
+    def getGaps(self, min_gap=None, max_gap=None, use_index=False):
         """
         Returns a list of all trace gaps/overlaps of the Stream object.
 
@@ -736,6 +919,10 @@ class Stream(object):
             value is assumed to be in seconds. Defaults to None.
         :param max_gap: All gaps larger than this value will be omitted. The
             value is assumed to be in seconds. Defaults to None.
+        :type use_index: bool, optional
+        :param use_index: If ``True``, traces are grouped by id using the
+            index of the stream (see :meth:`select`) instead of sorting the
+            whole stream. Defaults to ``False``.
 
         The returned list contains one item in the following form for each gap/
         overlap: [network, station, location, channel, starttime of the gap,
@@ -772,26 +959,31 @@ class Stream(object):
         BW.RJOB..EHZ      2009-08-24T00:20:13.000000Z ...
         Total: 1 gap(s) and 0 overlap(s)
         """
-        # Create shallow copy of the traces to be able to sort them later on.
-        copied_traces = copy.copy(self.traces)
-        self.sort()
+        if use_index:
+            traces = self._getIndex().sortedTraces(self.traces)
+        else:
+            # Create shallow copy of the traces to be able to sort them later
+            # on.
+            copied_traces = copy.copy(self.traces)
+            self.sort()
+            traces = self.traces
         gap_list = []
-        for _i in xrange(len(self.traces) - 1):
+        for _i in xrange(len(traces) - 1):
             # skip traces with different network, station, location or channel
-            if self.traces[_i].id != self.traces[_i + 1].id:
+            if traces[_i].id != traces[_i + 1].id:
                 continue
             # different sampling rates should always result in a gap or overlap
-            if self.traces[_i].stats.delta == self.traces[_i + 1].stats.delta:
+            if traces[_i].stats.delta == traces[_i + 1].stats.delta:
                 flag = True
             else:
                 flag = False
-            stats = self.traces[_i].stats
+            stats = traces[_i].stats
             stime = stats['endtime']
-            etime = self.traces[_i + 1].stats['starttime']
+            etime = traces[_i + 1].stats['starttime']
             delta = etime.timestamp - stime.timestamp
             # Check that any overlap is not larger than the trace coverage
             if delta < 0:
-                temp = self.traces[_i + 1].stats['endtime'].timestamp - \
+                temp = traces[_i + 1].stats['endtime'].timestamp - \
                     etime.timestamp
                 if (delta * -1) > temp:
                     delta = -1 * temp
@@ -812,8 +1004,9 @@ class Stream(object):
             gap_list.append([stats['network'], stats['station'],
                              stats['location'], stats['channel'],
                              stime, etime, delta, nsamples])
-        # Set the original traces to not alter the stream object.
-        self.traces = copied_traces
+        if not use_index:
+            # Set the original traces to not alter the stream object.
+            self.traces = copied_traces
         return gap_list
 
     def insert(self, position, object):
@@ -824,6 +1017,7 @@ class Stream(object):
         :param object: Single Trace object or list of Trace objects.
         """
         if isinstance(object, Trace):
+            self._invalidateIndex()
             self.traces.insert(position, object)
         elif isinstance(object, list):
             # Make sure each item in the list is a trace.
@@ -832,6 +1026,7 @@ class Stream(object):
                     msg = 'Trace object or a list of Trace objects expected!'
                     raise TypeError(msg)
             # Insert each item of the list.
+            self._invalidateIndex()
             for _i in xrange(len(object)):
                 self.traces.insert(position + _i, object[_i])
         elif isinstance(object, Stream):
@@ -1125,6 +1320,7 @@ class Stream(object):
         >>> print(tr)  # doctest: +ELLIPSIS
         BW.RJOB..EHE | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
         """
+        self._invalidateIndex()
         return self.traces.pop(index)
 
     def printGaps(self, min_gap=None, max_gap=None):
@@ -1219,6 +1415,7 @@ class Stream(object):
         BW.RJOB..EHZ | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
         BW.RJOB..EHN | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
         """
+        self._invalidateIndex()
         return self.traces.remove(trace)
 
     def reverse(self):
@@ -1241,6 +1438,7 @@ class Stream(object):
         BW.RJOB..EHN | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
         BW.RJOB..EHZ | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
         """
+        self._invalidateIndex()
         self.traces.reverse()
 
     def sort(self, keys=['network', 'station', 'location', 'channel',
@@ -1292,6 +1490,7 @@ class Stream(object):
                 items.index(_i)
             except:
                 raise TypeError(msg)
+        self._invalidateIndex()
         # Loop over all keys in reversed order.
         for _i in keys[::-1]:
             self.traces.sort(key=lambda x: x.stats[_i], reverse=reverse)
@@ -1305,9 +1504,9 @@ class Stream(object):
         :type format: string
         :param format: The format to write must be specified. One of
             ``"MSEED"``, ``"GSE2"``, ``"SAC"``, ``"SACXY"``, ``"Q"``,
-            ``"SH_ASC"``, ``"SEGY"``, ``"SU"``, ``"WAV"``, ``"PICKLE"``. See
-            the `Supported Formats`_ section below for a full list of supported
-            formats.
+            ``"SH_ASC"``, ``"SEGY"``, ``"SU"``, ``"WAV"``, ``"PICKLE"``,
+            ``"OBSPYBIN"``. See the `Supported Formats`_ section below for a
+            full list of supported formats.
         :param kwargs: Additional keyword arguments passed to the underlying
             waveform writer method.
 
@@ -1332,22 +1531,23 @@ class Stream(object):
         Please refer to the *Linked Function Call* of each module for any extra
         options available.
 
-        =======  ===================  ====================================
-        Format   Required Module      Linked Function Call
-        =======  ===================  ====================================
-        MSEED    :mod:`obspy.mseed`   :func:`obspy.mseed.core.writeMSEED`
-        GSE2     :mod:`obspy.gse2`    :func:`obspy.gse2.core.writeGSE2`
-        SAC      :mod:`obspy.sac`     :func:`obspy.sac.core.writeSAC`
-        SACXY    :mod:`obspy.sac`     :func:`obspy.sac.core.writeSACXY`
-        Q        :mod:`obspy.sh`      :func:`obspy.sh.core.writeQ`
-        SH_ASC   :mod:`obspy.sh`      :func:`obspy.sh.core.writeASC`
-        SEGY     :mod:`obspy.segy`    :func:`obspy.segy.core.writeSEGY`
-        SLIST    :mod:`obspy.core`    :func:`obspy.core.ascii.writeSLIST`
-        SU       :mod:`obspy.segy`    :func:`obspy.segy.core.writeSU`
-        TSPAIR   :mod:`obspy.core`    :func:`obspy.core.ascii.writeTSPAIR`
-        WAV      :mod:`obspy.wav`     :func:`obspy.wav.core.writeWAV`
-        PICKLE   :mod:`obspy.core`    :func:`obspy.core.stream.writePickle`
-        =======  ===================  ====================================
+        ========  ===================  ====================================
+        Format    Required Module      Linked Function Call
+        ========  ===================  ====================================
+        MSEED     :mod:`obspy.mseed`   :func:`obspy.mseed.core.writeMSEED`
+        GSE2      :mod:`obspy.gse2`    :func:`obspy.gse2.core.writeGSE2`
+        SAC       :mod:`obspy.sac`     :func:`obspy.sac.core.writeSAC`
+        SACXY     :mod:`obspy.sac`     :func:`obspy.sac.core.writeSACXY`
+        Q         :mod:`obspy.sh`      :func:`obspy.sh.core.writeQ`
+        SH_ASC    :mod:`obspy.sh`      :func:`obspy.sh.core.writeASC`
+        SEGY      :mod:`obspy.segy`    :func:`obspy.segy.core.writeSEGY`
+        SLIST     :mod:`obspy.core`    :func:`obspy.core.ascii.writeSLIST`
+        SU        :mod:`obspy.segy`    :func:`obspy.segy.core.writeSU`
+        TSPAIR    :mod:`obspy.core`    :func:`obspy.core.ascii.writeTSPAIR`
+        WAV       :mod:`obspy.wav`     :func:`obspy.wav.core.writeWAV`
+        PICKLE    :mod:`obspy.core`    :func:`obspy.core.stream.writePickle`
+        OBSPYBIN  :mod:`obspy.core`    :func:`obspy.core.binary.writeOBSPYBIN`
+        ========  ===================  ====================================
         """
         # Check all traces for masked arrays and raise exception.
         for trace in self.traces:
@@ -1441,6 +1641,7 @@ class Stream(object):
         for trace in self.traces:
             trace.trim(starttime, endtime, pad=pad,
                        nearest_sample=nearest_sample, fill_value=fill_value)
+        self._invalidateIndex()
         # remove empty traces after trimming
         self.traces = [_i for _i in self.traces if _i.stats.npts]
 
@@ -1452,6 +1653,7 @@ class Stream(object):
         for trace in self.traces:
             trace.trim(starttime=starttime, pad=pad,
                        nearest_sample=nearest_sample)
+        self._invalidateIndex()
         # remove empty traces after trimming
         self.traces = [tr for tr in self.traces if tr.stats.npts]
 
@@ -1462,6 +1664,7 @@ class Stream(object):
         """
         for trace in self.traces:
             trace.trim(endtime=endtime, pad=pad, nearest_sample=nearest_sample)
+        self._invalidateIndex()
         # remove empty traces after trimming
         self.traces = [tr for tr in self.traces if tr.stats.npts]
 
@@ -1498,7 +1701,8 @@ class Stream(object):
         tmp += self.slice(starttime=endtime, keep_empty_traces=False)
         self.traces = tmp.traces
 
-    def slice(self, starttime=None, endtime=None, keep_empty_traces=False):
+    def slice(self, starttime=None, endtime=None, keep_empty_traces=False,
+              use_index=False):
         """
         Returns new Stream object cut to the given start- and endtime.
 
@@ -1509,6 +1713,11 @@ class Stream(object):
         :type keep_empty_traces: bool, optional
         :param keep_empty_traces: Empty traces will be kept if set to ``True``.
             Defaults to ``False``.
+        :type use_index: bool, optional
+        :param use_index: If ``True``, only traces overlapping the given time
+            span are looked up using the index of the stream (see
+            :meth:`select`). Ignored if ``keep_empty_traces`` is set. Defaults
+            to ``False``.
         :return: :class:`~obspy.core.stream.Stream`
 
         .. note::
@@ -1536,16 +1745,123 @@ class Stream(object):
         """
         tmp = copy.copy(self)
         tmp.traces = []
+        tmp._index = None
         new = tmp.copy()
-        for trace in self:
+        traces = self.traces
+        if use_index and not keep_empty_traces:
+            positions = self._getIndex().overlapping(starttime, endtime)
+            traces = [traces[_i] for _i in positions]
+        for trace in traces:
             sliced_trace = trace.slice(starttime=starttime, endtime=endtime)
             if keep_empty_traces is False and not sliced_trace.stats.npts:
                 continue
             new.append(sliced_trace)
         return new
 
+    def windows(self, length, step=None):
+        """
+        Generator yielding time aligned sliding windows over all traces.
+
+        :type length: float
+        :param length: Length of each window in seconds. It is rounded to a
+            whole number of samples.
+        :type step: float, optional
+        :param step: Time between the starts of two consecutive windows in
+            seconds, rounded to a whole number of samples. Defaults to
+            ``length``, i.e. windows without overlap.
+        :return: Generator yielding a tuple of start time
+            (:class:`~obspy.core.utcdatetime.UTCDateTime`) and a list with
+            the data of the window for every trace, in the order of the
+            traces.
+
+        Windows start at the latest start time of all traces and only cover
+        the time span all traces have in common. All traces need to have the
+        same sampling rate. The data of each window is a view into the data of
+        the respective trace, no data is copied and no Trace objects are
+        created. See :meth:`~obspy.core.trace.Trace.windows` for windows over
+        a single trace.
+
+        .. rubric:: Example
+
+        >>> st = read()
+        >>> for starttime, data in st.windows(10.0, step=5.0):
+        ...     print starttime, [len(d) for d in data]
+        2009-08-24T00:20:03.000000Z [1000, 1000, 1000]
+        2009-08-24T00:20:08.000000Z [1000, 1000, 1000]
+        2009-08-24T00:20:13.000000Z [1000, 1000, 1000]
+        2009-08-24T00:20:18.000000Z [1000, 1000, 1000]
+        2009-08-24T00:20:23.000000Z [1000, 1000, 1000]
+        """
+        starttime, arrays, npts, step_npts = \
+            self._alignedData(length, step)
+        delta = self.traces[0].stats.delta
+        for i in xrange(0, len(arrays[0]) - npts + 1, step_npts):
+            yield starttime + i * delta, [data[i:i + npts] for data in arrays]
+
+    def windowArray(self, length, step=None):
+        """
+        Returns all time aligned sliding windows as a 2-D array per trace.
+
+        See :meth:`~obspy.core.stream.Stream.windows` for the parameters and
+        the alignment of the windows.
+
+        :return: Tuple of the start time of the first window
+            (:class:`~obspy.core.utcdatetime.UTCDateTime`) and a list with a
+            read-only 2-D array of shape ``(number of windows, samples per
+            window)`` for every trace. Each array is a strided view into the
+            data of its trace. Row ``i`` starts ``i * step`` seconds after the
+            returned start time.
+
+        .. rubric:: Example
+
+        >>> st = read()
+        >>> starttime, windows = st.windowArray(10.0, step=5.0)
+        >>> print starttime
+        2009-08-24T00:20:03.000000Z
+        >>> [w.shape for w in windows]
+        [(5, 1000), (5, 1000), (5, 1000)]
+        """
+        for tr in self:
+            if np.ma.is_masked(tr.data):
+                msg = "Trace with masked values found. This is not " + \
+                      "supported for this operation. Try the split() " + \
+                      "method on Stream to produce a Stream with " + \
+                      "unmasked Traces."
+                raise NotImplementedError(msg)
+        starttime, arrays, npts, step_npts = \
+            self._alignedData(length, step)
+        return starttime, [_windowArray(data, npts, step_npts)
+                           for data in arrays]
+
+    def _alignedData(self, length, step=None):
+        """
+        Returns the data of all traces cut to the time span they have in
+        common.
+
+        :return: Tuple of start time of the common time span, list of data
+            views, window length and window step in samples.
+        """
+        if not self.traces:
+            msg = "Stream contains no traces."
+            raise ValueError(msg)
+        sampling_rates = set(tr.stats.sampling_rate for tr in self)
+        if len(sampling_rates) > 1:
+            msg = "All traces need to have the same sampling rate."
+            raise ValueError(msg)
+        sampling_rate = sampling_rates.pop()
+        npts, step_npts = self.traces[0]._windowSamples(length, step)
+        starttime = max(tr.stats.starttime for tr in self)
+        offsets = [int(round((starttime - tr.stats.starttime) *
+                             sampling_rate)) for tr in self]
+        common = max(min(len(tr.data) - offset
+                         for tr, offset in izip(self, offsets)), 0)
+        arrays = [tr.data[offset:offset + common]
+                  for tr, offset in izip(self, offsets)]
+        return starttime, arrays, npts, step_npts
+
     def select(self, network=None, station=None, location=None, channel=None,
-               sampling_rate=None, npts=None, component=None, id=None):
+               sampling_rate=None, npts=None, component=None, id=None,
+               use_index=False):
         """
         Returns new Stream object only with these traces that match the given
         stats criteria (e.g. all traces with ``channel="EHZ"``).
@@ -1593,6 +1909,24 @@ class Stream(object):
 
         All other selection criteria that accept strings (network, station,
         location) may also contain Unix style wildcards (``*``, ``?``, ...).
+
+        .. rubric:: Index
+
+        For streams with many traces, ``use_index=True`` avoids testing every
+        single trace. An index of all traces by network, station, location,
+        channel, id and time span is built on first use and reused by
+        subsequent calls of :meth:`select`, :meth:`slice` and
+        :meth:`getGaps` with ``use_index=True``. The index is rebuilt
+        automatically if traces are added, removed or replaced using Stream
+        methods, after Stream methods altering trace headers (e.g. trimming)
+        and if the ``traces`` list is replaced. Changes made directly to
+        headers of single traces or to the ``traces`` list in place are not
+        necessarily detected, call :meth:`clearIndex` afterwards.
+
+        >>> st2 = st.select(station="RJOB", channel="*Z", use_index=True)
+        >>> print(st2)  # doctest: +ELLIPSIS
+        1 Trace(s) in Stream:
+        BW.RJOB..EHZ | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
         """
         # make given component letter uppercase (if e.g. "z" is given)
         if component and channel:
@@ -1602,8 +1936,14 @@ class Stream(object):
                 msg = "Selection criteria for channel and component are " + \
                       "mutually exclusive!"
                 raise ValueError(msg)
+        candidates = self.traces
+        if use_index:
+            positions = self._getIndex().matching(
+                network=network, station=station, location=location,
+                channel=channel, id=id)
+            candidates = [candidates[_i] for _i in positions]
         traces = []
-        for trace in self:
+        for trace in candidates:
             # skip trace if any given criterion is not matched
             if id and not fnmatch.fnmatch(trace.id.upper(), id.upper()):
                 continue
@@ -1631,6 +1971,38 @@ class Stream(object):
             traces.append(trace)
         return self.__class__(traces=traces)
 
+    def _getIndex(self):
+        """
+        Returns the index of the traces of this stream, (re-)building it if
+        the traces have changed.
+
+        Stream methods changing the traces invalidate the index. A replaced
+        ``traces`` list or one with a different length is detected in
+        constant time as well.
+        """
+        index = getattr(self, '_index', None)
+        if index is None or index.traces is not self.traces or \
+                index.length != len(self.traces):
+            index = _StreamIndex(self.traces)
+            self._index = index
+        return index
+
+    def _invalidateIndex(self):
+        """
+        Removes the index after trace headers have been changed in place.
+        """
+        self._index = None
+
+    def clearIndex(self):
+        """
+        Removes the trace index used by :meth:`select`, :meth:`slice` and
+        :meth:`getGaps`.
+
+        Needs to be called only after headers of traces or the ``traces``
+        list have been modified directly if the index is used.
+        """
+        self._invalidateIndex()
+
     def verify(self):
         """
         Verifies all traces of current Stream against available meta data.
@@ -1713,58 +2085,45 @@ class Stream(object):
         The ``method`` argument controls the handling of overlapping data
         values.
         """
-        def listsort(order, current):
-            """
-            Helper method for keeping trace's ordering
-            """
-            try:
-                return order.index(current)
-            except ValueError:
-                return -1
-
         if method == -1:
             self._cleanup()
             return
         # check sampling rates and dtypes
         self._mergeChecks()
         # remember order of traces
-        order = [id(i) for i in self.traces]
+        order = dict((id(tr), _i) for _i, tr in enumerate(self.traces))
         # order matters!
         self.sort(keys=['network', 'station', 'location', 'channel',
                         'starttime', 'endtime'])
         # build up dictionary with with lists of traces with same ids
         traces_dict = {}
-        # using pop() and try-except saves memory
-        try:
-            while True:
-                trace = self.traces.pop(0)
-                # skip empty traces
-                if len(trace) == 0:
-                    continue
-                _id = trace.getId()
-                if _id not in traces_dict:
-                    traces_dict[_id] = [trace]
-                else:
-                    traces_dict[_id].append(trace)
-        except IndexError:
-            pass
+        for trace in self.traces:
+            # skip empty traces
+            if len(trace) == 0:
+                continue
+            traces_dict.setdefault(trace.getId(), []).append(trace)
         # clear traces of current stream
         self.traces = []
         # loop through ids
-        for _id in traces_dict.keys():
-            cur_trace = traces_dict[_id].pop(0)
-            # loop through traces of same id
-            for _i in xrange(len(traces_dict[_id])):
-                trace = traces_dict[_id].pop(0)
-                # disable sanity checks because there are already done
-                cur_trace = cur_trace.__add__(
-                    trace, method, fill_value=fill_value, sanity_checks=False,
-                    interpolation_samples=interpolation_samples)
+        for traces in traces_dict.itervalues():
+            if len(traces) == 1:
+                self.traces.append(traces[0])
+                continue
+            cur_trace = _mergeFragments(traces, fill_value)
+            if cur_trace is None:
+                # overlapping or masked fragments are folded pairwise
+                cur_trace = traces[0]
+                for trace in traces[1:]:
+                    # disable sanity checks because there are already done
+                    cur_trace = cur_trace.__add__(
+                        trace, method, fill_value=fill_value,
+                        sanity_checks=False,
+                        interpolation_samples=interpolation_samples)
             self.traces.append(cur_trace)
 
         # trying to restore order, newly created traces are placed at
         # start
-        self.traces.sort(key=lambda x: listsort(order, id(x)))
+        self.traces.sort(key=lambda x: order.get(id(x), -1))
 
     def simulate(self, paz_remove=None, paz_simulate=None,
                  remove_sensitivity=True, simulate_sensitivity=True, **kwargs):
@@ -1869,7 +2228,15 @@ class Stream(object):
             further details.
         :param options: Necessary keyword arguments for the respective filter
             that will be passed on. (e.g. ``freqmin=1.0``, ``freqmax=20.0`` for
-            ``"bandpass"``)
+            ``"bandpass"``). The additional keyword ``workers`` (int) splits
+            batches of equal-length traces into ``workers`` blocks of rows
+            which are filtered concurrently by a pool of threads.
+
+        Traces sharing sampling rate, number of samples and data type are
+        filtered together as a single two-dimensional array for the
+        Butterworth filters (``'bandpass'``, ``'bandstop'``, ``'lowpass'``
+        and ``'highpass'``), so the filter is designed only once per group.
+        The data of each trace afterwards is a row of the filtered array.
 
         .. note::
 
@@ -1918,7 +2285,24 @@ class Stream(object):
             st.filter("highpass", freq=1.0)
             st.plot()
         """
-        for tr in self:
+        type = type.lower()
+        workers = options.pop('workers', None)
+        traces = self.traces
+        if type in BATCH_FILTERS:
+            groups = {}
+            for tr in self:
+                data = tr.data
+                if isinstance(data, np.ma.masked_array) or not len(data):
+                    continue
+                key = (tr.stats.sampling_rate, len(data), data.dtype.str)
+                groups.setdefault(key, []).append(tr)
+            batched = set()
+            for group in groups.itervalues():
+                if len(group) > 1:
+                    _filterBatch(group, type, workers, options)
+                    batched.update(id(tr) for tr in group)
+            traces = [tr for tr in self if id(tr) not in batched]
+        for tr in traces:
             tr.filter(type, **options)
 
     def trigger(self, type, **options):
@@ -1988,23 +2372,29 @@ class Stream(object):
         for tr in self:
             tr.trigger(type, **options)
 
-    def resample(self, sampling_rate, window='hanning', no_filter=True,
-                 strict_length=False):
+    def resample(self, sampling_rate, window=None, no_filter=True,
+                 strict_length=False, method='fft'):
         """
-        Resample data in all traces of stream using Fourier method.
+        Resample data in all traces of stream using Fourier or polyphase
+        method.
 
         :type sampling_rate: float
         :param sampling_rate: The sampling rate of the resampled signal.
         :type window: array_like, callable, string, float, or tuple, optional
         :param window: Specifies the window applied to the signal in the
             Fourier domain. Defaults ``'hanning'`` window. See
-            :func:`scipy.signal.resample` for details.
+            :func:`scipy.signal.resample` for details. For
+            ``method='polyphase'`` the window used in the design of the FIR
+            filter, defaults to ``('kaiser', 5.0)``.
         :type no_filter: bool, optional
         :param no_filter: Deactivates automatic filtering if set to ``True``.
-            Defaults to ``True``.
+            Defaults to ``True``. Ignored for ``method='polyphase'``.
         :type strict_length: bool, optional
         :param strict_length: Leave traces unchanged for which endtime of trace
             would change. Defaults to ``False``.
+        :type method: str, optional
+        :param method: ``'fft'`` (default) or ``'polyphase'``, see
+            :meth:`~obspy.core.trace.Trace.resample`.
 
         .. note::
 
@@ -2015,8 +2405,8 @@ class Stream(object):
             This also makes an entry with information on the applied processing
             in ``stats.processing`` of every trace.
 
-        Uses :func:`scipy.signal.resample`. Because a Fourier method is used,
-        the signal is assumed to be periodic.
+        The Fourier method uses :func:`scipy.signal.resample`. The signal is
+        assumed to be periodic.
 
         .. rubric:: Example
 
@@ -2035,7 +2425,8 @@ class Stream(object):
         """
         for tr in self:
             tr.resample(sampling_rate, window=window, no_filter=no_filter,
-                        strict_length=strict_length)
+                        strict_length=strict_length, method=method)
+        self._invalidateIndex()
 
     def decimate(self, factor, no_filter=False, strict_length=False):
         """
@@ -2092,6 +2483,7 @@ class Stream(object):
         for tr in self:
             tr.decimate(factor, no_filter=no_filter,
                         strict_length=strict_length)
+        self._invalidateIndex()
 
     def max(self):
         """
@@ -2425,6 +2817,7 @@ class Stream(object):
                 for comp in (i_1, i_2, i_3):
                     comp.stats.back_azimuth = back_azimuth
                     comp.stats.inclination = inclination
+        self._invalidateIndex()
 
     def copy(self):
         """
@@ -2614,6 +3007,175 @@ class Stream(object):
         return new_stream
 
 
+class _StreamIndex(object):
+    """
+    Index of a list of traces by SEED identifiers and time span.
+
+    Traces are grouped by upper-cased network, station, location, channel
+    codes and full id, thus only the distinct codes have to be tested against
+    wildcard patterns. For time queries the traces are sorted by start time,
+    so only traces starting between ``starttime - longest trace duration``
+    and ``endtime`` need to be checked.
+    """
+    def __init__(self, traces):
+        # keep a reference to the list to detect its replacement
+        self.traces = traces
+        self.length = len(traces)
+        self.keys = {}
+        for key in ['network', 'station', 'location', 'channel', 'id']:
+            self.keys[key] = {}
+        starts = np.empty(len(traces), dtype='float64')
+        ends = np.empty(len(traces), dtype='float64')
+        self.max_delta = 0.0
+        for _i, trace in enumerate(self.traces):
+            stats = trace.stats
+            for key in ['network', 'station', 'location', 'channel']:
+                self.keys[key].setdefault(stats[key].upper(), []).append(_i)
+            self.keys['id'].setdefault(trace.id.upper(), []).append(_i)
+            starts[_i] = stats.starttime.timestamp
+            ends[_i] = stats.endtime.timestamp
+            self.max_delta = max(self.max_delta, stats.delta)
+        self.order = np.argsort(starts, kind='mergesort')
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        if len(traces):
+            self.max_duration = (ends - starts).max()
+        else:
+            self.max_duration = 0.0
+
+    def matching(self, **kwargs):
+        """
+        Returns sorted positions of all traces possibly matching the given
+        patterns, e.g. ``station='RJ*'``.
+        """
+        positions = None
+        for key, pattern in kwargs.iteritems():
+            if not pattern:
+                continue
+            pattern = pattern.upper()
+            if has_magic(pattern):
+                values = [v for k, v in self.keys[key].iteritems()
+                          if fnmatch.fnmatch(k, pattern)]
+            else:
+                values = [self.keys[key].get(pattern, [])]
+            found = set()
+            for value in values:
+                found.update(value)
+            if positions is None:
+                positions = found
+            else:
+                positions &= found
+        if positions is None:
+            return range(len(self.traces))
+        return sorted(positions)
+
+    def overlapping(self, starttime=None, endtime=None):
+        """
+        Returns sorted positions of all traces possibly overlapping the given
+        time span.
+        """
+        # widen by one sample to account for nearest sample selection
+        if starttime is not None:
+            t1 = starttime.timestamp - self.max_delta
+            first = np.searchsorted(self.starts, t1 - self.max_duration)
+        else:
+            first = 0
+        if endtime is not None:
+            t2 = endtime.timestamp + self.max_delta
+            last = np.searchsorted(self.starts, t2, side='right')
+        else:
+            last = len(self.starts)
+        positions = self.order[first:last]
+        if starttime is not None:
+            positions = positions[self.ends[first:last] >= t1]
+        return np.sort(positions).tolist()
+
+    def sortedTraces(self, traces):
+        """
+        Returns the traces sorted by network, station, location, channel,
+        start and end time.
+        """
+        groups = {}
+        for _i in self.order:
+            trace = traces[_i]
+            stats = trace.stats
+            key = (stats.network, stats.station, stats.location,
+                   stats.channel)
+            groups.setdefault(key, []).append(trace)
+        result = []
+        for key in sorted(groups):
+            group = groups[key]
+            # already sorted by start time, sort is stable
+            group.sort(key=lambda x: (x.stats.starttime, x.stats.endtime))
+            result.extend(group)
+        return result
+
+
+def _mergeFragments(traces, fill_value=None):
+    """
+    Merges time sorted traces with same id and without overlaps into a single
+    trace in one pass.
+
+    The output array is allocated once and every fragment is copied into
+    place. Gaps are handled like :meth:`~obspy.core.trace.Trace.__add__`
+    does, so the result is identical to adding up all traces one after
+    another.
+
+    :type traces: list of :class:`~obspy.core.trace.Trace`
+    :param traces: Non-empty traces with same id, sampling rate, calibration
+        factor and data type sorted by start and end time.
+    :param fill_value: See :meth:`~obspy.core.stream.Stream.merge`.
+    :return: Merged :class:`~obspy.core.trace.Trace` or ``None`` if any
+        fragments overlap or contain masked arrays.
+    """
+    first = traces[0]
+    sr = first.stats.sampling_rate
+    sample_delta = first.stats.delta
+    starttime = first.stats.starttime
+    dtype = first.data.dtype
+    # sample offsets of all fragments and gaps in between
+    offsets = [0]
+    gaps = []
+    npts = len(first)
+    for trace in traces:
+        if isinstance(trace.data, np.ma.masked_array):
+            return None
+    for trace in traces[1:]:
+        # same arithmetic as in Trace.__add__ using the end time of all
+        # previously merged fragments
+        endtime = starttime + (npts - 1) * sample_delta
+        delta = int(round((trace.stats.starttime - endtime) * sr)) - 1
+        if delta < 0:
+            return None
+        if delta > 0:
+            gaps.append((npts, delta))
+        offsets.append(npts + delta)
+        npts += delta + len(trace)
+    # copy all fragments into place
+    data = np.empty(npts, dtype=dtype)
+    for offset, trace in izip(offsets, traces):
+        data[offset:offset + len(trace)] = trace.data
+    if gaps:
+        if fill_value is None:
+            mask = np.zeros(npts, dtype='bool')
+            for start, delta in gaps:
+                mask[start:start + delta] = True
+            data = np.ma.masked_array(data, mask=mask)
+        else:
+            for start, delta in gaps:
+                if fill_value == "latest":
+                    value = data[start - 1]
+                elif fill_value == "interpolate":
+                    value = (data[start - 1], data[start + delta])
+                else:
+                    value = fill_value
+                data[start:start + delta] = \
+                    createEmptyDataChunk(delta, dtype, value)
+    out = first.__class__(header=copy.deepcopy(first.stats))
+    out.data = data
+    return out
+
+
 def isPickle(filename):  # @UnusedVariable
     """
     Checks whether a file is a pickled ObsPy Stream file.
@@ -2628,16 +3190,11 @@ def isPickle(filename):  # @UnusedVariable
     >>> isPickle('/path/to/pickle.file')  # doctest: +SKIP
     True
     """
-    if isinstance(filename, basestring):
-        try:
-            st = cPickle.load(open(filename, 'rb'))
-        except:
-            return False
-    else:
-        try:
-            st = cPickle.load(filename)
-        except:
-            return False
+    try:
+        with _openFile(filename) as fh:
+            st = cPickle.load(fh)
+    except:
+        return False
     return isinstance(st, Stream)
 
 
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+from obspy import UTCDateTime, read, Trace, Stream
+from obspy.core.binary import isOBSPYBIN, readOBSPYBIN, writeOBSPYBIN, \
+    ALIGNMENT, FILE_HEADER_SIZE, HEADER_DTYPE
+from obspy.core.util import NamedTemporaryFile
+import StringIO
+import numpy as np
+import os
+import unittest
+
+
+class BinaryTestCase(unittest.TestCase):
+    """
+    Test cases for the ObsPy binary container format.
+    """
+    def setUp(self):
+        # three component example stream plus a SAC file with extra headers
+        self.stream = read()
+        self.stream += read(os.path.join(os.path.dirname(__file__),
+                                         os.pardir, os.pardir, 'sac',
+                                         'tests', 'data', 'test.sac'))
+        self.stream[0].stats.processing = ['filter:lowpass:5']
+
+    def _assertStreamsEqual(self, st1, st2):
+        self.assertEqual(len(st1), len(st2))
+        for tr1, tr2 in zip(st1, st2):
+            self.assertEqual(tr1.id, tr2.id)
+            self.assertEqual(tr1.stats.starttime, tr2.stats.starttime)
+            self.assertEqual(tr1.stats.sampling_rate,
+                             tr2.stats.sampling_rate)
+            self.assertEqual(tr1.stats.calib, tr2.stats.calib)
+            self.assertEqual(tr1.stats.npts, tr2.stats.npts)
+            self.assertEqual(tr1.data.dtype, tr2.data.dtype)
+            np.testing.assert_array_equal(tr1.data, tr2.data)
+
+    def test_readAndWrite(self):
+        """
+        Round trip of data and all headers, with and without memory map.
+        """
+        with NamedTemporaryFile() as tf:
+            tempfile = tf.name
+            self.stream.write(tempfile, format='OBSPYBIN')
+            self.assertTrue(isOBSPYBIN(tempfile))
+            for mmap in [True, False]:
+                st = read(tempfile, mmap=mmap)
+                self._assertStreamsEqual(self.stream, st)
+                self.assertEqual(st[0].stats._format, 'OBSPYBIN')
+                self.assertEqual(st[0].stats.processing,
+                                 ['filter:lowpass:5'])
+                self.assertEqual(st[3].stats.sac, self.stream[3].stats.sac)
+            # data of memory mapped traces can be changed without touching
+            # the file
+            st = read(tempfile)
+            st[0].data[:] = 0
+            self._assertStreamsEqual(self.stream, read(tempfile))
+
+    def test_layout(self):
+        """
+        Checks header table and alignment of the data arrays.
+        """
+        with NamedTemporaryFile() as tf:
+            tempfile = tf.name
+            writeOBSPYBIN(self.stream, tempfile)
+            with open(tempfile, 'rb') as fh:
+                self.assertEqual(fh.read(8), 'OBSPYBIN')
+                fh.seek(FILE_HEADER_SIZE)
+                table = np.fromstring(
+                    fh.read(len(self.stream) * HEADER_DTYPE.itemsize),
+                    dtype=HEADER_DTYPE)
+        self.assertEqual(table['station'].tolist(),
+                         ['RJOB', 'RJOB', 'RJOB', 'STA'])
+        self.assertEqual(table['npts'].tolist(), [3000, 3000, 3000, 100])
+        self.assertTrue(np.all(table['offset'] % ALIGNMENT == 0))
+        self.assertEqual(table['starttime'][0],
+                         self.stream[0].stats.starttime.ns)
+
+    def test_byteorder(self):
+        """
+        Non-native byte orders are converted on reading.
+        """
+        tr = Trace(data=np.arange(100, dtype='int32'))
+        tr.stats.station = 'A' * 20
+        for byteorder in ['<', '>', '=']:
+            with NamedTemporaryFile() as tf:
+                tempfile = tf.name
+                Stream([tr]).write(tempfile, format='OBSPYBIN',
+                                   byteorder=byteorder)
+                for mmap in [True, False]:
+                    st = read(tempfile, mmap=mmap)
+                    self.assertEqual(st[0].data.dtype.byteorder, '=')
+                    self.assertEqual(st[0].stats.station, 'A' * 20)
+                    np.testing.assert_array_equal(st[0].data, tr.data)
+
+    def test_partialReading(self):
+        """
+        Only selected traces and time ranges are loaded.
+        """
+        t = self.stream[0].stats.starttime
+        with NamedTemporaryFile() as tf:
+            tempfile = tf.name
+            self.stream.write(tempfile, format='OBSPYBIN')
+            # selecting traces
+            st = read(tempfile, sourcename='BW.RJOB..EH[NE]')
+            self.assertEqual([tr.id for tr in st],
+                             ['BW.RJOB..EHN', 'BW.RJOB..EHE'])
+            # time range - traces out of range are skipped
+            for nearest_sample in [True, False]:
+                st = read(tempfile, starttime=t + 10.004, endtime=t + 15.006,
+                          nearest_sample=nearest_sample)
+                expected = self.stream.select(station='RJOB').copy()
+                expected.trim(t + 10.004, t + 15.006,
+                              nearest_sample=nearest_sample)
+                self._assertStreamsEqual(expected, st)
+            # only the samples enclosing the window are loaded
+            st = readOBSPYBIN(tempfile, starttime=t + 10.004,
+                              endtime=t + 15.006)
+            self.assertEqual(st[0].stats.starttime, t + 10.0)
+            self.assertEqual(st[0].stats.npts, 502)
+            # lazy loading
+            st = read(tempfile, lazy=True, starttime=t + 10, endtime=t + 15)
+            self._assertStreamsEqual(
+                read(tempfile, starttime=t + 10, endtime=t + 15), st)
+            # headonly
+            st = read(tempfile, headonly=True)
+            self.assertEqual(st[3].stats.npts, 100)
+            self.assertEqual(len(st[3].data), 0)
+
+    def test_fileLikeObjects(self):
+        """
+        Reading from and writing into file-like objects.
+        """
+        buf = StringIO.StringIO()
+        writeOBSPYBIN(self.stream, buf)
+        buf.seek(0)
+        st = read(buf)
+        self._assertStreamsEqual(self.stream, st)
+        st = read(bytearray(buf.getvalue()),
+                  starttime=UTCDateTime(2009, 8, 24, 0, 20, 10))
+        self.assertEqual(len(st), 3)
+
+    def test_emptyStreamAndTraces(self):
+        """
+        Empty traces and streams are written and read.
+        """
+        with NamedTemporaryFile() as tf:
+            tempfile = tf.name
+            writeOBSPYBIN(Stream([Trace(data=np.array([], dtype='f8'))]),
+                          tempfile)
+            st = readOBSPYBIN(tempfile)
+            self.assertEqual(len(st), 1)
+            self.assertEqual(st[0].stats.npts, 0)
+            self.assertEqual(st[0].data.dtype, np.float64)
+            writeOBSPYBIN(Stream(), tempfile)
+            self.assertTrue(isOBSPYBIN(tempfile))
+            self.assertEqual(len(readOBSPYBIN(tempfile)), 0)
+
+
+def suite():
+    return unittest.makeSuite(BinaryTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
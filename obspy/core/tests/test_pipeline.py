@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+from obspy import Stream, Trace, UTCDateTime, read
+from obspy.core.pipeline import Pipeline
+from obspy.core.util import NamedTemporaryFile
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class PipelineTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.core.pipeline.
+    """
+    def setUp(self):
+        np.random.seed(815)
+        self.trace = Trace(data=np.random.randint(-1000, 1000, 24000)
+                           .astype('int32'),
+                           header={'network': 'BW', 'station': 'TEST',
+                                   'sampling_rate': 20.0,
+                                   'starttime': UTCDateTime(2012, 1, 1)})
+
+    def test_recordSteps(self):
+        """
+        Stream methods and functions are recorded, not executed.
+        """
+        pipeline = Pipeline()
+        self.assertTrue(pipeline.detrend('demean') is pipeline)
+        pipeline.filter('lowpass', freq=1.0).apply(Stream.reverse)
+        self.assertEqual(len(pipeline.steps), 3)
+        self.assertEqual(str(pipeline), "Pipeline with 3 step(s):\n"
+                         "    detrend('demean')\n"
+                         "    filter('lowpass', freq=1.0)\n"
+                         "    reverse()")
+        self.assertRaises(AttributeError, getattr, pipeline, 'no_method')
+        self.assertRaises(AttributeError, getattr, pipeline, '_ltrim')
+        # processing equals calling the methods directly
+        st = Stream([self.trace.copy()])
+        expected = st.copy()
+        expected.detrend('demean')
+        expected.filter('lowpass', freq=1.0)
+        expected.reverse()
+        st = pipeline.process(st)
+        np.testing.assert_array_equal(st[0].data, expected[0].data)
+
+    def test_iterChunks(self):
+        """
+        Chunks join without gaps or duplicated samples and match processing
+        the whole time span as far as the overlap covers edge effects.
+        """
+        pipeline = Pipeline().filter('lowpass', freq=1.0)
+        expected = self.trace.copy()
+        expected.filter('lowpass', freq=1.0)
+        t = self.trace.stats.starttime
+        with NamedTemporaryFile() as tf:
+            self.trace.write(tf.name, format='MSEED')
+            chunks = list(pipeline.iterChunks(tf.name, t, t + 1200,
+                                              chunk_length=170.0,
+                                              overlap=60.0))
+            # no sidecar files are written unless asked for
+            self.assertFalse(os.path.exists(tf.name + '.msidx'))
+        self.assertEqual(len(chunks), 8)
+        for i, st in enumerate(chunks):
+            self.assertEqual(len(st), 1)
+            self.assertEqual(st[0].stats.starttime, t + i * 170)
+            self.assertEqual(st[0].stats.processing,
+                             ["filter:lowpass:{'freq': 1.0}"])
+        data = np.concatenate([st[0].data for st in chunks])
+        self.assertEqual(len(data), len(expected.data))
+        np.testing.assert_allclose(data, expected.data, rtol=0,
+                                   atol=1e-6 * abs(expected.data).max())
+
+    def test_iterChunksGlob(self):
+        """
+        Chunks are read from all files of a glob pattern overlapping with
+        them, sidecar files of record indices are ignored.
+        """
+        pipeline = Pipeline()
+        t = self.trace.stats.starttime
+        tempdir = tempfile.mkdtemp()
+        try:
+            for i in xrange(3):
+                filename = os.path.join(tempdir, "%d.mseed" % i)
+                self.trace.slice(t + i * 400, t + (i + 1) * 400 - 0.05)\
+                    .write(filename, format='MSEED')
+            source = os.path.join(tempdir, "*")
+            chunks = list(pipeline.iterChunks(source, t, t + 1200,
+                                              chunk_length=300.0,
+                                              overlap=0.0, use_index=True))
+            self.assertTrue(os.path.exists(
+                os.path.join(tempdir, "0.mseed.msidx")))
+            # the second pass reads the sidecar files written by the first
+            chunks2 = list(pipeline.iterChunks(source, t, t + 1200,
+                                               chunk_length=300.0,
+                                               overlap=0.0, use_index=True))
+        finally:
+            shutil.rmtree(tempdir)
+        for st in (chunks, chunks2):
+            self.assertEqual(len(st), 4)
+            st = Stream([tr for chunk in st for tr in chunk])
+            st.merge()
+            self.assertEqual(len(st), 1)
+            np.testing.assert_array_equal(st[0].data, self.trace.data)
+
+    def test_callableSourceAndRun(self):
+        """
+        Chunks can be fetched by a function and written into files.
+        """
+        requests = []
+
+        def source(starttime, endtime):
+            requests.append((starttime, endtime))
+            return Stream([self.trace.slice(starttime, endtime)])
+
+        pipeline = Pipeline().decimate(4, no_filter=True)
+        t = self.trace.stats.starttime
+        tempdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tempdir, "BW.TEST.%H%M.mseed")
+            files = pipeline.run(source, t + 100, t + 700, filename, 'MSEED',
+                                 chunk_length=200, overlap=20)
+            self.assertEqual(requests, [(t + 80, t + 320), (t + 280, t + 520),
+                                        (t + 480, t + 720)])
+            self.assertEqual([os.path.basename(f) for f in files],
+                             ["BW.TEST.0001.mseed", "BW.TEST.0005.mseed",
+                              "BW.TEST.0008.mseed"])
+            st = read(os.path.join(tempdir, "*.mseed"))
+            st.merge()
+            self.assertEqual(len(st), 1)
+            self.assertEqual(st[0].stats.starttime, t + 100)
+            self.assertEqual(st[0].stats.sampling_rate, 5.0)
+            np.testing.assert_array_equal(
+                st[0].data, self.trace.data[2000:14000:4])
+            # read keyword arguments
+            source = os.path.join(tempdir, "*.mseed")
+            files = Pipeline().run(source, t + 100, t + 700,
+                                   os.path.join(tempdir, "%H%M.sac"), 'SAC',
+                                   chunk_length=200, overlap=0,
+                                   read_kwargs={'format': 'MSEED'})
+            self.assertEqual(len(files), 3)
+            # chunks resulting in the same file name
+            self.assertRaises(ValueError, pipeline.run, source, t + 100,
+                              t + 700, os.path.join(tempdir, "%Y.sac"),
+                              'SAC', chunk_length=200)
+        finally:
+            shutil.rmtree(tempdir)
+        self.assertRaises(ValueError, list,
+                          pipeline.iterChunks(source, t, t + 10, 0))
+
+
+def suite():
+    return unittest.makeSuite(PipelineTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from obspy import Stream, Trace, UTCDateTime
-from obspy.core.preview import createPreview, mergePreviews, resamplePreview
+from obspy.core.preview import createPreview, mergePreviews, \
+    resamplePreview, PreviewPyramid
+from obspy.core.util import NamedTemporaryFile
 import numpy as np
 import unittest
 
@@ -206,6 +208,132 @@ class UtilTestCase(unittest.TestCase):
         tr.stats.sampling_rate = 1
         createPreview(tr)
 
+    def test_previewPyramid(self):
+        """
+        Minima and maxima of all levels match a brute force computation.
+        """
+        np.random.seed(815)
+        data = np.random.randn(7000)
+        trace = Trace(data=data, header={'sampling_rate': 20.0,
+                                         'starttime': UTCDateTime(12.5)})
+        pyramid = PreviewPyramid(trace.id, 20.0, levels=(1, 10, 60))
+        pyramid.append(trace)
+        # samples relative to the start of the first 60 s interval
+        padded = np.empty(420 * 20)
+        padded.fill(np.nan)
+        padded[250:250 + len(data)] = data
+        for level, pixels in [(1, 351), (10, 36), (60, 7)]:
+            starttime, delta, mins, maxs = pyramid.get(pixels=pixels)
+            self.assertEqual(delta, level)
+            first = 12 // level * level
+            self.assertEqual(starttime, UTCDateTime(first))
+            bins = padded[first * 20:].reshape(-1, level * 20)
+            valid = ~np.isnan(bins).all(axis=1)
+            bins = bins[valid.nonzero()[0][0]:valid.nonzero()[0][-1] + 1]
+            np.testing.assert_allclose(mins, np.nanmin(bins, axis=1),
+                                       rtol=1e-6)
+            np.testing.assert_allclose(maxs, np.nanmax(bins, axis=1),
+                                       rtol=1e-6)
+        # requesting a short time range selects a finer level
+        starttime, delta, mins, maxs = pyramid.get(UTCDateTime(100),
+                                                   UTCDateTime(160),
+                                                   pixels=5)
+        self.assertEqual((starttime, delta, len(mins)),
+                         (UTCDateTime(100), 10.0, 6))
+        # no level resolves it with enough points
+        starttime, delta, mins, maxs = pyramid.get(UTCDateTime(100),
+                                                   UTCDateTime(102),
+                                                   pixels=100)
+        self.assertEqual((starttime, delta, len(mins)),
+                         (UTCDateTime(100), 1.0, 2))
+        # wrong levels, ids and sampling rates
+        self.assertRaises(ValueError, PreviewPyramid, 'A', 1.0, (10, 15))
+        self.assertRaises(ValueError, PreviewPyramid, 'A', 1.0, (10, 1))
+        self.assertRaises(ValueError, pyramid.append,
+                          Trace(data=data, header={'sampling_rate': 10.0}))
+
+    def test_previewPyramidAppend(self):
+        """
+        Appending chunks in any order, with gaps and masked values equals
+        adding all data at once.
+        """
+        np.random.seed(815)
+        data = np.ma.masked_array(np.random.randint(-1000, 1000, 9000))
+        data[4000:4500] = np.ma.masked
+        trace = Trace(data=data, header={'sampling_rate': 25.0,
+                                         'starttime': UTCDateTime(1000.2)})
+        expected = PreviewPyramid(trace.id, 25.0, levels=(2, 10, 30))
+        expected.append(trace)
+        pyramid = PreviewPyramid(trace.id, 25.0, levels=(2, 10, 30))
+        for t1, t2 in [(1200, 1361), (1000, 1100), (1100.2, 1200)]:
+            chunk = trace.slice(UTCDateTime(t1), UTCDateTime(t2))
+            for tr in chunk.split():
+                pyramid.append(tr)
+        for pixels in [1000, 30, 10]:
+            result = pyramid.get(pixels=pixels)
+            for first, second in zip(result, expected.get(pixels=pixels)):
+                np.testing.assert_array_equal(first, second)
+        self.assertEqual(str(pyramid), str(expected))
+        # the masked 20 s are empty on the 2 s level only
+        starttime, delta, mins, maxs = pyramid.get(pixels=1000)
+        self.assertEqual(starttime, UTCDateTime(1000))
+        self.assertEqual(np.isnan(mins).sum(), 9)
+        self.assertEqual(np.isnan(maxs[81:90]).sum(), 9)
+
+    def test_previewPyramidIncremental(self):
+        """
+        Many small appends grow the levels with spare capacity and keep
+        integer values beyond float32 precision.
+        """
+        data = (2 ** 30 + np.arange(20000)).astype('int32')
+        trace = Trace(data=data, header={'sampling_rate': 10.0,
+                                         'starttime': UTCDateTime(2000.0)})
+        expected = PreviewPyramid(trace.id, 10.0, levels=(1, 10))
+        expected.append(trace)
+        pyramid = PreviewPyramid(trace.id, 10.0, levels=(1, 10))
+        buffers = set()
+        # forwards from the middle, then backwards from the middle
+        for i in range(10000, 20000, 50) + range(9950, -50, -50):
+            pyramid.append(trace.slice(UTCDateTime(2000 + i / 10.0),
+                                       UTCDateTime(2004.9 + i / 10.0)))
+            buffers.add(id(pyramid._mins[0]))
+        self.assertTrue(len(buffers) < 25)
+        for pixels in [1000, 10]:
+            result = pyramid.get(pixels=pixels)
+            for first, second in zip(result, expected.get(pixels=pixels)):
+                np.testing.assert_array_equal(first, second)
+        starttime, delta, mins, maxs = pyramid.get(pixels=1000)
+        np.testing.assert_array_equal(mins, data[::10])
+        np.testing.assert_array_equal(maxs, data[9::10])
+
+    def test_previewPyramidSaveLoad(self):
+        """
+        Writing and reading a preview pyramid.
+        """
+        trace = Trace(data=np.arange(3000, dtype='float32'),
+                      header={'network': 'BW', 'station': 'MANZ',
+                              'sampling_rate': 50.0,
+                              'starttime': UTCDateTime(2012, 1, 1)})
+        pyramid = PreviewPyramid(trace.id, 50.0, levels=(0.5, 1, 5))
+        pyramid.append(trace)
+        with NamedTemporaryFile(suffix='.npz') as tf:
+            pyramid.save(tf.name)
+            loaded = PreviewPyramid.load(tf.name)
+        self.assertEqual(loaded.id, 'BW.MANZ..')
+        self.assertEqual(loaded.levels, (0.5, 1, 5))
+        self.assertEqual(str(loaded), str(pyramid))
+        for pixels in [100, 10]:
+            for first, second in zip(loaded.get(pixels=pixels),
+                                     pyramid.get(pixels=pixels)):
+                np.testing.assert_array_equal(first, second)
+        # appending continues seamlessly
+        later = trace.copy()
+        later.stats.starttime += 60
+        loaded.append(later)
+        pyramid.append(later)
+        np.testing.assert_array_equal(loaded.get(pixels=10)[2],
+                                      pyramid.get(pixels=10)[2])
+
 
 def suite():
     return unittest.makeSuite(UtilTestCase, 'test')
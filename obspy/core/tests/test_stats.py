@@ -223,6 +223,81 @@ class StatsTestCase(unittest.TestCase):
         self.assertEqual(ad, adict)
         self.assertEqual(adict, ad)
 
+    def test_derivedValues(self):
+        """
+        Tests that delta and endtime always follow the current values of
+        starttime, npts and sampling_rate.
+        """
+        stats = Stats()
+        self.assertEqual(stats.endtime, UTCDateTime(0))
+        stats.npts = 11
+        stats.sampling_rate = 2.0
+        self.assertEqual(stats.delta, 0.5)
+        self.assertEqual(stats.endtime, UTCDateTime(5))
+        stats.starttime = UTCDateTime(10)
+        self.assertEqual(stats['endtime'], UTCDateTime(15))
+        stats.sampling_rate = 0
+        self.assertEqual(stats.delta, 0)
+        self.assertEqual(stats.endtime, UTCDateTime(10))
+        # starttime is copied when set
+        t = UTCDateTime(100)
+        stats.starttime = t
+        t += 1
+        self.assertEqual(stats.starttime, UTCDateTime(100))
+        # default attributes are kept in slots, others in the instance dict
+        stats.mseed = {'dataquality': 'D'}
+        self.assertEqual(stats.__dict__.keys(), ['mseed'])
+        self.assertEqual(len(stats), 11)
+        self.assertTrue('endtime' in stats)
+        self.assertTrue('mseed' in stats)
+        self.assertFalse('sac' in stats)
+        # deleting a default attribute resets it
+        del stats.npts
+        self.assertEqual(stats.npts, 0)
+        self.assertRaises(AttributeError, stats.__delitem__, 'endtime')
+
+    def test_copyStats(self):
+        """
+        Tests shallow and deep copies of Stats objects.
+        """
+        stats = Stats({'station': 'MANZ', 'npts': 10,
+                       'starttime': UTCDateTime(2012, 1, 1),
+                       'mseed': {'dataquality': 'D'}})
+        for stats2 in [copy.copy(stats), copy.deepcopy(stats), Stats(stats)]:
+            self.assertEqual(stats, stats2)
+            stats2.station = 'RJOB'
+            stats2.starttime += 1
+            self.assertEqual(stats.station, 'MANZ')
+            self.assertEqual(stats.starttime, UTCDateTime(2012, 1, 1))
+        # only a deep copy also copies nested dictionaries
+        stats2 = copy.deepcopy(stats)
+        stats2.mseed.dataquality = 'Q'
+        self.assertEqual(stats.mseed.dataquality, 'D')
+        # subclasses and the precision of the start time are kept
+        class MyStats(Stats):
+            pass
+        stats = MyStats({'station': 'MANZ'})
+        stats.starttime.precision = 3
+        for stats2 in [copy.copy(stats), copy.deepcopy(stats)]:
+            self.assertTrue(isinstance(stats2, MyStats))
+            self.assertEqual(stats2.starttime.precision, 3)
+            self.assertFalse(stats2.starttime is stats.starttime)
+
+    def test_setStateFromDict(self):
+        """
+        Tests restoring state of a Stats object pickled as dictionary,
+        including the derived values.
+        """
+        stats = Stats.__new__(Stats)
+        stats.__setstate__({
+            'network': 'BW', 'station': 'MANZ', 'location': '',
+            'channel': 'EHZ', 'starttime': UTCDateTime(2012, 1, 1),
+            'endtime': UTCDateTime(2012, 1, 1, 0, 0, 5), 'delta': 0.05,
+            'sampling_rate': 20.0, 'npts': 101, 'calib': 1.0, 'test': 1})
+        self.assertEqual(stats.sampling_rate, 20.0)
+        self.assertEqual(stats.endtime, UTCDateTime(2012, 1, 1, 0, 0, 5))
+        self.assertEqual(stats.test, 1)
+
 
 def suite():
     return unittest.makeSuite(StatsTestCase, 'test')
@@ -7,6 +7,8 @@ from obspy.core.util.base import NamedTemporaryFile
 import cPickle
 import numpy as np
 import pickle
+import shutil
+import tempfile
 import unittest
 import warnings
 import os
@@ -1711,6 +1713,40 @@ class StreamTestCase(unittest.TestCase):
             self.assertRaises(UserWarning, read, '/path/to/slist_float.ascii',
                               headonly=True, starttime=0, endtime=1)
 
+    def test_readWithWorkers(self):
+        """
+        Reading multiple files concurrently must return the same traces in
+        the same order as reading them serially.
+        """
+        path = os.path.dirname(__file__)
+        filename = os.path.join(path, 'data', 'slist.*')
+        st = read(filename)
+        for worker_type in ['thread', 'process']:
+            st2 = read(filename, workers=3, worker_type=worker_type)
+            self.assertEquals(st, st2)
+        # unreadable files raise the same error as reading serially
+        tempdir = tempfile.mkdtemp(prefix='obspy-')
+        try:
+            for name in ['slist.ascii', 'tspair.ascii']:
+                shutil.copy(os.path.join(path, 'data', name), tempdir)
+            for name in ['zzy.ascii', 'zzz.ascii']:
+                with open(os.path.join(tempdir, name), 'wb') as fh:
+                    fh.write('garbage')
+            for pattern in ['*', 'zz*']:
+                pattern = os.path.join(tempdir, pattern)
+                for workers in [None, 2]:
+                    try:
+                        read(pattern, workers=workers)
+                    except TypeError, e:
+                        self.assertTrue('zzy.ascii' in str(e))
+                    else:
+                        self.fail('TypeError not raised')
+        finally:
+            shutil.rmtree(tempdir)
+        # invalid worker type
+        self.assertRaises(ValueError, read, filename, workers=2,
+                          worker_type='XXX')
+
     def test_copy(self):
         """
         Testing the copy method of the Stream object.
@@ -1739,6 +1775,118 @@ class StreamTestCase(unittest.TestCase):
         st.merge(fill_value='interpolate')
         self.assertEqual(len(st), 1)
 
+    def test_mergeManyFragments(self):
+        """
+        Merging many gappy fragments in a single pass must give the same
+        result as adding them up pairwise.
+        """
+        np.random.seed(42)
+        tr = Trace(data=np.random.randint(-100, 100, 3000).astype('int32'))
+        tr.stats.sampling_rate = 100.0
+        tr.stats.starttime = UTCDateTime(2010, 1, 1, 0, 0, 0, 123456)
+        st = Stream()
+        i = 0
+        while i < 3000:
+            n = np.random.randint(1, 100)
+            st.append(tr.slice(tr.stats.starttime + i * 0.01,
+                               tr.stats.starttime + (i + n - 1) * 0.01))
+            i += n + np.random.randint(0, 3)
+        for fill_value in [None, 0, 'latest', 'interpolate']:
+            expected = st[0]
+            for trace in st[1:]:
+                expected = expected.__add__(trace, fill_value=fill_value)
+            st2 = st.copy()
+            st2.reverse()
+            st2.merge(fill_value=fill_value)
+            self.assertEqual(len(st2), 1)
+            self.assertEqual(st2[0].stats, expected.stats)
+            self.assertEqual(type(st2[0].data), type(expected.data))
+            self.assertEqual(st2[0].data.dtype, expected.data.dtype)
+            if fill_value is None:
+                np.testing.assert_array_equal(st2[0].data.mask,
+                                              expected.data.mask)
+                np.testing.assert_array_equal(st2[0].data.filled(0),
+                                              expected.data.filled(0))
+            else:
+                np.testing.assert_array_equal(st2[0].data, expected.data)
+        # order of other traces is kept, merged traces are placed first
+        st3 = read()
+        st3 += st
+        st3.merge()
+        self.assertEqual([tr.id for tr in st3],
+                         ['...', 'BW.RJOB..EHZ', 'BW.RJOB..EHN',
+                          'BW.RJOB..EHE'])
+
+    def test_selectSliceGetGapsWithIndex(self):
+        """
+        Using the trace index must not change the results of select, slice
+        and getGaps.
+        """
+        np.random.seed(42)
+        st = Stream()
+        t0 = UTCDateTime(2012, 1, 1)
+        for net in ['BW', 'GR']:
+            for sta in ['ALTM', 'FUR', 'RJOB', 'MANZ']:
+                for cha in ['EHZ', 'EHN', 'BHZ']:
+                    t = t0 + np.random.randint(0, 100)
+                    for _i in xrange(5):
+                        npts = np.random.randint(10, 200)
+                        tr = Trace(data=np.ones(npts), header={
+                            'network': net, 'station': sta, 'channel': cha,
+                            'starttime': t, 'sampling_rate': 10.0})
+                        st.append(tr)
+                        t += npts / 10.0 + np.random.randint(-5, 5)
+        np.random.shuffle(st.traces)
+        queries = [{'station': 'RJOB'}, {'network': 'bw', 'channel': 'EH?'},
+                   {'id': 'GR.*.*.BHZ'}, {'component': 'N'},
+                   {'station': 'XYZ'}, {'location': '', 'station': 'F*'}]
+        for kwargs in queries:
+            self.assertEqual(st.select(**kwargs).traces,
+                             st.select(use_index=True, **kwargs).traces)
+        for dt in [0, 50, 100.05, 300, 1000]:
+            for length in [0.1, 10, 200]:
+                t1 = t0 + dt
+                self.assertEqual(st.slice(t1, t1 + length).traces,
+                                 st.slice(t1, t1 + length,
+                                          use_index=True).traces)
+        self.assertEqual(st.slice(None, t0 + 50).traces,
+                         st.slice(None, t0 + 50, use_index=True).traces)
+        self.assertEqual(st.getGaps(), st.getGaps(use_index=True))
+        # the index is reused and rebuilt after changes of the stream
+        index = st._getIndex()
+        self.assertTrue(st._getIndex() is index)
+        tr = st.pop(0)
+        self.assertFalse(st._getIndex() is index)
+        st.append(tr)
+        self.assertEqual(len(st.select(station='RJOB', use_index=True)),
+                         len(st.select(station='RJOB')))
+        # replacing and reordering traces
+        new = Trace(header={'station': 'XYZ'})
+        st.select(use_index=True)
+        st[0] = new
+        self.assertEqual(st.select(station='XYZ', use_index=True).traces,
+                         [new])
+        st.sort()
+        self.assertEqual(st.select(channel='BHZ', use_index=True).traces,
+                         st.select(channel='BHZ').traces)
+        st.traces = st.traces[::-1]
+        self.assertEqual(st.select(channel='BHZ', use_index=True).traces,
+                         st.select(channel='BHZ').traces)
+        del st[0]
+        self.assertEqual(st.select(station='XYZ', use_index=True).traces,
+                         st.select(station='XYZ').traces)
+        st.trim(t0 + 100, t0 + 200)
+        self.assertEqual(st.select(channel='EHZ', use_index=True).traces,
+                         st.select(channel='EHZ').traces)
+        self.assertEqual(st.slice(t0 + 250, t0 + 300, use_index=True).traces,
+                         [])
+        # direct changes of trace headers need an explicit reset
+        for tr in st.select(station='FUR'):
+            tr.stats.station = 'NEW'
+        st.clearIndex()
+        self.assertEqual(st.select(station='NEW', use_index=True).traces,
+                         st.select(station='NEW').traces)
+
     def test_rotate(self):
         """
         Testing the rotate method.
@@ -1942,6 +2090,35 @@ class StreamTestCase(unittest.TestCase):
         self.assertEquals(len(st[2]), 3000)
         self.assertFalse(isinstance(st[2].data, np.ma.masked_array))
 
+    def test_windows(self):
+        """
+        Sliding windows of a stream are aligned in time over all traces.
+        """
+        st = read()
+        t = st[0].stats.starttime
+        st[0].trim(t + 1.004)
+        st[1].trim(None, t + 25)
+        windows = list(st.windows(5.0, step=2.5))
+        # common time span 00:20:04 - 00:20:28
+        self.assertEqual(len(windows), 8)
+        for i, (starttime, data) in enumerate(windows):
+            self.assertEqual(starttime, t + 1 + i * 2.5)
+            self.assertEqual(len(data), 3)
+            for tr, d in zip(st, data):
+                self.assertEqual(len(d), 500)
+                self.assertTrue(np.may_share_memory(d, tr.data))
+                expected = tr.slice(starttime, starttime + 4.99).data
+                np.testing.assert_array_equal(d, expected)
+        starttime, arrays = st.windowArray(5.0, step=2.5)
+        self.assertEqual(starttime, t + 1)
+        for array, tr_windows in zip(arrays, zip(*[d for _t, d in windows])):
+            self.assertEqual(array.shape, (8, 500))
+            np.testing.assert_array_equal(array, np.array(tr_windows))
+        # different sampling rates and empty streams are rejected
+        st[0].stats.sampling_rate = 50.0
+        self.assertRaises(ValueError, list, st.windows(5.0))
+        self.assertRaises(ValueError, Stream().windowArray, 5.0)
+
 
 def suite():
     return unittest.makeSuite(StreamTestCase, 'test')
@@ -1278,6 +1278,64 @@ class TraceTestCase(unittest.TestCase):
         self.assertEquals(len(tr), 3000)
         self.assertFalse(isinstance(tr.data, np.ma.masked_array))
 
+    def test_copyWithoutData(self):
+        """
+        Tests Trace.copy with data=False sharing the data array.
+        """
+        tr = Trace(data=np.arange(10, dtype='int32'),
+                   header={'station': 'MANZ', 'sampling_rate': 10.0,
+                           'mseed': {'dataquality': 'D'}})
+        tr2 = tr.copy(data=False)
+        self.assertEqual(tr2, tr)
+        self.assertTrue(tr2.data is tr.data)
+        self.assertFalse(tr2.stats is tr.stats)
+        # header is independent
+        tr2.stats.station = 'RJOB'
+        tr2.stats.mseed.dataquality = 'Q'
+        tr2.stats.starttime += 10
+        self.assertEqual(tr.stats.station, 'MANZ')
+        self.assertEqual(tr.stats.mseed.dataquality, 'D')
+        self.assertEqual(tr.stats.starttime, UTCDateTime(0))
+        # processing which replaces the data array leaves the original alone
+        tr2.trim(tr2.stats.starttime + 0.2, tr2.stats.starttime + 0.5)
+        self.assertEqual(tr2.stats.npts, 4)
+        self.assertEqual(tr.stats.npts, 10)
+        np.testing.assert_array_equal(tr.data, np.arange(10))
+
+    def test_windows(self):
+        """
+        Sliding windows are views into the data matching Trace.slice.
+        """
+        tr = Trace(data=np.arange(1000, dtype='float64'))
+        tr.stats.sampling_rate = 20.0
+        windows = list(tr.windows(2.5, step=1.0))
+        self.assertEqual(len(windows), 48)
+        for i, (starttime, data) in enumerate(windows):
+            self.assertEqual(starttime, tr.stats.starttime + i * 1.0)
+            expected = tr.slice(starttime, starttime + 2.5 - tr.stats.delta)
+            np.testing.assert_array_equal(data, expected.data)
+            # no copies
+            self.assertTrue(np.may_share_memory(data, tr.data))
+        # windows without overlap by default
+        windows = list(tr.windows(10.0))
+        self.assertEqual([len(d) for _t, d in windows], [200] * 5)
+        # 2-D form
+        array = tr.windowArray(2.5, step=1.0)
+        self.assertEqual(array.shape, (48, 50))
+        self.assertFalse(array.flags.writeable)
+        self.assertTrue(np.may_share_memory(array, tr.data))
+        np.testing.assert_array_equal(
+            array, np.array([d for _t, d in tr.windows(2.5, step=1.0)]))
+        # windows longer than the trace
+        self.assertEqual(list(tr.windows(60.0)), [])
+        self.assertEqual(tr.windowArray(60.0).shape, (0, 1200))
+        # too short windows or steps
+        self.assertRaises(ValueError, list, tr.windows(0.01))
+        self.assertRaises(ValueError, tr.windowArray, 1.0, 0.0)
+        # masked values are not supported by the 2-D form
+        tr.data = np.ma.masked_array(tr.data, mask=tr.data < 10)
+        self.assertRaises(NotImplementedError, tr.windowArray, 1.0)
+
 
 def suite():
     return unittest.makeSuite(TraceTestCase, 'test')
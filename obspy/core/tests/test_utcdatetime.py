@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
 from obspy import UTCDateTime
+from obspy.core.utcdatetime import toDatetime64, fromDatetime64
 from obspy.core.util.decorator import skipIf
 import copy
 import datetime
 import numpy as np
+import pickle
 import unittest
 
 
@@ -361,7 +363,8 @@ class UTCDateTimeTestCase(unittest.TestCase):
         self.assertEqual(str(dt), "1969-12-31T23:59:59.999999Z")
         # -0.00000000001
         dt = UTCDateTime(-0.00000000001)
-        self.assertEqual(dt.timestamp, -0.00000000001)
+        # sub-nanosecond fractions are not stored
+        self.assertAlmostEqual(dt.timestamp, -0.00000000001, 9)
         self.assertEqual(str(dt), "1970-01-01T00:00:00.000000Z")
         # -1000.1
         dt = UTCDateTime("1969-12-31T23:43:19.900000Z")
@@ -907,6 +910,97 @@ class UTCDateTimeTestCase(unittest.TestCase):
         dt = UTCDateTime(1969, 12, 31, 23, 59, 59, 500000)
         self.assertEquals(abs(dt), 0.5)
 
+    def test_nanoseconds(self):
+        """
+        Tests the integer nanosecond representation of UTCDateTime.
+        """
+        dt = UTCDateTime(2008, 10, 1, 12, 30, 35, 123456)
+        self.assertEqual(dt.ns, 1222864235123456000)
+        self.assertEqual(dt.timestamp, 1222864235.123456)
+        # large timestamps keep their float representation
+        for value in [1240561632.0050001, 1222864235.123456, -1000.1,
+                      -2051177785.876544, 1e10 + 0.25]:
+            self.assertEqual(UTCDateTime(value).timestamp, value)
+        # arithmetic is exact in nanoseconds
+        dt = UTCDateTime(0)
+        for _i in xrange(1000):
+            dt += 0.001
+        self.assertEqual(dt.ns, 1000000000)
+        self.assertEqual(dt - UTCDateTime(0), 1.0)
+        # setting timestamp or ns
+        dt.ns = 1500000000
+        self.assertEqual(dt.timestamp, 1.5)
+        dt.timestamp = 2.25
+        self.assertEqual(dt.ns, 2250000000)
+        # adding two UTCDateTime objects is not defined
+        self.assertRaises(TypeError, dt.__add__, UTCDateTime(0))
+        # objects use slots
+        self.assertRaises(AttributeError, setattr, dt, 'foo', 1)
+
+    def test_comparisonPrecision(self):
+        """
+        Tests integer rich comparisons against float rounding.
+        """
+        t1 = UTCDateTime(0)
+        for precision in [0, 3, 6, 8, 9, 12]:
+            t1.precision = precision
+            for diff in [-1.5, -0.5000001, -0.0004, -6e-7, -1e-9, 0, 1e-9,
+                         4e-7, 5.1e-7, 0.0005, 0.7]:
+                t2 = UTCDateTime(diff)
+                expected = round(-diff, precision)
+                self.assertEqual(t1 == t2, expected == 0)
+                self.assertEqual(t1 != t2, expected != 0)
+                self.assertEqual(t1 < t2, expected < 0)
+                self.assertEqual(t1 <= t2, expected <= 0)
+                self.assertEqual(t1 > t2, expected > 0)
+                self.assertEqual(t1 >= t2, expected >= 0)
+
+    def test_pickle(self):
+        """
+        Tests pickling of UTCDateTime objects, including old pickles.
+        """
+        dt = UTCDateTime(2008, 10, 1, 12, 30, 35, 123456, precision=7)
+        for protocol in [0, 1, 2]:
+            dt2 = pickle.loads(pickle.dumps(dt, protocol))
+            self.assertEqual(dt2.ns, dt.ns)
+            self.assertEqual(dt2.precision, 7)
+        dt2 = copy.copy(dt)
+        dt2 += 1
+        self.assertEqual(dt.ns, 1222864235123456000)
+        # pickle created by a float timestamp based UTCDateTime
+        old = "ccopy_reg\n_reconstructor\np0\n(cobspy.core.utcdatetime\n" \
+            "UTCDateTime\np1\nc__builtin__\nobject\np2\nNtp3\nRp4\n" \
+            "(dp5\nS'_UTCDateTime__precision'\np6\nI6\nsS'timestamp'\n" \
+            "p7\nF1222864235.123456\nsS'_UTCDateTime__ms_pattern'\np8\n" \
+            "S'%0.6f'\np9\nsb."
+        dt2 = pickle.loads(old)
+        self.assertEqual(dt2, UTCDateTime(2008, 10, 1, 12, 30, 35, 123456))
+        self.assertEqual(dt2.precision, 6)
+
+    def test_datetime64(self):
+        """
+        Tests conversion from and to NumPy datetime64 objects and arrays.
+        """
+        dt = UTCDateTime(2008, 10, 1, 12, 30, 35, 123456)
+        self.assertEqual(dt.datetime64,
+                         np.datetime64('2008-10-01T12:30:35.123456', 'ns'))
+        self.assertEqual(UTCDateTime(dt.datetime64).ns, dt.ns)
+        self.assertEqual(
+            UTCDateTime(np.datetime64('2008-10-01T12:30:35', 's')),
+            UTCDateTime(2008, 10, 1, 12, 30, 35))
+        # arrays
+        times = [dt + i * 0.01 for i in range(5)] + [UTCDateTime(-1.5)]
+        array = toDatetime64(times)
+        self.assertEqual(array.dtype, np.dtype('datetime64[ns]'))
+        np.testing.assert_array_equal(array.view(np.int64),
+                                      [t.ns for t in times])
+        result = fromDatetime64(array)
+        self.assertEqual([t.ns for t in result], [t.ns for t in times])
+        result = fromDatetime64(array.astype('datetime64[ms]'))
+        self.assertEqual(result, [UTCDateTime(round(t.timestamp, 3))
+                                  for t in times])
+        self.assertRaises(TypeError, fromDatetime64, np.arange(3))
+
 
 def suite():
     return unittest.makeSuite(UTCDateTimeTestCase, 'test')
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
-from obspy.core.util.base import getMatplotlibVersion, NamedTemporaryFile
+from obspy import Trace
+from obspy.core.util.base import getMatplotlibVersion, NamedTemporaryFile, \
+    getExampleFile, _readFromPlugin, _DETECTED_FORMATS, _PLUGIN_FUNCTIONS, \
+    _getFormatCacheKey, LazyData
 from obspy.core.util.decorator import skipIf
+import numpy as np
 import os
 import unittest
 
@@ -72,6 +76,110 @@ class UtilBaseTestCase(unittest.TestCase):
             filename = tf.name
         self.assertFalse(os.path.exists(filename))
 
+    def test_readFromPluginFormatCache(self):
+        """
+        Tests caching of plug-in functions and detected formats.
+        """
+        _DETECTED_FORMATS.clear()
+        filename = getExampleFile('test.mseed')
+        key = _getFormatCacheKey('waveform', filename)
+        self.assertEqual(key, ('waveform', os.path.dirname(filename),
+                               '.mseed'))
+        st, format = _readFromPlugin('waveform', filename)
+        self.assertEqual(format, 'MSEED')
+        self.assertEqual(_DETECTED_FORMATS[key], 'MSEED')
+        self.assertTrue(
+            ('obspy.plugin.waveform.MSEED', 'readFormat') in
+            _PLUGIN_FUNCTIONS)
+        # formats with lax isFormat checks are not remembered, so files of
+        # different formats in the same directory with same extension are
+        # detected in the preferred order
+        filename = getExampleFile('tspair.ascii')
+        key = _getFormatCacheKey('waveform', filename)
+        st, format = _readFromPlugin('waveform', filename)
+        self.assertEqual(format, 'TSPAIR')
+        self.assertFalse(key in _DETECTED_FORMATS)
+        filename = getExampleFile('slist.ascii')
+        st2, format = _readFromPlugin('waveform', filename)
+        self.assertEqual(format, 'SLIST')
+        self.assertEqual(st[0].data.tolist(), st2[0].data.tolist())
+        # file-like objects are not cached
+        with open(filename, 'rb') as fh:
+            self.assertEqual(_getFormatCacheKey('waveform', fh), None)
+
+    def test_lazyData(self):
+        """
+        Tests on demand loading of trace data with a bounded cache.
+        """
+        calls = []
+
+        def load(filename, value, npts):
+            calls.append(value)
+            return np.ones(npts) * value
+
+        LazyData.clearCache()
+        max_resident = LazyData.max_resident
+        LazyData.max_resident = 2
+        try:
+            filename = getExampleFile('test.mseed')
+            traces = []
+            for i in xrange(3):
+                tr = Trace(header={'npts': 5})
+                tr._setLazyData(LazyData(load, filename, i, 5))
+                traces.append(tr)
+            self.assertEqual(calls, [])
+            self.assertEqual(traces[0].stats.npts, 5)
+            # first access decodes, following accesses use the cache
+            np.testing.assert_array_equal(traces[0].data, np.zeros(5))
+            np.testing.assert_array_equal(traces[0].data, np.zeros(5))
+            self.assertEqual(calls, [0])
+            self.assertFalse(traces[0].data.flags.writeable)
+            # least recently used arrays are released
+            traces[1].data
+            traces[0].data
+            traces[2].data
+            self.assertEqual(calls, [0, 1, 2])
+            traces[0].data
+            traces[1].data
+            self.assertEqual(calls, [0, 1, 2, 1])
+            # copies share the loader
+            tr = traces[2].copy()
+            self.assertEqual(tr.data[0], 2)
+            self.assertEqual(calls, [0, 1, 2, 1, 2])
+            # assigning data detaches the trace from the file
+            tr = traces[0]
+            tr.data = tr.data * 2
+            self.assertTrue(tr.data.flags.writeable)
+            self.assertFalse('_lazy_data' in tr.__dict__)
+            tr.data[0] = 5
+            self.assertEqual(tr.data[0], 5)
+            self.assertRaises(AttributeError, getattr, Trace(), 'xyz')
+        finally:
+            LazyData.max_resident = max_resident
+            LazyData.clearCache()
+
+    def test_lazyDataThreads(self):
+        """
+        Lazy data can be loaded from several threads at once.
+        """
+        from multiprocessing.pool import ThreadPool
+        filename = getExampleFile('test.mseed')
+        loaders = [LazyData(lambda f, i: np.ones(10) * i, filename, i)
+                   for i in xrange(20)]
+        LazyData.clearCache()
+        max_resident = LazyData.max_resident
+        LazyData.max_resident = 3
+        pool = ThreadPool(8)
+        try:
+            values = pool.map(lambda i: loaders[i % 20]()[0], xrange(2000))
+            self.assertEqual(values, [i % 20 for i in xrange(2000)])
+            self.assertTrue(len(LazyData._cache) <= 3)
+        finally:
+            pool.close()
+            pool.join()
+            LazyData.max_resident = max_resident
+            LazyData.clearCache()
+
 
 def suite():
     return unittest.makeSuite(UtilBaseTestCase, 'test')
@@ -8,6 +8,8 @@ import StringIO
 import cStringIO
 import numpy as np
 import os
+import shutil
+import tempfile
 import threading
 import time
 import unittest
@@ -294,6 +296,102 @@ class WaveformPluginsTestCase(unittest.TestCase):
         st2 = read(os.path.join(path, 'data', 'slist.ascii'))
         self.assertTrue(st1 == st2)
 
+    def test_readFromBuffer(self):
+        """
+        Reading from in-memory buffers must give the same result as reading
+        the files by name.
+        """
+        obspy_path = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        files = [('mseed', 'test.mseed'), ('mseed', 'fullseed.mseed'),
+                 ('sac', 'test.sac'), ('sac', 'test.sac.swap'),
+                 ('sac', 'testxy.sac'),
+                 ('gse2', 'loc_RJOB20050831023349.z'), ('gse2', 'acc.gse'),
+                 ('segy', '00001034.sgy_first_trace'),
+                 ('segy', '1.su_first_trace'),
+                 ('seisan', '2001-01-13-1742-24S.KONO__004'),
+                 ('sh', 'QFILE-TEST-ASC.ASC'),
+                 ('wav', '3cssan.near.8.1.RNON.wav'),
+                 ('y', 'YAYT_BHZ_20021223.124800'),
+                 ('datamark', '10030302.00'),
+                 ('seg2', '20130107_103041000.CET.3c.cont.0.seg2.gz'),
+                 ('core', 'slist.ascii'), ('core', 'tspair.ascii')]
+        for module, filename in files:
+            filename = os.path.join(obspy_path, module, 'tests', 'data',
+                                    filename)
+            st = read(filename)
+            raw = open(filename, 'rb').read()
+            for headonly in [False, True]:
+                for buf in [StringIO.StringIO(raw), bytearray(raw),
+                            buffer(raw), memoryview(raw)]:
+                    st2 = read(buf, headonly=headonly)
+                    self.assertEqual(len(st), len(st2))
+                    for tr, tr2 in zip(st, st2):
+                        self.assertEqual(tr.stats._format, tr2.stats._format)
+                        self.assertEqual(tr.id, tr2.id)
+                        self.assertEqual(tr.stats.starttime,
+                                         tr2.stats.starttime)
+                        self.assertEqual(tr.stats.npts, tr2.stats.npts)
+                        if not headonly:
+                            np.testing.assert_array_equal(tr.data, tr2.data)
+
+    def test_readQFromBuffer(self):
+        """
+        The data file of a Q header given as buffer can't be located, but its
+        header can be read.
+        """
+        filename = os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir, 'sh', 'tests', 'data',
+                                'QFILE-TEST.QHD')
+        raw = open(filename, 'rb').read()
+        st = read(StringIO.StringIO(raw), headonly=True)
+        self.assertEqual(len(st), 3)
+        self.assertEqual(st[0].stats._format, 'Q')
+        self.assertRaises(IOError, read, StringIO.StringIO(raw))
+
+    def test_readCSSFromBuffer(self):
+        """
+        Formats needing a file name are read from buffers via a temporary
+        file.
+        """
+        path = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                            'css', 'tests', 'data')
+        tempdir = tempfile.mkdtemp()
+        try:
+            shutil.copy(os.path.join(path, '201101311155.10.w'), tempdir)
+            # refer to the waveform file by absolute path
+            lines = []
+            with open(os.path.join(path, 'test.wfdisc'), 'rb') as fh:
+                for line in fh:
+                    lines.append(line[:148] + tempdir.ljust(64) + line[212:])
+            raw = ''.join(lines)
+            with open(os.path.join(tempdir, 'test.wfdisc'), 'wb') as fh:
+                fh.write(raw)
+            st = read(os.path.join(tempdir, 'test.wfdisc'))
+            for buf in [StringIO.StringIO(raw), bytearray(raw)]:
+                st2 = read(buf)
+                self.assertEqual(len(st2), 3)
+                self.assertEqual(st2[0].stats._format, 'CSS')
+                self.assertEqual(st, st2)
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_readCompressedFileObject(self):
+        """
+        Tests reading gzip and bzip2 compressed waveforms from open files and
+        in-memory buffers.
+        """
+        path = os.path.join(os.path.dirname(__file__), 'data')
+        for filename, compressed in [('tspair.ascii', 'tspair.ascii.gz'),
+                                     ('slist.ascii', 'slist.ascii.bz2')]:
+            st = read(os.path.join(path, filename))
+            with open(os.path.join(path, compressed), 'rb') as fh:
+                self.assertTrue(read(fh) == st)
+                fh.seek(0)
+                raw = fh.read()
+            self.assertTrue(read(StringIO.StringIO(raw)) == st)
+            self.assertTrue(read(bytearray(raw)) == st)
+
     def test_raiseOnUnknownFormat(self):
         """
         Test case for issue #338:
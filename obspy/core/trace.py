@@ -9,7 +9,8 @@ Module for handling ObsPy Trace objects.
     (http://www.gnu.org/copyleft/lesser.html)
 """
 from copy import deepcopy, copy
-from obspy.core.utcdatetime import UTCDateTime
+from fractions import Fraction
+from obspy.core.utcdatetime import UTCDateTime, _floatToNs
 from obspy.core.util import AttribDict, createEmptyDataChunk
 from obspy.core.util.base import _getFunctionFromEntryPoint
 from obspy.core.util.misc import flatnotmaskedContiguous
@@ -19,6 +20,20 @@ import numpy as np
 import warnings
 
 
+def _windowArray(data, npts, step_npts):
+    """
+    Returns a read-only strided view of all windows of ``npts`` samples
+    starting every ``step_npts`` samples of the 1-D array ``data``.
+    """
+    data = np.asarray(data)
+    count = max((len(data) - npts) // step_npts + 1, 0)
+    stride = data.strides[0]
+    windows = np.lib.stride_tricks.as_strided(
+        data, shape=(count, npts), strides=(step_npts * stride, stride))
+    windows.flags.writeable = False
+    return windows
+
+
 class Stats(AttribDict):
     """
     A container for additional header information of a ObsPy Trace object.
@@ -138,11 +153,77 @@ class Stats(AttribDict):
         'location': '',
         'channel': '',
     }
+    # the default attributes are stored in slots, all other keys end up in
+    # the instance dictionary which is only created on demand
+    __slots__ = ['_network', '_station', '_location', '_channel',
+                 '_starttime', '_sampling_rate', '_npts', '_calib']
+    # iteration order of the default attributes - 'delta' is placed before
+    # 'sampling_rate' so updating from another Stats object does not change
+    # the sampling rate by a float round trip
+    _keys = ('network', 'station', 'location', 'channel', 'starttime',
+             'endtime', 'delta', 'sampling_rate', 'npts', 'calib')
 
     def __init__(self, header={}):
         """
         """
-        super(Stats, self).__init__(header)
+        _set = object.__setattr__
+        if isinstance(header, Stats):
+            # fast path: copy default attributes directly
+            for key in self.__slots__:
+                _set(self, key, getattr(header, key))
+            starttime = header._starttime
+            _set(self, '_starttime', UTCDateTime._fromNs(
+                starttime.ns, starttime.precision))
+            for key, value in header.__dict__.iteritems():
+                self[key] = value
+            return
+        _set(self, '_network', '')
+        _set(self, '_station', '')
+        _set(self, '_location', '')
+        _set(self, '_channel', '')
+        _set(self, '_starttime', UTCDateTime._fromNs(0))
+        _set(self, '_sampling_rate', 1.0)
+        _set(self, '_npts', 0)
+        _set(self, '_calib', 1.0)
+        self.update(header)
+
+    def _getDelta(self):
+        """
+        Returns sample distance in seconds, derived from the sampling rate.
+        """
+        try:
+            return 1.0 / self._sampling_rate
+        except ZeroDivisionError:
+            return 0
+
+    def _getEndtime(self):
+        """
+        Returns time of the last sample, derived from starttime, npts and
+        sampling rate.
+        """
+        npts = self._npts
+        if npts == 0:
+            return UTCDateTime._fromNs(self._starttime.ns)
+        return UTCDateTime._fromNs(self._starttime.ns +
+                                   _floatToNs((npts - 1) * self._getDelta()))
+
+    network = property(lambda self: self._network)
+    station = property(lambda self: self._station)
+    location = property(lambda self: self._location)
+    channel = property(lambda self: self._channel)
+    starttime = property(lambda self: self._starttime)
+    endtime = property(_getEndtime)
+    sampling_rate = property(lambda self: self._sampling_rate)
+    delta = property(_getDelta)
+    npts = property(lambda self: self._npts)
+    calib = property(lambda self: self._calib)
+
+    def __getitem__(self, name, default=None):
+        """
+        """
+        if name in Stats.defaults:
+            return getattr(self, name)
+        return super(Stats, self).__getitem__(name, default)
 
     def __setitem__(self, key, value):
         """
@@ -156,35 +237,101 @@ class Stats(AttribDict):
             elif key == 'sampling_rate':
                 value = float(value)
             elif key == 'starttime':
-                value = UTCDateTime(value)
+                if isinstance(value, UTCDateTime):
+                    value = UTCDateTime._fromNs(value.ns)
+                else:
+                    value = UTCDateTime(value)
             elif key == 'npts':
                 value = int(value)
-            # set current key
-            super(Stats, self).__setitem__(key, value)
-            # set derived value: delta
-            try:
-                delta = 1.0 / float(self.sampling_rate)
-            except ZeroDivisionError:
-                delta = 0
-            self.__dict__['delta'] = delta
-            # set derived value: endtime
-            if self.npts == 0:
-                timediff = 0
-            else:
-                timediff = (self.npts - 1) * delta
-            self.__dict__['endtime'] = self.starttime + timediff
+            # derived values delta and endtime are computed on access
+            object.__setattr__(self, '_' + key, value)
             return
+        if key in self.readonly:
+            msg = 'Attribute "%s" in %s object is read only!'
+            raise AttributeError(msg % (key, self.__class__.__name__))
         # prevent a calibration factor of 0
         if key == 'calib' and value == 0:
             msg = 'Calibration factor set to 0.0!'
             warnings.warn(msg, UserWarning)
+        if key in Stats.defaults:
+            object.__setattr__(self, '_' + key, value)
         # all other keys
-        if isinstance(value, dict):
-            super(Stats, self).__setitem__(key, AttribDict(value))
+        elif isinstance(value, dict):
+            self.__dict__[key] = AttribDict(value)
         else:
-            super(Stats, self).__setitem__(key, value)
+            self.__dict__[key] = value
+
+    def __delitem__(self, name):
+        """
+        """
+        if name in Stats.defaults:
+            # default attributes are reset to their default values
+            self[name] = Stats.defaults[name]
+            return
+        super(Stats, self).__delitem__(name)
 
+    __getattr__ = __getitem__
     __setattr__ = __setitem__
+    __delattr__ = __delitem__
+
+    def __iter__(self):
+        """
+        """
+        for key in self._keys:
+            yield key
+        for key in self.__dict__:
+            yield key
+
+    def __len__(self):
+        """
+        """
+        return len(self._keys) + len(self.__dict__)
+
+    def __contains__(self, key):
+        """
+        """
+        return key in Stats.defaults or key in self.__dict__
+
+    def __repr__(self):
+        """
+        """
+        return "%s(%s)" % (self.__class__.__name__, dict(self))
+
+    def __getstate__(self):
+        """
+        """
+        return dict(self)
+
+    def __setstate__(self, adict):
+        """
+        """
+        self.__init__(adict)
+
+    def __copy__(self):
+        """
+        Returns a copy of the Stats object.
+
+        The default attributes are copied, all other values are shared with
+        the original object.
+        """
+        stats = self.__class__()
+        for key in self.__slots__:
+            object.__setattr__(stats, key, getattr(self, key))
+        starttime = self._starttime
+        object.__setattr__(stats, '_starttime', UTCDateTime._fromNs(
+            starttime.ns, starttime.precision))
+        stats.__dict__.update(self.__dict__)
+        return stats
+
+    def __deepcopy__(self, *args, **kwargs):  # @UnusedVariable
+        """
+        Returns a copy of the Stats object with deep copies of all
+        non-default attributes.
+        """
+        stats = self.__copy__()
+        for key, value in stats.__dict__.iteritems():
+            stats.__dict__[key] = deepcopy(value)
+        return stats
 
     def __str__(self):
         """
@@ -367,8 +514,37 @@ class Trace(object):
                 msg = "Trace.data must be a NumPy array."
                 raise ValueError(msg)
             self.stats.npts = len(value)
+            # a trace with new data is no longer tied to its file
+            self.__dict__.pop('_lazy_data', None)
         return super(Trace, self).__setattr__(key, value)
 
+    def __getattr__(self, name):
+        """
+        __getattr__ method of Trace object.
+
+        Only called if an attribute is not found the usual way, i.e. for the
+        ``data`` attribute of traces read with ``lazy=True`` which is decoded
+        on demand.
+        """
+        if name == 'data':
+            loader = self.__dict__.get('_lazy_data')
+            if loader is not None:
+                return loader()
+        msg = "'%s' object has no attribute '%s'" % \
+            (self.__class__.__name__, name)
+        raise AttributeError(msg)
+
+    def _setLazyData(self, loader):
+        """
+        Replaces the data of the trace by a loader decoding it on demand.
+
+        :type loader: :class:`~obspy.core.util.base.LazyData`
+        :param loader: Loader returning the data samples of this trace. The
+            number of samples in ``stats.npts`` is not changed.
+        """
+        self.__dict__.pop('data', None)
+        self.__dict__['_lazy_data'] = loader
+
     def __getitem__(self, index):
         """
         __getitem__ method of Trace object.
@@ -1011,6 +1187,84 @@ class Trace(object):
         tr.trim(starttime=starttime, endtime=endtime)
         return tr
 
+    def windows(self, length, step=None):
+        """
+        Generator yielding sliding windows over the data of the trace.
+
+        :type length: float
+        :param length: Length of each window in seconds. It is rounded to a
+            whole number of samples.
+        :type step: float, optional
+        :param step: Time between the starts of two consecutive windows in
+            seconds, rounded to a whole number of samples. Defaults to
+            ``length``, i.e. windows without overlap.
+        :return: Generator yielding a tuple of start time
+            (:class:`~obspy.core.utcdatetime.UTCDateTime`) and data of each
+            window which fits completely into the trace.
+
+        In contrast to calling :meth:`~obspy.core.trace.Trace.slice` in a loop
+        neither new Trace nor Stats objects are created. The data of each
+        window is a view into the data of the trace, i.e. it is not copied
+        and changes to it show up in the trace. A window covers ``length``
+        seconds excluding its end time, e.g. ``length=1`` at 100 Hz yields
+        windows of 100 samples.
+
+        .. rubric:: Example
+
+        >>> tr = Trace(data=np.arange(10))
+        >>> for starttime, data in tr.windows(4, step=3):
+        ...     print starttime, data
+        1970-01-01T00:00:00.000000Z [0 1 2 3]
+        1970-01-01T00:00:03.000000Z [3 4 5 6]
+        1970-01-01T00:00:06.000000Z [6 7 8 9]
+        """
+        npts, step_npts = self._windowSamples(length, step)
+        data = self.data
+        starttime = self.stats.starttime
+        delta = self.stats.delta
+        for i in xrange(0, len(data) - npts + 1, step_npts):
+            yield starttime + i * delta, data[i:i + npts]
+
+    @raiseIfMasked
+    def windowArray(self, length, step=None):
+        """
+        Returns all sliding windows over the data of the trace as 2-D array.
+
+        See :meth:`~obspy.core.trace.Trace.windows` for the parameters.
+
+        :rtype: :class:`numpy.ndarray`
+        :return: Read-only array of shape ``(number of windows, samples per
+            window)``. It is a strided view into the data of the trace, so no
+            data is copied regardless of the overlap of the windows. Row ``i``
+            starts ``i * step`` seconds after the start of the trace.
+
+        .. rubric:: Example
+
+        >>> tr = Trace(data=np.arange(10))
+        >>> windows = tr.windowArray(4, step=3)
+        >>> windows.shape
+        (3, 4)
+        >>> windows.sum(axis=1)
+        array([ 6, 18, 30])
+        """
+        npts, step_npts = self._windowSamples(length, step)
+        return _windowArray(self.data, npts, step_npts)
+
+    def _windowSamples(self, length, step=None):
+        """
+        Returns window length and step in samples.
+        """
+        sampling_rate = self.stats.sampling_rate
+        npts = int(round(length * sampling_rate))
+        if step is None:
+            step_npts = npts
+        else:
+            step_npts = int(round(step * sampling_rate))
+        if npts < 1 or step_npts < 1:
+            msg = "Window length and step must be at least one sample."
+            raise ValueError(msg)
+        return npts, step_npts
+
     def verify(self):
         """
         Verifies current trace object against available meta data.
@@ -1317,23 +1571,34 @@ class Trace(object):
         proc_info = "trigger:%s:%s" % (type, options)
         self._addProcessingInfo(proc_info)
 
-    def resample(self, sampling_rate, window='hanning', no_filter=True,
-                 strict_length=False):
+    def resample(self, sampling_rate, window=None, no_filter=True,
+                 strict_length=False, method='fft'):
         """
-        Resample trace data using Fourier method.
+        Resample trace data using Fourier or polyphase method.
 
         :type sampling_rate: float
         :param sampling_rate: The sampling rate of the resampled signal.
         :type window: array_like, callable, string, float, or tuple, optional
         :param window: Specifies the window applied to the signal in the
             Fourier domain. Defaults to ``'hanning'`` window. See
-            :func:`scipy.signal.resample` for details.
+            :func:`scipy.signal.resample` for details. For
+            ``method='polyphase'`` the window used in the design of the FIR
+            filter, defaults to ``('kaiser', 5.0)``.
         :type no_filter: bool, optional
         :param no_filter: Deactivates automatic filtering if set to ``True``.
-            Defaults to ``True``.
+            Defaults to ``True``. Ignored for ``method='polyphase'`` which
+            always applies its own anti-aliasing filter.
         :type strict_length: bool, optional
         :param strict_length: Leave traces unchanged for which endtime of trace
             would change. Defaults to ``False``.
+        :type method: str, optional
+        :param method: ``'fft'`` (default) resamples in the Fourier domain,
+            ``'polyphase'`` with a polyphase FIR filter (see
+            :func:`~obspy.signal.filter.resamplePolyphase`). The latter
+            requires the ratio of new and old sampling rate to be a fraction
+            of integers not larger than 1000 (e.g. 200 Hz to 40 Hz or
+            100 Hz to 33.3 Hz) and works in chunks with bounded memory, with
+            a cost independent of the prime factors of the trace length.
 
         .. note::
 
@@ -1344,8 +1609,8 @@ class Trace(object):
             This also makes an entry with information on the applied processing
             in ``stats.processing`` of this trace.
 
-        Uses :func:`scipy.signal.resample`. Because a Fourier method is used,
-        the signal is assumed to be periodic.
+        The Fourier method uses :func:`scipy.signal.resample`. The signal is
+        assumed to be periodic.
 
         .. rubric:: Example
 
@@ -1361,13 +1626,27 @@ class Trace(object):
         4.0
         >>> tr.data  # doctest: +NORMALIZE_WHITESPACE +ELLIPSIS
         array([ 0.5       ,  0.40432914,  0.3232233 ,  0.26903012,  0.25 ...
+
+        >>> tr = Trace(data=np.arange(300.0))
+        >>> tr.stats.sampling_rate = 100.0
+        >>> tr.resample(100.0 / 3, method='polyphase')
+        >>> tr.stats.npts
+        100
         """
-        from scipy.signal import resample
         factor = self.stats.sampling_rate / float(sampling_rate)
         # check if endtime changes and this is not explicitly allowed
         if strict_length and len(self.data) % factor != 0.0:
             msg = "Endtime of trace would change and strict_length=True."
             raise ValueError(msg)
+        if method == 'polyphase':
+            self._resamplePolyphase(sampling_rate, window)
+            return
+        elif method != 'fft':
+            msg = "Resampling method must be either 'fft' or 'polyphase'."
+            raise ValueError(msg)
+        from scipy.signal import resample
+        if window is None:
+            window = 'hanning'
         # do automatic lowpass filtering
         if not no_filter:
             # be sure filter still behaves good
@@ -1386,6 +1665,29 @@ class Trace(object):
         proc_info = "resample:%d:%s" % (sampling_rate, window)
         self._addProcessingInfo(proc_info)
 
+    def _resamplePolyphase(self, sampling_rate, window=None):
+        """
+        Resamples the trace by a rational factor with a polyphase filter.
+
+        See :meth:`~obspy.core.trace.Trace.resample` for details.
+        """
+        from obspy.signal.filter import resamplePolyphase
+        rate = float(sampling_rate) / self.stats.sampling_rate
+        ratio = Fraction(rate).limit_denominator(1000)
+        if ratio.numerator > 1000 or \
+                abs(float(ratio) - rate) > 1e-9 * rate:
+            msg = "Ratio of sampling rates (%s) is not a fraction of " + \
+                "integers up to 1000. Use method='fft' instead."
+            raise ValueError(msg % rate)
+        if window is None:
+            window = ('kaiser', 5.0)
+        self.data = resamplePolyphase(self.data, ratio.numerator,
+                                      ratio.denominator, window=window)
+        self.stats.sampling_rate = sampling_rate
+        # add processing information to the stats dictionary
+        proc_info = "resample:%d:%s:polyphase" % (sampling_rate, window)
+        self._addProcessingInfo(proc_info)
+
     def decimate(self, factor, no_filter=False, strict_length=False):
         """
         Downsample trace data by an integer factor.
@@ -1773,10 +2075,14 @@ class Trace(object):
         proc_info = "normalize:%s" % norm
         self._addProcessingInfo(proc_info)
 
-    def copy(self):
+    def copy(self, data=True):
         """
         Returns a deepcopy of the trace.
 
+        :type data: bool, optional
+        :param data: If ``False`` only the header is copied and the new trace
+            shares its data array with the original trace. Defaults to
+            ``True``.
         :return: Copy of trace.
 
         This actually copies all data in the trace and does not only provide
@@ -1809,8 +2115,27 @@ class Trace(object):
         True
         >>> tr3 == tr
         True
+
+        Using ``data=False`` is a cheap way to get a trace with an independent
+        header, e.g. before slicing or before replacing the data anyway. Only
+        in-place modifications of the shared array affect both traces, while
+        assigning a new array to ``data`` does not:
+
+        >>> tr4 = tr.copy(data=False)
+        >>> tr4.data is tr.data
+        True
+        >>> tr4.stats.station = 'XYZ'
+        >>> tr.stats.station
+        ''
+        >>> tr4.data = tr4.data * 2
+        >>> tr4.data is tr.data
+        False
         """
-        return deepcopy(self)
+        if data:
+            return deepcopy(self)
+        tr = copy(self)
+        tr.stats = deepcopy(self.stats)
+        return tr
 
     def _addProcessingInfo(self, info):
         """
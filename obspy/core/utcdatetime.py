@@ -9,11 +9,69 @@ Module containing a UTC-based datetime class.
     (http://www.gnu.org/copyleft/lesser.html)
 """
 import datetime
+import math
+import operator
 import time
 
+import numpy as np
+
 
 TIMESTAMP0 = datetime.datetime(1970, 1, 1)
 
+#: Number of nanoseconds per second.
+NS_PER_SECOND = 1000000000
+
+
+def _floatToNs(value):
+    """
+    Converts seconds given as int or float into integer nanoseconds.
+
+    Integer values are converted exactly. Float values are split into whole
+    and fractional seconds before scaling so that large timestamps do not
+    lose precision by a multiplication with 1e9.
+    """
+    if type(value) is not float:
+        if isinstance(value, (int, long, np.integer)):
+            return int(value) * NS_PER_SECOND
+        value = float(value)
+    seconds = math.floor(value)
+    return int(seconds) * NS_PER_SECOND + \
+        int(round((value - seconds) * NS_PER_SECOND))
+
+
+def _nsToFloat(ns):
+    """
+    Converts integer nanoseconds into float seconds.
+
+    The integer true division is correctly rounded, so the nearest float to
+    the exact value is returned even for large values.
+    """
+    return operator.truediv(ns, NS_PER_SECOND)
+
+
+def _halfUnitNs(precision, _cache={}):
+    """
+    Returns the smallest difference in nanoseconds which does not round to
+    zero at the given precision, used for integer rich comparisons.
+    """
+    try:
+        return _cache[precision]
+    except KeyError:
+        if precision < 9:
+            half = 5 * 10 ** (8 - precision)
+        else:
+            half = 1
+        _cache[precision] = half
+        return half
+
+
+def _timedeltaToNs(td):
+    """
+    Converts a :class:`datetime.timedelta` object into integer nanoseconds.
+    """
+    return ((td.days * 86400 + td.seconds) * 1000000 +
+            td.microseconds) * 1000
+
 
 class UTCDateTime(object):
     """
@@ -21,11 +79,11 @@ class UTCDateTime(object):
 
     This datetime class is based on the POSIX time, a system for describing
     instants in time, defined as the number of seconds elapsed since midnight
-    Coordinated Universal Time (UTC) of Thursday, January 1, 1970. Using a
-    single float timestamp allows higher precision as the default Python
-    :class:`datetime.datetime` class. It features the full `ISO8601:2004`_
-    specification and some additional string patterns during object
-    initialization.
+    Coordinated Universal Time (UTC) of Thursday, January 1, 1970. Internally
+    the time is stored as a single integer number of nanoseconds which allows
+    higher precision as the default Python :class:`datetime.datetime` class.
+    It features the full `ISO8601:2004`_ specification and some additional
+    string patterns during object initialization.
 
     :type args: int, float, string, :class:`datetime.datetime`, optional
     :param args: The creation of a new `UTCDateTime` object depends from the
@@ -44,6 +102,11 @@ class UTCDateTime(object):
         instead uses timestamp as a single floating point value which allows
         higher precision.
 
+    .. versionchanged:: 0.8.4
+        The timestamp is stored as integer nanoseconds. Arithmetic and rich
+        comparisons between UTCDateTime objects are done in integer
+        arithmetic, the float :attr:`timestamp` is computed on demand.
+
     .. rubric:: Supported Operations
 
     ``UTCDateTime = UTCDateTime + delta``
@@ -199,7 +262,7 @@ class UTCDateTime(object):
 
     .. _ISO8601:2004: http://en.wikipedia.org/wiki/ISO_8601
     """
-    timestamp = 0.0
+    __slots__ = ['_ns', '__precision', '__half', '__weakref__']
     DEFAULT_PRECISION = 6
 
     def __init__(self, *args, **kwargs):
@@ -213,14 +276,22 @@ class UTCDateTime(object):
         # check parameter
         if len(args) == 0 and len(kwargs) == 0:
             # use current time if no time is given
-            self.timestamp = time.time()
+            self._ns = _floatToNs(time.time())
             return
         elif len(args) == 1 and len(kwargs) == 0:
             value = args[0]
             # check types
+            if isinstance(value, UTCDateTime):
+                # got another UTCDateTime object
+                self._ns = value._ns
+                return
+            elif isinstance(value, np.datetime64):
+                # got a NumPy datetime64 object
+                self._ns = int(value.astype('datetime64[ns]').view(np.int64))
+                return
             try:
                 # got a timestamp
-                self.timestamp = value.__float__()
+                self._ns = _floatToNs(value.__float__())
                 return
             except:
                 pass
@@ -239,7 +310,7 @@ class UTCDateTime(object):
                 # check for ISO8601 date string
                 if value.count("T") == 1 or iso8601:
                     try:
-                        self.timestamp = self._parseISO8601(value).timestamp
+                        self._ns = self._parseISO8601(value)._ns
                         return
                     except:
                         if iso8601:
@@ -337,12 +408,12 @@ class UTCDateTime(object):
         microsecond = kwargs.get('microsecond', self.microsecond)
         julday = kwargs.get('julday', None)
         if julday:
-            self.timestamp = UTCDateTime(year=year, julday=julday, hour=hour,
-                                         minute=minute, second=second,
-                                         microsecond=microsecond).timestamp
+            self._ns = UTCDateTime(year=year, julday=julday, hour=hour,
+                                   minute=minute, second=second,
+                                   microsecond=microsecond)._ns
         else:
-            self.timestamp = UTCDateTime(year, month, day, hour, minute,
-                                         second, microsecond).timestamp
+            self._ns = UTCDateTime(year, month, day, hour, minute,
+                                   second, microsecond)._ns
 
     def _fromDateTime(self, dt, ms=0):
         """
@@ -358,8 +429,46 @@ class UTCDateTime(object):
             td = (dt - TIMESTAMP0)
         except TypeError:
             td = (dt.replace(tzinfo=None) - dt.utcoffset()) - TIMESTAMP0
-        self.timestamp = (td.microseconds + (td.seconds + td.days * 86400) *
-                          1000000) / 1000000.0 + ms
+        self._ns = _timedeltaToNs(td)
+        if ms:
+            self._ns += _floatToNs(ms)
+
+    @staticmethod
+    def _fromNs(ns, precision=None):
+        """
+        Creates a new UTCDateTime object from integer nanoseconds.
+
+        This bypasses the argument parsing of the constructor and is used by
+        the arithmetic operators and bulk conversion functions.
+        """
+        obj = object.__new__(UTCDateTime)
+        obj._ns = ns
+        if precision is None:
+            precision = UTCDateTime.DEFAULT_PRECISION
+        obj.__precision = precision
+        obj.__half = _halfUnitNs(precision)
+        return obj
+
+    def __getstate__(self):
+        """
+        Returns the state used for pickling and copying.
+        """
+        return (self._ns, self.__precision)
+
+    def __setstate__(self, state):
+        """
+        Restores the state used for pickling and copying.
+
+        Also accepts the attribute dictionary of objects pickled with older
+        versions storing a float timestamp.
+        """
+        if isinstance(state, dict):
+            self._ns = _floatToNs(state.get('timestamp', 0.0))
+            precision = state.get('_UTCDateTime__precision',
+                                  self.DEFAULT_PRECISION)
+        else:
+            self._ns, precision = state
+        self.precision = precision
 
     @staticmethod
     def _parseISO8601(value):
@@ -453,7 +562,67 @@ class UTCDateTime(object):
         >>> dt.timestamp
         1222864235.123456
         """
-        return self.timestamp
+        return _nsToFloat(self._ns)
+
+    def _setTimeStamp(self, value):
+        """
+        Sets UTC timestamp in seconds.
+
+        :type value: int or float
+        :param value: Timestamp in seconds.
+
+        .. rubric:: Example
+
+        >>> dt = UTCDateTime(2008, 10, 1)
+        >>> dt.timestamp = 1222864235.5
+        >>> dt
+        UTCDateTime(2008, 10, 1, 12, 30, 35, 500000)
+        """
+        self._ns = _floatToNs(value)
+
+    timestamp = property(_getTimeStamp, _setTimeStamp)
+
+    def _getNs(self):
+        """
+        Returns UTC timestamp in integer nanoseconds.
+
+        :rtype: int
+        :return: Timestamp in nanoseconds.
+
+        .. rubric:: Example
+
+        >>> dt = UTCDateTime(2008, 10, 1, 12, 30, 35, 123456)
+        >>> dt.ns
+        1222864235123456000
+        """
+        return self._ns
+
+    def _setNs(self, value):
+        """
+        Sets UTC timestamp in integer nanoseconds.
+
+        :type value: int
+        :param value: Timestamp in nanoseconds.
+        """
+        self._ns = int(value)
+
+    ns = property(_getNs, _setNs)
+
+    def _getDatetime64(self):
+        """
+        Returns a NumPy datetime64 object with nanosecond resolution.
+
+        :rtype: :class:`numpy.datetime64`
+
+        .. rubric:: Example
+
+        >>> dt = UTCDateTime(2008, 10, 1, 12, 30, 35, 123456)
+        >>> print(dt.datetime64)
+        2008-10-01T12:30:35.123456000
+        """
+        return np.int64(self._ns).view('datetime64[ns]')
+
+    datetime64 = property(_getDatetime64)
 
     def __float__(self):
         """
@@ -468,7 +637,7 @@ class UTCDateTime(object):
         >>> float(dt)
         1222864235.123456
         """
-        return self.timestamp
+        return _nsToFloat(self._ns)
 
     def _getDateTime(self):
         """
@@ -483,7 +652,9 @@ class UTCDateTime(object):
         >>> dt.datetime
         datetime.datetime(2008, 10, 1, 12, 30, 35, 45020)
         """
-        return datetime.datetime.utcfromtimestamp(self.timestamp)
+        # round to microseconds as done by datetime.utcfromtimestamp
+        return TIMESTAMP0 + \
+            datetime.timedelta(microseconds=(self._ns + 500) // 1000)
 
     datetime = property(_getDateTime)
 
@@ -734,7 +905,7 @@ class UTCDateTime(object):
         >>> dt
         UTCDateTime(2012, 2, 11, 10, 11, 20)
         """
-        self.timestamp += value - self.second
+        self._ns += (value - self.second) * NS_PER_SECOND
 
     second = property(_getSecond, _setSecond)
 
@@ -839,10 +1010,11 @@ class UTCDateTime(object):
         UTCDateTime(1970, 1, 1, 0, 0, 1, 123456)
         """
         if isinstance(value, datetime.timedelta):
-            # see datetime.timedelta.total_seconds
-            value = (value.microseconds + (value.seconds + value.days *
-                     86400) * 1000000) / 1000000.0
-        return UTCDateTime(self.timestamp + value)
+            return UTCDateTime._fromNs(self._ns + _timedeltaToNs(value))
+        elif isinstance(value, UTCDateTime):
+            raise TypeError("unsupported operand type(s) for +: "
+                            "'UTCDateTime' and 'UTCDateTime'")
+        return UTCDateTime._fromNs(self._ns + _floatToNs(value))
 
     def __sub__(self, value):
         """
@@ -867,12 +1039,10 @@ class UTCDateTime(object):
         86400.0
         """
         if isinstance(value, UTCDateTime):
-            return round(self.timestamp - value.timestamp, self.__precision)
+            return round(_nsToFloat(self._ns - value._ns), self.__precision)
         elif isinstance(value, datetime.timedelta):
-            # see datetime.timedelta.total_seconds
-            value = (value.microseconds + (value.seconds + value.days *
-                     86400) * 1000000) / 1000000.0
-        return UTCDateTime(self.timestamp - value)
+            return UTCDateTime._fromNs(self._ns - _timedeltaToNs(value))
+        return UTCDateTime._fromNs(self._ns - _floatToNs(value))
 
     def __str__(self):
         """
@@ -886,8 +1056,19 @@ class UTCDateTime(object):
         >>> str(dt)
         '2008-10-01T12:30:35.045020Z'
         """
-        return "%s%sZ" % (self.strftime('%Y-%m-%dT%H:%M:%S'),
-                          (self.__ms_pattern % (abs(self.timestamp % 1)))[1:])
+        precision = self.__precision
+        ns = self._ns
+        if precision < 9:
+            # round to the requested number of digits
+            scale = 10 ** (9 - precision)
+            ns = (ns + scale // 2) // scale * scale
+        seconds, fraction = divmod(ns, NS_PER_SECOND)
+        dt = TIMESTAMP0 + datetime.timedelta(seconds=seconds)
+        if precision > 0:
+            fraction = ('.%09d' % fraction + '0' * precision)[:precision + 1]
+        else:
+            fraction = ''
+        return "%s%sZ" % (dt.strftime('%Y-%m-%dT%H:%M:%S'), fraction)
 
     def __unicode__(self):
         """
@@ -928,6 +1109,9 @@ class UTCDateTime(object):
         >>> t1 == t2
         False
         """
+        if isinstance(other, UTCDateTime):
+            diff = self._ns - other._ns
+            return abs(diff) < self.__half
         try:
             return round(self.timestamp - float(other), self.__precision) == 0
         except (TypeError, ValueError):
@@ -985,6 +1169,9 @@ class UTCDateTime(object):
         >>> t1 < t2
         True
         """
+        if isinstance(other, UTCDateTime):
+            diff = self._ns - other._ns
+            return diff <= -self.__half
         try:
             return round(self.timestamp - float(other), self.__precision) < 0
         except (TypeError, ValueError):
@@ -1015,6 +1202,9 @@ class UTCDateTime(object):
         >>> t1 <= t2
         False
         """
+        if isinstance(other, UTCDateTime):
+            diff = self._ns - other._ns
+            return diff < self.__half
         try:
             return round(self.timestamp - float(other), self.__precision) <= 0
         except (TypeError, ValueError):
@@ -1045,6 +1235,9 @@ class UTCDateTime(object):
         >>> t1 > t2
         True
         """
+        if isinstance(other, UTCDateTime):
+            diff = self._ns - other._ns
+            return diff >= self.__half
         try:
             return round(self.timestamp - float(other), self.__precision) > 0
         except (TypeError, ValueError):
@@ -1075,6 +1268,9 @@ class UTCDateTime(object):
         >>> t1 >= t2
         False
         """
+        if isinstance(other, UTCDateTime):
+            diff = self._ns - other._ns
+            return diff > -self.__half
         try:
             return round(self.timestamp - float(other), self.__precision) >= 0
         except (TypeError, ValueError):
@@ -1091,7 +1287,7 @@ class UTCDateTime(object):
         Returns absolute timestamp value of the current UTCDateTime object.
         """
         # needed for unittest.assertAlmostEqual tests on linux
-        return abs(self.timestamp)
+        return abs(_nsToFloat(self._ns))
 
     def __hash__(self):
         """
@@ -1394,7 +1590,7 @@ class UTCDateTime(object):
             12
         """
         self.__precision = int(value)
-        self.__ms_pattern = "%%0.%df" % (self.__precision)
+        self.__half = _halfUnitNs(self.__precision)
 
     precision = property(_getPrecision, _setPrecision)
 
@@ -1429,6 +1625,52 @@ class UTCDateTime(object):
         return UTCDateTime()
 
 
+def toDatetime64(times):
+    """
+    Converts a sequence of UTCDateTime objects into a NumPy array.
+
+    :type times: list of :class:`~obspy.core.utcdatetime.UTCDateTime`
+    :param times: Sequence of UTCDateTime objects or any input accepted by
+        the :class:`~obspy.core.utcdatetime.UTCDateTime` constructor.
+    :rtype: :class:`numpy.ndarray`
+    :return: Array of dtype ``datetime64[ns]``.
+
+    .. rubric:: Example
+
+    >>> t = UTCDateTime(2012, 1, 1)
+    >>> print(toDatetime64([t, t + 0.5]))
+    ['2012-01-01T00:00:00.000000000' '2012-01-01T00:00:00.500000000']
+    """
+    ns = [t._ns if isinstance(t, UTCDateTime) else UTCDateTime(t)._ns
+          for t in times]
+    return np.array(ns, dtype=np.int64).view('datetime64[ns]')
+
+
+def fromDatetime64(array):
+    """
+    Converts a NumPy datetime64 array into a list of UTCDateTime objects.
+
+    :type array: :class:`numpy.ndarray`
+    :param array: One-dimensional array of any ``datetime64`` dtype.
+    :rtype: list of :class:`~obspy.core.utcdatetime.UTCDateTime`
+
+    .. rubric:: Example
+
+    >>> import numpy as np
+    >>> array = np.array(['2012-01-01T00:00:00', '2012-01-02T12:00:00'],
+    ...                  dtype='datetime64[s]')
+    >>> fromDatetime64(array)  # doctest: +NORMALIZE_WHITESPACE
+    [UTCDateTime(2012, 1, 1, 0, 0), UTCDateTime(2012, 1, 2, 12, 0)]
+    """
+    array = np.asarray(array)
+    if array.dtype.kind != 'M':
+        msg = "Expected an array of dtype datetime64, got %s"
+        raise TypeError(msg % array.dtype)
+    ns = array.astype('datetime64[ns]').view(np.int64).ravel()
+    fromNs = UTCDateTime._fromNs
+    return [fromNs(int(i)) for i in ns]
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
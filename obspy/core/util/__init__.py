@@ -24,7 +24,7 @@ from obspy.core.util.attribdict import AttribDict
 from obspy.core.util.base import NamedTemporaryFile, add_doctests, \
     add_unittests, ALL_MODULES, DEFAULT_MODULES, NATIVE_BYTEORDER, \
     c_file_p, createEmptyDataChunk, getExampleFile, getMatplotlibVersion, \
-    NETWORK_MODULES, _readFromPlugin, getScriptDirName
+    NETWORK_MODULES, _readFromPlugin, getScriptDirName, LazyData
 from obspy.core.util.decorator import deprecated, deprecated_keywords, \
     skip, skipIf, uncompressFile
 from obspy.core.util.geodetics import FlinnEngdahl
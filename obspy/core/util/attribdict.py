@@ -134,7 +134,7 @@ class AttribDict(collections.MutableMapping):
         other_keys = [k for k in keys if k not in priorized_keys]
         # priorized keys first + all other keys
         keys = priorized_keys + sorted(other_keys)
-        head = [pattern % (k, self.__dict__[k]) for k in keys]
+        head = [pattern % (k, self[k]) for k in keys]
         return "\n".join(head)
 
     def __iter__(self):
@@ -11,6 +11,7 @@ Base utilities and constants for ObsPy.
 
 from obspy.core.util.misc import toIntOrZero
 from obspy.core.util.obspy_types import OrderedDict
+from contextlib import contextmanager
 from pkg_resources import iter_entry_points, load_entry_point
 import ctypes as C
 import doctest
@@ -20,6 +21,8 @@ import numpy as np
 import os
 import sys
 import tempfile
+import threading
+import warnings
 
 
 # defining ObsPy modules currently used by runtests and the path function
@@ -33,7 +36,12 @@ ALL_MODULES = DEFAULT_MODULES + NETWORK_MODULES
 # default order of automatic format detection
 WAVEFORM_PREFERRED_ORDER = ['MSEED', 'SAC', 'GSE2', 'SEISAN', 'SACXY', 'GSE1',
                             'Q', 'SH_ASC', 'SLIST', 'TSPAIR', 'Y', 'SEGY',
-                            'SU', 'SEG2', 'WAV', 'PICKLE', 'DATAMARK', 'CSS']
+                            'SU', 'SEG2', 'WAV', 'PICKLE', 'OBSPYBIN',
+                            'DATAMARK', 'CSS']
+
+# file name suffix of sidecar files storing Mini-SEED record indices, such
+# files are never read as waveform files
+INDEX_SUFFIX = '.msidx'
 
 _sys_is_le = sys.byteorder == 'little'
 NATIVE_BYTEORDER = _sys_is_le and '<' or '>'
@@ -142,6 +150,171 @@ def createEmptyDataChunk(delta, dtype, fill_value=None):
     return temp
 
 
+class LazyData(object):
+    """
+    Loads the data samples of a single trace from disk on demand.
+
+    Waveform plugins attach a LazyData object to a
+    :class:`~obspy.core.trace.Trace` instead of the data array when reading
+    with ``lazy=True``. The data is decoded on first access of
+    :attr:`Trace.data <obspy.core.trace.Trace.data>` by calling
+    ``function(filename, *args, **kwargs)``.
+
+    Decoded arrays are kept in a cache shared by all LazyData objects which is
+    bounded by the class attribute ``max_resident``. If more arrays are
+    decoded, the least recently used arrays are released and decoded again on
+    the next access. Cached arrays are read-only - assign a new array to
+    :attr:`Trace.data <obspy.core.trace.Trace.data>` to modify the data, e.g.
+    ``tr.data = tr.data.copy()``, which also detaches the trace from the file.
+    The cache may be used from several threads, data is decoded outside of
+    its lock.
+
+    :type function: function
+    :param function: Function returning the data samples as NumPy array.
+    :type filename: str
+    :param filename: Name of the file containing the data.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read('/path/to/test.mseed', lazy=True)
+    >>> st[0].data  # data is decoded here  # doctest: +ELLIPSIS
+    array([...], dtype=int32)
+    >>> LazyData.max_resident = 50  # keep up to 50 decoded arrays in memory
+    >>> LazyData.max_resident = 100
+    """
+    max_resident = 100
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, function, filename, *args, **kwargs):
+        self.function = function
+        self.filename = filename
+        self.args = args
+        self.kwargs = kwargs
+        self.mtime = os.path.getmtime(filename)
+
+    def __call__(self):
+        """
+        Returns the decoded data, either from the cache or from disk.
+        """
+        cache = LazyData._cache
+        with LazyData._lock:
+            data = cache.pop(self, None)
+            if data is not None:
+                cache[self] = data
+                return data
+        mtime = os.path.getmtime(self.filename)
+        if mtime != self.mtime:
+            msg = "File '%s' changed since reading headers" % self.filename
+            msg += "; data may be read incorrectly "
+            msg += "(modification time = %s)." % mtime
+            warnings.warn(msg)
+        data = self.function(self.filename, *self.args, **self.kwargs)
+        data.flags.writeable = False
+        with LazyData._lock:
+            cache[self] = data
+            while len(cache) > LazyData.max_resident:
+                cache.popitem(last=False)
+        return data
+
+    def __deepcopy__(self, memo):  # @UnusedVariable
+        # the loader never changes, copies of a trace may share it
+        return self
+
+    @staticmethod
+    def clearCache():
+        """
+        Releases all decoded arrays kept in memory.
+        """
+        with LazyData._lock:
+            LazyData._cache.clear()
+
+
+@contextmanager
+def _openFile(filename, mode='rb'):
+    """
+    Context manager returning an open file for a file name or the given
+    file-like object itself.
+
+    Files given by name are closed on exit. The position of file-like objects,
+    e.g. :class:`StringIO.StringIO` buffers, is restored on exit, so several
+    format checks may look at the same in-memory buffer one after another.
+
+    .. rubric:: Example
+
+    >>> from StringIO import StringIO
+    >>> buf = StringIO('DELTA: 0.05')
+    >>> with _openFile(buf) as fh:
+    ...     fh.read(6)
+    'DELTA:'
+    >>> buf.tell()
+    0
+    """
+    if isinstance(filename, basestring):
+        with open(filename, mode) as fh:
+            yield fh
+    else:
+        position = filename.tell()
+        try:
+            yield filename
+        finally:
+            filename.seek(position, 0)
+
+
+def _getFileSize(fh):
+    """
+    Returns the size in bytes of an open file or file-like object.
+
+    .. rubric:: Example
+
+    >>> from StringIO import StringIO
+    >>> _getFileSize(StringIO('abcdef'))
+    6
+    """
+    position = fh.tell()
+    fh.seek(0, 2)
+    size = fh.tell()
+    fh.seek(position, 0)
+    return size
+
+
+def _fromFile(fh, dtype, count=-1, sep=''):
+    """
+    Works like :func:`numpy.fromfile` but also accepts file-like objects
+    which are not backed by a file on disk, e.g. in-memory buffers.
+
+    For text data (``sep`` given) whole lines are consumed from file-like
+    objects until ``count`` values are read.
+
+    .. rubric:: Example
+
+    >>> from StringIO import StringIO
+    >>> _fromFile(StringIO('1 2 3\\n4 5 6\\n'), 'int32', count=4, sep=' ')
+    array([1, 2, 3, 4], dtype=int32)
+    """
+    if isinstance(fh, file):
+        return np.fromfile(fh, dtype=dtype, count=count, sep=sep)
+    dtype = np.dtype(dtype)
+    if sep:
+        values = []
+        while count < 0 or len(values) < count:
+            line = fh.readline()
+            if not line:
+                break
+            values.extend(line.split())
+        if count >= 0:
+            values = values[:count]
+        return np.array(values, dtype=dtype)
+    if count < 0:
+        data = fh.read()
+    else:
+        data = fh.read(count * dtype.itemsize)
+    # ignore incomplete trailing items like numpy.fromfile does
+    data = data[:len(data) // dtype.itemsize * dtype.itemsize]
+    return np.fromstring(data, dtype=dtype)
+
+
 def getExampleFile(filename):
     """
     Function to find the absolute path of a test data file
@@ -385,6 +558,93 @@ def getMatplotlibVersion():
     return version
 
 
+# cache of already resolved plug-in functions, keyed by
+# (entry point group, entry point name, function name)
+_PLUGIN_FUNCTIONS = {}
+
+# cache of the last detected format for each directory and file extension,
+# used by _readFromPlugin to skip format detection for homogeneous archives
+_DETECTED_FORMATS = OrderedDict()
+_DETECTED_FORMATS_MAXSIZE = 1000
+# read(workers=N) detects formats from several threads
+_DETECTED_FORMATS_LOCK = threading.Lock()
+# formats whose isFormat function checks a distinct magic signature, only
+# these are remembered - lax checks (e.g. SU, Y or SLIST) could claim files
+# of formats ranked higher in WAVEFORM_PREFERRED_ORDER
+STRICT_FORMATS = ['MSEED', 'OBSPYBIN', 'SEG2', 'WAV', 'GSE2']
+
+
+def _loadPluginFunction(plugin_type, format_ep, name):
+    """
+    Loads and caches function ``name`` of a given format entry point.
+
+    :type plugin_type: str
+    :param plugin_type: Plug-in type, e.g. ``'waveform'``.
+    :type format_ep: :class:`pkg_resources.EntryPoint`
+    :param format_ep: Entry point of the format, e.g. for ``'MSEED'``.
+    :type name: str
+    :param name: Name of the function, e.g. ``'isFormat'`` or
+        ``'readFormat'``.
+    """
+    group = 'obspy.plugin.%s.%s' % (plugin_type, format_ep.name)
+    key = (group, name)
+    try:
+        return _PLUGIN_FUNCTIONS[key]
+    except KeyError:
+        pass
+    func = load_entry_point(format_ep.dist.key, group, name)
+    _PLUGIN_FUNCTIONS[key] = func
+    return func
+
+
+def _getFormatCacheKey(plugin_type, filename):
+    """
+    Returns the key for the format detection cache of the given file or
+    ``None`` if the file can not be cached (e.g. file-like objects).
+    """
+    if not isinstance(filename, basestring):
+        return None
+    dirname, basename = os.path.split(os.path.abspath(filename))
+    extension = os.path.splitext(basename)[1].lower()
+    return (plugin_type, dirname, extension)
+
+
+def _detectFormat(plugin_type, filename):
+    """
+    Detects the format entry point of a given file.
+
+    If the last format found for a file within the same directory with the
+    same file extension has a strict ``isFormat`` check (see
+    ``STRICT_FORMATS``), it is tried first, so reading homogeneous archives
+    usually needs a single ``isFormat`` call per file. Otherwise all known
+    formats are checked in the preferred order.
+    """
+    EPS = ENTRY_POINTS[plugin_type]
+    key = _getFormatCacheKey(plugin_type, filename)
+    candidates = EPS.values()
+    with _DETECTED_FORMATS_LOCK:
+        cached = _DETECTED_FORMATS.get(key)
+    if cached in EPS:
+        candidates = [EPS[cached]] + \
+            [ep for ep in candidates if ep.name != cached]
+    for format_ep in candidates:
+        # search isFormat for given entry point
+        isFormat = _loadPluginFunction(plugin_type, format_ep, 'isFormat')
+        # check format
+        if isFormat(filename):
+            break
+    else:
+        raise TypeError('Unknown format for file %s' % filename)
+    if key is not None and format_ep.name != cached:
+        with _DETECTED_FORMATS_LOCK:
+            _DETECTED_FORMATS.pop(key, None)
+            if format_ep.name in STRICT_FORMATS:
+                _DETECTED_FORMATS[key] = format_ep.name
+            while len(_DETECTED_FORMATS) > _DETECTED_FORMATS_MAXSIZE:
+                _DETECTED_FORMATS.popitem(last=False)
+    return format_ep
+
+
 def _readFromPlugin(plugin_type, filename, format=None, **kwargs):
     """
     Reads a single file from a plug-in's readFormat function.
@@ -394,31 +654,19 @@ def _readFromPlugin(plugin_type, filename, format=None, **kwargs):
     format_ep = None
     if not format:
         # auto detect format - go through all known formats in given sort order
-        for format_ep in EPS.values():
-            # search isFormat for given entry point
-            isFormat = load_entry_point(
-                format_ep.dist.key,
-                'obspy.plugin.%s.%s' % (plugin_type, format_ep.name),
-                'isFormat')
-            # check format
-            if isFormat(filename):
-                break
-        else:
-            raise TypeError('Unknown format for file %s' % filename)
+        format_ep = _detectFormat(plugin_type, filename)
     else:
         # format given via argument
         format = format.upper()
         try:
             format_ep = EPS[format]
-        except IndexError:
+        except (KeyError, IndexError):
             msg = "Format \"%s\" is not supported. Supported types: %s"
             raise TypeError(msg % (format, ', '.join(EPS)))
     # file format should be known by now
     try:
         # search readFormat for given entry point
-        readFormat = load_entry_point(
-            format_ep.dist.key,
-            'obspy.plugin.%s.%s' % (plugin_type, format_ep.name), 'readFormat')
+        readFormat = _loadPluginFunction(plugin_type, format_ep, 'readFormat')
     except ImportError:
         msg = "Format \"%s\" is not supported. Supported types: %s"
         raise TypeError(msg % (format_ep.name, ', '.join(EPS)))
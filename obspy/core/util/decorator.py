@@ -9,14 +9,22 @@ Decorator used in ObsPy.
     (http://www.gnu.org/copyleft/lesser.html)
 """
 
-from obspy.core.util.base import NamedTemporaryFile
-import numpy as np
+from StringIO import StringIO
+import bz2
 import functools
+import gzip
+import numpy as np
 import os
+import re
 import unittest
 import warnings
 
 
+# leading bytes of gzip and bzip2 compressed data
+GZIP_MAGIC = '\x1f\x8b'
+BZIP2_MAGIC = re.compile('BZh[1-9]1AY&SY')
+
+
 def deprecated(func, warning_msg=None):
     """
     This is a decorator which can be used to mark functions as deprecated.
@@ -103,42 +111,66 @@ def skipIf(condition, reason):
     return _id
 
 
+def _uncompress(fh, compression, chunksize=1048576):
+    """
+    Decompresses a gzip or bzip2 compressed file-like object chunk by chunk
+    into an in-memory buffer.
+
+    Returns ``None`` if the data can't be decompressed.
+    """
+    buf = StringIO()
+    try:
+        if compression == 'bz2':
+            decompressor = bz2.BZ2Decompressor()
+            for chunk in iter(lambda: fh.read(chunksize), ''):
+                buf.write(decompressor.decompress(chunk))
+        else:
+            gz = gzip.GzipFile(fileobj=fh, mode='rb')
+            for chunk in iter(lambda: gz.read(chunksize), ''):
+                buf.write(chunk)
+    except:
+        return None
+    if not buf.tell():
+        return None
+    buf.seek(0)
+    return buf
+
+
 def uncompressFile(func):
     """
-    Decorator used for temporary uncompressing file if .gz or .bz2 archive.
+    Decorator used for uncompressing .gz or .bz2 archives in memory.
+
+    Compressed files given by name are recognized by their file extension,
+    compressed file-like objects by their leading magic bytes. The
+    decompressed data is passed to the wrapped function as
+    :class:`StringIO.StringIO` buffer - no temporary files are written.
     """
     def wrapped_func(filename, *args, **kwargs):
-        if not isinstance(filename, basestring):
-            return func(filename, *args, **kwargs)
-        elif not os.path.exists(filename):
-            msg = "File not found '%s'" % (filename)
-            raise IOError(msg)
-        # check if we got a compressed file
         unpacked_data = None
-        if filename.endswith('.bz2'):
-            # bzip2
-            try:
-                import bz2
-                unpacked_data = bz2.decompress(open(filename, 'rb').read())
-            except:
-                pass
-        elif filename.endswith('.gz'):
-            # gzip
-            try:
-                import gzip
-                unpacked_data = gzip.open(filename, 'rb').read()
-            except:
-                pass
-        if unpacked_data:
-            # we unpacked something without errors - create temporary file
-            with NamedTemporaryFile() as tempfile:
-                tempfile._fileobj.write(unpacked_data)
-                # call wrapped function
-                result = func(tempfile.name, *args, **kwargs)
-        else:
-            # call wrapped function with original filename
-            result = func(filename, *args, **kwargs)
-        return result
+        if isinstance(filename, basestring):
+            if not os.path.exists(filename):
+                msg = "File not found '%s'" % (filename)
+                raise IOError(msg)
+            # check if we got a compressed file
+            compression = os.path.splitext(filename)[1][1:]
+            if compression in ('bz2', 'gz'):
+                with open(filename, 'rb') as fh:
+                    unpacked_data = _uncompress(fh, compression)
+        elif hasattr(filename, 'read'):
+            position = filename.tell()
+            magic = filename.read(10)
+            filename.seek(position, 0)
+            if magic.startswith(GZIP_MAGIC):
+                unpacked_data = _uncompress(filename, 'gz')
+            elif BZIP2_MAGIC.match(magic):
+                unpacked_data = _uncompress(filename, 'bz2')
+            if unpacked_data is None:
+                filename.seek(position, 0)
+        if unpacked_data is not None:
+            # we unpacked something without errors - read from memory
+            return func(unpacked_data, *args, **kwargs)
+        # call wrapped function with original filename
+        return func(filename, *args, **kwargs)
     return wrapped_func
 
 
@@ -4,6 +4,7 @@ DATAMARK bindings to ObsPy core module.
 """
 
 from obspy import Trace, UTCDateTime, Stream
+from obspy.core.util.base import _getFileSize, _openFile
 import numpy as np
 import warnings
 
@@ -20,26 +21,26 @@ def isDATAMARK(filename):  # @UnusedVariable
     # as long we don't have full format description we just try to read the
     # file like readDATAMARK and check for errors
     try:
-        fpin = open(filename, "rb")
-        fpin.read(4)
-        buff = fpin.read(6)
-        yy = "%s%02x" % (20, np.fromstring(buff[0], dtype='b')[0])
-        mm = "%x" % np.fromstring(buff[1], dtype='b')[0]
-        dd = "%x" % np.fromstring(buff[2], dtype='b')[0]
-        hh = "%x" % np.fromstring(buff[3], dtype='b')[0]
-        mi = "%x" % np.fromstring(buff[4], dtype='b')[0]
-        sec = "%x" % np.fromstring(buff[5], dtype='b')[0]
+        with _openFile(filename) as fpin:
+            fpin.read(4)
+            buff = fpin.read(6)
+            yy = "%s%02x" % (20, np.fromstring(buff[0], dtype='b')[0])
+            mm = "%x" % np.fromstring(buff[1], dtype='b')[0]
+            dd = "%x" % np.fromstring(buff[2], dtype='b')[0]
+            hh = "%x" % np.fromstring(buff[3], dtype='b')[0]
+            mi = "%x" % np.fromstring(buff[4], dtype='b')[0]
+            sec = "%x" % np.fromstring(buff[5], dtype='b')[0]
 
-        # This will raise for invalid dates.
-        UTCDateTime(int(yy), int(mm), int(dd), int(hh), int(mi),
-                    int(sec))
-        buff = fpin.read(4)
-        np.fromstring(buff[0], dtype='b')[0]
-        np.fromstring(buff[1], dtype='b')[0]
-        np.fromstring(buff[2], dtype='b')[0] >> 4
-        np.fromstring(buff[3], dtype='b')[0]
-        idata00 = fpin.read(4)
-        np.fromstring(idata00, '>i')[0]
+            # This will raise for invalid dates.
+            UTCDateTime(int(yy), int(mm), int(dd), int(hh), int(mi),
+                        int(sec))
+            buff = fpin.read(4)
+            np.fromstring(buff[0], dtype='b')[0]
+            np.fromstring(buff[1], dtype='b')[0]
+            np.fromstring(buff[2], dtype='b')[0] >> 4
+            np.fromstring(buff[3], dtype='b')[0]
+            idata00 = fpin.read(4)
+            np.fromstring(idata00, '>i')[0]
     except:
         return False
     return True
@@ -63,10 +64,8 @@ def readDATAMARK(filename, century="20", **kwargs):  # @UnusedVariable
     output = {}
 
     # read datamark file
-    with open(filename, "rb") as fpin:
-        fpin.seek(0, 2)
-        sz = fpin.tell()
-        fpin.seek(0)
+    with _openFile(filename) as fpin:
+        sz = _getFileSize(fpin) - fpin.tell()
         leng = 0
         status0 = 0
         start = 0
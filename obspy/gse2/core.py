@@ -4,6 +4,8 @@ GSE2/GSE1 bindings to ObsPy core module.
 """
 
 from obspy import Trace, UTCDateTime, Stream
+from obspy.core.util import LazyData
+from obspy.core.util.base import _openFile
 from obspy.gse2 import libgse2, libgse1
 import numpy as np
 
@@ -19,9 +21,8 @@ def isGSE2(filename):
     """
     # Open file.
     try:
-        f = open(filename)
-        libgse2.isGse2(f)
-        f.close()
+        with _openFile(filename) as f:
+            libgse2.isGse2(f)
     except:
         return False
     return True
@@ -45,7 +46,7 @@ gse2_extra = [
 ]
 
 
-def readGSE2(filename, headonly=False, verify_chksum=True,
+def readGSE2(filename, headonly=False, verify_chksum=True, lazy=False,
              **kwargs):  # @UnusedVariable
     """
     Reads a GSE2 file and returns a Stream object.
@@ -63,6 +64,10 @@ def readGSE2(filename, headonly=False, verify_chksum=True,
     :type verify_chksum: boolean, optional
     :param verify_chksum: If True verify Checksum and raise Exception if
         it is not correct.
+    :type lazy: boolean, optional
+    :param lazy: If True read only the headers and decode the data samples of
+        each trace on first access of ``Trace.data``, see
+        :class:`~obspy.core.util.base.LazyData`.
     :rtype: :class:`~obspy.core.stream.Stream`
     :returns: Stream object containing header and data.
 
@@ -71,46 +76,62 @@ def readGSE2(filename, headonly=False, verify_chksum=True,
     >>> from obspy import read
     >>> st = read("/path/to/loc_RJOB20050831023349.z")
     """
+    # data can only be loaded lazily from files given by name
+    lazy = lazy and isinstance(filename, basestring)
     traces = []
     # read GSE2 file
-    f = open(filename, 'rb')
-    for _k in xrange(10000):  # avoid endless loop
-        pos = f.tell()
-        widi = f.readline()[0:4]
-        if widi == '':  # end of file
-            break
-        elif widi != 'WID2':
-            continue
-        else:  # valid gse2 part
-            f.seek(pos)
-            if headonly:
-                header = libgse2.readHead(f)
-            else:
-                header, data = libgse2.read(f, verify_chksum=verify_chksum)
-            # assign all header entries to a new dictionary compatible with an
-            # ObsPy Trace object.
-            new_header = {}
-            for i, j in convert_dict.iteritems():
-                value = header[i]
-                if isinstance(value, str):
-                    value = value.strip()
-                new_header[j] = value
-            # assign gse specific header entries
-            new_header['gse2'] = {}
-            for i in gse2_extra:
-                new_header['gse2'][i] = header[i]
-            # Calculate start time.
-            new_header['starttime'] = UTCDateTime(
-                header['d_year'], header['d_mon'], header['d_day'],
-                header['t_hour'], header['t_min'], 0) + header['t_sec']
-            if headonly:
-                traces.append(Trace(header=new_header))
-            else:
-                traces.append(Trace(header=new_header, data=data))
-    f.close()
+    with _openFile(filename) as f:
+        for _k in xrange(10000):  # avoid endless loop
+            pos = f.tell()
+            widi = f.readline()[0:4]
+            if widi == '':  # end of file
+                break
+            elif widi != 'WID2':
+                continue
+            else:  # valid gse2 part
+                f.seek(pos)
+                if headonly or lazy:
+                    header = libgse2.readHead(f)
+                else:
+                    header, data = libgse2.read(f,
+                                                verify_chksum=verify_chksum)
+                # assign all header entries to a new dictionary compatible
+                # with an ObsPy Trace object.
+                new_header = {}
+                for i, j in convert_dict.iteritems():
+                    value = header[i]
+                    if isinstance(value, str):
+                        value = value.strip()
+                    new_header[j] = value
+                # assign gse specific header entries
+                new_header['gse2'] = {}
+                for i in gse2_extra:
+                    new_header['gse2'][i] = header[i]
+                # Calculate start time.
+                new_header['starttime'] = UTCDateTime(
+                    header['d_year'], header['d_mon'], header['d_day'],
+                    header['t_hour'], header['t_min'], 0) + header['t_sec']
+                if headonly:
+                    traces.append(Trace(header=new_header))
+                elif lazy:
+                    tr = Trace(header=new_header)
+                    tr._setLazyData(LazyData(_readLazyData, filename, pos,
+                                             verify_chksum))
+                    traces.append(tr)
+                else:
+                    traces.append(Trace(header=new_header, data=data))
     return Stream(traces=traces)
 
 
+def _readLazyData(filename, offset, verify_chksum=True):
+    """
+    Reads the data samples of the GSE2 trace starting at the given offset.
+    """
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        return libgse2.read(f, verify_chksum=verify_chksum)[1]
+
+
 def writeGSE2(stream, filename, inplace=False, **kwargs):  # @UnusedVariable
     """
     Write GSE2 file from a Stream object.
@@ -177,11 +198,10 @@ def isGSE1(filename):
     """
     # Open file.
     try:
-        f = open(filename)
-        data = f.readline()
+        with _openFile(filename) as f:
+            data = f.readline()
     except:
         return False
-    f.close()
     if data.startswith('WID1') or data.startswith('XW01'):
         return True
     return False
@@ -215,16 +235,16 @@ def readGSE1(filename, headonly=False, verify_chksum=True,
     """
     traces = []
     # read GSE1 file
-    fh = open(filename, 'rb')
-    while True:
-        try:
-            if headonly:
-                header = libgse1.readHeader(fh)
-                traces.append(Trace(header=header))
-            else:
-                header, data = libgse1.read(fh, verify_chksum=verify_chksum)
-                traces.append(Trace(header=header, data=data))
-        except EOFError:
-            break
-    fh.close()
+    with _openFile(filename) as fh:
+        while True:
+            try:
+                if headonly:
+                    header = libgse1.readHeader(fh)
+                    traces.append(Trace(header=header))
+                else:
+                    header, data = libgse1.read(fh,
+                                                verify_chksum=verify_chksum)
+                    traces.append(Trace(header=header, data=data))
+            except EOFError:
+                break
     return Stream(traces=traces)
@@ -18,6 +18,7 @@ Low-level module internally used for handling GSE1 files
 """
 
 from obspy import UTCDateTime
+from obspy.core.util.base import _fromFile
 from obspy.gse2.libgse2 import uncompress_CM6, verifyChecksum
 import doctest
 import numpy as np
@@ -63,7 +64,7 @@ def readIntegerData(fh, npts):
     buf = fh.readline()
     while buf:
         if buf.startswith("DAT1"):
-            data = np.fromfile(fh, dtype=np.int32, count=npts, sep=' ')
+            data = _fromFile(fh, dtype=np.int32, count=npts, sep=' ')
             break
         buf = fh.readline()
     return data
@@ -162,6 +162,12 @@ clibgse2.buf_free.restype = C.c_void_p
 # >>> from obspy.gse2 import gse2head
 gse2head = [_i[0] for _i in HEADER._fields_]
 
+# characters of the CM6 encoding ordered by their 6 bit value, values of 32
+# and above carry the continuation bit, see decomp_6b of gse_functions
+CM6_CHARS = '+-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+CM6_TABLE = np.zeros(128, dtype='int64')
+CM6_TABLE[np.fromstring(CM6_CHARS, dtype='uint8')] = np.arange(64)
+
 
 def isGse2(f):
     """
@@ -220,20 +226,111 @@ def uncompress_CM6(f, n_samps):
     Uncompress n_samps of CM6 compressed data from file pointer fp.
 
     :type f: File Pointer
-    :param f: File Pointer
+    :param f: File Pointer or file-like object, e.g. an in-memory buffer.
     :type n_samps: Int
     :param n_samps: Number of samples
     """
-    # transform to a C file pointer
-    fp = C.pythonapi.PyFile_AsFile(f)
-    data = np.empty(n_samps, dtype='int32')
-    n = clibgse2.decomp_6b(fp, n_samps, data)
+    if isinstance(f, file):
+        # transform to a C file pointer
+        fp = C.pythonapi.PyFile_AsFile(f)
+        data = np.empty(n_samps, dtype='int32')
+        n = clibgse2.decomp_6b(fp, n_samps, data)
+    else:
+        data = _decompCM6(f, n_samps)
+        n = len(data)
     if n != n_samps:
         raise GSEUtiError("Mismatching length in lib.decomp_6b")
     clibgse2.rem_2nd_diff(data, n_samps)
     return data
 
 
+def _decompCM6(f, n_samps):
+    """
+    Decodes n_samps CM6 encoded samples from a file-like object.
+
+    NumPy version of decomp_6b of gse_functions for file-like objects which
+    are not backed by a C file pointer. The second differences are not
+    removed. Returns less than n_samps samples if the data ends prematurely.
+    """
+    # search for the DAT2 or DAT1 line
+    line = f.readline()
+    while line and not (line.startswith('DAT2') or line.startswith('DAT1')):
+        line = f.readline()
+    # collect the encoded characters of as many lines as needed, characters
+    # without continuation bit terminate a sample
+    continuation_chars = CM6_CHARS[32:]
+    lines = []
+    count = 0
+    while line and count < n_samps:
+        line = f.readline()
+        if line.startswith('CHK2 ') or line.startswith('CHK1 '):
+            break
+        chars = line[:80].split()
+        if chars:
+            lines.append(chars[0])
+            count += len(chars[0].translate(None, continuation_chars))
+    codes = CM6_TABLE[np.fromstring(''.join(lines), dtype='uint8') & 127]
+    ends = np.flatnonzero((codes & 32) == 0)[:n_samps]
+    if not len(ends):
+        return np.empty(0, dtype='int32')
+    codes = codes[:ends[-1] + 1]
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # every character adds 5 bits, the first one of a sample only 4 bits
+    # and the sign bit
+    values = codes & 31
+    values[starts] &= 15
+    index = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = 5 * (ends[index] - np.arange(len(codes)))
+    data = np.add.reduceat(values << shifts, starts)
+    data[(codes[starts] & 16) != 0] *= -1
+    return data.astype('int32')
+
+
+def _readHeader(f):
+    """
+    Reads the next GSE2 header of a file or file-like object.
+
+    Returns the filled HEADER structure and the error code of read_header.
+    File-like objects not backed by a C file pointer, e.g. in-memory buffers,
+    are parsed by a Python version of read_header of gse_functions.
+    """
+    head = HEADER()
+    if isinstance(f, file):
+        fp = C.pythonapi.PyFile_AsFile(f)
+        errcode = clibgse2.read_header(fp, C.pointer(head))
+        del fp
+        return head, errcode
+    # search for the next WID2 line
+    line = f.readline()
+    while line and not line.startswith('WID2'):
+        line = f.readline()
+    if not line:
+        return head, -1
+    line = line[:119]
+    # character fields are copied from fixed columns, numbers are scanned
+    # from the null terminated line as sscanf would do
+    for name, start, end in [('station', 29, 34), ('channel', 35, 38),
+                             ('auxid', 39, 43), ('datatype', 44, 47),
+                             ('instype', 88, 94)]:
+        setattr(head, name, line[start:end].split('\0')[0])
+    cline = line.split('\0')[0]
+    for fields in [[('d_year', 5, 9, int), ('d_mon', 10, 12, int),
+                    ('d_day', 13, 15, int), ('t_hour', 16, 18, int),
+                    ('t_min', 19, 21, int), ('t_sec', 22, 28, float)],
+                   [('n_samps', 48, 56, int), ('samp_rate', 57, 68, float),
+                    ('calib', 69, 79, float), ('calper', 80, 87, float),
+                    ('hang', 95, 100, float), ('vang', 101, 105, float)]]:
+        for name, start, end, dtype in fields:
+            try:
+                setattr(head, name, dtype(cline[start:end]))
+            except ValueError:
+                # sscanf stops at the first field not matching
+                break
+    return head, 0
+
+
 def verifyChecksum(fh, data, version=2):
     """
     Calculate checksum from data, as in gse_driver.c line 60
@@ -285,9 +382,7 @@ def read(f, verify_chksum=True):
     :rtype: Dictionary, Numpy.ndarray int32
     :return: Header entries and data as numpy.ndarray of type int32.
     """
-    fp = C.pythonapi.PyFile_AsFile(f)
-    head = HEADER()
-    errcode = clibgse2.read_header(fp, C.pointer(head))
+    head, errcode = _readHeader(f)
     if errcode != 0:
         raise GSEUtiError("Error in lib.read_header")
     if head.n_samps == 0:
@@ -302,7 +397,7 @@ def read(f, verify_chksum=True):
     for i in head._fields_:
         headdict[i[0]] = getattr(head, i[0])
     # cleaning up
-    del fp, head
+    del head
     return headdict, data
 
 
@@ -398,13 +493,11 @@ def readHead(f):
     :rtype: Dictionary
     :return: Header entries.
     """
-    fp = C.pythonapi.PyFile_AsFile(f)
-    head = HEADER()
-    clibgse2.read_header(fp, C.pointer(head))
+    head, _errcode = _readHeader(f)
     headdict = {}
     for i in head._fields_:
         headdict[i[0]] = getattr(head, i[0])
-    del fp, head
+    del head
     return headdict
 
 
@@ -422,16 +515,14 @@ def getStartAndEndTime(f):
     :return: C{[startdate,stopdate,startime,stoptime]} Start and Stop time as
              Julian seconds and as date string.
     """
-    fp = C.pythonapi.PyFile_AsFile(f)
-    head = HEADER()
-    clibgse2.read_header(fp, C.pointer(head))
+    head, _errcode = _readHeader(f)
     seconds = int(head.t_sec)
     microseconds = int(1e6 * (head.t_sec - seconds))
     startdate = UTCDateTime(head.d_year, head.d_mon, head.d_day,
                             head.t_hour, head.t_min, seconds, microseconds)
     stopdate = UTCDateTime(startdate.timestamp +
                            head.n_samps / float(head.samp_rate))
-    del fp, head
+    del head
     return [startdate, stopdate, startdate.timestamp, stopdate.timestamp]
 
 
@@ -44,6 +44,16 @@ class CoreTestCase(unittest.TestCase):
                                1125455629.849998, 6)
         self.assertEqual(tr.data[0:13].tolist(), testdata)
 
+    def test_readLazy(self):
+        """
+        Tests decoding the data of GSE2 files on demand.
+        """
+        gse2file = os.path.join(self.path, 'data', 'loc_RJOB20050831023349.z')
+        st = read(gse2file)
+        st2 = read(gse2file, lazy=True)
+        self.assertFalse('data' in st2[0].__dict__)
+        self.assertEqual(st, st2)
+
     def test_readHeadViaObsPy(self):
         """
         Read header of files via L{obspy.Trace}
@@ -8,6 +8,7 @@ from obspy import UTCDateTime
 from obspy.core.util import NamedTemporaryFile
 from obspy.gse2 import libgse2
 from obspy.gse2.libgse2 import ChksumError
+from StringIO import StringIO
 import numpy as np
 import os
 import unittest
@@ -178,6 +179,31 @@ class LibGSE2TestCase(unittest.TestCase):
         f = open(os.path.join(self.path, 'broken_head.gse2'), 'rb')
         self.assertRaises(ChksumError, libgse2.read, f)
 
+    def test_readFromStringIO(self):
+        """
+        Header and CM6 data read from in-memory buffers must equal the ones
+        read by the C library from real files.
+        """
+        for filename in ['loc_RJOB20050831023349.z',
+                         'loc_RJOB20050831023349_first100_dos.z',
+                         'loc_RNON20040609200559.z', 'twiceCHK2.gse2',
+                         'broken_head.gse2']:
+            gse2file = os.path.join(self.path, filename)
+            with open(gse2file, 'rb') as f:
+                header, data = libgse2.read(f, verify_chksum=False)
+                f.seek(0)
+                raw = f.read()
+            header2, data2 = libgse2.read(StringIO(raw), verify_chksum=False)
+            self.assertEqual(header, header2)
+            np.testing.assert_array_equal(data, data2)
+            self.assertEqual(libgse2.readHead(StringIO(raw)), header)
+        # checksum is verified for buffers, too
+        gse2file = os.path.join(self.path,
+                                'loc_RJOB20050831023349.z.wrong_chksum')
+        with open(gse2file, 'rb') as f:
+            fp = StringIO(f.read())
+        self.assertRaises(ChksumError, libgse2.read, fp, verify_chksum=True)
+
 
 def suite():
     return unittest.makeSuite(LibGSE2TestCase, 'test')
@@ -56,6 +56,14 @@ of each trace.
 >>> print(st[0].data)
 [2787 2776 2774 ..., 2850 2853 2853]
 
+Files too large to be held in memory as well as pipes or sockets can be
+decoded record by record using the :func:`~obspy.mseed.core.iterMSEED`
+generator:
+
+>>> from obspy.mseed.core import iterMSEED
+>>> for tr in iterMSEED("/path/to/test.mseed"):  # doctest: +SKIP
+...     tr.filter('lowpass', freq=1.0)
+
 Writing
 -------
 You may export the data to the file system using the
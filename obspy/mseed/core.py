@@ -5,15 +5,15 @@ MSEED bindings to ObsPy core module.
 
 from headers import clibmseed, ENCODINGS, HPTMODULUS, SAMPLETYPE, DATATYPES, \
     VALID_RECORD_LENGTHS, HPTERROR, SelectTime, Selections, blkt_1001_s, \
-    VALID_CONTROL_HEADERS, SEED_CONTROL_HEADERS
+    VALID_CONTROL_HEADERS, SEED_CONTROL_HEADERS, RecordBuffer, collectRecord
 from itertools import izip
-from math import log
 from obspy import Stream, Trace, UTCDateTime
-from obspy.core.util import NATIVE_BYTEORDER
+from obspy.core.util import NATIVE_BYTEORDER, LazyData
+from obspy.core.util.base import _getFileSize, _openFile
 from obspy.mseed.headers import blkt_100_s
+from StringIO import StringIO
 import ctypes as C
 import numpy as np
-import os
 import util
 import warnings
 
@@ -36,7 +36,16 @@ def isMSEED(filename):
 
     Thus it cannot be used to validate a Mini-SEED or SEED file.
     """
-    fp = open(filename, 'rb')
+    with _openFile(filename) as fp:
+        return _isMSEED(fp)
+
+
+def _isMSEED(fp):
+    """
+    Checks whether the open file or file-like object contains Mini-SEED/full
+    SEED data starting at its current position.
+    """
+    start = fp.tell()
     header = fp.read(7)
     # File has less than 7 characters
     if len(header) != 7:
@@ -76,9 +85,9 @@ def isMSEED(filename):
         record_length = pow(2, int(fp.read(2)))
     except:
         return False
-    file_size = os.path.getsize(filename)
+    file_size = _getFileSize(fp)
     # Jump to the second record.
-    fp.seek(record_length + 6)
+    fp.seek(start + record_length + 6)
     # Loop over all records and return True if one record is a data
     # record
     while fp.tell() < file_size:
@@ -89,9 +98,36 @@ def isMSEED(filename):
     return False
 
 
+def _selectRecordsFromIndex(filename, buffer, starttime=None, endtime=None,
+                            sourcename=None):
+    """
+    Returns a buffer only containing the records of a memory mapped Mini-SEED
+    file that match the given selection, using the record index of the file.
+
+    Returns ``None`` if no record index can be created for the file, e.g. for
+    full SEED files.
+    """
+    try:
+        index = util.getRecordIndex(filename)
+    except (ValueError, IndexError):
+        return None
+    index = util._selectRecords(index, starttime, endtime, sourcename)
+    if not len(index):
+        return np.empty(0, dtype='b')
+    # Join adjacent records to avoid copying them one by one.
+    starts = index['offset']
+    ends = starts + index['record_length']
+    breaks = np.nonzero(starts[1:] != ends[:-1])[0] + 1
+    starts = starts[np.concatenate([[0], breaks])]
+    ends = ends[np.concatenate([breaks - 1, [len(index) - 1]])]
+    return np.concatenate([buffer[start:end]
+                           for start, end in izip(starts, ends)])
+
+
 def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
               sourcename=None, reclen=None, recinfo=True, details=False,
-              header_byteorder=None, verbose=None, **kwargs):
+              header_byteorder=None, verbose=None, use_index=False,
+              lazy=False, **kwargs):
     """
     Reads a Mini-SEED file and returns a Stream object.
 
@@ -140,6 +176,19 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
         little-endian, ``1`` or ``'>'`` for MBF or big-endian. ``'='`` is the
         native byteorder. Used to enforce the header byteorder. Useful in some
         rare cases where the automatic byte order detection fails.
+    :type use_index: bool, optional
+    :param use_index: If ``True`` and ``starttime``, ``endtime`` or
+        ``sourcename`` is given, only the records matching the selection are
+        passed to libmseed. The records are looked up in a record index which
+        is stored in a sidecar file next to the Mini-SEED file and updated
+        automatically if the file changes, see
+        :func:`~obspy.mseed.util.getRecordIndex`. Only used for file names.
+        Defaults to ``False``.
+    :type lazy: bool, optional
+    :param lazy: If ``True`` only the headers are read and the data samples
+        of every trace are decoded from the records of the trace on first
+        access of ``Trace.data``, see :class:`~obspy.core.util.base.LazyData`.
+        Only used for file names. Defaults to ``False``.
 
     .. rubric:: Example
 
@@ -158,8 +207,9 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
     1 Trace(s) in Stream:
     NL.HGN.00.BHZ | 2003-05-29T02:15:59.993400Z - ... | 40.0 Hz, 5629 samples
     """
-    # Parse the headonly and reclen flags.
-    if headonly is True:
+    # Parse the headonly, lazy and reclen flags.
+    lazy = lazy and headonly is False and isinstance(mseed_object, basestring)
+    if headonly is True or lazy:
         unpack_data = 0
     else:
         unpack_data = 1
@@ -170,7 +220,7 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
         warnings.warn(msg)
         reclen = -1
     else:
-        reclen = int(log(reclen, 2))
+        reclen = int(reclen)
 
     # Determine the byteorder.
     if header_byteorder == "=":
@@ -209,10 +259,17 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
                 'byteorder': info['byteorder'],
                 'number_of_records': info['number_of_records']}
 
-    # If its a filename just read it.
+    # If its a filename memory map it.
     if isinstance(mseed_object, basestring):
-        # Read to NumPy array which is used as a buffer.
-        buffer = np.fromfile(mseed_object, dtype='b')
+        buffer = util._mapFile(mseed_object)
+        if use_index and (starttime is not None or endtime is not None or
+                          sourcename is not None):
+            selected = _selectRecordsFromIndex(mseed_object, buffer,
+                                               starttime, endtime, sourcename)
+            if selected is not None:
+                if not len(selected):
+                    return Stream()
+                buffer = selected
     elif hasattr(mseed_object, 'read'):
         buffer = np.fromstring(mseed_object.read(), dtype='b')
 
@@ -343,7 +400,7 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
                 header['mseed']['calibration_type'] = \
                     currentSegment.calibration_type
 
-            if headonly is False:
+            if unpack_data:
                 # The data always will be in sequential order.
                 data = all_data.pop(0)
                 header['npts'] = len(data)
@@ -369,11 +426,187 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
 
     clibmseed.lil_free(lil)
     del lil
+    if lazy:
+        _setLazyData(mseed_object, traces, details=details,
+                     header_byteorder=header_byteorder, sidecar=use_index)
     return Stream(traces=traces)
 
 
+def _setLazyData(filename, traces, sidecar=False, **kwargs):
+    """
+    Attaches a loader to every trace which decodes only the records of the
+    trace, looked up in the record index of the file.
+    """
+    try:
+        index = util.getRecordIndex(filename, sidecar=sidecar)
+    except (ValueError, IndexError):
+        # e.g. full SEED files - decode the whole file on demand
+        index = None
+    for trace in traces:
+        stats = trace.stats
+        records = None
+        if index is not None:
+            # libmseed joins records within a tolerance of half a sample
+            tolerance = int(0.5 * stats.delta * HPTMODULUS)
+            start = util._convertDatetimeToMSTime(stats.starttime)
+            end = util._convertDatetimeToMSTime(stats.endtime)
+            mask = (index['network'] == stats.network) & \
+                (index['station'] == stats.station) & \
+                (index['location'] == stats.location) & \
+                (index['channel'] == stats.channel) & \
+                (index['dataquality'] == stats.mseed.dataquality) & \
+                (index['starttime'] >= start - tolerance) & \
+                (index['starttime'] <= end + tolerance)
+            records = np.column_stack((index['offset'][mask],
+                                       index['record_length'][mask]))
+        trace._setLazyData(LazyData(
+            _readLazyData, filename, trace.id, UTCDateTime(stats.starttime),
+            stats.sampling_rate, stats.npts, records, **kwargs))
+
+
+def _readLazyData(filename, sourcename, starttime, sampling_rate, npts,
+                  records=None, **kwargs):
+    """
+    Decodes the data samples of a single trace of a Mini-SEED file.
+
+    :param records: Array of record offsets and lengths of the trace. If
+        ``None`` the whole file is decoded.
+    """
+    if records is not None and len(records):
+        buffer = util._mapFile(filename)
+        buffer = np.concatenate([buffer[offset:offset + length]
+                                 for offset, length in records])
+        st = readMSEED(StringIO(buffer.tostring()), recinfo=False, **kwargs)
+    else:
+        st = readMSEED(filename, sourcename=sourcename, recinfo=False,
+                       **kwargs)
+    tolerance = 0.5 / sampling_rate if sampling_rate else 0
+    for tr in st:
+        if tr.id == sourcename and tr.stats.npts == npts and \
+                abs(tr.stats.starttime - starttime) <= tolerance:
+            return tr.data
+    if records is not None:
+        # the trace could not be rebuilt from its records alone
+        return _readLazyData(filename, sourcename, starttime, sampling_rate,
+                             npts, **kwargs)
+    msg = "No data found for %s starting at %s in file %s"
+    raise ValueError(msg % (sourcename, starttime, filename))
+
+
+def iterMSEED(mseed_object, chunksize=1, reclen=None, verbose=None):
+    """
+    Generator decoding a Mini-SEED file or stream record by record.
+
+    Consecutive records with the same network, station, location and channel
+    codes are decoded in chunks of up to ``chunksize`` records and yielded as
+    :class:`~obspy.core.trace.Trace` objects. Only a single chunk of records
+    is held in memory at any time, so arbitrarily long files as well as pipes
+    and sockets can be processed without reading them completely.
+
+    :param mseed_object: File name or open file-like object providing a
+        ``read()`` method, e.g. ``sys.stdin`` or ``socket.makefile()``.
+    :type chunksize: int, optional
+    :param chunksize: Maximal number of records decoded at once. Defaults to
+        ``1``.
+    :type reclen: int, optional
+    :param reclen: Record length in bytes. Only needed if the records do not
+        contain a Blockette 1000 within the first 256 bytes. The data of such
+        records is decoded as big-endian Steim-1, the libmseed fallback.
+    :type verbose: int, optional
+    :param verbose: Controls verbosity of libmseed.
+
+    .. note::
+        Gaps, overlaps and changes of the sampling rate inside a chunk result
+        in multiple traces per chunk. Traces of successive chunks are not
+        merged, use :meth:`~obspy.core.stream.Stream.merge` if needed.
+
+    .. rubric:: Example
+
+    >>> from obspy.core.util import getExampleFile
+    >>> filename = getExampleFile("test.mseed")
+    >>> for tr in iterMSEED(filename):  # doctest: +ELLIPSIS
+    ...     print(tr)
+    NL.HGN.00.BHZ | 2003-05-29T02:13:22.043400Z - ... | 40.0 Hz, 5980 samples
+    NL.HGN.00.BHZ | 2003-05-29T02:15:51.543400Z - ... | 40.0 Hz, 5967 samples
+    """
+    if reclen is not None and reclen not in VALID_RECORD_LENGTHS:
+        msg = 'Invalid record length. The record length must be a value\n' + \
+            'of 2 to the power of X where 8 <= X <= 20.'
+        raise ValueError(msg)
+    if isinstance(mseed_object, basestring):
+        fh = open(mseed_object, 'rb')
+    else:
+        fh = mseed_object
+    chunk = []
+    chunk_id = None
+    chunk_info = None
+    try:
+        while True:
+            # The minimal record length is 256 bytes which should contain the
+            # fixed header and the Blockette 1000.
+            record = _readBytes(fh, 256)
+            if not record:
+                break
+            if len(record) < 256:
+                msg = "Truncated Mini-SEED record found"
+                raise Exception(msg)
+            info = util._parseRecordIndex(np.frombuffer(record, dtype='b'),
+                                          count=1, reclen=reclen)[0]
+            record_length = info['record_length']
+            if record_length > 256:
+                record += _readBytes(fh, record_length - 256)
+            if len(record) < record_length:
+                msg = "Truncated Mini-SEED record found"
+                raise Exception(msg)
+            id = (info['network'], info['station'], info['location'],
+                  info['channel'])
+            if chunk and (id != chunk_id or len(chunk) >= chunksize):
+                for trace in _decodeRecords(chunk, chunk_info, reclen,
+                                            verbose):
+                    yield trace
+                chunk = []
+            if not chunk:
+                chunk_id = id
+                chunk_info = info
+            chunk.append(record)
+        if chunk:
+            for trace in _decodeRecords(chunk, chunk_info, reclen, verbose):
+                yield trace
+    finally:
+        if fh is not mseed_object:
+            fh.close()
+
+
+def _readBytes(file_object, size):
+    """
+    Reads up to ``size`` bytes from a file-like object. Short reads, e.g. of
+    pipes or sockets, are continued until ``size`` bytes or the end of the
+    stream is reached.
+    """
+    data = file_object.read(size)
+    while data and len(data) < size:
+        more = file_object.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def _decodeRecords(records, info, reclen=None, verbose=None):
+    """
+    Decodes a list of raw Mini-SEED records and returns the resulting traces.
+    """
+    st = readMSEED(StringIO(''.join(records)), reclen=reclen, recinfo=False,
+                   verbose=verbose)
+    for trace in st:
+        trace.stats.mseed.encoding = ENCODINGS[info['encoding']][0] \
+            if info['encoding'] in ENCODINGS else info['encoding']
+        trace.stats.mseed.record_length = int(info['record_length'])
+    return st.traces
+
+
 def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
-               flush=1, verbose=0, **_kwargs):
+               flush=1, verbose=0, workers=None, **_kwargs):
     """
     Write Mini-SEED file from a Stream object.
 
@@ -409,6 +642,11 @@ def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
     :type verbose: int, optional
     :param verbose: Controls verbosity, a value of zero will result in no
         diagnostic output.
+    :type workers: int, optional
+    :param workers: If given, the traces are compressed in parallel by a pool
+        of ``workers`` threads. The file content is identical to the serial
+        case as the packed records are written in the order of the traces.
+        Defaults to ``None``.
 
     .. note::
         The reclen, encoding and byteorder keyword arguments can be set
@@ -481,9 +719,9 @@ def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
         # header will suffice (see ms_genfactmult in libmseed/genutils.c)
         if trace.stats.sampling_rate >= 32727.0 or \
            trace.stats.sampling_rate <= (1.0 / 32727.0):
-            use_blkt_100 = True
+            trace_attr['use_blkt_100'] = True
         else:
-            use_blkt_100 = False
+            trace_attr['use_blkt_100'] = False
 
         # Set data quality to indeterminate (= D) if it is not already set.
         try:
@@ -638,86 +876,129 @@ def writeMSEED(stream, filename, encoding=None, reclen=None, byteorder=None,
     else:
         f = filename
 
-    # Loop over every trace and finally write it to the filehandler.
+    # Pack the records of every trace into a single string and write the
+    # records of consecutive traces to the filehandler in large blocks.
+    jobs = []
     for trace, data, trace_attr in izip(stream, trace_data, trace_attributes):
         if not len(data):
             msg = 'Skipping empty trace "%s".' % (trace)
             warnings.warn(msg)
             continue
-        # Create C struct MSTrace.
-        mst = MST(trace, data, dataquality=trace_attr['dataquality'])
-
-        # Initialize packedsamples pointer for the mst_pack function
-        packedsamples = C.c_int()
-
-        # Callback function for mst_pack to actually write the file
-        def record_handler(record, reclen, _stream):
-            f.write(record[0:reclen])
-        # Define Python callback function for use in C function
-        recHandler = C.CFUNCTYPE(C.c_void_p, C.POINTER(C.c_char), C.c_int,
-                                 C.c_void_p)(record_handler)
-
-        # Fill up msr record structure, this is already contained in
-        # mstg, however if blk1001 is set we need it anyway
-        msr = clibmseed.msr_init(None)
-        msr.contents.network = trace.stats.network
-        msr.contents.station = trace.stats.station
-        msr.contents.location = trace.stats.location
-        msr.contents.channel = trace.stats.channel
-        msr.contents.dataquality = trace_attr['dataquality']
-
-        # Only use Blockette 1001 if necessary.
-        if use_blkt_1001:
-            size = C.sizeof(blkt_1001_s)
-            blkt1001 = C.c_char(' ')
-            C.memset(C.pointer(blkt1001), 0, size)
-            ret_val = clibmseed.msr_addblockette(msr, C.pointer(blkt1001),
-                                                 size, 1001, 0)
-            # Usually returns a pointer to the added blockette in the
-            # blockette link chain and a NULL pointer if it fails.
-            # NULL pointers have a false boolean value according to the
-            # ctypes manual.
-            if bool(ret_val) is False:
-                clibmseed.msr_free(C.pointer(msr))
-                del msr
-                raise Exception('Error in msr_addblockette')
-        # Only use Blockette 100 if necessary.
-        if use_blkt_100:
-            size = C.sizeof(blkt_100_s)
-            blkt100 = C.c_char(' ')
-            C.memset(C.pointer(blkt100), 0, size)
-            ret_val = clibmseed.msr_addblockette(msr, C.pointer(blkt100),
-                                                 size, 100, 0)
-            # Usually returns a pointer to the added blockette in the
-            # blockette link chain and a NULL pointer if it fails.
-            # NULL pointers have a false boolean value according to the
-            # ctypes manual.
-            if bool(ret_val) is False:
-                clibmseed.msr_free(C.pointer(msr))
-                del msr
-                raise Exception('Error in msr_addblockette')
-
-        # Pack mstg into a MSEED file using the callback record_handler as
-        # write method.
-        errcode = clibmseed.mst_pack(
-            mst.mst, recHandler, None, trace_attr['reclen'],
-            trace_attr['encoding'], trace_attr['byteorder'],
-            C.byref(packedsamples), flush, verbose, msr)
+        jobs.append((trace, data, trace_attr, use_blkt_1001, flush, verbose))
+    if workers and len(jobs) > 1:
+        # libmseed releases the GIL while compressing, thus threads suffice.
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(int(workers), len(jobs)))
+        try:
+            # imap preserves the order of the traces
+            _writeBlocks(f, pool.imap(_packTrace, jobs))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        _writeBlocks(f, (_packTrace(job) for job in jobs))
+    # Close if its a file handler.
+    if isinstance(f, file):
+        f.close()
+
+
+def _writeBlocks(f, packed, blocksize=16 * 1024 * 1024):
+    """
+    Writes the packed records of consecutive traces with a single write call
+    per block of about ``blocksize`` bytes.
+    """
+    block = []
+    size = 0
+    for records in packed:
+        block.append(records)
+        size += len(records)
+        if size >= blocksize:
+            f.write(''.join(block))
+            block = []
+            size = 0
+    if block:
+        f.write(''.join(block))
+
+
+def _packTrace(job):
+    """
+    Packs a single trace into Mini-SEED records using libmseed.
 
+    :param job: Tuple of trace, data to write, trace attributes as determined
+        by :func:`writeMSEED`, use_blkt_1001, flush and verbose flags.
+    :return: All packed records of the trace as a single string.
+    """
+    trace, data, trace_attr, use_blkt_1001, flush, verbose = job
+    # Create C struct MSTrace.
+    mst = MST(trace, data, dataquality=trace_attr['dataquality'])
+
+    # Initialize packedsamples pointer for the mst_pack function
+    packedsamples = C.c_int()
+
+    # The records are collected in C by the collectRecord handler, no Python
+    # code is called per record.
+    buffer = RecordBuffer()
+
+    # Fill up msr record structure, this is already contained in
+    # mstg, however if blk1001 is set we need it anyway
+    msr = clibmseed.msr_init(None)
+    msr.contents.network = trace.stats.network
+    msr.contents.station = trace.stats.station
+    msr.contents.location = trace.stats.location
+    msr.contents.channel = trace.stats.channel
+    msr.contents.dataquality = trace_attr['dataquality']
+
+    # Only use Blockette 1001 if necessary.
+    if use_blkt_1001:
+        size = C.sizeof(blkt_1001_s)
+        blkt1001 = C.c_char(' ')
+        C.memset(C.pointer(blkt1001), 0, size)
+        ret_val = clibmseed.msr_addblockette(msr, C.pointer(blkt1001),
+                                             size, 1001, 0)
+        # Usually returns a pointer to the added blockette in the
+        # blockette link chain and a NULL pointer if it fails.
+        # NULL pointers have a false boolean value according to the
+        # ctypes manual.
+        if bool(ret_val) is False:
+            clibmseed.msr_free(C.pointer(msr))
+            del msr
+            raise Exception('Error in msr_addblockette')
+    # Only use Blockette 100 if necessary.
+    if trace_attr['use_blkt_100']:
+        size = C.sizeof(blkt_100_s)
+        blkt100 = C.c_char(' ')
+        C.memset(C.pointer(blkt100), 0, size)
+        ret_val = clibmseed.msr_addblockette(msr, C.pointer(blkt100),
+                                             size, 100, 0)
+        # Usually returns a pointer to the added blockette in the
+        # blockette link chain and a NULL pointer if it fails.
+        # NULL pointers have a false boolean value according to the
+        # ctypes manual.
+        if bool(ret_val) is False:
+            clibmseed.msr_free(C.pointer(msr))
+            del msr
+            raise Exception('Error in msr_addblockette')
+
+    # Pack mstg into the record buffer.
+    errcode = clibmseed.mst_pack(
+        mst.mst, collectRecord, C.byref(buffer), trace_attr['reclen'],
+        trace_attr['encoding'], trace_attr['byteorder'],
+        C.byref(packedsamples), flush, verbose, msr)
+    # Deallocate any allocated memory.
+    clibmseed.msr_free(C.pointer(msr))
+    del mst, msr
+    try:
         if errcode == 0:
             msg = ("Did not write any data for trace '%s' even though it "
                    "contains data values.") % trace
             raise ValueError(msg)
         if errcode == -1:
-            clibmseed.msr_free(C.pointer(msr))
-            del mst, msr
             raise Exception('Error in mst_pack')
-        # Deallocate any allocated memory.
-        clibmseed.msr_free(C.pointer(msr))
-        del mst, msr
-    # Close if its a file handler.
-    if isinstance(f, file):
-        f.close()
+        if buffer.failed:
+            raise MemoryError('Could not allocate memory for packed records')
+        return C.string_at(buffer.data, buffer.length)
+    finally:
+        clibmseed.freeRecordBuffer(C.byref(buffer))
 
 
 class MST(object):
@@ -661,6 +661,18 @@ LinkedIDList._fields_ = [
 ]
 
 
+class RecordBuffer(C.Structure):
+    """
+    Growable buffer collecting the records packed by mst_pack.
+    """
+    _fields_ = [
+        ('data', C.c_void_p),            # Packed records
+        ('length', C.c_longlong),        # Number of used bytes
+        ('capacity', C.c_longlong),      # Number of allocated bytes
+        ('failed', C.c_int),             # Set if growing failed
+    ]
+
+
 ########################################
 # Done with the C structures defintions.
 ########################################
@@ -694,6 +706,13 @@ clibmseed.lil_free.restype = C.c_void_p
 clibmseed.allocate_bytes.argtypes = (C.c_int, )
 clibmseed.allocate_bytes.restype = C.c_void_p
 
+# Record handler of mst_pack collecting the records in a RecordBuffer.
+RECORD_HANDLER = C.CFUNCTYPE(None, C.POINTER(C.c_char), C.c_int, C.c_void_p)
+collectRecord = RECORD_HANDLER(('collectRecord', clibmseed))
+
+clibmseed.freeRecordBuffer.argtypes = [C.POINTER(RecordBuffer)]
+clibmseed.freeRecordBuffer.restype = None
+
 
 # Python callback functions for C
 def __PyFile_callback(_f):
@@ -290,8 +290,9 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
         if (swapflag <= 0) {
             // Returns 0 if the host is little endian, otherwise 1.
             flag bigendianhost = ms_bigendianhost();
-            // Set the swapbyteflag if it is needed.
-            if ( msr->Blkt1000 != 0) {
+            // Set the swapbyteflag if it is needed. Records without a
+            // Blockette 1000 use the byteorder determined by libmseed.
+            if ( msr->byteorder >= 0 ) {
                 /* If BE host and LE data need swapping */
                 if ( bigendianhost && msr->byteorder == 0 ) {
                     swapflag = 1;
@@ -488,3 +489,55 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
     }
     return idListHead;
 }
+
+
+// Growable buffer collecting packed records.
+typedef struct RecordBuffer_s {
+    char *data;                             // Packed records
+    long long length;                       // Number of used bytes
+    long long capacity;                     // Number of allocated bytes
+    int failed;                             // Set if growing failed
+}
+RecordBuffer;
+
+
+// Record handler for mst_pack appending each packed record to the
+// RecordBuffer given as handler data. Packing thus needs no callback into
+// Python for every record.
+void
+collectRecord(char *record, int reclen, void *handlerdata)
+{
+    RecordBuffer *buffer = (RecordBuffer *) handlerdata;
+    long long capacity;
+    char *data;
+
+    if (buffer->failed) {
+        return;
+    }
+    if (buffer->length + reclen > buffer->capacity) {
+        capacity = buffer->capacity > 0 ? buffer->capacity : 16 * reclen;
+        while (capacity < buffer->length + reclen) {
+            capacity *= 2;
+        }
+        data = (char *) realloc(buffer->data, (size_t) capacity);
+        if (data == NULL) {
+            buffer->failed = 1;
+            return;
+        }
+        buffer->data = data;
+        buffer->capacity = capacity;
+    }
+    memcpy(buffer->data + buffer->length, record, reclen);
+    buffer->length += reclen;
+}
+
+
+// Frees the records of a RecordBuffer.
+void
+freeRecordBuffer(RecordBuffer *buffer)
+{
+    free(buffer->data);
+    buffer->data = NULL;
+    buffer->length = 0;
+    buffer->capacity = 0;
+}
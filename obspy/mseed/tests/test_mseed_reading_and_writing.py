@@ -3,7 +3,7 @@ from obspy import UTCDateTime, Stream, Trace, read
 from obspy.core import AttribDict
 from obspy.core.util import NamedTemporaryFile
 from obspy.mseed import util
-from obspy.mseed.core import readMSEED, writeMSEED, isMSEED
+from obspy.mseed.core import readMSEED, writeMSEED, isMSEED, iterMSEED
 from obspy.mseed.headers import clibmseed, ENCODINGS
 from obspy.mseed.msstruct import _MSStruct
 import copy
@@ -350,6 +350,149 @@ class MSEEDReadingAndWritingTestCase(unittest.TestCase):
         Tests reading from a MiniSEED file in an StringIO object.
         """
 
+    def test_readMemoryMappedFile(self):
+        """
+        Reading a file name uses a private memory map. The result must equal
+        reading the same file from a file-like object and the file on disk
+        must stay untouched even though libmseed swaps data in place.
+        """
+        for name in ['test.mseed', 'gaps.mseed', 'BW.BGLD.__.EHE.D.2008.001'
+                     '.first_10_records']:
+            testfile = os.path.join(self.path, 'data', name)
+            with open(testfile, 'rb') as fh:
+                content = fh.read()
+            st = readMSEED(testfile)
+            with open(testfile, 'rb') as fh:
+                st2 = readMSEED(fh)
+            self.assertEqual(st, st2)
+            with open(testfile, 'rb') as fh:
+                self.assertEqual(content, fh.read())
+        # empty files can not be memory mapped
+        with NamedTemporaryFile() as tf:
+            self.assertRaises(Exception, readMSEED, tf.name)
+
+    def test_readLazy(self):
+        """
+        Tests decoding the data of a Mini-SEED file on demand.
+        """
+        for name in ['gaps.mseed', 'two_channels.mseed', 'test.mseed']:
+            filename = os.path.join(self.path, 'data', name)
+            st = read(filename)
+            st2 = read(filename, lazy=True)
+            for tr in st2:
+                self.assertFalse('data' in tr.__dict__)
+            self.assertEqual(st, st2)
+        # full SEED files decode the whole file on demand
+        filename = os.path.join(self.path, 'data', 'fullseed.mseed')
+        st = read(filename)
+        st2 = read(filename, lazy=True)
+        self.assertEqual(st, st2)
+
+    def test_iterMSEED(self):
+        """
+        Tests decoding Mini-SEED record by record from files and streams.
+        """
+        class ShortReads(object):
+            """
+            File-like object returning at most 100 bytes per read() call,
+            like pipes and sockets might do.
+            """
+            def __init__(self, data):
+                self.data = data
+                self.pos = 0
+
+            def read(self, size):
+                size = min(size, 100)
+                data = self.data[self.pos:self.pos + size]
+                self.pos += len(data)
+                return data
+
+        for name in ['gaps.mseed', 'two_channels.mseed', 'test.mseed']:
+            filename = os.path.join(self.path, 'data', name)
+            st = readMSEED(filename)
+            with open(filename, 'rb') as fh:
+                data = fh.read()
+            for source in [filename, ShortReads(data)]:
+                for chunksize in [1, 3, 1000]:
+                    traces = list(iterMSEED(source, chunksize=chunksize))
+                    if isinstance(source, ShortReads):
+                        source.pos = 0
+                    # only join directly adjacent traces
+                    st2 = Stream(traces=traces)
+                    st2.merge(-1)
+                    self.assertEqual(len(st), len(st2))
+                    for tr, tr2 in zip(st, st2):
+                        self.assertEqual(tr.id, tr2.id)
+                        self.assertEqual(tr.stats.starttime,
+                                         tr2.stats.starttime)
+                        np.testing.assert_array_equal(tr.data, tr2.data)
+                        self.assertEqual(tr.stats.mseed.encoding,
+                                         tr2.stats.mseed.encoding)
+        # one trace per record
+        filename = os.path.join(self.path, 'data',
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        self.assertEqual(len(list(iterMSEED(filename))), 10)
+        self.assertEqual(len(list(iterMSEED(filename, chunksize=10))), 1)
+        # truncated records
+        with open(filename, 'rb') as fh:
+            data = fh.read(700)
+        self.assertRaises(Exception, list, iterMSEED(ShortReads(data)))
+
+    def test_iterMSEEDWithoutBlockette1000(self):
+        """
+        Records without a Blockette 1000 are decoded if the record length is
+        given.
+        """
+        filename = os.path.join(self.path, 'data',
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        with open(filename, 'rb') as fh:
+            data = fh.read()
+        # remove the Blockette 1000 (the only blockette) of every record
+        records = []
+        for i in xrange(0, len(data), 512):
+            record = data[i:i + 512]
+            records.append(record[:39] + '\x00' + record[40:46] +
+                           '\x00\x00' + record[48:])
+        with NamedTemporaryFile() as tf:
+            tf.write(''.join(records))
+            tf.flush()
+            self.assertRaises(ValueError, list, iterMSEED(tf.name))
+            traces = list(iterMSEED(tf.name, chunksize=10, reclen=512))
+        st = readMSEED(filename)
+        self.assertEqual(len(traces), 1)
+        self.assertEqual(traces[0].id, st[0].id)
+        self.assertEqual(traces[0].stats.starttime, st[0].stats.starttime)
+        np.testing.assert_array_equal(traces[0].data, st[0].data)
+
+    def test_writeWithWorkers(self):
+        """
+        Packing the traces in parallel must result in exactly the same file
+        as packing them one after another.
+        """
+        np.random.seed(815)
+        st = Stream()
+        for i in xrange(20):
+            data = np.random.randint(-1000, 1000, 5000 + i).astype('int32')
+            tr = Trace(data=data)
+            tr.stats.station = 'ST%02d' % i
+            tr.stats.sampling_rate = 100.0 if i % 2 else 1e5
+            st.append(tr)
+        st.append(Trace(data=np.random.randn(3000)))
+        with NamedTemporaryFile() as tf1:
+            with NamedTemporaryFile() as tf2:
+                writeMSEED(st, tf1.name, reclen=512)
+                writeMSEED(st, tf2.name, reclen=512, workers=4)
+                with open(tf1.name, 'rb') as fh:
+                    data1 = fh.read()
+                with open(tf2.name, 'rb') as fh:
+                    data2 = fh.read()
+                self.assertEqual(data1, data2)
+                st2 = readMSEED(tf2.name)
+        self.assertEqual(len(st2), len(st))
+        for tr, tr2 in zip(st, st2):
+            np.testing.assert_array_equal(tr.data, tr2.data)
+            self.assertEqual(tr.stats.sampling_rate, tr2.stats.sampling_rate)
+
     def test_writeIntegers(self):
         """
         Write integer array via L{obspy.mseed.mseed.writeMSEED}.
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from StringIO import StringIO
+from struct import pack, unpack
 from obspy import UTCDateTime
 from obspy.mseed import util
 from obspy.mseed.core import readMSEED
@@ -283,6 +284,147 @@ class MSEEDUtilTestCase(unittest.TestCase):
             st_before[0].stats.starttime -= 2.2222
             self.assertEqual(st_before, st_after)
 
+    def test_getRecordIndex(self):
+        """
+        Tests the record index and its sidecar file.
+        """
+        filename = os.path.join(self.path, 'data',
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        with open(filename, 'rb') as fh:
+            data = fh.read()
+        with NamedTemporaryFile() as tf:
+            index_file = tf.name + util.INDEX_SUFFIX
+            # first five records only
+            tf.write(data[:5 * 512])
+            tf.flush()
+            index = util.getRecordIndex(tf.name)
+            self.assertTrue(os.path.exists(index_file))
+            self.assertEqual(len(index), 5)
+            self.assertEqual(index['offset'].tolist(),
+                             range(0, 5 * 512, 512))
+            for i, record in enumerate(index):
+                info = util.getRecordInformation(filename, offset=i * 512)
+                self.assertEqual(record['npts'], info['npts'])
+                # index times are exact, UTCDateTime is a float timestamp
+                self.assertAlmostEqual(record['starttime'] / 1e6,
+                                       info['starttime'].timestamp, 5)
+                self.assertAlmostEqual(record['endtime'] / 1e6,
+                                       info['endtime'].timestamp, 5)
+                self.assertEqual(record['encoding'], info['encoding'])
+                self.assertEqual(record['channel'], 'EHE')
+            # sidecar file is used as long as the file does not change
+            self.assertEqual(util.getRecordIndex(tf.name).tolist(),
+                             index.tolist())
+            # growing file is indexed incrementally
+            tf.write(data[5 * 512:])
+            tf.flush()
+            index = util.getRecordIndex(tf.name)
+            self.assertEqual(len(index), 10)
+            self.assertEqual(
+                index.tolist(),
+                util.getRecordIndex(filename, sidecar=False).tolist())
+            # windowed reading using the index
+            t1 = UTCDateTime(2008, 1, 1, 0, 0, 5)
+            t2 = t1 + 3
+            st1 = readMSEED(tf.name, starttime=t1, endtime=t2)
+            st2 = readMSEED(tf.name, starttime=t1, endtime=t2,
+                            use_index=True)
+            self.assertEqual(st1, st2)
+            self.assertEqual(len(util._selectRecords(index, t1, t2)), 2)
+            self.assertEqual(len(util._selectRecords(
+                index, sourcename='BW.BGLD.*.EHZ')), 0)
+            self.assertEqual(len(readMSEED(tf.name, sourcename='*.EHZ',
+                                           use_index=True)), 0)
+            os.remove(index_file)
+
+    def test_getRecordIndexPartlyWrittenRecord(self):
+        """
+        A record only partly written when indexing is indexed once the file
+        has grown.
+        """
+        filename = os.path.join(self.path, 'data',
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        with open(filename, 'rb') as fh:
+            data = fh.read()
+        expected = util.getRecordIndex(filename, sidecar=False)
+        with NamedTemporaryFile() as tf:
+            index_file = tf.name + util.INDEX_SUFFIX
+            # three and a half records
+            tf.write(data[:3 * 512 + 256])
+            tf.flush()
+            index = util.getRecordIndex(tf.name)
+            self.assertEqual(index.tolist(), expected[:3].tolist())
+            # complete the fourth and add a fifth record
+            tf.write(data[3 * 512 + 256:5 * 512])
+            tf.flush()
+            index = util.getRecordIndex(tf.name)
+            self.assertEqual(index.tolist(), expected[:5].tolist())
+            # the remaining records are appended to the index as well
+            tf.write(data[5 * 512:])
+            tf.flush()
+            index = util.getRecordIndex(tf.name)
+            self.assertEqual(index.tolist(), expected.tolist())
+            os.remove(index_file)
+
+    def test_getRecordIndexFileRewritten(self):
+        """
+        A file rewritten in place with the same size is indexed again.
+        """
+        filename = os.path.join(self.path, 'data',
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        with open(filename, 'rb') as fh:
+            data = fh.read()
+        with NamedTemporaryFile() as tf:
+            index_file = tf.name + util.INDEX_SUFFIX
+            tf.write(data)
+            tf.flush()
+            os.utime(tf.name, (1000000000, 1000000000))
+            index = util.getRecordIndex(tf.name)
+            # same size, swapped halves and a new modification time
+            tf.seek(0)
+            tf.write(data[5 * 512:] + data[:5 * 512])
+            tf.flush()
+            os.utime(tf.name, (1000000010, 1000000010))
+            expected = util.getRecordIndex(tf.name, sidecar=False)
+            self.assertNotEqual(expected.tolist(), index.tolist())
+            for _i in range(2):
+                self.assertEqual(util.getRecordIndex(tf.name).tolist(),
+                                 expected.tolist())
+            t1 = UTCDateTime(2008, 1, 1, 0, 0, 5)
+            t2 = t1 + 3
+            self.assertEqual(
+                readMSEED(tf.name, starttime=t1, endtime=t2),
+                readMSEED(tf.name, starttime=t1, endtime=t2, use_index=True))
+            os.remove(index_file)
+
+    def test_parseRecordIndexCorrupt(self):
+        """
+        Corrupt blockette chains and records without Blockette 1000 raise.
+        """
+        filename = os.path.join(self.path, 'data',
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        with open(filename, 'rb') as fh:
+            data = fh.read()
+        year = unpack('>H', data[20:22])[0]
+        endian = '>' if 1900 <= year <= 2100 else '<'
+        blkt_offset = unpack(endian + 'H', data[46:48])[0]
+        pos = 512 + blkt_offset + 2
+        # next blockette of the second record pointing to itself
+        corrupt = data[:pos] + pack(endian + 'H', blkt_offset) + \
+            data[pos + 2:]
+        buffer = np.fromstring(corrupt, dtype='b')
+        self.assertRaises(ValueError, util._parseRecordIndex, buffer)
+        # first blockette of the second record inside the fixed header
+        corrupt = data[:558] + pack(endian + 'H', 20) + data[560:]
+        buffer = np.fromstring(corrupt, dtype='b')
+        self.assertRaises(ValueError, util._parseRecordIndex, buffer)
+        # second record without any blockette, its length is unknown
+        corrupt = data[:558] + pack(endian + 'H', 0) + data[560:]
+        buffer = np.fromstring(corrupt, dtype='b')
+        self.assertRaises(ValueError, util._parseRecordIndex, buffer)
+        index = util._parseRecordIndex(buffer, reclen=512)
+        self.assertEqual(index['offset'].tolist(), range(0, 10 * 512, 512))
+
 
 def suite():
     return unittest.makeSuite(MSEEDUtilTestCase, 'test')
@@ -3,15 +3,35 @@
 Mini-SEED specific utilities.
 """
 from headers import HPTMODULUS, clibmseed, FRAME, SAMPLESIZES, ENDIAN
+from datetime import date
+from fnmatch import fnmatch
 from obspy import UTCDateTime
 from obspy.core.util import scoreatpercentile
-from struct import unpack
+from obspy.core.util.base import INDEX_SUFFIX
+from struct import unpack, unpack_from
 import sys
 import ctypes as C
+import mmap
 import numpy as np
+import os
 import warnings
 
 
+# Structure of a record index as returned by getRecordIndex(). Times are
+# given in high precision time ticks (see HPTMODULUS) since 1970-01-01.
+RECORD_INDEX_DTYPE = np.dtype([
+    ('offset', 'i8'), ('record_length', 'i4'), ('network', 'S2'),
+    ('station', 'S5'), ('location', 'S2'), ('channel', 'S3'),
+    ('dataquality', 'S1'), ('starttime', 'i8'), ('endtime', 'i8'),
+    ('npts', 'i4'), ('sampling_rate', 'f8'), ('encoding', 'i2')])
+
+# Fixed section of the data header, starting at the sequence number.
+_FIXED_HEADER = '6sc1x5s2s3s2sHHBBBxHHhhBBBBlHH'
+
+# Length in bytes of the blockettes read by _parseRecordIndex.
+_BLOCKETTE_LENGTHS = {100: 12, 1000: 8, 1001: 8}
+
+
 def getStartAndEndTime(file_or_file_object):
     """
     Returns the start- and endtime of a Mini-SEED file or file-like object.
@@ -419,6 +439,236 @@ def _getRecordInformation(file_object, offset=0, endian=None):
     return info
 
 
+def _mapFile(filename):
+    """
+    Returns the content of a file as a NumPy array of bytes backed by a
+    memory map.
+
+    Only the pages actually accessed while parsing and unpacking the records
+    are loaded from disk. The map is private (copy-on-write) as libmseed swaps
+    some data words in place during unpacking; those changes never reach the
+    file. The map is closed once the returned array is garbage collected.
+    """
+    with open(filename, 'rb') as fh:
+        # Empty files can not be memory mapped.
+        if os.fstat(fh.fileno()).st_size == 0:
+            return np.empty(0, dtype='b')
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_COPY)
+    return np.frombuffer(mm, dtype='b')
+
+
+def getRecordIndex(filename, sidecar=True):
+    """
+    Returns an index of all data records of a Mini-SEED file.
+
+    The index is a NumPy structured array with one entry per record (see
+    :const:`RECORD_INDEX_DTYPE`) containing the byte offset, record length,
+    network, station, location and channel codes, data quality, start and end
+    time (of the last sample) in high precision time ticks, number of samples,
+    sampling rate and encoding of each record.
+
+    :type filename: str
+    :param filename: Name of the Mini-SEED file.
+    :type sidecar: bool, optional
+    :param sidecar: If ``True``, the index is stored in a sidecar file next to
+        the Mini-SEED file (file name + ``'.msidx'``) and reused as long as
+        size and modification time of the Mini-SEED file match. If the file
+        has grown, only the appended records are parsed. Failures to write the
+        sidecar file are silently ignored. Defaults to ``True``.
+
+    .. rubric:: Example
+
+    >>> from obspy.core.util import getExampleFile
+    >>> filename = getExampleFile("test.mseed")
+    >>> index = getRecordIndex(filename, sidecar=False)
+    >>> print(index['offset'])
+    [   0 4096]
+    >>> print(index['npts'])
+    [5980 5967]
+    >>> print(UTCDateTime(index['starttime'][1] / 1e6))
+    2003-05-29T02:15:51.543400Z
+    """
+    stat = os.stat(filename)
+    index_file = filename + INDEX_SUFFIX
+    index = None
+    filesize = 0
+    if sidecar:
+        try:
+            with open(index_file, 'rb') as fh:
+                npz = np.load(fh)
+                index = npz['records']
+                filesize = int(npz['filesize'])
+                mtime = float(npz['mtime'])
+        except Exception:
+            index = None
+        else:
+            if filesize == stat.st_size and mtime == stat.st_mtime:
+                return index
+    buffer = _mapFile(filename)
+    if index is not None and len(index) and 0 < filesize < stat.st_size:
+        # The file has grown. Only parse the appended records if the last
+        # indexed record is unchanged.
+        last = index[-1:]
+        try:
+            check = _parseRecordIndex(buffer, last['offset'][0], count=1)
+        except ValueError:
+            check = None
+        if check is not None and check.tolist() == last.tolist():
+            # Resume after the last indexed record, the file might have
+            # ended within a partly written record.
+            end = int(last['offset'][0]) + int(last['record_length'][0])
+            appended = _parseRecordIndex(buffer, end)
+            index = np.concatenate([index, appended])
+        else:
+            index = None
+    else:
+        # Same size but modified, or shrunk: the old index can not be trusted.
+        index = None
+    if index is None:
+        index = _parseRecordIndex(buffer)
+    if sidecar:
+        try:
+            with open(index_file, 'wb') as fh:
+                np.savez(fh, records=index, filesize=stat.st_size,
+                         mtime=stat.st_mtime)
+        except (IOError, OSError):
+            pass
+    return index
+
+
+def _parseRecordIndex(buffer, offset=0, count=None, reclen=None):
+    """
+    Parses the fixed header and blockettes of consecutive Mini-SEED data
+    records in a buffer and returns a record index.
+
+    :param buffer: NumPy array of bytes, e.g. from :func:`_mapFile`.
+    :param offset: Byte offset of the first record to parse.
+    :param count: Maximal number of records to parse. Defaults to all records
+        until the end of the buffer. A truncated record at the end of the
+        buffer is not indexed.
+    :param reclen: Record length in bytes used for records without a
+        Blockette 1000.
+    """
+    records = []
+    buflen = len(buffer)
+    endian = None
+    epoch = date(1970, 1, 1).toordinal()
+    year_offsets = {}
+    while offset + 48 <= buflen:
+        if count is not None and len(records) >= count:
+            break
+        if endian is None:
+            # Use the year to figure out the byteorder.
+            year = unpack_from('>H', buffer, offset + 20)[0]
+            endian = '>' if 1900 <= year <= 2100 else '<'
+        (_seq, quality, station, location, channel, network, year, julday,
+         hour, minute, second, fract, npts, factor, multiplier, activity,
+         _io, _dq, _nblkt, time_correction, _data_offset, blkt_offset) = \
+            unpack_from(endian + _FIXED_HEADER, buffer, offset)
+        if quality not in ('D', 'R', 'Q', 'M'):
+            msg = "Record at byte %d is not a Mini-SEED data record" % offset
+            raise ValueError(msg)
+        try:
+            days = year_offsets[year]
+        except KeyError:
+            days = date(year, 1, 1).toordinal() - epoch
+            year_offsets[year] = days
+        seconds = (days + julday - 1) * 86400 + hour * 3600 + minute * 60 + \
+            second
+        starttime = seconds * HPTMODULUS + fract * 100
+        # Time correction is in units of 0.0001 seconds.
+        if not activity & 2 and time_correction:
+            starttime += time_correction * 100
+        samp_rate = None
+        encoding = -1
+        record_length = reclen
+        truncated = False
+        while blkt_offset:
+            # Blockettes follow the fixed header in ascending order, anything
+            # else would loop forever on corrupt records.
+            if blkt_offset < 48:
+                msg = "Invalid blockette chain in record at byte %d" % offset
+                raise ValueError(msg)
+            pos = offset + blkt_offset
+            if pos + 4 > buflen:
+                truncated = True
+                break
+            blkt_type, next_offset = unpack_from(endian + 'HH', buffer, pos)
+            if next_offset and next_offset <= blkt_offset:
+                msg = "Invalid blockette chain in record at byte %d" % offset
+                raise ValueError(msg)
+            blkt_offset = next_offset
+            if pos + _BLOCKETTE_LENGTHS.get(blkt_type, 4) > buflen:
+                truncated = True
+                break
+            if blkt_type == 1000:
+                encoding, _word_order, exponent = \
+                    unpack_from(endian + 'BBB', buffer, pos + 4)
+                record_length = 2 ** exponent
+            elif blkt_type == 1001:
+                starttime += unpack_from(endian + 'b', buffer, pos + 5)[0]
+            elif blkt_type == 100:
+                samp_rate = unpack_from(endian + 'f', buffer, pos + 4)[0]
+        if truncated or (record_length is not None and
+                         offset + record_length > buflen):
+            # The last record is not completely written yet. It is indexed
+            # once the file has grown.
+            break
+        if record_length is None:
+            msg = "Record length of record at byte %d unknown" % offset
+            raise ValueError(msg)
+        if not samp_rate:
+            if factor > 0 and multiplier > 0:
+                samp_rate = float(factor * multiplier)
+            elif factor > 0 and multiplier < 0:
+                samp_rate = -1.0 * float(factor) / float(multiplier)
+            elif factor < 0 and multiplier > 0:
+                samp_rate = -1.0 * float(multiplier) / float(factor)
+            elif factor < 0 and multiplier < 0:
+                samp_rate = -1.0 / float(factor * multiplier)
+            else:
+                samp_rate = 0.0
+        if npts > 1 and samp_rate:
+            endtime = starttime + \
+                int(round((npts - 1) / samp_rate * HPTMODULUS))
+        else:
+            endtime = starttime
+        records.append((offset, record_length, network.strip(),
+                        station.strip(), location.strip(), channel.strip(),
+                        quality, starttime, endtime, npts, samp_rate,
+                        encoding))
+        offset += record_length
+    return np.array(records, dtype=RECORD_INDEX_DTYPE)
+
+
+def _selectRecords(index, starttime=None, endtime=None, sourcename=None):
+    """
+    Returns the part of a record index overlapping with the given time span
+    and matching the given sourcename.
+
+    :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+    :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+    :type sourcename: str
+    :param sourcename: ``'network.station.location.channel'``, may contain
+        wildcards.
+    """
+    mask = np.ones(len(index), dtype='bool')
+    if starttime is not None:
+        mask &= index['endtime'] >= _convertDatetimeToMSTime(starttime)
+    if endtime is not None:
+        mask &= index['starttime'] <= _convertDatetimeToMSTime(endtime)
+    if sourcename is not None:
+        ids = set(zip(index['network'], index['station'],
+                      index['location'], index['channel']))
+        for id in ids:
+            if not fnmatch('.'.join(id), sourcename):
+                mask &= (index['network'] != id[0]) | \
+                    (index['station'] != id[1]) | \
+                    (index['location'] != id[2]) | \
+                    (index['channel'] != id[3])
+    return index[mask]
+
+
 def _ctypesArray2NumpyArray(buffer, buffer_elements, sampletype):
     """
     Takes a Ctypes array and its length and type and returns it as a
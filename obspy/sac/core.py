@@ -10,11 +10,18 @@ SAC bindings to ObsPy core module.
 """
 
 from obspy import Trace, Stream
-from obspy.sac.sacio import SacIO, _isText
+from obspy.core.util import LazyData
+from obspy.core.util.base import _openFile
+from obspy.sac.sacio import SacIO, SacIOError, _isText
+import numpy as np
 import os
 import struct
 
 
+# size of the binary SAC header in bytes
+SAC_HEADER_SIZE = 632
+
+
 def isSAC(filename):
     """
     Checks whether a file is a SAC file or not.
@@ -29,32 +36,33 @@ def isSAC(filename):
     >>> isSAC('/path/to/test.sac')  #doctest: +SKIP
     """
     try:
-        with open(filename, 'rb') as f:
+        with _openFile(filename) as f:
+            start = f.tell()
             # read delta (first header float)
             delta_bin = f.read(4)
             delta = struct.unpack('<f', delta_bin)[0]
             # read nvhdr (70 header floats, 6 position in header integers)
-            f.seek(4 * 70 + 4 * 6)
+            f.seek(start + 4 * 70 + 4 * 6)
             nvhdr_bin = f.read(4)
             nvhdr = struct.unpack('<i', nvhdr_bin)[0]
             # read leven (70 header floats, 35 header integers, 0 position in
             # header bool)
-            f.seek(4 * 70 + 4 * 35)
+            f.seek(start + 4 * 70 + 4 * 35)
             leven_bin = f.read(4)
             leven = struct.unpack('<i', leven_bin)[0]
             # read lpspol (70 header floats, 35 header integers, 1 position in
             # header bool)
-            f.seek(4 * 70 + 4 * 35 + 4 * 1)
+            f.seek(start + 4 * 70 + 4 * 35 + 4 * 1)
             lpspol_bin = f.read(4)
             lpspol = struct.unpack('<i', lpspol_bin)[0]
             # read lovrok (70 header floats, 35 header integers, 2 position in
             # header bool)
-            f.seek(4 * 70 + 4 * 35 + 4 * 2)
+            f.seek(start + 4 * 70 + 4 * 35 + 4 * 2)
             lovrok_bin = f.read(4)
             lovrok = struct.unpack('<i', lovrok_bin)[0]
             # read lcalda (70 header floats, 35 header integers, 3 position in
             # header bool)
-            f.seek(4 * 70 + 4 * 35 + 4 * 3)
+            f.seek(start + 4 * 70 + 4 * 35 + 4 * 3)
             lcalda_bin = f.read(4)
             lcalda = struct.unpack('<i', lcalda_bin)[0]
             # check if file is big-endian
@@ -103,14 +111,14 @@ def isSACXY(filename):
     if not _isText(filename, blocksize=512):
         return False
     try:
-        f = open(filename)
-        hdcards = []
-        # read in the header cards
-        for _i in xrange(30):
-            hdcards.append(f.readline())
-        npts = int(hdcards[15].split()[-1])
-        # read in the seismogram
-        seis = f.read(-1).split()
+        with _openFile(filename, 'r') as f:
+            hdcards = []
+            # read in the header cards
+            for _i in xrange(30):
+                hdcards.append(f.readline())
+            npts = int(hdcards[15].split()[-1])
+            # read in the seismogram
+            seis = f.read(-1).split()
     except:
         return False
     # check that npts header value and seismogram length are consistent
@@ -194,7 +202,7 @@ def writeSACXY(stream, filename, **kwargs):  # @UnusedVariable
 
 
 def readSAC(filename, headonly=False, debug_headers=False, fsize=True,
-            **kwargs):  # @UnusedVariable
+            lazy=False, **kwargs):  # @UnusedVariable
     """
     Reads an SAC file and returns an ObsPy Stream object.
 
@@ -217,6 +225,10 @@ def readSAC(filename, headonly=False, debug_headers=False, fsize=True,
     :type fsize: bool, optional
     :param fsize: Check if file size is consistent with theoretical size
         from header. Defaults to ``True``.
+    :type lazy: bool, optional
+    :param lazy: If ``True`` only the header is read and the data samples are
+        read on first access of ``Trace.data``, see
+        :class:`~obspy.core.util.base.LazyData`. Defaults to ``False``.
     :rtype: :class:`~obspy.core.stream.Stream`
     :return: A ObsPy Stream object.
 
@@ -227,7 +239,9 @@ def readSAC(filename, headonly=False, debug_headers=False, fsize=True,
     """
     # read SAC file
     t = SacIO(debug_headers=debug_headers)
-    if headonly:
+    # data can only be loaded lazily from files given by name
+    lazy = lazy and isinstance(filename, basestring)
+    if headonly or lazy:
         t.ReadSacHeader(filename)
     else:
         t.ReadSacFile(filename, fsize)
@@ -236,11 +250,28 @@ def readSAC(filename, headonly=False, debug_headers=False, fsize=True,
 
     if headonly:
         tr = Trace(header=header)
+    elif lazy:
+        tr = Trace(header=header)
+        dtype = t.byteorder == 'big' and '>f4' or '<f4'
+        tr._setLazyData(LazyData(_readLazyData, filename, dtype,
+                                 tr.stats.npts))
     else:
         tr = Trace(header=header, data=t.seis)
     return Stream([tr])
 
 
+def _readLazyData(filename, dtype, npts):
+    """
+    Reads the data samples of a binary SAC file.
+    """
+    with open(filename, 'rb') as fh:
+        fh.seek(SAC_HEADER_SIZE)
+        data = np.fromfile(fh, dtype=dtype, count=npts)
+    if len(data) != npts:
+        raise SacIOError("Cannot read all data points")
+    return data
+
+
 def writeSAC(stream, filename, **kwargs):  # @UnusedVariable
     """
     Writes a SAC file.
@@ -9,6 +9,8 @@
 #-------------------------------------------------------------------
 from obspy import UTCDateTime, Trace
 from obspy.core.util import gps2DistAzimuth, loadtxt, AttribDict
+from obspy.core.util.base import _fromFile, _getFileSize, _openFile
+from contextlib import contextmanager
 import numpy as np
 import os
 import string
@@ -101,6 +103,20 @@ class SacIOError(Exception):
     pass
 
 
+@contextmanager
+def _openSacFile(fname, mode):
+    """
+    Opens a SAC file given by name or returns the given file-like object.
+    """
+    try:
+        with _openFile(fname, mode) as f:
+            yield f
+    except IOError:
+        if isinstance(fname, basestring) and not os.path.isfile(fname):
+            raise SacIOError("No such file: " + fname)
+        raise
+
+
 def _isText(filename, blocksize=512):
     """
     Check if it is a text or a binary file.
@@ -110,7 +126,8 @@ def _isText(filename, blocksize=512):
     # http://code.activestate.com/)
     text_characters = "".join(map(chr, range(32, 127)) + list("\n\r\t\b"))
     _null_trans = string.maketrans("", "")
-    s = open(filename).read(blocksize)
+    with _openFile(filename, 'r') as fh:
+        s = fh.read(blocksize)
     if "\0" in s:
         return False
 
@@ -492,8 +509,13 @@ class SacIO(object):
             raise SacError("Number of points in header and " +
                            "length of trace inconsistent!")
         if fsize:
-            st = os.stat(name)  # file's size = st[6]
-            sizecheck = st[6] - (632 + 4 * int(npts))
+            if isinstance(name, basestring):
+                st = os.stat(name)  # file's size = st[6]
+                size = st[6]
+            else:
+                # file-like object positioned right behind the header
+                size = _getFileSize(name) - name.tell() + 632
+            sizecheck = size - (632 + 4 * int(npts))
             # size check info
             if sizecheck != 0:
                 msg = "File-size and theoretical size are inconsistent: %s\n" \
@@ -520,44 +542,38 @@ class SacIO(object):
 
         >>> tr = SacIO('test.sac', headonly=True)  # doctest: +SKIP
         """
-        #### check if file exists
-        try:
-            #### open the file
-            f = open(fname, 'rb')
-        except IOError:
-            raise SacIOError("No such file: " + fname)
-        #--------------------------------------------------------------
-        # parse the header
-        #
-        # The sac header has 70 floats, 40 integers, then 192 bytes
-        #    in strings. Store them in array (an convert the char to a
-        #    list). That's a total of 632 bytes.
-        #--------------------------------------------------------------
-        self.hf = np.fromfile(f, dtype='<f4', count=70)
-        self.hi = np.fromfile(f, dtype='<i4', count=40)
-        # read in the char values
-        self.hs = np.fromfile(f, dtype='|S8', count=24)
-        if len(self.hf) != 70 or len(self.hi) != 40 or len(self.hs) != 24:
-            self.hf = self.hi = self.hs = None
-            f.close()
-            raise SacIOError("Cannot read all header values")
-        try:
-            self.IsSACfile(fname)
-        except SacError, e:
+        with _openSacFile(fname, 'rb') as f:
+            start = f.tell()
+            #--------------------------------------------------------------
+            # parse the header
+            #
+            # The sac header has 70 floats, 40 integers, then 192 bytes
+            #    in strings. Store them in array (an convert the char to a
+            #    list). That's a total of 632 bytes.
+            #--------------------------------------------------------------
+            self.hf = _fromFile(f, dtype='<f4', count=70)
+            self.hi = _fromFile(f, dtype='<i4', count=40)
+            # read in the char values
+            self.hs = _fromFile(f, dtype='|S8', count=24)
+            if len(self.hf) != 70 or len(self.hi) != 40 or len(self.hs) != 24:
+                self.hf = self.hi = self.hs = None
+                raise SacIOError("Cannot read all header values")
             try:
-                # if it is not a valid SAC-file try with big endian
-                # byte order
-                f.seek(0, 0)
-                self.hf = np.fromfile(f, dtype='>f4', count=70)
-                self.hi = np.fromfile(f, dtype='>i4', count=40)
-                # read in the char values
-                self.hs = np.fromfile(f, dtype='|S8', count=24)
                 self.IsSACfile(fname)
-                self.byteorder = 'big'
             except SacError, e:
-                self.hf = self.hi = self.hs = None
-                f.close()
-                raise SacError(e)
+                try:
+                    # if it is not a valid SAC-file try with big endian
+                    # byte order
+                    f.seek(start, 0)
+                    self.hf = _fromFile(f, dtype='>f4', count=70)
+                    self.hi = _fromFile(f, dtype='>i4', count=40)
+                    # read in the char values
+                    self.hs = _fromFile(f, dtype='|S8', count=24)
+                    self.IsSACfile(fname)
+                    self.byteorder = 'big'
+                except SacError, e:
+                    self.hf = self.hi = self.hs = None
+                    raise SacError(e)
         try:
             self._get_date()
         except SacError:
@@ -567,7 +583,6 @@ class SacIO(object):
                 self._get_dist()
             except SacError:
                 pass
-        f.close()
 
     def WriteSacHeader(self, fname):
         """
@@ -622,57 +637,51 @@ class SacIO(object):
 
         >>> tr = SacIO('test.sac')  # doctest: +SKIP
         """
-        try:
-            #### open the file
-            f = open(fname, 'rb')
-        except IOError:
-            raise SacIOError("No such file: " + fname)
-        #--------------------------------------------------------------
-        # parse the header
-        #
-        # The sac header has 70 floats, 40 integers, then 192 bytes
-        #    in strings. Store them in array (an convert the char to a
-        #    list). That's a total of 632 bytes.
-        #--------------------------------------------------------------
-        self.hf = np.fromfile(f, dtype='<f4', count=70)
-        self.hi = np.fromfile(f, dtype='<i4', count=40)
-        # read in the char values
-        self.hs = np.fromfile(f, dtype='|S8', count=24)
-        if len(self.hf) != 70 or len(self.hi) != 40 or len(self.hs) != 24:
-            self.hf = self.hi = self.hs = None
-            f.close()
-            raise SacIOError("Cannot read all header values")
-        ##### only continue if it is a SAC file
-        try:
-            self.IsSACfile(fname, fsize)
-        except SacError:
+        with _openSacFile(fname, 'rb') as f:
+            start = f.tell()
+            #--------------------------------------------------------------
+            # parse the header
+            #
+            # The sac header has 70 floats, 40 integers, then 192 bytes
+            #    in strings. Store them in array (an convert the char to a
+            #    list). That's a total of 632 bytes.
+            #--------------------------------------------------------------
+            self.hf = _fromFile(f, dtype='<f4', count=70)
+            self.hi = _fromFile(f, dtype='<i4', count=40)
+            # read in the char values
+            self.hs = _fromFile(f, dtype='|S8', count=24)
+            if len(self.hf) != 70 or len(self.hi) != 40 or len(self.hs) != 24:
+                self.hf = self.hi = self.hs = None
+                raise SacIOError("Cannot read all header values")
+            ##### only continue if it is a SAC file
             try:
-                # if it is not a valid SAC-file try with big endian
-                # byte order
-                f.seek(0, 0)
-                self.hf = np.fromfile(f, dtype='>f4', count=70)
-                self.hi = np.fromfile(f, dtype='>i4', count=40)
-                # read in the char values
-                self.hs = np.fromfile(f, dtype='|S8', count=24)
                 self.IsSACfile(fname, fsize)
-                self.byteorder = 'big'
-            except SacError, e:
-                f.close()
-                raise SacError(e)
-        #--------------------------------------------------------------
-        # read in the seismogram points
-        #--------------------------------------------------------------
-        # you just have to know it's in the 10th place
-        # actually, it's in the SAC manual
-        npts = self.hi[9]
-        if self.byteorder == 'big':
-            self.seis = np.fromfile(f, dtype='>f4', count=npts)
-        else:
-            self.seis = np.fromfile(f, dtype='<f4', count=npts)
-        if len(self.seis) != npts:
-            self.hf = self.hi = self.hs = self.seis = None
-            f.close()
-            raise SacIOError("Cannot read all data points")
+            except SacError:
+                try:
+                    # if it is not a valid SAC-file try with big endian
+                    # byte order
+                    f.seek(start, 0)
+                    self.hf = _fromFile(f, dtype='>f4', count=70)
+                    self.hi = _fromFile(f, dtype='>i4', count=40)
+                    # read in the char values
+                    self.hs = _fromFile(f, dtype='|S8', count=24)
+                    self.IsSACfile(fname, fsize)
+                    self.byteorder = 'big'
+                except SacError, e:
+                    raise SacError(e)
+            #--------------------------------------------------------------
+            # read in the seismogram points
+            #--------------------------------------------------------------
+            # you just have to know it's in the 10th place
+            # actually, it's in the SAC manual
+            npts = self.hi[9]
+            if self.byteorder == 'big':
+                self.seis = _fromFile(f, dtype='>f4', count=npts)
+            else:
+                self.seis = _fromFile(f, dtype='<f4', count=npts)
+            if len(self.seis) != npts:
+                self.hf = self.hi = self.hs = self.seis = None
+                raise SacIOError("Cannot read all data points")
         try:
             self._get_date()
         except SacError:
@@ -682,7 +691,6 @@ class SacIO(object):
                 self._get_dist()
             except SacError:
                 pass
-        f.close()
 
     def ReadSacXY(self, fname):
         """
@@ -703,38 +711,33 @@ class SacIO(object):
         Reading only the header portion of alphanumeric SAC-files is currently
         not supported.
         """
-        ###### open the file
-        try:
-            f = open(fname, 'r')
-        except IOError:
-            raise SacIOError("No such file: " + fname)
-        try:
-            #--------------------------------------------------------------
-            # parse the header
-            #
-            # The sac header has 70 floats, 40 integers, then 192 bytes
-            #    in strings. Store them in array (an convert the char to a
-            #    list). That's a total of 632 bytes.
-            #--------------------------------------------------------------
-            # read in the float values
-            self.hf = np.fromfile(f, dtype='<f4', count=70, sep=" ")
-            # read in the int values
-            self.hi = np.fromfile(f, dtype='<i4', count=40, sep=" ")
-            # reading in the string part is a bit more complicated
-            # because every string field has to be 8 characters long
-            # apart from the second field which is 16 characters long
-            # resulting in a total length of 192 characters
-            for i in xrange(0, 24, 3):
-                self.hs[i:i + 3] = np.fromfile(f, dtype='|S8', count=3)
-                f.readline()  # strip the newline
-            #--------------------------------------------------------------
-            # read in the seismogram points
-            #--------------------------------------------------------------
-            self.seis = loadtxt(f, dtype='<f4', ndlim=1).ravel()
-        except IOError, e:
-            self.hf = self.hs = self.hi = self.seis = None
-            f.close()
-            raise SacIOError("%s is not a valid SAC file:" % fname, e)
+        with _openSacFile(fname, 'r') as f:
+            try:
+                #--------------------------------------------------------------
+                # parse the header
+                #
+                # The sac header has 70 floats, 40 integers, then 192 bytes
+                #    in strings. Store them in array (an convert the char to a
+                #    list). That's a total of 632 bytes.
+                #--------------------------------------------------------------
+                # read in the float values
+                self.hf = _fromFile(f, dtype='<f4', count=70, sep=" ")
+                # read in the int values
+                self.hi = _fromFile(f, dtype='<i4', count=40, sep=" ")
+                # reading in the string part is a bit more complicated
+                # because every string field has to be 8 characters long
+                # apart from the second field which is 16 characters long
+                # resulting in a total length of 192 characters
+                for i in xrange(0, 24, 3):
+                    self.hs[i:i + 3] = _fromFile(f, dtype='|S8', count=3)
+                    f.readline()  # strip the newline
+                #--------------------------------------------------------------
+                # read in the seismogram points
+                #--------------------------------------------------------------
+                self.seis = loadtxt(f, dtype='<f4', ndlim=1).ravel()
+            except IOError, e:
+                self.hf = self.hs = self.hi = self.seis = None
+                raise SacIOError("%s is not a valid SAC file:" % fname, e)
         try:
             self._get_date()
         except SacError:
@@ -744,7 +747,6 @@ class SacIO(object):
                 self._get_dist()
             except SacError:
                 pass
-        f.close()
 
     def ReadSacXYHeader(self, fname):
         """
@@ -765,39 +767,33 @@ class SacIO(object):
         Reading only the header portion of alphanumeric SAC-files is currently
         not supported.
         """
-        ###### open the file
-        try:
-            f = open(fname, 'r')
-        except IOError:
-            raise SacIOError("No such file: " + fname)
-        try:
-            #--------------------------------------------------------------
-            # parse the header
-            #
-            # The sac header has 70 floats, 40 integers, then 192 bytes
-            #    in strings. Store them in array (an convert the char to a
-            #    list).
-            #--------------------------------------------------------------
-            # read in the float values
-            self.hf = np.fromfile(f, dtype='<f4', count=70, sep=" ")
-            # read in the int values
-            self.hi = np.fromfile(f, dtype='<i4', count=40, sep=" ")
-            # reading in the string part is a bit more complicated
-            # because every string field has to be 8 characters long
-            # apart from the second field which is 16 characters long
-            # resulting in a total length of 192 characters
-            for i in xrange(0, 24, 3):
-                self.hs[i:i + 3] = np.fromfile(f, dtype='|S8', count=3)
-                f.readline()  # strip the newline
-        except IOError, e:
-            self.hf = self.hs = self.hi = self.seis = None
-            f.close()
-            raise SacIOError("%s is not a valid SAC file:" % fname, e)
-        try:
-            self.IsSACfile(fname, fsize=False)
-        except SacError, e:
-            f.close()
-            raise SacError(e)
+        with _openSacFile(fname, 'r') as f:
+            try:
+                #--------------------------------------------------------------
+                # parse the header
+                #
+                # The sac header has 70 floats, 40 integers, then 192 bytes
+                #    in strings. Store them in array (an convert the char to a
+                #    list).
+                #--------------------------------------------------------------
+                # read in the float values
+                self.hf = _fromFile(f, dtype='<f4', count=70, sep=" ")
+                # read in the int values
+                self.hi = _fromFile(f, dtype='<i4', count=40, sep=" ")
+                # reading in the string part is a bit more complicated
+                # because every string field has to be 8 characters long
+                # apart from the second field which is 16 characters long
+                # resulting in a total length of 192 characters
+                for i in xrange(0, 24, 3):
+                    self.hs[i:i + 3] = _fromFile(f, dtype='|S8', count=3)
+                    f.readline()  # strip the newline
+            except IOError, e:
+                self.hf = self.hs = self.hi = self.seis = None
+                raise SacIOError("%s is not a valid SAC file:" % fname, e)
+            try:
+                self.IsSACfile(fname, fsize=False)
+            except SacError, e:
+                raise SacError(e)
         try:
             self._get_date()
         except SacError:
@@ -807,7 +803,6 @@ class SacIO(object):
                 self._get_dist()
             except SacError:
                 pass
-        f.close()
 
     def readTrace(self, trace):
         """
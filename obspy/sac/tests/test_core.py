@@ -107,6 +107,17 @@ class CoreTestCase(unittest.TestCase):
         np.testing.assert_array_almost_equal(self.testdata[0:10],
                                              tr.data[0:10])
 
+    def test_readLazy(self):
+        """
+        Tests reading the data of SAC files on demand.
+        """
+        for filename in [self.file, self.filebe]:
+            tr = read(filename)[0]
+            tr2 = read(filename, lazy=True)[0]
+            self.assertFalse('data' in tr2.__dict__)
+            self.assertEqual(tr2, tr)
+            self.assertEqual(tr2.data.dtype, tr.data.dtype)
+
     def test_readHeadViaObsPy(self):
         """
         Read files via L{obspy.Stream}
@@ -18,6 +18,7 @@ import warnings
 
 from obspy import Trace, Stream, UTCDateTime
 from obspy.core import AttribDict
+from obspy.core.util.base import _openFile
 from header import MONTHS
 
 
@@ -276,16 +277,8 @@ class SEG2(object):
 
 
 def isSEG2(filename):
-    if isinstance(filename, basestring):
-        is_filename = True
-        file_pointer = open(filename, 'rb')
-    else:
-        is_filename = False
-        file_pointer = filename
-
-    file_descriptor_block = file_pointer.read(4)
-    if is_filename is True:
-        file_pointer.close()
+    with _openFile(filename) as file_pointer:
+        file_descriptor_block = file_pointer.read(4)
     try:
         # Determine the endianness and check if the block id is valid.
         if (unpack('B', file_descriptor_block[0])[0] == 0x55) and \
@@ -10,6 +10,8 @@ SEG Y bindings to ObsPy core module.
 """
 from obspy import Stream, Trace, UTCDateTime
 from obspy.core import AttribDict
+from obspy.core.util import LazyData
+from obspy.core.util.base import _openFile
 from obspy.segy.segy import readSEGY as readSEGYrev1
 from obspy.segy.segy import readSU as readSUFile
 from obspy.segy.segy import SEGYError, SEGYFile, SEGYBinaryFileHeader
@@ -17,7 +19,7 @@ from obspy.segy.segy import SEGYTrace, autodetectEndianAndSanityCheckSU
 from obspy.segy.segy import SUFile, SEGYTraceHeader
 from obspy.segy.header import BINARY_FILE_HEADER_FORMAT, TRACE_HEADER_FORMAT
 from obspy.segy.header import DATA_SAMPLE_FORMAT_CODE_DTYPE, TRACE_HEADER_KEYS
-from obspy.segy.header import ENDIAN
+from obspy.segy.header import ENDIAN, DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS
 from obspy.segy.util import unpack_header_value
 
 import numpy as np
@@ -61,20 +63,20 @@ def isSEGY(filename):
     # greater than 0 and that the number of samples per trace is greater than
     # 0.
     try:
-        temp = open(filename, 'rb')
-        temp.seek(3212)
-        _number_of_data_traces = temp.read(2)
-        _number_of_auxiliary_traces = temp.read(2)
-        _sample_interval = temp.read(2)
-        temp.seek(2, 1)
-        _samples_per_trace = temp.read(2)
-        temp.seek(2, 1)
-        data_format_code = temp.read(2)
-        temp.seek(3500, 0)
-        _format_number = temp.read(2)
-        _fixed_length = temp.read(2)
-        _extended_number = temp.read(2)
-        temp.close()
+        with _openFile(filename) as temp:
+            start = temp.tell()
+            temp.seek(start + 3212)
+            _number_of_data_traces = temp.read(2)
+            _number_of_auxiliary_traces = temp.read(2)
+            _sample_interval = temp.read(2)
+            temp.seek(2, 1)
+            _samples_per_trace = temp.read(2)
+            temp.seek(2, 1)
+            data_format_code = temp.read(2)
+            temp.seek(start + 3500, 0)
+            _format_number = temp.read(2)
+            _fixed_length = temp.read(2)
+            _extended_number = temp.read(2)
     except:
         return False
     # Unpack using big endian first and check if it is valid.
@@ -114,7 +116,7 @@ def isSEGY(filename):
 
 def readSEGY(filename, headonly=False, byteorder=None,
              textual_header_encoding=None, unpack_trace_headers=False,
-             **kwargs):  # @UnusedVariable
+             lazy=False, **kwargs):  # @UnusedVariable
     """
     Reads a SEG Y file and returns an ObsPy Stream object.
 
@@ -142,6 +144,10 @@ def readSEGY(filename, headonly=False, byteorder=None,
         header values can still be accessed and will be calculated on the fly
         but tab completion will no longer work. Look in the headers.py for a
         list of all possible trace header values. Defaults to ``False``.
+    :type lazy: bool, optional
+    :param lazy: If ``True`` the waveform data of each trace is read on first
+        access of ``Trace.data``, see :class:`~obspy.core.util.base.LazyData`.
+        Defaults to ``False``.
     :returns: A ObsPy :class:`~obspy.core.stream.Stream` object.
 
     .. rubric:: Example
@@ -154,10 +160,13 @@ def readSEGY(filename, headonly=False, byteorder=None,
     1 Trace(s) in Stream:
     Seq. No. in line:    1 | 2009-06-22T14:47:37.000000Z - ... 2001 samples
     """
+    # Data can only be loaded lazily from files given by name.
+    lazy = lazy and isinstance(filename, basestring)
     # Read file to the internal segy representation.
     segy_object = readSEGYrev1(filename, endian=byteorder,
                                textual_header_encoding=textual_header_encoding,
-                               unpack_headers=unpack_trace_headers)
+                               unpack_headers=unpack_trace_headers,
+                               headonly=headonly or lazy)
     # Create the stream object.
     stream = Stream()
     # SEGY has several file headers that apply to all traces. They will be
@@ -191,6 +200,11 @@ def readSEGY(filename, headonly=False, byteorder=None,
         # skip data if headonly is set
         if headonly:
             trace.stats.npts = tr.npts
+        elif lazy:
+            trace.stats.npts = tr.npts
+            trace._setLazyData(LazyData(
+                _readLazyData, filename, tr.data_encoding,
+                tr.unpack_data.seek, tr.npts, tr.endian))
         else:
             trace.data = tr.data
         trace.stats.segy = AttribDict()
@@ -238,6 +252,16 @@ def readSEGY(filename, headonly=False, byteorder=None,
     return stream
 
 
+def _readLazyData(filename, data_encoding, offset, npts, endian):
+    """
+    Reads the data samples of a single SEG Y or SU trace.
+    """
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        return DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS[data_encoding](
+            f, npts, endian=endian)
+
+
 def writeSEGY(stream, filename, data_encoding=None, byteorder=None,
               textual_header_encoding=None, **kwargs):  # @UnusedVariable
     """
@@ -437,7 +461,7 @@ def isSU(filename):
         This test is rather shaky because there is no reliable identifier in a
         Seismic Unix file.
     """
-    with open(filename, 'rb') as f:
+    with _openFile(filename) as f:
         stat = autodetectEndianAndSanityCheckSU(f)
     if stat is False:
         return False
@@ -446,7 +470,8 @@ def isSU(filename):
 
 
 def readSU(filename, headonly=False, byteorder=None,
-           unpack_trace_headers=False, **kwargs):  # @UnusedVariable
+           unpack_trace_headers=False, lazy=False,
+           **kwargs):  # @UnusedVariable
     """
     Reads a Seismic Unix (SU) file and returns an ObsPy Stream object.
 
@@ -471,6 +496,10 @@ def readSU(filename, headonly=False, byteorder=None,
         header values can still be accessed and will be calculated on the fly
         but tab completion will no longer work. Look in the headers.py for a
         list of all possible trace header values. Defaults to ``False``.
+    :type lazy: bool, optional
+    :param lazy: If ``True`` the waveform data of each trace is read on first
+        access of ``Trace.data``, see :class:`~obspy.core.util.base.LazyData`.
+        Defaults to ``False``.
     :returns: A ObsPy :class:`~obspy.core.stream.Stream` object.
 
     .. rubric:: Example
@@ -483,9 +512,12 @@ def readSU(filename, headonly=False, byteorder=None,
     1 Trace(s) in Stream:
     ... | 2005-12-19T15:07:54.000000Z - ... | 4000.0 Hz, 8000 samples
     """
+    # Data can only be loaded lazily from files given by name.
+    lazy = lazy and isinstance(filename, basestring)
     # Read file to the internal segy representation.
     su_object = readSUFile(filename, endian=byteorder,
-                           unpack_headers=unpack_trace_headers)
+                           unpack_headers=unpack_trace_headers,
+                           headonly=headonly or lazy)
 
     # Create the stream object.
     stream = Stream()
@@ -501,6 +533,11 @@ def readSU(filename, headonly=False, byteorder=None,
         # skip data if headonly is set
         if headonly:
             trace.stats.npts = tr.npts
+        elif lazy:
+            trace.stats.npts = tr.npts
+            trace._setLazyData(LazyData(
+                _readLazyData, filename, tr.data_encoding,
+                tr.unpack_data.seek, tr.npts, tr.endian))
         else:
             trace.data = tr.data
         trace.stats.su = AttribDict()
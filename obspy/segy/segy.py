@@ -17,9 +17,8 @@ from obspy.segy.header import ENDIAN, DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS, \
 from obspy.segy.util import unpack_header_value
 from struct import pack, unpack
 from unpack import OnTheFlyDataUnpacker
-import StringIO
+from obspy.core.util.base import _getFileSize
 import numpy as np
-import os
 
 
 class SEGYError(Exception):
@@ -305,10 +304,7 @@ class SEGYFile(object):
         """
         self.traces = []
         # Determine the filesize once.
-        if isinstance(self.file, StringIO.StringIO):
-            filesize = self.file.len
-        else:
-            filesize = os.fstat(self.file.fileno())[6]
+        filesize = _getFileSize(self.file)
         # Big loop to read all data traces.
         while True:
             # Read and as soon as the trace header is too small abort.
@@ -452,7 +448,7 @@ class SEGYTrace(object):
             memory usage and the performance. They can be unpacked on-the-fly
             after being read. Defaults to False.
         :param filesize: Integer. Filesize of the file. If not given it will be
-            determined using fstat which is slow.
+            determined by seeking to the end of the file.
         :param headonly: Bool. Determines whether or not the actual data
             records will be read and unpacked. Has a huge impact on memory
             usage. Data can be read and unpacked on-the-fly after reading the
@@ -469,10 +465,7 @@ class SEGYTrace(object):
         if filesize:
             self.filesize = filesize
         else:
-            if isinstance(self.file, StringIO.StringIO):
-                self.filesize = self.file.len
-            else:
-                self.filesize = os.fstat(self.file.fileno())[6]
+            self.filesize = _getFileSize(self.file)
         # Otherwise read the file.
         self._readTrace(unpack_headers=unpack_headers, headonly=headonly)
 
@@ -516,10 +509,13 @@ class SEGYTrace(object):
         if headonly:
             # skip reading the data, but still advance the file
             self.file.seek(data_needed, 1)
-            # build a function for reading data from the disk on the fly
-            self.unpack_data = OnTheFlyDataUnpacker(
-                DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS[self.data_encoding],
-                self.file.name, self.file.mode, pos, npts, endian=self.endian)
+            # build a function for reading data from the disk on the fly,
+            # in-memory buffers have no file on disk to read from later
+            if hasattr(self.file, 'name'):
+                self.unpack_data = OnTheFlyDataUnpacker(
+                    DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS[self.data_encoding],
+                    self.file.name, self.file.mode, pos, npts,
+                    endian=self.endian)
         else:
             # Unpack the data.
             self.data = DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS[
@@ -961,10 +957,7 @@ def autodetectEndianAndSanityCheckSU(file):
     the Trace header.
     """
     pos = file.tell()
-    if isinstance(file, StringIO.StringIO):
-        size = file.len
-    else:
-        size = os.fstat(file.fileno())[6]
+    size = _getFileSize(file) - pos
     if size < 244:
         return False
     # Also has to be a multiple of 4 in length because every header is 400 long
@@ -972,11 +965,11 @@ def autodetectEndianAndSanityCheckSU(file):
     elif (size % 4) != 0:
         return False
     # Jump to the number of samples field in the trace header.
-    file.seek(114, 0)
+    file.seek(pos + 114, 0)
     sample_count = file.read(2)
     interval = file.read(2)
     # Jump to the beginning of the year fields.
-    file.seek(156, 0)
+    file.seek(pos + 156, 0)
     year = file.read(2)
     jul_day = file.read(2)
     hour = file.read(2)
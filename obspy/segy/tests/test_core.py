@@ -31,6 +31,21 @@ class SEGYCoreTestCase(unittest.TestCase):
         self.files = FILES
         self.dtypes = DTYPES
 
+    def test_readLazy(self):
+        """
+        Tests reading the data of SEG Y and SU files on demand.
+        """
+        for name, format in [('00001034.sgy_first_trace', 'SEGY'),
+                             ('seismic01_gemini_vz.su', 'SU')]:
+            filename = os.path.join(self.path, name)
+            st = read(filename, format=format)
+            st2 = read(filename, format=format, lazy=True)
+            self.assertEqual(len(st), len(st2))
+            for tr, tr2 in zip(st, st2):
+                self.assertFalse('data' in tr2.__dict__)
+                self.assertEqual(tr.stats.npts, tr2.stats.npts)
+                np.testing.assert_array_equal(tr.data, tr2.data)
+
     def test_isSEGYFile(self):
         """
         Tests the isSEGY method.
@@ -11,6 +11,7 @@ SEISAN bindings to ObsPy core module.
 
 from obspy import Stream, Trace, UTCDateTime
 from obspy.core import Stats
+from obspy.core.util.base import _fromFile, _openFile
 import numpy as np
 
 
@@ -29,12 +30,11 @@ def isSEISAN(filename):
     True
     """
     try:
-        f = open(filename, 'rb')
+        with _openFile(filename) as f:
+            # read some data - contains at least 12 lines a 80 characters
+            data = f.read(12 * 80)
     except:
         return False
-    # read some data - contains at least 12 lines a 80 characters
-    data = f.read(12 * 80)
-    f.close()
     if _getVersion(data):
         return True
     return False
@@ -140,59 +140,62 @@ def readSEISAN(filename, headonly=False, **kwargs):  # @UnusedVariable
         start = 4
         return data[start:end]
     # read data chunk from given file
-    fh = open(filename, 'rb')
-    data = fh.read(80 * 12)
-    # get version info from file
-    (byteorder, arch, _version) = _getVersion(data)
-    # fetch lines
-    fh.seek(0)
-    # start with event file header
-    # line 1
-    data = _readline(fh)
-    number_of_channels = int(data[30:33])
-    # calculate number of lines with channels
-    number_of_lines = number_of_channels // 3 + (number_of_channels % 3 and 1)
-    if number_of_lines < 10:
-        number_of_lines = 10
-    # line 2
-    data = _readline(fh)
-    # line 3
-    for _i in xrange(0, number_of_lines):
+    with _openFile(filename) as fh:
+        pos = fh.tell()
+        data = fh.read(80 * 12)
+        # get version info from file
+        (byteorder, arch, _version) = _getVersion(data)
+        # fetch lines
+        fh.seek(pos)
+        # start with event file header
+        # line 1
         data = _readline(fh)
-    # now parse each event file channel header + data
-    stream = Stream()
-    dlen = arch / 8
-    dtype = byteorder + 'i' + str(dlen)
-    stype = '=i' + str(dlen)
-    for _i in xrange(number_of_channels):
-        # get channel header
-        temp = _readline(fh, 1040)
-        # create Stats
-        header = Stats()
-        header['network'] = (temp[16] + temp[19]).strip()
-        header['station'] = temp[0:5].strip()
-        header['location'] = (temp[7] + temp[12]).strip()
-        header['channel'] = (temp[5:7] + temp[8]).strip()
-        header['sampling_rate'] = float(temp[36:43])
-        header['npts'] = int(temp[43:50])
-        # create start and end times
-        year = int(temp[9:12]) + 1900
-        month = int(temp[17:19])
-        day = int(temp[20:22])
-        hour = int(temp[23:25])
-        mins = int(temp[26:28])
-        secs = float(temp[29:35])
-        header['starttime'] = UTCDateTime(year, month, day, hour, mins) + secs
-        if headonly:
-            # skip data
-            fh.seek(dlen * (header['npts'] + 2), 1)
-            stream.append(Trace(header=header))
-        else:
-            # fetch data
-            data = np.fromfile(fh, dtype=dtype, count=header['npts'] + 2)
-            # convert to system byte order
-            data = np.require(data, stype)
-            stream.append(Trace(data=data[2:], header=header))
+        number_of_channels = int(data[30:33])
+        # calculate number of lines with channels
+        number_of_lines = number_of_channels // 3 + \
+            (number_of_channels % 3 and 1)
+        if number_of_lines < 10:
+            number_of_lines = 10
+        # line 2
+        data = _readline(fh)
+        # line 3
+        for _i in xrange(0, number_of_lines):
+            data = _readline(fh)
+        # now parse each event file channel header + data
+        stream = Stream()
+        dlen = arch / 8
+        dtype = byteorder + 'i' + str(dlen)
+        stype = '=i' + str(dlen)
+        for _i in xrange(number_of_channels):
+            # get channel header
+            temp = _readline(fh, 1040)
+            # create Stats
+            header = Stats()
+            header['network'] = (temp[16] + temp[19]).strip()
+            header['station'] = temp[0:5].strip()
+            header['location'] = (temp[7] + temp[12]).strip()
+            header['channel'] = (temp[5:7] + temp[8]).strip()
+            header['sampling_rate'] = float(temp[36:43])
+            header['npts'] = int(temp[43:50])
+            # create start and end times
+            year = int(temp[9:12]) + 1900
+            month = int(temp[17:19])
+            day = int(temp[20:22])
+            hour = int(temp[23:25])
+            mins = int(temp[26:28])
+            secs = float(temp[29:35])
+            header['starttime'] = \
+                UTCDateTime(year, month, day, hour, mins) + secs
+            if headonly:
+                # skip data
+                fh.seek(dlen * (header['npts'] + 2), 1)
+                stream.append(Trace(header=header))
+            else:
+                # fetch data
+                data = _fromFile(fh, dtype, header['npts'] + 2)
+                # convert to system byte order
+                data = np.require(data, stype)
+                stream.append(Trace(data=data[2:], header=header))
     return stream
 
 
@@ -13,6 +13,7 @@ from StringIO import StringIO
 from obspy import Stream, Trace, UTCDateTime
 from obspy.core import Stats
 from obspy.core.util import loadtxt
+from obspy.core.util.base import _openFile
 import numpy as np
 import os
 
@@ -77,7 +78,8 @@ def isASC(filename):
     """
     # first six chars should contain 'DELTA:'
     try:
-        temp = open(filename, 'rb').read(6)
+        with _openFile(filename) as fh:
+            temp = fh.read(6)
     except:
         return False
     if temp != 'DELTA:':
@@ -122,12 +124,13 @@ def readASC(filename, headonly=False, skip=0, delta=None, length=None,
     .TEST..BHE | 2009-10-01T12:46:01.000000Z - ... | 20.0 Hz, 801 samples
     .WET..HHZ  | 2010-01-01T01:01:05.999000Z - ... | 100.0 Hz, 4001 samples
     """
-    fh = open(filename, 'rt')
+    with _openFile(filename, 'rt') as fh:
+        lines = fh.readlines()
     # read file and split text into channels
     channels = []
     headers = {}
     data = StringIO()
-    for line in fh.readlines()[skip:]:
+    for line in lines[skip:]:
         if line.isspace():
             # blank line
             # check if any data fetched yet
@@ -153,7 +156,6 @@ def readASC(filename, headonly=False, skip=0, delta=None, length=None,
         elif not headonly:
             # data entry - may be written in multiple columns
             data.write(line.strip() + ' ')
-    fh.close()
     # create ObsPy stream object
     stream = Stream()
     # custom header
@@ -302,7 +304,8 @@ def isQ(filename):
     """
     # file must start with magic number 43981
     try:
-        temp = open(filename, 'rb').read(5)
+        with _openFile(filename) as fh:
+            temp = fh.read(5)
     except:
         return False
     if temp != '43981':
@@ -361,6 +364,10 @@ def readQ(filename, headonly=False, data_directory=None, byteorder='=',
     .WET..HHZ  | 2010-01-01T01:01:05.999000Z - ... | 100.0 Hz, 4001 samples
     """
     if not headonly:
+        if not isinstance(filename, basestring):
+            msg = "Can't find corresponding QBN file of a Q header file " + \
+                "not given by name."
+            raise TypeError(msg)
         if not data_directory:
             data_file = os.path.splitext(filename)[0] + '.QBN'
         else:
@@ -371,24 +378,24 @@ def readQ(filename, headonly=False, data_directory=None, byteorder='=',
             raise IOError(msg % data_file)
         fh_data = open(data_file, 'rb')
     # loop through read header file
-    fh = open(filename, 'rt')
-    line = fh.readline()
-    cmtlines = int(line[5:7]) - 1
-    # comment lines
-    comments = []
-    for _i in xrange(0, cmtlines):
-        comments += [fh.readline()]
-    # trace lines
-    traces = {}
-    i = -1
-    id = ''
-    for line in fh:
-        cid = int(line[0:2])
-        if cid != id:
-            id = cid
-            i += 1
-        traces.setdefault(i, '')
-        traces[i] += line[3:].strip()
+    with _openFile(filename, 'rt') as fh:
+        line = fh.readline()
+        cmtlines = int(line[5:7]) - 1
+        # comment lines
+        comments = []
+        for _i in xrange(0, cmtlines):
+            comments += [fh.readline()]
+        # trace lines
+        traces = {}
+        i = -1
+        id = ''
+        for line in fh:
+            cid = int(line[0:2])
+            if cid != id:
+                id = cid
+                i += 1
+            traces.setdefault(i, '')
+            traces[i] += line[3:].strip()
     # create stream object
     stream = Stream()
     for id in sorted(traces.keys()):
@@ -396,8 +403,10 @@ def readQ(filename, headonly=False, data_directory=None, byteorder='=',
         header = {}
         header['sh'] = {
             "FROMQ": True,
-            "FILE": os.path.splitext(os.path.split(filename)[1])[0],
         }
+        if isinstance(filename, basestring):
+            header['sh']['FILE'] = \
+                os.path.splitext(os.path.split(filename)[1])[0]
         channel = ['', '', '']
         npts = 0
         for item in traces[id].split('~'):
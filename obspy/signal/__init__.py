@@ -184,13 +184,14 @@ and the same page in the `Tutorial`_. For automated use see the following
 """
 
 from filter import bandpass, bandstop, lowpass, highpass, remezFIR, \
-    lowpassFIR, envelope, integerDecimation
+    lowpassFIR, envelope, integerDecimation, ContinuousFilter
 from rotate import rotate_NE_RT, rotate_RT_NE, rotate_ZNE_LQT, rotate_LQT_ZNE
 from invsim import cosTaper, cornFreq2Paz, pazToFreqResp, seisSim, specInv, \
     estimateMagnitude
 from cpxtrace import normEnvelope, centroid, instFreq, instBwith
 from util import utlGeoKm, utlLonLat
-from cross_correlation import xcorr, xcorr_3C, xcorrPickCorrection
+from cross_correlation import xcorr, xcorr_3C, xcorrPickCorrection, \
+    xcorrOneToMany, xcorrAllPairs, correlateTemplate, matchedFilter
 from freqattributes import cfrequency, bwith, domperiod, logcep
 from hoctavbands import sonogram
 from polarization import eigval
@@ -198,7 +199,7 @@ from spectral_estimation import psd, PPSD
 from konnoohmachismoothing import konnoOhmachiSmoothing
 from trigger import recSTALTA, recSTALTAPy, carlSTATrig, classicSTALTA, \
     delayedSTALTA, zDetect, triggerOnset, pkBaer, arPick, \
-    coincidenceTrigger, classicSTALTAPy
+    coincidenceTrigger, classicSTALTAPy, ContinuousTrigger
 
 
 if __name__ == '__main__':
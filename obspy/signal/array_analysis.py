@@ -19,6 +19,7 @@ Functions for Array Analysis
 
 import math
 import warnings
+from itertools import izip
 import numpy as np
 from obspy.signal.util import utlGeoKm, nextpow2
 from obspy.signal.headers import clibsignal
@@ -27,6 +28,25 @@ from obspy.core.util.decorator import deprecated
 from scipy.integrate import cumtrapz
 from obspy.signal.invsim import cosTaper
 
+# NumPy < 1.14 can't compute pseudo-inverses of stacked matrices at once
+try:
+    np.linalg.pinv(np.zeros((1, 1, 1)))
+    _STACKED_PINV = True
+except (np.linalg.LinAlgError, ValueError):
+    _STACKED_PINV = False
+
+
+def _pinv(a, rcond):
+    """
+    Pseudo-inverses of a stack of matrices in the last two axes of ``a``.
+    """
+    if _STACKED_PINV:
+        return np.linalg.pinv(a, rcond=rcond)
+    out = np.empty_like(a)
+    for index in np.ndindex(*a.shape[:-2]):
+        out[index] = np.linalg.pinv(a[index], rcond=rcond)
+    return out
+
 
 def array_rotation_strain(subarray, ts1, ts2, ts3, vp, vs, array_coords,
                           sigmau):
@@ -856,7 +876,8 @@ def dump(pow_map, apow_map, i):
 def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
                      sl_s, semb_thres, vel_thres, frqlow, frqhigh, stime,
                      etime, prewhiten, verbose=False, coordsys='lonlat',
-                     timestamp='mlabday', method=0, store=None):
+                     timestamp='mlabday', method=0, store=None,
+                     workers=None, block_size=None):
     """
     Method for Seismic-Array-Beamforming/FK-Analysis/Capon
 
@@ -908,12 +929,17 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
         second arguments and the iteration number as third argument. Useful for
         storing or plotting the map for each iteration. For this purpose the
         dump function of this module can be used.
+    :type workers: int
+    :param workers: Number of threads processing blocks of sliding windows
+        concurrently.
+    :type block_size: int
+    :param block_size: Number of sliding windows processed at once. Defaults
+        to as many windows as fit into about 64 MB of intermediate arrays.
     :return: numpy.ndarray of timestamp, relative relpow, absolute relpow,
         backazimut, slowness
     """
     BF, CAPON = 0, 1
     res = []
-    eotr = True
 
     # check that sampling rates do not vary
     fs = stream[0].stats.sampling_rate
@@ -957,71 +983,105 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
     steer = np.empty((nf, grdpts_x, grdpts_y, nstat), dtype='c16')
     clibsignal.calcSteer(nstat, grdpts_x, grdpts_y, nf, nlow,
                          deltaf, time_shift_table, steer)
-    R = np.empty((nf, nstat, nstat), dtype='c16')
-    ft = np.empty((nstat, nf), dtype='c16')
-    newstart = stime
     tap = cosTaper(nsamp, p=0.22)  # 0.22 matches 0.2 of historical C bbfk.c
+    # offsets and start times of all sliding windows
+    offsets = []
+    starttimes = []
     offset = 0
-    relpow_map = np.empty((grdpts_x, grdpts_y), dtype='f8')
-    abspow_map = np.empty((grdpts_x, grdpts_y), dtype='f8')
-    while eotr:
-        try:
-            for i, tr in enumerate(stream):
-                dat = tr.data[spoint[i] + offset:
-                              spoint[i] + offset + nsamp]
-                dat = (dat - dat.mean()) * tap
-                ft[i, :] = np.fft.rfft(dat, nfft)[nlow:nlow + nf]
-        except IndexError:
+    newstart = stime
+    while True:
+        if any(spoint[i] + offset + nsamp > len(tr.data)
+               for i, tr in enumerate(stream)):
             break
-        ft = np.require(ft, 'c16', ['C_CONTIGUOUS'])
-        relpow_map.fill(0.)
-        abspow_map.fill(0.)
-        # computing the covariances of the signal at different receivers
-        dpow = 0.
-        for i in xrange(nstat):
-            for j in xrange(i, nstat):
-                R[:, i, j] = ft[i, :] * ft[j, :].conj()
-                if method == CAPON:
-                    R[:, i, j] /= np.abs(R[:, i, j].sum())
-                if i != j:
-                    R[:, j, i] = R[:, i, j].conjugate()
-                else:
-                    dpow += np.abs(R[:, i, j].sum())
-        dpow *= nstat
-        if method == CAPON:
-            # P(f) = 1/(e.H R(f)^-1 e)
-            for n in xrange(nf):
-                R[n, :, :] = np.linalg.pinv(R[n, :, :], rcond=1e-6)
-
-        errcode = clibsignal.generalizedBeamformer(
-            relpow_map, abspow_map, steer, R, nsamp, nstat, prewhiten,
-            grdpts_x, grdpts_y, nfft, nf, dpow, method)
-        if errcode != 0:
-            msg = 'generalizedBeamforming exited with error %d'
-            raise Exception(msg % errcode)
-        ix, iy = np.unravel_index(relpow_map.argmax(), relpow_map.shape)
-        relpow, abspow = relpow_map[ix, iy], abspow_map[ix, iy]
-        if store is not None:
-            store(relpow_map, abspow_map, offset)
-        # here we compute baz, slow
-        slow_x = sll_x + ix * sl_s
-        slow_y = sll_y + iy * sl_s
-
-        slow = np.sqrt(slow_x ** 2 + slow_y ** 2)
-        if slow < 1e-8:
-            slow = 1e-8
-        azimut = 180 * math.atan2(slow_x, slow_y) / math.pi
-        baz = azimut - np.sign(azimut) * 180
-        if relpow > semb_thres and 1. / slow > vel_thres:
-            res.append(np.array([newstart.timestamp, relpow, abspow, baz,
-                                 slow]))
-            if verbose:
-                print(newstart, (newstart + (nsamp / fs)), res[-1][1:])
+        offsets.append(offset)
+        starttimes.append(newstart)
         if (newstart + (nsamp + nstep) / fs) > etime:
-            eotr = False
+            break
         offset += nstep
-
         newstart += nstep / fs
+    offsets = np.array(offsets, dtype='int64')
+
+    def _beamform(block):
+        """
+        Power maps of a block of windows.
+        """
+        # FFT of all windows of all stations in one call
+        index = block[:, np.newaxis] + np.arange(nsamp)
+        data = np.empty((len(block), nstat, nsamp))
+        for i, tr in enumerate(stream):
+            data[:, i, :] = tr.data[spoint[i] + index]
+        data -= data.mean(axis=2)[:, :, np.newaxis]
+        data *= tap
+        ft = np.fft.rfft(data, nfft, axis=2)[:, :, nlow:nlow + nf]
+        ft = ft.transpose(0, 2, 1)
+        # covariances of the signal at different receivers as outer
+        # products for all windows and frequencies
+        R = ft[:, :, :, np.newaxis] * ft[:, :, np.newaxis, :].conj()
+        if method == CAPON:
+            R /= np.abs(R.sum(axis=1))[:, np.newaxis, :, :]
+        dpow = nstat * np.abs(np.diagonal(R.sum(axis=1), axis1=1,
+                                          axis2=2)).sum(axis=1)
+        if method == CAPON:
+            # P(f) = 1/(e.H R(f)^-1 e)
+            R = _pinv(R, rcond=1e-6)
+        maps = []
+        for k in xrange(len(block)):
+            relpow_map = np.zeros((grdpts_x, grdpts_y), dtype='f8')
+            abspow_map = np.zeros((grdpts_x, grdpts_y), dtype='f8')
+            errcode = clibsignal.generalizedBeamformer(
+                relpow_map, abspow_map, steer,
+                np.require(R[k], 'c16', ['C_CONTIGUOUS']), nsamp, nstat,
+                prewhiten, grdpts_x, grdpts_y, nfft, nf, dpow[k], method)
+            if errcode != 0:
+                msg = 'generalizedBeamforming exited with error %d'
+                raise Exception(msg % errcode)
+            maps.append((relpow_map, abspow_map))
+        return maps
+
+    # windows are processed in blocks limiting the memory used for the
+    # data, spectra, covariance matrices (twice for capon) and power maps
+    if block_size is None:
+        window_bytes = 8 * nstat * nsamp + 16 * nstat * (nfft // 2 + 1) + \
+            32 * nf * nstat ** 2 + 16 * grdpts_x * grdpts_y
+        block_size = max(1, 2 ** 26 // window_bytes)
+    blocks = [offsets[i:i + block_size]
+              for i in xrange(0, len(offsets), block_size)]
+    if workers and workers > 1 and len(blocks) > 1:
+        # the beamformer and the linear algebra routines release the GIL,
+        # thus threads suffice
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(int(workers), len(blocks)))
+        results = pool.imap(_beamform, blocks)
+    else:
+        pool = None
+        results = (_beamform(block) for block in blocks)
+    try:
+        maps = (m for result in results for m in result)
+        for offset, newstart, (relpow_map, abspow_map) in \
+                izip(offsets, starttimes, maps):
+            ix, iy = np.unravel_index(relpow_map.argmax(),
+                                      relpow_map.shape)
+            relpow, abspow = relpow_map[ix, iy], abspow_map[ix, iy]
+            if store is not None:
+                store(relpow_map, abspow_map, offset)
+            # here we compute baz, slow
+            slow_x = sll_x + ix * sl_s
+            slow_y = sll_y + iy * sl_s
+
+            slow = np.sqrt(slow_x ** 2 + slow_y ** 2)
+            if slow < 1e-8:
+                slow = 1e-8
+            azimut = 180 * math.atan2(slow_x, slow_y) / math.pi
+            baz = azimut - np.sign(azimut) * 180
+            if relpow > semb_thres and 1. / slow > vel_thres:
+                res.append(np.array([newstart.timestamp, relpow, abspow,
+                                     baz, slow]))
+                if verbose:
+                    print(newstart, (newstart + (nsamp / fs)), res[-1][1:])
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
     res = np.array(res)
     if timestamp == 'julsec':
         pass
@@ -16,12 +16,14 @@ Signal processing routines based on cross correlation techniques.
     (http://www.gnu.org/copyleft/lesser.html)
 """
 
+import bisect
 import warnings
 import numpy as np
 import ctypes as C
 import scipy
 from obspy import Trace, Stream
 from obspy.signal.headers import clibsignal
+from obspy.signal.util import nextpow2
 from obspy.signal import cosTaper
 
 
@@ -210,6 +212,176 @@ def xcorr_max(fct, abs_max=True):
     return float(shift), float(value)
 
 
+def _stackData(traces):
+    """
+    Returns the data of traces, arrays or rows of a 2-D array as list of
+    float64 arrays.
+    """
+    if isinstance(traces, np.ndarray) and traces.ndim == 2:
+        return list(traces.astype('float64'))
+    return [np.require(tr.data if isinstance(tr, Trace) else tr, 'float64')
+            for tr in traces]
+
+
+def _spectra(data, nfft, demean=True):
+    """
+    Computes the spectra of a list of arrays in one call.
+
+    :return: Real FFT of the zero padded (and demeaned) data of length
+        ``nfft`` as rows of a 2-D array and the L2 norms of the data.
+    """
+    block = np.zeros((len(data), nfft))
+    for i, x in enumerate(data):
+        block[i, :len(x)] = x
+        if demean and len(x):
+            block[i, :len(x)] -= x.mean()
+    norms = np.sqrt((block ** 2).sum(axis=1))
+    return np.fft.rfft(block, axis=1), norms
+
+
+def _correlateSpectra(spec1, norm1, spec2, norm2, nfft, max_lag, out):
+    """
+    Normalized cross correlations of spectra, written to out.
+
+    spec1 and spec2 are either single spectra or rows of spectra of the
+    same number. Only the lags up to max_lag are kept.
+    """
+    lags = np.arange(-max_lag, max_lag + 1) % nfft
+    out[:] = np.fft.irfft(spec1 * spec2.conj(), nfft, axis=-1)[..., lags]
+    norm = np.atleast_1d(norm1 * norm2)
+    nonzero = norm > 0
+    out[nonzero] /= norm[nonzero][:, np.newaxis]
+    out[~nonzero] = 0.
+
+
+def _nfft(data, max_lag):
+    """
+    FFT length avoiding wrap around for all lags up to max_lag.
+    """
+    npts = max([len(x) for x in data] or [1])
+    return nextpow2(npts + max_lag)
+
+
+def xcorrOneToMany(tr, traces, max_lag, demean=True, block_size=None):
+    """
+    Normalized cross correlation of one trace with many traces in the
+    frequency domain.
+
+    Computes the same cross correlation function as
+    :func:`~obspy.signal.cross_correlation.xcorr` with ``full_xcorr=True``
+    (but without the restriction of ``shift_len`` to a quarter of the trace
+    length and in double precision) for a whole batch of traces. The
+    spectrum of ``tr`` is computed once and reused for all traces, the
+    spectra of all traces are computed in one call. Sample ``max_lag`` of
+    every row corresponds to zero shift, a positive shift means that ``tr``
+    is delayed against the other trace.
+
+    :type tr: :class:`~obspy.core.trace.Trace` or :class:`~numpy.ndarray`
+    :param tr: Trace correlated with all others.
+    :type traces: :class:`~obspy.core.stream.Stream`, list or 2-D
+        :class:`~numpy.ndarray`
+    :param traces: Traces or data arrays (e.g. rows of a 2-D array) to
+        correlate with ``tr``. Lengths may differ.
+    :type max_lag: int
+    :param max_lag: Maximum shift in samples.
+    :type demean: bool, optional
+    :param demean: Remove the mean of all traces before correlation.
+    :type block_size: int, optional
+    :param block_size: Number of correlations transformed back in one call,
+        bounds the memory needed for intermediate results. Defaults to
+        all at once.
+    :rtype: :class:`~numpy.ndarray`
+    :return: Cross correlation functions, one row of length
+        ``2 * max_lag + 1`` per trace.
+
+    .. note::
+        The cost per correlation is dominated by one inverse FFT instead of
+        ``2 * max_lag + 1`` dot products. Correlating all 4950 pairs of 100
+        traces with 10000 samples for ``max_lag=200`` with
+        :func:`~obspy.signal.cross_correlation.xcorrAllPairs` takes about a
+        tenth of the time of calling
+        :func:`~obspy.signal.cross_correlation.xcorr` for every pair.
+
+    .. rubric:: Example
+
+    >>> np.random.seed(123)
+    >>> data = np.random.randn(3, 1000)
+    >>> data[1, 7:] = data[0, :-7]
+    >>> cc = xcorrOneToMany(data[0], data, 20)
+    >>> cc.shape
+    (3, 41)
+    >>> shift, value = xcorr_max(cc[1])
+    >>> shift, round(value, 2)
+    (-7.0, 0.99)
+    """
+    data = _stackData([tr]) + _stackData(traces)
+    nfft = _nfft(data, max_lag)
+    spec, norms = _spectra(data, nfft, demean)
+    n = len(data) - 1
+    out = np.empty((n, 2 * max_lag + 1))
+    block_size = block_size or max(n, 1)
+    for i in xrange(0, n, block_size):
+        j = min(i + block_size, n)
+        _correlateSpectra(spec[0], norms[0], spec[i + 1:j + 1],
+                          norms[i + 1:j + 1], nfft, max_lag, out[i:j])
+    return out
+
+
+def xcorrAllPairs(traces, max_lag, demean=True, block_size=None):
+    """
+    Normalized cross correlation of all pairs of traces in the frequency
+    domain.
+
+    Like :func:`~obspy.signal.cross_correlation.xcorrOneToMany`, but for
+    every pair ``(i, j)`` with ``i < j``. The spectrum of every trace is
+    computed only once and reused for all pairs it appears in.
+
+    :type traces: :class:`~obspy.core.stream.Stream`, list or 2-D
+        :class:`~numpy.ndarray`
+    :param traces: Traces or data arrays to correlate.
+    :type max_lag: int
+    :param max_lag: Maximum shift in samples.
+    :type demean: bool, optional
+    :param demean: Remove the mean of all traces before correlation.
+    :type block_size: int, optional
+    :param block_size: Number of correlations transformed back in one call,
+        bounds the memory needed for intermediate results. Defaults to all
+        pairs of one trace with the following traces at once.
+    :return: **pairs, cc** - Indices ``(i, j)`` of the correlated traces as
+        2-D integer array and the cross correlation functions of
+        ``traces[i]`` and ``traces[j]`` as rows of a 2-D array of length
+        ``2 * max_lag + 1`` (see
+        :func:`~obspy.signal.cross_correlation.xcorrOneToMany`).
+
+    .. rubric:: Example
+
+    >>> np.random.seed(123)
+    >>> data = np.random.randn(4, 1000)
+    >>> pairs, cc = xcorrAllPairs(data, 20)
+    >>> pairs.tolist()
+    [[0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]]
+    >>> cc.shape
+    (6, 41)
+    """
+    data = _stackData(traces)
+    nfft = _nfft(data, max_lag)
+    spec, norms = _spectra(data, nfft, demean)
+    n = len(data)
+    pairs = np.array(np.triu_indices(n, 1), dtype='int').T.reshape(-1, 2)
+    out = np.empty((len(pairs), 2 * max_lag + 1))
+    block_size = block_size or max(n - 1, 1)
+    start = 0
+    for i in xrange(n - 1):
+        # pairs of trace i with the following traces, block by block
+        for j in xrange(i + 1, n, block_size):
+            k = min(j + block_size, n)
+            end = start + k - j
+            _correlateSpectra(spec[i], norms[i], spec[j:k], norms[j:k],
+                              nfft, max_lag, out[start:end])
+            start = end
+    return pairs, out
+
+
 def xcorrPickCorrection(pick1, trace1, pick2, trace2, t_before, t_after,
                         cc_maxlag, filter=None, filter_options={}, plot=False,
                         filename=None):
@@ -527,6 +699,280 @@ def templatesMaxSimilarity(st, time, streams_templates):
         return 0
 
 
+def _windowNorms(data, npts):
+    """
+    L2 norms of the demeaned windows of length npts of data, computed with
+    running sums.
+    """
+    csum = np.zeros(len(data) + 1)
+    np.cumsum(data, out=csum[1:])
+    sums = csum[npts:] - csum[:-npts]
+    np.cumsum(data ** 2, out=csum[1:])
+    var = csum[npts:] - csum[:-npts] - sums ** 2 / npts
+    # below the round-off error of the running sums the window is constant
+    var[var < 1e3 * np.finfo('float64').eps * csum[-1]] = 0.
+    return np.sqrt(var)
+
+
+def _normalizeTemplate(template):
+    """
+    Returns the demeaned template scaled to unit L2 norm.
+    """
+    template = np.require(template, 'float64')
+    template = template - template.mean()
+    norm = np.sqrt((template ** 2).sum())
+    if norm == 0:
+        raise ValueError("Template has zero variance.")
+    return template / norm
+
+
+def _slidingCorrelation(spec, norms, template, nfft, start, npts):
+    """
+    Normalized cross correlation of a normalized template with the windows
+    of data starting at samples start to start + npts - 1, given the
+    spectrum of the data and the window norms.
+    """
+    cc = np.fft.irfft(spec * np.fft.rfft(template, nfft).conj(), nfft)
+    cc = cc[start:start + npts]
+    norms = norms[start:start + npts]
+    # windows without variance (e.g. zero padded gaps) do not correlate
+    valid = norms > 0
+    cc[valid] /= norms[valid]
+    cc[~valid] = 0.
+    return cc
+
+
+def correlateTemplate(data, template):
+    """
+    Normalized cross correlation of a template with all windows of data.
+
+    The correlation is computed in the frequency domain, the normalization
+    by the standard deviation of each data window uses running sums instead
+    of recomputing it for every lag. Sample ``i`` of the result is the
+    correlation coefficient of the template with ``data[i:i + len(template)]``
+    (like :func:`numpy.correlate` in ``'valid'`` mode of the normalized
+    data).
+
+    :type data: :class:`~numpy.ndarray`
+    :param data: Continuous data.
+    :type template: :class:`~numpy.ndarray`
+    :param template: Template, not longer than the data.
+    :rtype: :class:`~numpy.ndarray`
+    :return: Correlation coefficients of length
+        ``len(data) - len(template) + 1``.
+
+    .. rubric:: Example
+
+    >>> np.random.seed(123)
+    >>> data = np.random.randn(1000)
+    >>> cc = correlateTemplate(data, 5 * data[300:400] + 1)
+    >>> int(cc.argmax()), round(cc.max(), 6)
+    (300, 1.0)
+    """
+    data = np.require(data, 'float64')
+    if not 0 < len(template) <= len(data):
+        msg = "Template must not be empty and not be longer than the data."
+        raise ValueError(msg)
+    template = _normalizeTemplate(template)
+    npts = len(data) - len(template) + 1
+    data = data - data.mean()
+    nfft = nextpow2(len(data))
+    spec = np.fft.rfft(data, nfft)
+    norms = _windowNorms(data, len(template))
+    return _slidingCorrelation(spec, norms, template, nfft, 0, npts)
+
+
+def _matchedFilterChunk(job):
+    """
+    Runs all templates over one chunk of continuous data for
+    :func:`~obspy.signal.cross_correlation.matchedFilter`.
+
+    :return: List of ``(template index, sample, value, threshold)`` tuples
+        of the maxima of all runs of the channel stacks above the threshold.
+    """
+    datas, start, end, npos, templates, threshold = job
+    block = np.array([data[start:end] for data in datas], dtype='float64')
+    block -= block.mean(axis=1)[:, np.newaxis]
+    nfft = nextpow2(block.shape[1])
+    # spectra of all channels in one call, reused for all templates
+    specs = np.fft.rfft(block, nfft, axis=1)
+    norms = {}
+    detections = []
+    for index, (channels, span) in enumerate(templates):
+        npos_t = min(npos, block.shape[1] - span + 1)
+        if npos_t <= 0:
+            continue
+        stack = np.zeros(npos_t)
+        for ch, offset, template in channels:
+            key = (ch, len(template))
+            if key not in norms:
+                norms[key] = _windowNorms(block[ch], len(template))
+            stack += _slidingCorrelation(specs[ch], norms[key], template,
+                                         nfft, offset, npos_t)
+        stack /= len(channels)
+        thr = threshold * np.median(np.abs(stack - np.median(stack)))
+        above = np.concatenate(([0], stack > thr, [0])).astype('int8')
+        edges = np.nonzero(np.diff(above))[0]
+        for on, off in zip(edges[::2], edges[1::2]):
+            peak = on + stack[on:off].argmax()
+            detections.append((index, start + peak, stack[peak], thr))
+    return detections
+
+
+def matchedFilter(stream, templates, threshold=8.0, trig_int=None,
+                  chunk_length=3600, workers=None):
+    """
+    Matched filter (template matching) detection on continuous data.
+
+    Every template is correlated with the continuous data of all its
+    channels (see :func:`~obspy.signal.cross_correlation.correlateTemplate`),
+    the correlation functions are aligned by the time offsets of the
+    template traces and averaged over the channels. Detections are the
+    maxima of this network correlation where it exceeds ``threshold`` times
+    its median absolute deviation (MAD).
+
+    The data is processed in chunks of ``chunk_length`` seconds which
+    overlap by the longest template. The spectrum of every channel of a
+    chunk is computed once and reused for all templates. Chunks can be
+    processed concurrently by a pool of ``workers`` threads (the FFTs and
+    array operations of NumPy do most of the work).
+
+    :type stream: :class:`~obspy.core.stream.Stream`
+    :param stream: Continuous data with one trace per channel. All traces
+        must have the same start time, number of samples and sampling rate
+        (e.g. trim with ``pad=True`` and ``fill_value=0``, zero padded parts
+        do not correlate).
+    :type templates: list of :class:`~obspy.core.stream.Stream`
+    :param templates: Templates with traces of the same ids and sampling
+        rate as the continuous data. The traces of a template may start at
+        different times (e.g. P waves on vertical and S waves on horizontal
+        components), their relative offsets are kept. Template traces whose
+        id is not in the stream are skipped.
+    :type threshold: float, optional
+    :param threshold: Detection threshold in multiples of the MAD of the
+        network correlation of the template within a chunk.
+    :type trig_int: float, optional
+    :param trig_int: Minimum time (in seconds) between two detections of the
+        same template, only the larger one is kept. Defaults to the length
+        of the template.
+    :type chunk_length: float, optional
+    :param chunk_length: Length of the processed chunks in seconds. It
+        should be much longer than the templates for a robust estimate of
+        the MAD.
+    :type workers: int, optional
+    :param workers: Number of threads processing chunks concurrently.
+    :rtype: list
+    :returns: List of detections sorted chronologically. Each detection is a
+        dictionary with the start time of the template at the detection
+        (``'time'``), the index of the template (``'template'``), the mean
+        correlation coefficient over the channels (``'correlation'``), the
+        threshold of the chunk (``'threshold'``) and the used trace ids
+        (``'trace_ids'``).
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read()
+    >>> t = st[0].stats.starttime
+    >>> template = st.slice(t + 4, t + 6).copy()
+    >>> detections = matchedFilter(st, [template], chunk_length=10)
+    >>> detections[0]['time'] == t + 4
+    True
+    >>> round(detections[0]['correlation'], 6)
+    1.0
+    """
+    if not len(stream):
+        return []
+    ids = [tr.id for tr in stream]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Stream must contain one trace per channel.")
+    starttime = stream[0].stats.starttime
+    npts = stream[0].stats.npts
+    df = stream[0].stats.sampling_rate
+    for tr in stream:
+        if tr.stats.starttime != starttime or tr.stats.npts != npts or \
+                tr.stats.sampling_rate != df:
+            msg = "All traces must have the same start time, number of " + \
+                "samples and sampling rate."
+            raise ValueError(msg)
+        if isinstance(tr.data, np.ma.masked_array):
+            raise NotImplementedError("Trace with masked values found.")
+    # normalized template traces with their channel and sample offset
+    templates_ = []
+    for st_tmpl in templates:
+        if len(set(tr.stats.sampling_rate for tr in st_tmpl) - set([df])):
+            msg = "Sampling rate of template differs from the data."
+            raise ValueError(msg)
+        tmpl_start = min(tr.stats.starttime for tr in st_tmpl)
+        channels = []
+        for tr in st_tmpl:
+            if tr.id not in ids:
+                msg = "Skipping trace %s in template (not present in " + \
+                    "stream)."
+                warnings.warn(msg % tr.id)
+                continue
+            offset = int(round((tr.stats.starttime - tmpl_start) * df))
+            channels.append((ids.index(tr.id), offset,
+                             _normalizeTemplate(tr.data)))
+        span = max([offset + len(template)
+                    for _, offset, template in channels] or [0])
+        templates_.append((channels, span))
+    used = [tmpl for tmpl in templates_ if tmpl[0]]
+    if not used:
+        return []
+    max_span = max(span for _, span in used)
+    min_span = min(span for _, span in used)
+    step = max(int(chunk_length * df), 1)
+    total = max(npts - min_span + 1, 1)
+    starts = range(0, total, step)
+    # the MAD of a short last chunk is unreliable, it is appended to the
+    # previous chunk
+    if len(starts) > 1 and total - starts[-1] < step // 2:
+        starts.pop()
+    bounds = starts + [total]
+    datas = [tr.data for tr in stream]
+    jobs = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        end = min(stop + max_span - 1, npts)
+        jobs.append((datas, start, end, stop - start, templates_, threshold))
+    detections = []
+    if workers and workers > 1 and len(jobs) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(int(workers), len(jobs)))
+        try:
+            for result in pool.imap(_matchedFilterChunk, jobs):
+                detections.extend(result)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for job in jobs:
+            detections.extend(_matchedFilterChunk(job))
+    # keep the largest detection within trig_int of each template, this
+    # also merges detections split at chunk borders
+    detections.sort(key=lambda det: -det[2])
+    accepted = {}
+    result = []
+    for index, sample, value, thr in detections:
+        channels, span = templates_[index]
+        if trig_int is None:
+            min_dist = span
+        else:
+            min_dist = trig_int * df
+        samples = accepted.setdefault(index, [])
+        i = bisect.bisect(samples, sample)
+        if (i > 0 and sample - samples[i - 1] < min_dist) or \
+                (i < len(samples) and samples[i] - sample < min_dist):
+            continue
+        samples.insert(i, sample)
+        result.append({'time': starttime + sample / df,
+                       'template': index,
+                       'correlation': float(value),
+                       'threshold': float(thr),
+                       'trace_ids': [ids[ch] for ch, _, _ in channels]})
+    result.sort(key=lambda det: (det['time'], det['template']))
+    return result
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
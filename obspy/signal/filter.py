@@ -17,11 +17,161 @@ Various Seismogram Filtering Functions
     (http://www.gnu.org/copyleft/lesser.html)
 """
 
+from collections import OrderedDict
+from fractions import Fraction
+from obspy.core.util.decorator import raiseIfMasked
+import numpy as np
 import warnings
 from numpy import array, where, fft
 from scipy.fftpack import hilbert
 from scipy.signal import iirfilter, lfilter, remez, convolve, get_window, \
-    cheby2, cheb2ord
+    cheby2, cheb2ord, firwin
+import threading
+try:
+    from scipy.signal import sosfilt, zpk2sos
+except ImportError:
+    # SciPy < 0.16, the local implementations below are used
+    sosfilt = zpk2sos = None
+
+
+# maximum number of filter designs kept by _designFilter
+MAX_CACHED_DESIGNS = 256
+_design_cache = OrderedDict()
+_design_cache_lock = threading.Lock()
+
+
+def _pairRoots(roots):
+    """
+    Groups roots into complex conjugate pairs and pairs of real roots.
+    """
+    roots = np.asarray(roots, dtype='complex128')
+    tol = 100 * np.finfo('float64').eps * np.maximum(abs(roots), 1)
+    real = np.sort(roots[abs(roots.imag) <= tol].real)
+    pairs = [np.array([r, r.conjugate()]) for r in roots[roots.imag > tol]]
+    pairs += [real[i:i + 2] for i in xrange(0, len(real), 2)]
+    return pairs
+
+
+def _zpk2sos(z, p, k):
+    """
+    Converts zeros, poles and gain of a filter to second-order sections.
+
+    Local version of :func:`scipy.signal.zpk2sos` for SciPy < 0.16. Poles
+    are grouped into conjugate pairs, starting with the ones farthest from
+    the unit circle, and each pair gets the pair of zeros closest to it.
+    """
+    z = np.atleast_1d(z)
+    p = np.atleast_1d(p)
+    nsec = (max(len(z), len(p)) + 1) // 2
+    # pad with roots at the origin to complete the sections
+    z = np.concatenate([z, np.zeros(2 * nsec - len(z))])
+    p = np.concatenate([p, np.zeros(2 * nsec - len(p))])
+    zpairs = _pairRoots(z)
+    ppairs = _pairRoots(p)
+    ppairs.sort(key=lambda pair: -abs(1 - abs(pair).max()))
+    sos = np.zeros((nsec, 6))
+    for i, pair in enumerate(ppairs):
+        dist = [abs(zpair[:, np.newaxis] - pair).min() for zpair in zpairs]
+        zpair = zpairs.pop(int(np.argmin(dist)))
+        sos[i, :3] = np.poly(zpair).real
+        sos[i, 3:] = np.poly(pair).real
+    sos[0, :3] *= k
+    return sos
+
+
+def _sosfilt(sos, x, zi=None):
+    """
+    Filters data along the last axis with a cascade of second-order
+    sections.
+
+    Local version of :func:`scipy.signal.sosfilt` for SciPy < 0.16, running
+    :func:`scipy.signal.lfilter` section by section.
+    """
+    if zi is not None:
+        zf = np.empty_like(zi)
+    for i, section in enumerate(sos):
+        if zi is None:
+            x = lfilter(section[:3], section[3:], x)
+        else:
+            x, zf[i] = lfilter(section[:3], section[3:], x, zi=zi[i])
+    if zi is None:
+        return x
+    return x, zf
+
+
+if sosfilt is None:
+    sosfilt, zpk2sos = _sosfilt, _zpk2sos
+
+
+def _designFilter(design, *args, **kwargs):
+    """
+    Returns the designed filter for the given arguments, memoising the most
+    recent ``MAX_CACHED_DESIGNS`` designs.
+
+    :type design: func
+    :param design: Design function of :mod:`scipy.signal` accepting an
+        ``output`` keyword, e.g. :func:`scipy.signal.iirfilter`.
+    :param args: Positional arguments of the design function, i.e. order and
+        normalised corner frequencies.
+    :param kwargs: Keyword arguments of the design function.
+    :return: Tuple ``('sos', sos)`` with the second-order sections as
+        read-only array.
+    """
+    key = (design.__name__, args, tuple(sorted(kwargs.items())))
+    return _cached(key, _design, design, *args, **kwargs)
+
+
+def _design(design, *args, **kwargs):
+    """
+    Uncached worker of :func:`_designFilter`.
+    """
+    sos = zpk2sos(*design(*args, output='zpk', **kwargs))
+    sos.flags.writeable = False
+    return ('sos', sos)
+
+
+def _cached(key, func, *args, **kwargs):
+    """
+    Returns ``func(*args, **kwargs)``, looked up in the design cache by
+    ``key`` first. The least recently used entry is evicted once the cache
+    holds ``MAX_CACHED_DESIGNS`` entries. The cache may be used from several
+    threads, e.g. by ``Stream.filter(workers=N)``.
+    """
+    with _design_cache_lock:
+        value = _design_cache.pop(key, None)
+        if value is not None:
+            _design_cache[key] = value
+            return value
+    # design outside of the lock, concurrent designs of the same key are
+    # harmless
+    value = func(*args, **kwargs)
+    with _design_cache_lock:
+        _design_cache.pop(key, None)
+        while len(_design_cache) >= MAX_CACHED_DESIGNS:
+            _design_cache.popitem(last=False)
+        _design_cache[key] = value
+    return value
+
+
+def _applyFilter(filt, data, zerophase=False):
+    """
+    Applies a filter returned by :func:`_designFilter` along the last axis.
+
+    Second-order sections are run as a cascade of biquads, which stays
+    numerically stable for high orders and corners close to zero or
+    Nyquist.
+
+    :param filt: Filter as returned by :func:`_designFilter`.
+    :param data: Data to filter, type numpy.ndarray.
+    :param zerophase: If True, apply filter once forwards and once backwards.
+    :return: Filtered data.
+    """
+    _output, sos = filt
+    func = lambda x: sosfilt(sos, x)
+    if zerophase:
+        firstpass = func(data)
+        return func(firstpass[..., ::-1])[..., ::-1]
+    return func(data)
 
 
 def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
@@ -30,7 +180,8 @@ def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
 
     Filter data from ``freqmin`` to ``freqmax`` using ``corners`` corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered row by row, i.e. along the last axis.
     :param freqmin: Pass band low corner frequency.
     :param freqmax: Pass band high corner frequency.
     :param df: Sampling rate in Hz.
@@ -41,25 +192,8 @@ def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
-    fe = 0.5 * df
-    low = freqmin / fe
-    high = freqmax / fe
-    # raise for some bad scenarios
-    if high > 1:
-        high = 1.0
-        msg = "Selected high corner frequency is above Nyquist. " + \
-              "Setting Nyquist as high corner."
-        warnings.warn(msg)
-    if low > 1:
-        msg = "Selected low corner frequency is above Nyquist."
-        raise ValueError(msg)
-    [b, a] = iirfilter(corners, [low, high], btype='band',
-                       ftype='butter', output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    filt = _bandpassDesign(freqmin, freqmax, df, corners)
+    return _applyFilter(filt, data, zerophase)
 
 
 def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
@@ -69,7 +203,8 @@ def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
     Filter data removing data between frequencies ``freqmin`` and ``freqmax``
     using ``corners`` corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered row by row, i.e. along the last axis.
     :param freqmin: Stop band low corner frequency.
     :param freqmax: Stop band high corner frequency.
     :param df: Sampling rate in Hz.
@@ -80,25 +215,8 @@ def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
-    fe = 0.5 * df
-    low = freqmin / fe
-    high = freqmax / fe
-    # raise for some bad scenarios
-    if high > 1:
-        high = 1.0
-        msg = "Selected high corner frequency is above Nyquist. " + \
-              "Setting Nyquist as high corner."
-        warnings.warn(msg)
-    if low > 1:
-        msg = "Selected low corner frequency is above Nyquist."
-        raise ValueError(msg)
-    [b, a] = iirfilter(corners, [low, high],
-                       btype='bandstop', ftype='butter', output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    filt = _bandstopDesign(freqmin, freqmax, df, corners)
+    return _applyFilter(filt, data, zerophase)
 
 
 def lowpass(data, freq, df, corners=4, zerophase=False):
@@ -108,7 +226,8 @@ def lowpass(data, freq, df, corners=4, zerophase=False):
     Filter data removing data over certain frequency ``freq`` using ``corners``
     corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered row by row, i.e. along the last axis.
     :param freq: Filter corner frequency.
     :param df: Sampling rate in Hz.
     :param corners: Filter corners. Note: This is twice the value of PITSA's
@@ -118,21 +237,8 @@ def lowpass(data, freq, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
-    fe = 0.5 * df
-    f = freq / fe
-    # raise for some bad scenarios
-    if f > 1:
-        f = 1.0
-        msg = "Selected corner frequency is above Nyquist. " + \
-              "Setting Nyquist as high corner."
-        warnings.warn(msg)
-    [b, a] = iirfilter(corners, f, btype='lowpass', ftype='butter',
-                       output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    filt = _lowpassDesign(freq, df, corners)
+    return _applyFilter(filt, data, zerophase)
 
 
 def highpass(data, freq, df, corners=4, zerophase=False):
@@ -142,7 +248,8 @@ def highpass(data, freq, df, corners=4, zerophase=False):
     Filter data removing data below certain frequency ``freq`` using
     ``corners`` corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered row by row, i.e. along the last axis.
     :param freq: Filter corner frequency.
     :param df: Sampling rate in Hz.
     :param corners: Filter corners. Note: This is twice the value of PITSA's
@@ -152,19 +259,78 @@ def highpass(data, freq, df, corners=4, zerophase=False):
         the resulting filtered trace.
     :return: Filtered data.
     """
+    filt = _highpassDesign(freq, df, corners)
+    return _applyFilter(filt, data, zerophase)
+
+
+def _bandpassDesign(freqmin, freqmax, df, corners=4):
+    """
+    Designs the filter for :func:`bandpass`.
+    """
+    fe = 0.5 * df
+    low = freqmin / fe
+    high = freqmax / fe
+    # raise for some bad scenarios
+    if high > 1:
+        high = 1.0
+        msg = "Selected high corner frequency is above Nyquist. " + \
+              "Setting Nyquist as high corner."
+        warnings.warn(msg)
+    if low > 1:
+        msg = "Selected low corner frequency is above Nyquist."
+        raise ValueError(msg)
+    return _designFilter(iirfilter, corners, (low, high), btype='band',
+                         ftype='butter')
+
+
+def _bandstopDesign(freqmin, freqmax, df, corners=4):
+    """
+    Designs the filter for :func:`bandstop`.
+    """
+    fe = 0.5 * df
+    low = freqmin / fe
+    high = freqmax / fe
+    # raise for some bad scenarios
+    if high > 1:
+        high = 1.0
+        msg = "Selected high corner frequency is above Nyquist. " + \
+              "Setting Nyquist as high corner."
+        warnings.warn(msg)
+    if low > 1:
+        msg = "Selected low corner frequency is above Nyquist."
+        raise ValueError(msg)
+    return _designFilter(iirfilter, corners, (low, high), btype='bandstop',
+                         ftype='butter')
+
+
+def _lowpassDesign(freq, df, corners=4):
+    """
+    Designs the filter for :func:`lowpass`.
+    """
+    fe = 0.5 * df
+    f = freq / fe
+    # raise for some bad scenarios
+    if f > 1:
+        f = 1.0
+        msg = "Selected corner frequency is above Nyquist. " + \
+              "Setting Nyquist as high corner."
+        warnings.warn(msg)
+    return _designFilter(iirfilter, corners, f, btype='lowpass',
+                         ftype='butter')
+
+
+def _highpassDesign(freq, df, corners=4):
+    """
+    Designs the filter for :func:`highpass`.
+    """
     fe = 0.5 * df
     f = freq / fe
     # raise for some bad scenarios
     if f > 1:
         msg = "Selected corner frequency is above Nyquist."
         raise ValueError(msg)
-    [b, a] = iirfilter(corners, f, btype='highpass', ftype='butter',
-                       output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    return _designFilter(iirfilter, corners, f, btype='highpass',
+                         ftype='butter')
 
 
 def envelope(data):
@@ -319,6 +485,109 @@ def integerDecimation(data, decimation_factor):
     return data
 
 
+def resamplePolyphase(data, up, down, window=('kaiser', 5.0),
+                      chunk_size=65536):
+    """
+    Resampling by a rational factor using a polyphase FIR filter.
+
+    The data is conceptually upsampled by ``up`` by inserting zeros, lowpass
+    filtered with a zero phase FIR filter and downsampled by ``down``. Only
+    the output samples actually needed are computed, each from the
+    ``ceil(taps / up)`` coefficients of its filter phase. The filter bank is
+    cached for repeated use with the same factors and window.
+
+    :param data: Data to resample, type numpy.ndarray.
+    :type up: int
+    :param up: Upsampling factor.
+    :type down: int
+    :param down: Downsampling factor.
+    :param window: Window used in the design of the anti-aliasing FIR filter
+        with :func:`scipy.signal.firwin`. Defaults to a Kaiser window with
+        beta of 5.0.
+    :type chunk_size: int, optional
+    :param chunk_size: Number of output samples computed at once. Bounds the
+        memory needed in addition to input and output arrays.
+    :return: Resampled data with ``ceil(len(data) * up / down)`` samples.
+
+    .. rubric:: Example
+
+    Resampling a 1 Hz sine from 100 Hz to 40 Hz:
+
+    >>> t = np.arange(1000) / 100.0
+    >>> data = np.sin(2 * np.pi * t)
+    >>> resampled = resamplePolyphase(data, 2, 5)
+    >>> len(resampled)
+    400
+    >>> t_new = np.arange(400) / 40.0
+    >>> np.allclose(resampled[20:-20], np.sin(2 * np.pi * t_new[20:-20]),
+    ...             atol=1e-3)
+    True
+    """
+    up, down = int(up), int(down)
+    if up < 1 or down < 1:
+        msg = "Resampling factors must be positive integers."
+        raise ValueError(msg)
+    ratio = Fraction(up, down)
+    up, down = ratio.numerator, ratio.denominator
+    data = np.asarray(data)
+    npts = len(data)
+    if up == down == 1:
+        return data.astype('float64')
+    bank, half_len = _cached(('polyphase', up, down, window),
+                             _polyphaseBank, up, down, window)
+    taps = bank.shape[1]
+    npts_out = -(-npts * up // down)
+    out = np.empty(npts_out, dtype='float64')
+    for m1 in xrange(0, npts_out, int(chunk_size)):
+        m2 = min(m1 + int(chunk_size), npts_out)
+        # position of each output sample on the upsampled time axis
+        t = np.arange(m1, m2) * down + half_len
+        phase = t % up
+        # last input sample contributing to each output sample
+        last = t // up
+        # input samples needed for this chunk, zero padded outside the data
+        i1 = last[0] - taps + 1
+        i2 = last[-1] + 1
+        chunk = np.zeros(i2 - i1, dtype='float64')
+        j1, j2 = max(i1, 0), min(i2, npts)
+        if j2 > j1:
+            chunk[j1 - i1:j2 - i1] = data[j1:j2]
+        rows = last - last[0]
+        # output samples up apart share their phase and their input windows
+        # start down samples apart, so each phase is applied to a strided
+        # view of the chunk without copying the windows
+        step = chunk.strides[0]
+        for r in xrange(min(up, m2 - m1)):
+            count = len(xrange(r, m2 - m1, up))
+            windows = np.lib.stride_tricks.as_strided(
+                chunk[rows[r]:], shape=(count, taps),
+                strides=(down * step, step))
+            out[m1 + r:m2:up] = np.einsum('ij,j->i', windows,
+                                          bank[phase[r]])
+    return out
+
+
+def _polyphaseBank(up, down, window):
+    """
+    Designs the FIR filter bank of :func:`resamplePolyphase`.
+
+    :return: Tuple of the filter bank as array of shape ``(up, taps)`` and
+        the delay of the filter in samples of the upsampled data. Row ``p``
+        holds the coefficients of phase ``p`` in reversed order, so that it
+        can be applied directly to a slice of input samples in time order.
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    h = firwin(2 * half_len + 1, 1.0 / max_rate, window=window) * up
+    taps = -(-len(h) // up)
+    bank = np.zeros((up, taps), dtype='float64')
+    for p in xrange(up):
+        phase = h[p::up]
+        bank[p, taps - len(phase):] = phase[::-1]
+    bank.flags.writeable = False
+    return bank, half_len
+
+
 def lowpassCheby2(data, freq, df, maxorder=12, ba=False,
                   freq_passband=False):
     """
@@ -343,9 +612,31 @@ def lowpassCheby2(data, freq, df, maxorder=12, ba=False,
         the iteratively determined pass band frequency
     :return: Filtered data.
     """
+    order, rs, wn, freq_pass = _lowpassCheby2Order(freq, df, maxorder)
+    if ba:
+        return cheby2(order, rs, wn, btype='low', analog=0, output='ba')
+    filt = _designFilter(cheby2, order, rs, wn, btype='low', analog=0)
+    if freq_passband:
+        return _applyFilter(filt, data), freq_pass
+    return _applyFilter(filt, data)
+
+
+def _lowpassCheby2Design(freq, df, maxorder=12):
+    """
+    Designs the filter for :func:`lowpassCheby2`.
+    """
+    order, rs, wn, _freq_pass = _lowpassCheby2Order(freq, df, maxorder)
+    return _designFilter(cheby2, order, rs, wn, btype='low', analog=0)
+
+
+def _lowpassCheby2Order(freq, df, maxorder):
+    """
+    Determines order, stop band attenuation, natural frequency and pass band
+    frequency in Hz of the filter of :func:`lowpassCheby2`.
+    """
     nyquist = df * 0.5
     # rp - maximum ripple of passband, rs - attenuation of stopband
-    rp, rs, order = 1, 96, 1e99
+    rp, rs = 1, 96
     ws = freq / nyquist  # stop band frequency
     wp = ws              # pass band frequency
     # raise for some bad scenarios
@@ -354,17 +645,163 @@ def lowpassCheby2(data, freq, df, maxorder=12, ba=False,
         msg = "Selected corner frequency is above Nyquist. " + \
               "Setting Nyquist as high corner."
         warnings.warn(msg)
+    order, wn, wp = _cached(('cheb2ord', wp, ws, rp, rs, maxorder),
+                            _cheby2Order, wp, ws, rp, rs, maxorder)
+    return order, rs, wn, wp * nyquist
+
+
+def _cheby2Order(wp, ws, rp, rs, maxorder):
+    """
+    Lowers the pass band frequency of a Cheby2 lowpass until the filter
+    order does not exceed ``maxorder``.
+
+    :return: Tuple of filter order, natural frequency and pass band
+        frequency, all normalised to Nyquist.
+    """
+    order = 1e99
     while True:
         if order <= maxorder:
             break
         wp = wp * 0.99
         order, wn = cheb2ord(wp, ws, rp, rs, analog=0)
-    b, a = cheby2(order, rs, wn, btype='low', analog=0, output='ba')
-    if ba:
-        return b, a
-    if freq_passband:
-        return lfilter(b, a, data), wp * nyquist
-    return lfilter(b, a, data)
+    return order, wn, wp
+
+
+class ContinuousFilter(object):
+    """
+    Causal filter which carries its state across successive chunks of data.
+
+    Filtering an archive chunk by chunk with the stateless filter functions
+    produces transients at the start of every chunk. This class keeps the
+    final conditions of each chunk as initial conditions of the next one,
+    thus the concatenated output equals filtering the concatenated data in
+    one go while only one chunk has to be kept in memory. The filter design
+    is shared with the corresponding filter function.
+
+    :type type: str
+    :param type: Name of the filter, one of ``'bandpass'``, ``'bandstop'``,
+        ``'lowpass'``, ``'highpass'`` and ``'lowpassCheby2'``.
+    :type df: float
+    :param df: Sampling rate in Hz.
+    :param options: Keyword arguments of the respective filter function
+        (e.g. ``freqmin=1.0``, ``freqmax=20.0`` for ``'bandpass'``) except
+        ``zerophase`` which can not be applied chunk by chunk.
+
+    The state is kept separately for every trace id, so chunks of different
+    channels can be interleaved. A gap or overlap between consecutive chunks
+    of a trace restarts its filter with a warning.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read()
+    >>> tr = st[0]
+    >>> flt = ContinuousFilter('bandpass', tr.stats.sampling_rate,
+    ...                        freqmin=1.0, freqmax=20.0)
+    >>> t = tr.stats.starttime
+    >>> chunks = [tr.slice(t + i * 10, t + i * 10 + 9.99) for i in xrange(3)]
+    >>> for chunk in chunks:
+    ...     flt.filterTrace(chunk)
+    >>> tr.filter('bandpass', freqmin=1.0, freqmax=20.0)
+    >>> filtered = np.concatenate([chunk.data for chunk in chunks])
+    >>> np.allclose(filtered, tr.data)
+    True
+    """
+    designs = {
+        'bandpass': _bandpassDesign,
+        'bandstop': _bandstopDesign,
+        'lowpass': _lowpassDesign,
+        'highpass': _highpassDesign,
+        'lowpasscheby2': _lowpassCheby2Design}
+
+    def __init__(self, type, df, **options):
+        if options.pop('zerophase', False):
+            msg = "Zero phase filters can not be applied chunk by chunk."
+            raise ValueError(msg)
+        try:
+            design = self.designs[type.lower()]
+        except KeyError:
+            msg = "Filter type '%s' not supported for continuous " + \
+                "filtering. Supported types: %s"
+            raise ValueError(msg % (type, ", ".join(sorted(self.designs))))
+        self.type = type.lower()
+        self.df = float(df)
+        self.options = options
+        self.filt = design(df=self.df, **options)
+        # filter state and expected start of next chunk per id
+        self._zi = {}
+        self._next_start = {}
+
+    def reset(self, id=None):
+        """
+        Drops the filter state so that the next chunk starts from rest.
+
+        :type id: str, optional
+        :param id: Trace id whose state is dropped. If omitted, the states of
+            all traces are dropped.
+        """
+        if id is None:
+            self._zi.clear()
+            self._next_start.clear()
+        else:
+            self._zi.pop(id, None)
+            self._next_start.pop(id, None)
+
+    def filter(self, data, id=None):
+        """
+        Filters the next chunk of a continuous data stream.
+
+        :type data: :class:`numpy.ndarray`
+        :param data: Next chunk of data, following the previous chunk of the
+            same ``id`` without gap.
+        :type id: str, optional
+        :param id: Key under which the filter state is kept.
+        :return: Filtered data.
+        """
+        _output, sos = self.filt
+        zi = self._zi.get(id)
+        if zi is None:
+            zi = np.zeros((sos.shape[0], 2))
+        data, zi = sosfilt(sos, data, zi=zi)
+        self._zi[id] = zi
+        return data
+
+    @raiseIfMasked
+    def filterTrace(self, trace):
+        """
+        Filters the next chunk of a trace in place.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: Next chunk of the trace. Its state is looked up by the
+            trace id.
+        """
+        if trace.stats.sampling_rate != self.df:
+            msg = "Sampling rate of trace (%s Hz) differs from the sampling " \
+                "rate of the filter (%s Hz)."
+            raise ValueError(msg % (trace.stats.sampling_rate, self.df))
+        id = trace.id
+        expected = self._next_start.get(id)
+        starttime = trace.stats.starttime
+        if expected is not None and \
+                abs(starttime - expected) > 0.5 * trace.stats.delta:
+            msg = "%s: chunk starts at %s instead of %s, restarting filter."
+            warnings.warn(msg % (id, starttime, expected))
+            self.reset(id)
+        trace.data = self.filter(trace.data, id=id)
+        self._next_start[id] = \
+            starttime + trace.stats.npts * trace.stats.delta
+        proc_info = "filter:%s:%s" % (self.type, self.options)
+        trace._addProcessingInfo(proc_info)
+
+    def filterStream(self, stream):
+        """
+        Filters the next chunk of each trace of a stream in place.
+
+        :type stream: :class:`~obspy.core.stream.Stream`
+        :param stream: Next chunk of all traces.
+        """
+        for trace in stream:
+            self.filterTrace(trace)
 
 
 if __name__ == '__main__':
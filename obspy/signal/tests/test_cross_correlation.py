@@ -2,10 +2,14 @@
 The cross correlation test suite.
 """
 
+import numpy as np
 import os
 import unittest
-from obspy import read, UTCDateTime
-from obspy.signal.cross_correlation import xcorrPickCorrection
+from obspy import read, UTCDateTime, Stream, Trace
+from obspy.signal.cross_correlation import xcorrPickCorrection, xcorr, \
+    xcorrOneToMany, xcorrAllPairs, xcorr_max, correlateTemplate, \
+    matchedFilter
+import warnings
 
 
 class CrossCorrelationTestCase(unittest.TestCase):
@@ -43,6 +47,129 @@ class CrossCorrelationTestCase(unittest.TestCase):
         self.assertAlmostEqual(dt, -0.013025086360067755)
         self.assertAlmostEqual(coeff, 0.98279277273758803)
 
+    def test_xcorrOneToMany(self):
+        """
+        Frequency domain correlations equal the ones of xcorr.
+        """
+        np.random.seed(815)
+        data = np.random.randn(5, 2000).astype('float32')
+        data[2, 13:] = data[0, :-13]
+        cc = xcorrOneToMany(data[0], data, 100)
+        self.assertEqual(cc.shape, (5, 201))
+        for row, x in zip(cc, data):
+            shift, value, fct = xcorr(data[0], x, 100, full_xcorr=True)
+            np.testing.assert_allclose(row, fct, atol=1e-5)
+            self.assertEqual(xcorr_max(row)[0], shift)
+        self.assertEqual(xcorr_max(cc[2])[0], -13)
+        np.testing.assert_allclose(cc[0, 100], 1.0)
+        # processing in blocks, traces of different length and zero traces
+        np.testing.assert_allclose(
+            xcorrOneToMany(data[0], data, 100, block_size=2), cc)
+        st = read()
+        cc = xcorrOneToMany(st[0], [st[1], st[2].data[:1000],
+                                    np.zeros(500)], 10)
+        self.assertEqual(cc.shape, (3, 21))
+        np.testing.assert_array_equal(cc[2], 0)
+
+    def test_xcorrAllPairs(self):
+        """
+        All pairs of traces are correlated in order.
+        """
+        st = read()
+        pairs, cc = xcorrAllPairs(st, 50)
+        self.assertEqual(pairs.tolist(), [[0, 1], [0, 2], [1, 2]])
+        self.assertEqual(cc.shape, (3, 101))
+        for (i, j), row in zip(pairs, cc):
+            ref = xcorrOneToMany(st[i], [st[j]], 50)[0]
+            np.testing.assert_allclose(row, ref)
+            shift, value, fct = xcorr(st[i].data, st[j].data, 50,
+                                      full_xcorr=True)
+            np.testing.assert_allclose(row, fct, atol=1e-5)
+        np.random.seed(815)
+        data = np.random.randn(7, 300)
+        pairs, cc = xcorrAllPairs(data, 30)
+        for block_size in [1, 2, 4]:
+            pairs2, cc2 = xcorrAllPairs(data, 30, block_size=block_size)
+            np.testing.assert_array_equal(pairs2, pairs)
+            np.testing.assert_allclose(cc2, cc)
+        pairs, cc = xcorrAllPairs(st[:1], 50)
+        self.assertEqual(cc.shape, (0, 101))
+
+    def test_correlateTemplate(self):
+        """
+        Sliding normalized correlation equals the correlation coefficients
+        of all windows.
+        """
+        np.random.seed(815)
+        data = np.random.randn(2000) + 100
+        template = np.random.randn(150)
+        cc = correlateTemplate(data, template)
+        ref = [np.corrcoef(data[i:i + 150], template)[0, 1]
+               for i in xrange(len(data) - 149)]
+        np.testing.assert_allclose(cc, ref, atol=1e-10)
+        # windows without variance
+        data[500:800] = 3.0
+        cc = correlateTemplate(data, template)
+        np.testing.assert_array_equal(cc[500:651], 0)
+        self.assertRaises(ValueError, correlateTemplate, template, data)
+        self.assertRaises(ValueError, correlateTemplate, data, np.ones(10))
+
+    def test_matchedFilter(self):
+        """
+        Detection of a three component template in continuous noise.
+        """
+        np.random.seed(815)
+        df = 50.0
+        t0 = UTCDateTime(2012, 3, 4)
+        events = [np.random.randn(200) * np.hanning(200) for _ in xrange(3)]
+        offsets = [0, 20, 45]
+        onsets = [1000, 40000, 44990, 89700]
+        st = Stream()
+        template = Stream()
+        for event, offset, cha in zip(events, offsets, 'ZNE'):
+            header = {'station': 'A', 'channel': 'HH' + cha,
+                      'sampling_rate': df, 'starttime': t0}
+            data = np.random.randn(90000) * 0.5
+            for onset in onsets:
+                data[onset + offset:onset + offset + 200] += 3 * event
+            st.append(Trace(data, header=header))
+            header['starttime'] = t0 + 10 + offset / df
+            template.append(Trace(event, header=header))
+        # a template of noise does not trigger
+        noise = Trace(np.random.randn(100), header={
+            'station': 'A', 'channel': 'HHZ', 'sampling_rate': df})
+        results = []
+        # chunk borders in between the samples of a detection
+        for kwargs in [{'chunk_length': 900}, {'chunk_length': 3600},
+                       {'chunk_length': 299.9, 'workers': 3}]:
+            detections = matchedFilter(st, [template, Stream([noise])],
+                                       threshold=10, **kwargs)
+            self.assertEqual([(d['time'] - t0) * df for d in detections],
+                             [1000, 40000, 44990, 89700])
+            self.assertEqual([d['template'] for d in detections], [0] * 4)
+            self.assertEqual(detections[0]['trace_ids'],
+                             ['.A..HHZ', '.A..HHN', '.A..HHE'])
+            for d in detections:
+                self.assertTrue(0.9 < d['correlation'] <= 1.0)
+                self.assertTrue(d['correlation'] > d['threshold'])
+            results.append([d['correlation'] for d in detections])
+        np.testing.assert_allclose(results[0], results[1])
+        np.testing.assert_allclose(results[0], results[2])
+        # trig_int merges close detections
+        detections = matchedFilter(st, [template], threshold=10,
+                                   trig_int=120)
+        self.assertEqual(len(detections), 3)
+        # unknown channels are skipped with a warning
+        template[0].stats.station = 'B'
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            detections = matchedFilter(st, [template], threshold=10)
+        self.assertEqual(len(w), 1)
+        self.assertEqual(detections[0]['trace_ids'], ['.A..HHN', '.A..HHE'])
+        # data must be aligned
+        st[0].stats.starttime += 1
+        self.assertRaises(ValueError, matchedFilter, st, [template])
+
 
 def suite():
     return unittest.makeSuite(CrossCorrelationTestCase, 'test')
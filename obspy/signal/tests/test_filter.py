@@ -5,12 +5,15 @@ The Filter test suite.
 """
 
 from obspy.signal import bandpass, lowpass, highpass
-from obspy.signal.filter import envelope, lowpassCheby2
+from obspy.signal import filter as signal_filter
+from obspy import Trace, UTCDateTime
+from obspy.signal.filter import envelope, lowpassCheby2, ContinuousFilter
 import os
 import unittest
 import gzip
 import numpy as np
 import scipy.signal as sg
+import warnings
 
 
 class FilterTestCase(unittest.TestCase):
@@ -248,6 +251,180 @@ class FilterTestCase(unittest.TestCase):
         # be 0 (1dB ripple) before filter ramp
         self.assertTrue(h_db[freq < 25].min() > -1)
 
+    def test_designCache(self):
+        """
+        Repeated filtering reuses the filter design, the cache is bounded.
+        """
+        data = np.random.randn(200)
+        signal_filter._design_cache.clear()
+        bandpass(data, 1.0, 5.0, df=100.0)
+        self.assertEqual(len(signal_filter._design_cache), 1)
+        cached = signal_filter._design_cache.values()[0]
+        bandpass(data, 1.0, 5.0, df=100.0)
+        self.assertEqual(len(signal_filter._design_cache), 1)
+        self.assertTrue(signal_filter._design_cache.values()[0] is cached)
+        # design coefficients are shared and therefore read-only
+        output, coeffs = cached
+        if output == 'ba':
+            arrays = coeffs
+        else:
+            arrays = [coeffs]
+        for c in arrays:
+            self.assertFalse(c.flags.writeable)
+        # the least recently used designs are evicted
+        max_cached = signal_filter.MAX_CACHED_DESIGNS
+        try:
+            signal_filter.MAX_CACHED_DESIGNS = 3
+            for freq in [1.0, 2.0, 3.0, 4.0]:
+                lowpass(data, freq, df=100.0)
+            self.assertEqual(len(signal_filter._design_cache), 3)
+            self.assertFalse(any(filt is cached for filt in
+                                 signal_filter._design_cache.values()))
+        finally:
+            signal_filter.MAX_CACHED_DESIGNS = max_cached
+            signal_filter._design_cache.clear()
+
+    def test_designCacheThreads(self):
+        """
+        The design cache can be used from several threads at once.
+        """
+        from multiprocessing.pool import ThreadPool
+        data = np.random.randn(50)
+        max_cached = signal_filter.MAX_CACHED_DESIGNS
+        pool = ThreadPool(8)
+        try:
+            signal_filter.MAX_CACHED_DESIGNS = 2
+            freqs = [1.0 + (i % 7) for i in xrange(2000)]
+            results = pool.map(lambda f: lowpass(data, f, df=100.0), freqs)
+            for freq, result in zip(freqs[:7], results[:7]):
+                np.testing.assert_array_equal(
+                    result, lowpass(data, freq, df=100.0))
+            self.assertTrue(len(signal_filter._design_cache) <= 2)
+        finally:
+            pool.close()
+            pool.join()
+            signal_filter.MAX_CACHED_DESIGNS = max_cached
+            signal_filter._design_cache.clear()
+
+    def test_highOrderLowCorner(self):
+        """
+        High order filters with corners close to zero frequency stay stable
+        when run as second-order sections.
+        """
+        np.random.seed(815)
+        data = np.random.randn(10000)
+        df = 100.0
+        for corners in [4, 10, 16]:
+            filtered = bandpass(data, 0.01, 0.05, df=df, corners=corners)
+            self.assertTrue(np.all(np.isfinite(filtered)))
+            self.assertTrue(np.abs(filtered).max() < np.abs(data).max())
+            # same with the local second-order sections for old SciPy
+            zpk = sg.iirfilter(corners, [0.01 / 50.0, 0.05 / 50.0],
+                               btype='band', ftype='butter', output='zpk')
+            local = signal_filter._sosfilt(signal_filter._zpk2sos(*zpk),
+                                           data)
+            self.assertTrue(np.all(np.isfinite(local)))
+            self.assertTrue(np.abs(local).max() < np.abs(data).max())
+
+    def test_localSecondOrderSections(self):
+        """
+        The local second-order section functions used for SciPy < 0.16 give
+        the same results as the ones of SciPy.
+        """
+        np.random.seed(815)
+        data = np.random.randn(2, 3000)
+        designs = [
+            sg.iirfilter(4, [0.02, 0.4], btype='band', ftype='butter',
+                         output='zpk'),
+            sg.iirfilter(4, [0.02, 0.4], btype='bandstop', ftype='butter',
+                         output='zpk'),
+            sg.iirfilter(5, 0.2, btype='lowpass', ftype='butter',
+                         output='zpk'),
+            sg.iirfilter(3, 0.3, btype='highpass', ftype='butter',
+                         output='zpk'),
+            sg.cheby2(12, 96, 0.3, btype='low', analog=0, output='zpk')]
+        for zpk in designs:
+            sos = signal_filter._zpk2sos(*zpk)
+            b, a = sg.zpk2tf(*zpk)
+            ref = sg.lfilter(b, a, data)
+            got = signal_filter._sosfilt(sos, data)
+            np.testing.assert_allclose(got, ref, rtol=0,
+                                       atol=1e-9 * abs(ref).max())
+            # filter state is carried over between chunks
+            zi = np.zeros((sos.shape[0], 2))
+            got1, zi = signal_filter._sosfilt(sos, data[0, :1000], zi=zi)
+            got2, zi = signal_filter._sosfilt(sos, data[0, 1000:], zi=zi)
+            np.testing.assert_allclose(np.concatenate([got1, got2]),
+                                       got[0], rtol=0,
+                                       atol=1e-12 * abs(ref).max())
+
+    def test_continuousFilter(self):
+        """
+        Filtering chunk by chunk equals filtering the concatenated data.
+        """
+        np.random.seed(815)
+        data = np.random.randn(5000)
+        df = 100.0
+        filters = [['bandpass', {'freqmin': 1., 'freqmax': 20.}],
+                   ['bandstop', {'freqmin': 5, 'freqmax': 15., 'corners': 6}],
+                   ['lowpass', {'freq': 30.5}],
+                   ['highpass', {'freq': 2, 'corners': 2}],
+                   ['lowpassCheby2', {'freq': 10}]]
+        bounds = [0, 1, 700, 701, 2500, 4999, 5000]
+        for filt_type, filt_ops in filters:
+            expected = getattr(signal_filter, filt_type)(data, df=df,
+                                                         **filt_ops)
+            flt = ContinuousFilter(filt_type, df, **filt_ops)
+            got = [flt.filter(data[i:j]) for i, j in zip(bounds[:-1],
+                                                         bounds[1:])]
+            np.testing.assert_array_almost_equal(np.concatenate(got),
+                                                 expected, 12)
+            # reset starts over from rest
+            flt.reset()
+            np.testing.assert_array_almost_equal(flt.filter(data[:100]),
+                                                 expected[:100], 12)
+
+    def test_continuousFilterTraces(self):
+        """
+        Trace chunks keep separate states per id, gaps restart the filter.
+        """
+        np.random.seed(815)
+        data = {'A': np.random.randn(3000), 'B': np.random.randn(3000)}
+        t = UTCDateTime(2012, 1, 1)
+        flt = ContinuousFilter('highpass', 50.0, freq=1.0)
+        chunks = {'A': [], 'B': []}
+        for i in xrange(3):
+            # interleave chunks of both stations
+            for sta in ['A', 'B']:
+                header = {'station': sta, 'sampling_rate': 50.0,
+                          'starttime': t + i * 20}
+                tr = Trace(data=data[sta][i * 1000:(i + 1) * 1000].copy(),
+                           header=header)
+                flt.filterTrace(tr)
+                self.assertEqual(tr.stats.processing,
+                                 ["filter:highpass:{'freq': 1.0}"])
+                chunks[sta].append(tr.data)
+        for sta in ['A', 'B']:
+            np.testing.assert_array_almost_equal(
+                np.concatenate(chunks[sta]),
+                highpass(data[sta], 1.0, df=50.0), 12)
+        # a gap restarts the filter
+        tr = Trace(data=data['A'][:1000].copy(),
+                   header={'station': 'A', 'sampling_rate': 50.0,
+                           'starttime': t + 100})
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            flt.filterTrace(tr)
+        self.assertEqual(len(w), 1)
+        np.testing.assert_array_almost_equal(tr.data, chunks['A'][0], 12)
+        # bad sampling rate and zero phase are rejected
+        tr = Trace(data=data['A'][:10], header={'sampling_rate': 20.0})
+        self.assertRaises(ValueError, flt.filterTrace, tr)
+        self.assertRaises(ValueError, ContinuousFilter, 'highpass', 50.0,
+                          freq=1.0, zerophase=True)
+        self.assertRaises(ValueError, ContinuousFilter, 'remezFIR', 50.0,
+                          freqmin=1.0, freqmax=5.0)
+
 
 def suite():
     return unittest.makeSuite(FilterTestCase, 'test')
@@ -5,6 +5,7 @@ from obspy.core.util import AttribDict
 from obspy.signal.array_analysis import array_transff_freqslowness, \
     array_processing
 from obspy.signal.array_analysis import array_transff_wavenumber
+from obspy.signal import array_analysis
 from obspy.signal.util import utlLonLat
 import numpy as np
 import unittest
@@ -16,7 +17,7 @@ class SonicTestCase(unittest.TestCase):
     Test fk analysis, main function is sonic() in array_analysis.py
     """
 
-    def arrayProcessing(self, prewhiten, method):
+    def arrayProcessing(self, prewhiten, method, **options):
         np.random.seed(2348)
 
         geometry = np.array([[0.0, 0.0, 0.0],
@@ -83,6 +84,7 @@ class SonicTestCase(unittest.TestCase):
                 semb_thres, vel_thres, frqlow, frqhigh, stime, etime)
         kwargs = dict(prewhiten=prewhiten, coordsys='xy', verbose=False,
                       method=method)
+        kwargs.update(options)
         out = array_processing(*args, **kwargs)
         if 0:  # 1 for debugging
             print '\n', out[:, 1:]
@@ -142,6 +144,44 @@ class SonicTestCase(unittest.TestCase):
         # XXX relative tolerance should be lower!
         self.assertTrue(np.allclose(ref, out[:, 1:], rtol=4e-5))
 
+    def test_sonicCaponLoopedPinv(self):
+        """
+        Pseudo-inverses computed matrix by matrix, as for NumPy < 1.14, give
+        the same results.
+        """
+        ref = self.arrayProcessing(prewhiten=0, method=1)
+        stacked = array_analysis._STACKED_PINV
+        array_analysis._STACKED_PINV = False
+        try:
+            out = self.arrayProcessing(prewhiten=0, method=1)
+        finally:
+            array_analysis._STACKED_PINV = stacked
+        np.testing.assert_allclose(ref, out, rtol=1e-10)
+
+    def test_sonicWorkers(self):
+        """
+        Windows processed concurrently give the same results and power maps
+        in the same order.
+        """
+        for method in [0, 1]:
+            maps = []
+            store = lambda relpow, abspow, offset: \
+                maps.append((relpow.copy(), abspow.copy(), offset))
+            ref = self.arrayProcessing(prewhiten=0, method=method,
+                                       store=store)
+            ref_maps = maps
+            maps = []
+            # blocks of two windows, i.e. three blocks for the pool
+            out = self.arrayProcessing(prewhiten=0, method=method,
+                                       store=store, workers=3, block_size=2)
+            np.testing.assert_array_equal(ref, out)
+            self.assertEqual(len(maps), len(out))
+            self.assertEqual([m[2] for m in maps], [0, 40, 80, 120, 160, 200])
+            for (relpow1, abspow1, _), (relpow2, abspow2, _) in \
+                    zip(maps, ref_maps):
+                np.testing.assert_array_equal(relpow1, relpow2)
+                np.testing.assert_array_equal(abspow1, abspow2)
+
     def test_array_transff_freqslowness(self):
 
         coords = np.array([[10., 60., 0.],
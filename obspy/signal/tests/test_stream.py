@@ -117,6 +117,41 @@ class StreamTestCase(unittest.TestCase):
             np.testing.assert_array_equal(tr.data, st_bkp[i].data)
             self.assertEqual(tr.stats, st_bkp[i].stats)
 
+    def test_filterBatched(self):
+        """
+        Equal-length traces are filtered as one array. The result must match
+        filtering each trace on its own, also when using several workers.
+        """
+        np.random.seed(815)
+        st = Stream()
+        for i in xrange(7):
+            st.append(Trace(data=np.random.randn(1000),
+                            header={'station': 'S%d' % i,
+                                    'sampling_rate': 100.0}))
+        # traces which don't fit into the batch
+        st.append(Trace(data=np.random.randn(500),
+                        header={'sampling_rate': 100.0}))
+        st.append(Trace(data=np.random.randint(0, 1000, 1000),
+                        header={'sampling_rate': 100.0}))
+        st.append(Trace(data=np.random.randn(1000),
+                        header={'sampling_rate': 200.0}))
+        filters = [['bandpass', {'freqmin': 1., 'freqmax': 20.}],
+                   ['bandstop', {'freqmin': 5, 'freqmax': 15., 'corners': 6}],
+                   ['lowpass', {'freq': 30.5, 'zerophase': True}],
+                   ['highpass', {'freq': 2, 'corners': 2}]]
+        for filt_type, filt_ops in filters:
+            expected = st.copy()
+            for tr in expected:
+                tr.filter(filt_type, **filt_ops)
+            for workers in [None, 3]:
+                st2 = st.copy()
+                st2.filter(filt_type, workers=workers, **filt_ops)
+                for tr, tr_exp in zip(st2, expected):
+                    np.testing.assert_array_equal(tr.data, tr_exp.data)
+                    self.assertEqual(tr.stats.npts, tr_exp.stats.npts)
+                    self.assertEqual(tr.stats.processing,
+                                     tr_exp.stats.processing)
+
     def test_simulate(self):
         """
         Tests if calling simulate of stream gives the same result as calling
@@ -4,7 +4,8 @@ from copy import deepcopy
 import numpy as np
 from obspy import UTCDateTime, Trace, read
 from obspy.signal import seisSim, bandpass, bandstop, lowpass, highpass
-from obspy.signal.filter import lowpassCheby2
+from obspy.signal.filter import lowpassCheby2, resamplePolyphase, \
+    _polyphaseBank
 import unittest
 
 
@@ -164,6 +165,62 @@ class TraceTestCase(unittest.TestCase):
         tr2.decimate(4, no_filter=True)
         np.testing.assert_array_equal(tr.data, tr2.data)
 
+    def test_resamplePolyphase(self):
+        """
+        Tests resampling by rational factors with a polyphase filter.
+        """
+        t = np.arange(20000) / 200.0
+        # 1 Hz and 30 Hz sine, the latter must be removed going to 40 Hz
+        data = np.sin(2 * np.pi * t) + np.sin(2 * np.pi * 30 * t)
+        tr = Trace(data=data, header={'sampling_rate': 200.0})
+        tr.resample(40.0, method='polyphase')
+        self.assertEqual(tr.stats.sampling_rate, 40.0)
+        self.assertEqual(tr.stats.npts, 4000)
+        self.assertEqual(tr.stats.endtime, UTCDateTime(99.975))
+        self.assertEqual(tr.stats.processing,
+                         ["resample:40:('kaiser', 5.0):polyphase"])
+        expected = np.sin(2 * np.pi * np.arange(4000) / 40.0)
+        np.testing.assert_allclose(tr.data[100:-100], expected[100:-100],
+                                   atol=2e-3)
+        # factors of 1/3 and chunked processing
+        tr = Trace(data=data, header={'sampling_rate': 100.0})
+        tr.resample(100.0 / 3, method='polyphase')
+        self.assertEqual(tr.stats.npts, 6667)
+        np.testing.assert_array_equal(
+            tr.data, resamplePolyphase(data, 1, 3, chunk_size=1000))
+        # upsampling
+        tr = Trace(data=data[:100], header={'sampling_rate': 200.0})
+        tr.resample(500.0, method='polyphase')
+        self.assertEqual(tr.stats.npts, 250)
+        # some things that should fail
+        tr = Trace(data=data, header={'sampling_rate': 200.0})
+        self.assertRaises(ValueError, tr.resample, 200.0 / 1234.5,
+                          method='polyphase')
+        self.assertRaises(ValueError, tr.resample, 40.0, method='xxx')
+        self.assertRaises(ValueError, resamplePolyphase, data, 0, 2)
+        np.testing.assert_array_equal(tr.data, data)
+
+    def test_resamplePolyphaseVsUpsampling(self):
+        """
+        Compares the polyphase implementation with explicit upsampling,
+        filtering and downsampling.
+        """
+        np.random.seed(815)
+        data = np.random.randn(1000)
+        for up, down in [(1, 5), (2, 5), (3, 1), (7, 3)]:
+            got = resamplePolyphase(data, up, down, chunk_size=77)
+            # zero stuffed data and full convolution with the filter
+            bank, half_len = _polyphaseBank(up, down, ('kaiser', 5.0))
+            h = np.zeros(bank.shape[1] * up)
+            for p in xrange(up):
+                h[p::up] = bank[p, ::-1]
+            upsampled = np.zeros(len(data) * up)
+            upsampled[::up] = data
+            full = np.convolve(upsampled, h)
+            expected = full[half_len::down][:len(got)]
+            self.assertEqual(len(got), -(-len(data) * up // down))
+            np.testing.assert_allclose(got, expected, atol=1e-12)
+
 
 def suite():
     return unittest.makeSuite(TraceTestCase, 'test')
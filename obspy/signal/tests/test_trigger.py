@@ -5,7 +5,8 @@ The obspy.signal.trigger test suite.
 from ctypes import ArgumentError
 from obspy import read, Stream, UTCDateTime
 from obspy.signal import recSTALTA, recSTALTAPy, triggerOnset, pkBaer, \
-    coincidenceTrigger, arPick, classicSTALTA, classicSTALTAPy
+    coincidenceTrigger, arPick, classicSTALTA, classicSTALTAPy, \
+    ContinuousTrigger
 from obspy.signal.util import clibsignal
 import gzip
 import numpy as np
@@ -411,6 +412,128 @@ class TriggerTestCase(unittest.TestCase):
         ref = np.array([0.38012302, 0.37704431, 0.47674533, 0.67992292])
         self.assertTrue(np.allclose(ref, c2[99:103]))
 
+    def test_continuousTrigger(self):
+        """
+        Chunk wise triggering equals triggering the whole data.
+        """
+        data = self.data.reshape(4, -1).copy()
+        data[:, 5000:5300] *= 8
+        data[1, 12000:14000] *= 5
+        bounds = [0, 7, 5001, 5002, 13000, data.shape[1]]
+        for type, func in [('recstalta', recSTALTA),
+                           ('classicstalta', classicSTALTA)]:
+            for max_len, max_len_delete in [(9e99, False), (50, False),
+                                            (50, True)]:
+                trig = ContinuousTrigger(type, 20, 300, 2.0, 1.2,
+                                         max_len=max_len,
+                                         max_len_delete=max_len_delete)
+                cft = []
+                picks = []
+                for start, end in zip(bounds[:-1], bounds[1:]):
+                    cft.append(trig.charfct(data[:, start:end]))
+                    picks.extend(trig.trigger(cft[-1]))
+                picks.extend(trig.flush())
+                cft = np.hstack(cft)
+                for i, trace in enumerate(data):
+                    ref = func(trace, 20, 300)
+                    # first sample is not set by recSTALTA
+                    ref[0] = 0.
+                    np.testing.assert_allclose(cft[i], ref, rtol=1e-9)
+                    ref = triggerOnset(ref, 2.0, 1.2, max_len=max_len,
+                                       max_len_delete=max_len_delete)
+                    got = [list(p[1:]) for p in picks if p[0] == i]
+                    if max_len_delete:
+                        # triggerOnset drops the last trigger even if it is
+                        # switched off before the end of the data
+                        got = got[:len(ref)]
+                    self.assertEqual(got, ref.tolist())
+                self.assertTrue(len(picks) > 4)
+        # on times of triggers still on at the end of a chunk
+        trig = ContinuousTrigger('recstalta', 20, 300, 2.0, 1.2)
+        self.assertEqual(len(trig.getOpenOnsets()), 0)
+        trig.process(data[:, :5100])
+        expected = []
+        for trace in data:
+            ref = recSTALTA(trace, 20, 300)
+            ref[0] = 0.
+            ons = [on for on, off in triggerOnset(ref, 2.0, 1.2)
+                   if on <= 5099 <= off]
+            expected.append(ons[0] if ons else -1)
+        self.assertTrue(max(expected) >= 0)
+        self.assertEqual(trig.getOpenOnsets().tolist(), expected)
+        trig.flush()
+        self.assertEqual(len(trig.getOpenOnsets()), 0)
+
+    def test_continuousTriggerStream(self):
+        """
+        Chunk wise triggering of a stream with trace ids and times.
+        """
+        st = read()
+        st.filter('highpass', freq=1.0)
+        t = st[0].stats.starttime
+        trig = ContinuousTrigger('recstalta', 50, 500, 3.0, 1.5)
+        picks = []
+        for i in xrange(3):
+            chunk = st.slice(t + i * 10, t + i * 10 + 9.99)
+            picks.extend(trig.processStream(chunk, flush=(i == 2)))
+        self.assertEqual(len(picks), 3)
+        for id, on, off in picks:
+            tr = st.select(id=id)[0]
+            cft = recSTALTA(tr.data, 50, 500)
+            ref = triggerOnset(cft, 3.0, 1.5)
+            self.assertEqual(on, t + ref[0][0] * tr.stats.delta)
+            self.assertEqual(off, t + ref[0][1] * tr.stats.delta)
+        # gaps restart the trigger of the affected trace
+        chunk = st.slice(t, t + 9.99)
+        trig.processStream(chunk)
+        chunk = st.slice(t + 15, t + 24.99)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            trig.processStream(chunk)
+        self.assertEqual(len(w), 3)
+        self.assertTrue(np.all(trig._count == 1000))
+        # channel count and stream layout must not change
+        self.assertRaises(ValueError, trig.process, np.zeros((2, 10)))
+        self.assertRaises(ValueError, trig.processStream, chunk[:2])
+        self.assertRaises(ValueError, ContinuousTrigger, 'zdetect', 5, 10,
+                          1.0, 0.5)
+
+    def test_coincidenceTriggerChunksAndWorkers(self):
+        """
+        Chunk wise and concurrent single station triggering gives the same
+        coincidence triggers and leaves the input data untouched.
+        """
+        st = Stream()
+        files = ["BW.UH1._.SHZ.D.2010.147.cut.slist.gz",
+                 "BW.UH2._.SHZ.D.2010.147.cut.slist.gz",
+                 "BW.UH3._.SHZ.D.2010.147.cut.slist.gz",
+                 "BW.UH4._.EHZ.D.2010.147.cut.slist.gz"]
+        for filename in files:
+            st += read(os.path.join(self.path, filename))
+        st.filter('bandpass', freqmin=10, freqmax=20)
+        data = [tr.data.copy() for tr in st]
+        for kwargs in [{}, {'max_trigger_length': 0.13}]:
+            ref = coincidenceTrigger("recstalta", 2.5, 1, st, 1, sta=0.5,
+                                     lta=10, details=True, **kwargs)
+            self.assertTrue(len(ref) > 3)
+            for options in [{'workers': 3}, {'chunk_length': 7.3},
+                            {'chunk_length': 30, 'workers': 2}]:
+                options.update(kwargs)
+                res = coincidenceTrigger("recstalta", 2.5, 1, st, 1,
+                                         sta=0.5, lta=10, details=True,
+                                         **options)
+                self.assertEqual(len(res), len(ref))
+                for ev1, ev2 in zip(res, ref):
+                    for key in ['time', 'duration', 'trace_ids',
+                                'coincidence_sum']:
+                        self.assertEqual(ev1[key], ev2[key])
+                    np.testing.assert_allclose(ev1['cft_peaks'],
+                                               ev2['cft_peaks'])
+                    np.testing.assert_allclose(ev1['cft_stds'],
+                                               ev2['cft_stds'])
+        for tr, orig in zip(st, data):
+            np.testing.assert_array_equal(tr.data, orig)
+
 
 def suite():
     return unittest.makeSuite(TriggerTestCase, 'test')
@@ -29,7 +29,9 @@ import warnings
 import ctypes as C
 from collections import deque
 import numpy as np
+from scipy.signal import lfilter
 from obspy import UTCDateTime
+from obspy.core.util.base import _getFunctionFromEntryPoint
 from obspy.signal.headers import clibsignal, head_stalta_t
 from obspy.signal.cross_correlation import templatesMaxSimilarity
 
@@ -344,7 +346,7 @@ def triggerOnset(charfct, thres1, thres2, max_len=9e99, max_len_delete=False):
     #
     on = deque([ind1[0]])
     of = deque([-1])
-    of.extend(ind2[np.diff(ind2) > 1].tolist())
+    of.extend(ind2[:-1][np.diff(ind2) > 1].tolist())
     on.extend(ind1[np.where(np.diff(ind1) > 1)[0] + 1].tolist())
     # include last pick if trigger is on or drop it
     if max_len_delete:
@@ -370,6 +372,386 @@ def triggerOnset(charfct, thres1, thres2, max_len=9e99, max_len_delete=False):
     return np.array(pick)
 
 
+class ContinuousTrigger(object):
+    """
+    STA/LTA trigger which carries its state across successive chunks of
+    multi-channel data.
+
+    The characteristic functions of all channels of a chunk are computed in
+    one vectorized call on a 2-D array (channels x samples). The STA/LTA
+    state of every channel is kept between chunks, so the concatenated
+    characteristic function equals the one of
+    :func:`~obspy.signal.trigger.recSTALTA` or
+    :func:`~obspy.signal.trigger.classicSTALTA` applied to the concatenated
+    data. Triggers are reported as soon as they are switched off and match
+    the ones of :func:`~obspy.signal.trigger.triggerOnset` applied to the
+    whole characteristic function.
+
+    :type type: str
+    :param type: ``'recstalta'`` or ``'classicstalta'``. The delayed STA/LTA
+        and the Z-detector depend on the whole trace and are not supported.
+    :type nsta: int
+    :param nsta: Length of short time average window in samples.
+    :type nlta: int
+    :param nlta: Length of long time average window in samples.
+    :type thr_on: float
+    :param thr_on: Value above which a trigger is switched on.
+    :type thr_off: float
+    :param thr_off: Value below which a trigger is switched off.
+    :type max_len: int
+    :param max_len: Maximum length of triggered event in samples, see
+        :func:`~obspy.signal.trigger.triggerOnset`.
+    :type max_len_delete: bool
+    :param max_len_delete: Drop events longer than ``max_len``. A trigger
+        which is still on at the end of the data is dropped as well.
+
+    Triggers are returned as ``(channel, on, off)`` tuples sorted by their
+    on time. ``on`` and ``off`` are sample indices counted from the first
+    chunk after the last reset of the channel.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read()
+    >>> st.filter('highpass', freq=1.0)
+    >>> data = np.array([tr.data for tr in st])
+    >>> trig = ContinuousTrigger('recstalta', 50, 500, 3.0, 1.5)
+    >>> picks = []
+    >>> for i in xrange(0, 3000, 1000):
+    ...     picks.extend(trig.process(data[:, i:i + 1000]))
+    >>> picks.extend(trig.flush())
+    >>> picks
+    [(0, 500, 865), (1, 500, 838), (2, 500, 881)]
+    >>> cft = recSTALTA(st[0].data, 50, 500)
+    >>> [p[1:] for p in picks if p[0] == 0] == \\
+    ...     [tuple(p) for p in triggerOnset(cft, 3.0, 1.5)]
+    True
+    """
+    types = ('recstalta', 'classicstalta')
+
+    def __init__(self, type, nsta, nlta, thr_on, thr_off, max_len=9e99,
+                 max_len_delete=False):
+        if type.lower() not in self.types:
+            msg = "Trigger type '%s' not supported for continuous " + \
+                "triggering. Supported types: %s"
+            raise ValueError(msg % (type, ", ".join(self.types)))
+        if nsta < 1 or nlta < nsta:
+            msg = "Window lengths must satisfy 1 <= nsta <= nlta."
+            raise ValueError(msg)
+        self.type = type.lower()
+        self.nsta = int(nsta)
+        self.nlta = int(nlta)
+        self.thr_on = thr_on
+        self.thr_off = thr_off
+        self.max_len = max_len
+        self.max_len_delete = max_len_delete
+        self._nch = None
+        # trace ids, start times and sampling rate of processed streams
+        self._ids = None
+        self._df = None
+        self._starttimes = None
+
+    def _initState(self, nch):
+        """
+        Allocates the state of all channels on the first chunk.
+        """
+        if self._nch is None:
+            self._nch = nch
+            self.reset()
+        elif nch != self._nch:
+            msg = "Chunk has %d channels, expected %d."
+            raise ValueError(msg % (nch, self._nch))
+
+    def reset(self, channel=None):
+        """
+        Drops the state so that the next chunk starts a new data stream.
+
+        :type channel: int, optional
+        :param channel: Channel whose state is dropped. If omitted, the
+            states of all channels are dropped.
+        """
+        if self._nch is None:
+            return
+        if channel is None:
+            nch = self._nch
+            channel = slice(None)
+            # STA/LTA state: samples seen, recursive averages and history
+            # of squared samples for the classic STA/LTA
+            self._count = np.zeros(nch, dtype='int64')
+            self._sta = np.zeros((nch, 1))
+            self._lta = np.zeros((nch, 1))
+            self._hist = np.zeros((nch, self.nlta - 1))
+            # trigger state: samples seen, threshold flags of last sample,
+            # on time of open trigger (-1 if off), last off time, last
+            # sample above thr_off and whether the open trigger is dropped
+            self._tcount = np.zeros(nch, dtype='int64')
+            self._above_on = np.zeros(nch, dtype='bool')
+            self._above_off = np.zeros(nch, dtype='bool')
+            self._on = -np.ones(nch, dtype='int64')
+            self._last_off = -np.ones(nch)
+            self._last_above = -np.ones(nch, dtype='int64')
+            self._drop = np.zeros(nch, dtype='bool')
+            return
+        self._count[channel] = 0
+        self._sta[channel] = 0.
+        self._lta[channel] = 0.
+        self._hist[channel] = 0.
+        self._tcount[channel] = 0
+        self._above_on[channel] = False
+        self._above_off[channel] = False
+        self._on[channel] = -1
+        self._last_off[channel] = -1
+        self._last_above[channel] = -1
+        self._drop[channel] = False
+
+    def charfct(self, data):
+        """
+        Computes the characteristic function of the next chunk.
+
+        :type data: :class:`numpy.ndarray`
+        :param data: Next chunk of data, either 2-D (channels x samples) or
+            1-D for a single channel.
+        :return: Characteristic function, same shape as ``data``.
+        """
+        data = np.asarray(data, dtype='float64')
+        ndim = data.ndim
+        data = np.atleast_2d(data)
+        nch, npts = data.shape
+        self._initState(nch)
+        if npts == 0:
+            return data.reshape(data.shape[-ndim:])
+        sq = data ** 2
+        # sample index of every value since the last reset of its channel
+        index = self._count[:, np.newaxis] + np.arange(npts)
+        if self.type == 'recstalta':
+            # the recursion starts at the second sample of the stream
+            sq[index == 0] = 0.
+            csta = 1. / self.nsta
+            clta = 1. / self.nlta
+            sta, self._sta = lfilter([csta], [1., csta - 1.], sq, axis=1,
+                                     zi=self._sta)
+            lta, self._lta = lfilter([clta], [1., clta - 1.], sq, axis=1,
+                                     zi=self._lta)
+            mute = index < self.nlta
+        else:
+            # windowed sums of the squares via cumulative sums over the
+            # squares of the previous nlta - 1 samples and this chunk
+            nhist = self.nlta - 1
+            sq = np.hstack((self._hist, sq))
+            csum = np.zeros((nch, sq.shape[1] + 1))
+            np.cumsum(sq, axis=1, out=csum[:, 1:])
+            nsta, nlta = self.nsta, self.nlta
+            sta = (csum[:, nlta:] - csum[:, nlta - nsta:-nsta]) / nsta
+            lta = (csum[:, nlta:] - csum[:, :-nlta]) / nlta
+            self._hist = sq[:, sq.shape[1] - nhist:]
+            mute = index < nhist
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cft = sta / lta
+        cft[mute] = 0.
+        self._count += npts
+        if ndim == 1:
+            return cft[0]
+        return cft
+
+    def trigger(self, cft):
+        """
+        Determines the triggers switched off in the next chunk of the
+        characteristic function.
+
+        :type cft: :class:`numpy.ndarray`
+        :param cft: Next chunk of the characteristic function, either 2-D
+            (channels x samples) or 1-D for a single channel.
+        :rtype: list
+        :return: ``(channel, on, off)`` tuples of the completed triggers.
+        """
+        cft = np.atleast_2d(cft)
+        nch, npts = cft.shape
+        self._initState(nch)
+        if npts == 0:
+            return []
+        start = self._tcount.copy()
+        above_on = np.hstack((self._above_on[:, np.newaxis],
+                              cft > self.thr_on))
+        above_off = np.hstack((self._above_off[:, np.newaxis],
+                               cft > self.thr_off))
+        # candidates like in triggerOnset: first samples above thr_on and
+        # last samples above thr_off (which can be the last sample of the
+        # previous chunk)
+        on_ch, on_idx = np.nonzero(above_on[:, 1:] & ~above_on[:, :-1])
+        off_ch, off_idx = np.nonzero(above_off[:, :-1] & ~above_off[:, 1:])
+        on_split = np.searchsorted(on_ch, np.arange(nch + 1))
+        off_split = np.searchsorted(off_ch, np.arange(nch + 1))
+        any_above = above_off[:, 1:].any(axis=1)
+        last_above = start + npts - 1 - \
+            np.argmax(above_off[:, :0:-1], axis=1)
+        self._last_above[any_above] = last_above[any_above]
+        self._above_on = above_on[:, -1].copy()
+        self._above_off = above_off[:, -1].copy()
+        self._tcount += npts
+        picks = []
+        for ch in xrange(nch):
+            ons = start[ch] + on_idx[on_split[ch]:on_split[ch + 1]]
+            offs = start[ch] - 1 + off_idx[off_split[ch]:off_split[ch + 1]]
+            self._sweep(ch, ons, offs, start[ch] + npts - 1, picks)
+        picks.sort(key=lambda pick: (pick[1], pick[0]))
+        return picks
+
+    def _sweep(self, ch, ons, offs, end, picks):
+        """
+        Runs the trigger state of one channel over its on and off
+        candidates, appending completed triggers to picks.
+        """
+        events = [(i, 0) for i in ons.tolist()] + \
+            [(i, 1) for i in offs.tolist()]
+        events.sort()
+        on = int(self._on[ch])
+        last_off = self._last_off[ch]
+        drop = self._drop[ch]
+        # (end, 2) only checks max_len at the end of the chunk
+        for index, kind in events + [(end, 2)]:
+            if on >= 0 and not drop and index - on > self.max_len:
+                # off time will be later than max_len
+                if self.max_len_delete:
+                    drop = True
+                else:
+                    picks.append((ch, on, on + self.max_len))
+                    last_off = on + self.max_len
+                    on = -1
+            if kind == 0:
+                if on < 0 and index > last_off:
+                    on = index
+            elif kind == 1 and on >= 0:
+                if not drop:
+                    picks.append((ch, on, index))
+                last_off = index
+                on = -1
+                drop = False
+        self._on[ch] = on
+        self._last_off[ch] = last_off
+        self._drop[ch] = drop
+
+    def process(self, data):
+        """
+        Computes the characteristic function of the next chunk and returns
+        the triggers switched off in it.
+
+        :type data: :class:`numpy.ndarray`
+        :param data: Next chunk of data, either 2-D (channels x samples) or
+            1-D for a single channel.
+        :rtype: list
+        :return: ``(channel, on, off)`` tuples of the completed triggers.
+        """
+        return self.trigger(self.charfct(data))
+
+    def flush(self):
+        """
+        Ends the data stream of all channels.
+
+        Returns the triggers which are still on, like
+        :func:`~obspy.signal.trigger.triggerOnset` does at the end of the
+        data, and resets the state.
+
+        :rtype: list
+        :return: ``(channel, on, off)`` tuples of the open triggers.
+        """
+        picks = self._openTriggers()
+        self._nch = None
+        self._ids = None
+        return picks
+
+    def getOpenOnsets(self):
+        """
+        Returns the on times of the triggers which are still on.
+
+        :rtype: :class:`numpy.ndarray`
+        :return: On sample index of the open trigger of every channel or
+            ``-1`` for channels without open trigger. Empty before the first
+            chunk and after :meth:`flush`.
+        """
+        if self._nch is None:
+            return np.empty(0, dtype='int64')
+        return self._on.copy()
+
+    def _openTriggers(self):
+        """
+        Returns the triggers which are still on at the end of the data.
+        """
+        picks = []
+        if self._nch is None or self.max_len_delete:
+            return picks
+        for ch in np.nonzero(self._on >= 0)[0].tolist():
+            on = int(self._on[ch])
+            picks.append((ch, on, max(on, int(self._last_above[ch]))))
+        picks.sort(key=lambda pick: (pick[1], pick[0]))
+        return picks
+
+    def _toTimes(self, picks):
+        """
+        Converts sample indices of triggers to trace ids and times.
+        """
+        delta = 1.0 / self._df
+        return [(self._ids[ch], self._starttimes[ch] + on * delta,
+                 self._starttimes[ch] + off * delta)
+                for ch, on, off in picks]
+
+    def processStream(self, stream, flush=False):
+        """
+        Processes the next chunk of each trace of a stream.
+
+        All traces must have the same number of samples and sampling rate.
+        Traces are matched to channels by their id. A gap or overlap
+        between consecutive chunks of a trace restarts its channel with a
+        warning.
+
+        :type stream: :class:`~obspy.core.stream.Stream`
+        :param stream: Next chunk of all traces.
+        :type flush: bool, optional
+        :param flush: Set to ``True`` for the last chunk to also return the
+            triggers which are still on and reset the state.
+        :rtype: list
+        :return: ``(id, on, off)`` tuples of the completed triggers with
+            :class:`~obspy.core.utcdatetime.UTCDateTime` on and off times.
+        """
+        if len(stream) == 0:
+            return []
+        npts = set(tr.stats.npts for tr in stream)
+        df = set(tr.stats.sampling_rate for tr in stream)
+        if len(npts) > 1 or len(df) > 1:
+            msg = "All traces must have the same number of samples and " + \
+                "sampling rate."
+            raise ValueError(msg)
+        traces = dict((tr.id, tr) for tr in stream)
+        if self._ids is None:
+            self._ids = sorted(traces)
+            self._df = df.pop()
+            self._starttimes = [traces[id].stats.starttime
+                                for id in self._ids]
+        elif sorted(traces) != self._ids or df.pop() != self._df:
+            msg = "Trace ids or sampling rate differ from previous chunks."
+            raise ValueError(msg)
+        self._initState(len(self._ids))
+        delta = 1.0 / self._df
+        for ch, id in enumerate(self._ids):
+            starttime = traces[id].stats.starttime
+            expected = self._starttimes[ch] + self._count[ch] * delta
+            if abs(starttime - expected) > 0.5 * delta:
+                if self._count[ch] > 0:
+                    msg = "%s: chunk starts at %s instead of %s, " + \
+                        "restarting trigger."
+                    warnings.warn(msg % (id, starttime, expected))
+                self.reset(ch)
+                self._starttimes[ch] = starttime
+        data = np.array([traces[id].data for id in self._ids],
+                        dtype='float64')
+        picks = self.process(data)
+        if flush:
+            picks.extend(self._openTriggers())
+        picks = self._toTimes(picks)
+        if flush:
+            self.flush()
+        return picks
+
+
 def pkBaer(reltrc, samp_int, tdownmax, tupevent, thr1, thr2, preset_len,
            p_dur):
     """
@@ -498,16 +880,18 @@ def coincidenceTrigger(trigger_type, thr_on, thr_off, stream,
                        max_trigger_length=1e6, delete_long_trigger=False,
                        trigger_off_extension=0, details=False,
                        event_templates={}, similarity_threshold=0.7,
-                       **options):
+                       workers=None, chunk_length=None, **options):
     """
     Perform a network coincidence trigger.
 
     The routine works in the following steps:
       * take every single trace in the stream
-      * apply specified triggering routine
+      * apply specified triggering routine (optionally on several traces
+        concurrently and chunk by chunk)
       * evaluate triggering results
       * compile chronological overall list of all single station triggers
-      * find overlapping single station triggers
+      * find overlapping single station triggers in one sweep over the
+        sorted list
       * calculate coincidence sum every individual overlapping trigger
       * add to coincidence trigger list if it exceeds the given threshold
       * return list of network coincidence triggers
@@ -534,8 +918,8 @@ def coincidenceTrigger(trigger_type, thr_on, thr_off, stream,
     :type thr_off: float
     :param thr_off: threshold for switching single station trigger off
     :type stream: :class:`~obspy.core.stream.Stream`
-    :param stream: Stream containing waveform data for all stations. These
-        data are changed inplace, make a copy to keep the raw waveform data.
+    :param stream: Stream containing waveform data for all stations. The
+        data are not changed.
     :type thr_coincidence_sum: int or float
     :param thr_coincidence_sum: Threshold for coincidence sum. The network
         coincidence sum has to be at least equal to this value for a trigger to
@@ -588,92 +972,103 @@ def coincidenceTrigger(trigger_type, thr_on, thr_off, stream,
         trigger list. A common threshold can be set for all stations (float) or
         a dictionary mapping station names to float values for each station.
     :type similarity_threshold: float or dict
+    :type workers: int (optional)
+    :param workers: Number of threads computing the single station triggers
+        of different traces concurrently.
+    :type chunk_length: int or float (optional)
+    :param chunk_length: Length (in seconds) of the chunks in which the
+        characteristic function of a trace is computed for ``'recstalta'``
+        and ``'classicstalta'``, see
+        :class:`~obspy.signal.trigger.ContinuousTrigger`. This bounds the
+        memory needed for long traces. Other trigger types always process
+        whole traces.
     :rtype: list
     :returns: List of event triggers sorted chronologically.
     """
-    st = stream.copy()
     # if no trace ids are specified use all traces ids found in stream
     if trace_ids is None:
-        trace_ids = [tr.id for tr in st]
+        trace_ids = [tr.id for tr in stream]
     # we always work with a dictionary with trace ids and their weights later
     if isinstance(trace_ids, list) or isinstance(trace_ids, tuple):
         trace_ids = dict.fromkeys(trace_ids, 1)
     # set up similarity thresholds as a dictionary if necessary
     if not isinstance(similarity_threshold, dict):
-        similarity_threshold = dict.fromkeys([tr.stats.station for tr in st],
-                                             similarity_threshold)
+        similarity_threshold = dict.fromkeys(
+            [tr.stats.station for tr in stream], similarity_threshold)
 
-    # the single station triggering
-    triggers = []
-    # prepare kwargs for triggerOnset
-    kwargs = {'max_len_delete': delete_long_trigger}
-    for tr in st:
+    # the single station triggering, the input data stays untouched
+    jobs = []
+    for tr in stream:
         if tr.id not in trace_ids:
             msg = "At least one trace's ID was not found in the " + \
                   "trace ID list and was disregarded (%s)" % tr.id
             warnings.warn(msg, UserWarning)
             continue
-        if trigger_type is not None:
-            tr.trigger(trigger_type, **options)
-        kwargs['max_len'] = max_trigger_length * tr.stats.sampling_rate
-        tmp_triggers = triggerOnset(tr.data, thr_on, thr_off, **kwargs)
-        for on, off in tmp_triggers:
-            cft_peak = tr.data[on:off].max()
-            cft_std = tr.data[on:off].std()
-            on = tr.stats.starttime + float(on) / tr.stats.sampling_rate
-            off = tr.stats.starttime + float(off) / tr.stats.sampling_rate
-            triggers.append((on.timestamp, off.timestamp, tr.id, cft_peak,
-                             cft_std))
+        jobs.append((tr, trigger_type, thr_on, thr_off, max_trigger_length,
+                     delete_long_trigger, chunk_length, options))
+    triggers = []
+    if workers and workers > 1 and len(jobs) > 1:
+        # the C STA/LTA routines release the GIL, thus threads suffice
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(int(workers), len(jobs)))
+        try:
+            for tmp_triggers in pool.imap(_singleStationTriggers, jobs):
+                triggers.extend(tmp_triggers)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for job in jobs:
+            triggers.extend(_singleStationTriggers(job))
     triggers.sort()
 
-    # the coincidence triggering and coincidence sum computation
+    # the coincidence triggering and coincidence sum computation, sweeping
+    # once over the triggers sorted by on time and looking ahead only as
+    # long as the following triggers overlap
+    ons = [trigger[0] for trigger in triggers]
+    offs = [trigger[1] for trigger in triggers]
+    ids = [trigger[2] for trigger in triggers]
+    stations = [tr_id.split(".")[1] for tr_id in ids]
+    weights = [trace_ids[tr_id] for tr_id in ids]
     coincidence_triggers = []
     last_off_time = 0.0
-    while triggers != []:
-        # remove first trigger from list and look for overlaps
-        on, off, tr_id, cft_peak, cft_std = triggers.pop(0)
-        sta = tr_id.split(".")[1]
-        event = {}
-        event['time'] = UTCDateTime(on)
-        event['stations'] = [tr_id.split(".")[1]]
-        event['trace_ids'] = [tr_id]
-        event['coincidence_sum'] = float(trace_ids[tr_id])
-        event['similarity'] = {}
-        if details:
-            event['cft_peaks'] = [cft_peak]
-            event['cft_stds'] = [cft_std]
-        # evaluate maximum similarity for station if event templates were
-        # provided
-        templates = event_templates.get(sta)
-        if templates:
-            event['similarity'][sta] = \
-                templatesMaxSimilarity(stream, event['time'], templates)
+    for i in xrange(len(triggers)):
+        off = offs[i]
+        members = [i]
+        member_ids = set([ids[i]])
+        coincidence_sum = float(weights[i])
         # compile the list of stations that overlap with the current trigger
-        for trigger in triggers:
-            tmp_on, tmp_off, tmp_tr_id, tmp_cft_peak, tmp_cft_std = trigger
-            tmp_sta = tmp_tr_id.split(".")[1]
-            # skip retriggering of already present station in current
-            # coincidence trigger
-            if tmp_tr_id in event['trace_ids']:
-                continue
+        for j in xrange(i + 1, len(triggers)):
             # check for overlapping trigger,
             # break if there is a gap in between the two triggers
-            if tmp_on > off + trigger_off_extension:
+            if ons[j] > off + trigger_off_extension:
                 break
-            event['stations'].append(tmp_sta)
-            event['trace_ids'].append(tmp_tr_id)
-            event['coincidence_sum'] += trace_ids[tmp_tr_id]
-            if details:
-                event['cft_peaks'].append(tmp_cft_peak)
-                event['cft_stds'].append(tmp_cft_std)
+            # skip retriggering of already present station in current
+            # coincidence trigger
+            if ids[j] in member_ids:
+                continue
+            members.append(j)
+            member_ids.add(ids[j])
+            coincidence_sum += weights[j]
             # allow sets of triggers that overlap only on subsets of all
             # stations (e.g. A overlaps with B and B overlaps w/ C => ABC)
-            off = max(off, tmp_off)
-            # evaluate maximum similarity for station if event templates were
-            # provided
-            templates = event_templates.get(tmp_sta)
+            off = max(off, offs[j])
+        # skip coincidence trigger if it is just a subset of the previous
+        # (determined by a shared off-time, this is a bit sloppy)
+        if off <= last_off_time:
+            continue
+        event = {}
+        event['time'] = UTCDateTime(ons[i])
+        event['stations'] = [stations[k] for k in members]
+        event['trace_ids'] = [ids[k] for k in members]
+        event['coincidence_sum'] = coincidence_sum
+        # evaluate maximum similarity for stations if event templates were
+        # provided
+        event['similarity'] = {}
+        for sta in event['stations']:
+            templates = event_templates.get(sta)
             if templates:
-                event['similarity'][tmp_sta] = \
+                event['similarity'][sta] = \
                     templatesMaxSimilarity(stream, event['time'], templates)
         # skip if both coincidence sum and similarity thresholds are not met
         if event['coincidence_sum'] < thr_coincidence_sum:
@@ -682,23 +1077,87 @@ def coincidenceTrigger(trigger_type, thr_on, thr_off, stream,
             elif not any([val > similarity_threshold[_s]
                           for _s, val in event['similarity'].iteritems()]):
                 continue
-        # skip coincidence trigger if it is just a subset of the previous
-        # (determined by a shared off-time, this is a bit sloppy)
-        if off <= last_off_time:
-            continue
-        event['duration'] = off - on
+        event['duration'] = off - ons[i]
         if details:
-            weights = np.array([trace_ids[i] for i in event['trace_ids']])
-            weighted_values = np.array(event['cft_peaks']) * weights
-            event['cft_peak_wmean'] = weighted_values.sum() / weights.sum()
-            weighted_values = np.array(event['cft_stds']) * weights
+            event['cft_peaks'] = [triggers[k][3] for k in members]
+            event['cft_stds'] = [triggers[k][4] for k in members]
+            member_weights = np.array([weights[k] for k in members])
+            weighted_values = np.array(event['cft_peaks']) * member_weights
+            event['cft_peak_wmean'] = \
+                weighted_values.sum() / member_weights.sum()
+            weighted_values = np.array(event['cft_stds']) * member_weights
             event['cft_std_wmean'] = \
-                (np.array(event['cft_stds']) * weights).sum() / weights.sum()
+                weighted_values.sum() / member_weights.sum()
         coincidence_triggers.append(event)
         last_off_time = off
     return coincidence_triggers
 
 
+def _singleStationTriggers(job):
+    """
+    Computes the single station triggers of one trace for
+    :func:`~obspy.signal.trigger.coincidenceTrigger`.
+
+    :param job: Tuple of trace, trigger type, on and off thresholds,
+        maximum trigger length, delete flag, chunk length and trigger
+        options as passed to :func:`coincidenceTrigger`.
+    :rtype: list
+    :return: ``(on, off, id, cft_peak, cft_std)`` tuples with on and off
+        times as POSIX timestamps.
+    """
+    tr, trigger_type, thr_on, thr_off, max_trigger_length, \
+        delete_long_trigger, chunk_length, options = job
+    df = tr.stats.sampling_rate
+    options = options.copy()
+    # sta and lta are given in seconds, see Trace.trigger
+    for key in ['sta', 'lta']:
+        if key in options:
+            options['n%s' % (key)] = int(options.pop(key) * df)
+    max_len = max_trigger_length * df
+    triggers = []
+
+    def _append(on, off, cft, offset=0):
+        values = cft[int(on) - offset:max(int(off), int(on) + 1) - offset]
+        on = tr.stats.starttime + float(on) / df
+        off = tr.stats.starttime + float(off) / df
+        triggers.append((on.timestamp, off.timestamp, tr.id, values.max(),
+                         values.std()))
+
+    if trigger_type is not None and chunk_length and \
+            trigger_type.lower() in ContinuousTrigger.types:
+        # characteristic function chunk by chunk, only the part since the
+        # on time of a still open trigger is kept for its peak and std
+        trig = ContinuousTrigger(trigger_type, options['nsta'],
+                                 options['nlta'], thr_on, thr_off,
+                                 max_len=max_len,
+                                 max_len_delete=delete_long_trigger)
+        npts = max(int(chunk_length * df), 1)
+        tail = np.empty(0)
+        tail_start = 0
+        for start in xrange(0, tr.stats.npts, npts):
+            cft = np.concatenate((tail, trig.charfct(
+                tr.data[start:start + npts])))
+            for _, on, off in trig.trigger(cft[len(tail):]):
+                _append(on, off, cft, tail_start)
+            on = trig.getOpenOnsets()[0]
+            if on >= 0:
+                tail = cft[on - tail_start:]
+                tail_start = on
+            else:
+                tail = np.empty(0)
+                tail_start = start + npts
+        for _, on, off in trig.flush():
+            _append(on, off, tail, tail_start)
+    else:
+        cft = tr.data
+        if trigger_type is not None:
+            func = _getFunctionFromEntryPoint('trigger', trigger_type.lower())
+            cft = func(tr.data, **options)
+        for on, off in triggerOnset(cft, thr_on, thr_off, max_len=max_len,
+                                    max_len_delete=delete_long_trigger):
+            _append(on, off, cft)
+    return triggers
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
@@ -19,6 +19,7 @@ WAV bindings to ObsPy core module.
 
 from __future__ import division
 from obspy import Trace, Stream
+from obspy.core.util.base import _openFile
 import numpy as np
 import os
 import wave
@@ -48,9 +49,11 @@ def isWAV(filename):
     True
     """
     try:
-        fh = wave.open(filename, 'rb')
-        (_nchannel, width, _rate, _len, _comptype, _compname) = fh.getparams()
-        fh.close()
+        with _openFile(filename) as fp:
+            fh = wave.open(fp, 'rb')
+            (_nchannel, width, _rate, _len, _comptype, _compname) = \
+                fh.getparams()
+            fh.close()
     except:
         return False
     if width == 1 or width == 2 or width == 4:
@@ -84,16 +87,19 @@ def readWAV(filename, headonly=False, **kwargs):  # @UnusedVariable
     | 7000.0 Hz, 2599 samples
     """
     # read WAV file
-    fh = wave.open(filename, 'rb')
-    # header information
-    (_nchannel, width, rate, length, _comptype, _compname) = fh.getparams()
-    header = {'sampling_rate': rate, 'npts': length}
-    if headonly:
-        return Stream([Trace(header=header)])
-    if width not in WIDTH2DTYPE.keys():
-        raise TypeError("Unsupported Format Type, word width %dbytes" % width)
-    data = np.fromstring(fh.readframes(length), dtype=WIDTH2DTYPE[width])
-    fh.close()
+    with _openFile(filename) as fp:
+        fh = wave.open(fp, 'rb')
+        # header information
+        (_nchannel, width, rate, length, _comptype, _compname) = \
+            fh.getparams()
+        header = {'sampling_rate': rate, 'npts': length}
+        if headonly:
+            return Stream([Trace(header=header)])
+        if width not in WIDTH2DTYPE.keys():
+            msg = "Unsupported Format Type, word width %dbytes" % width
+            raise TypeError(msg)
+        data = np.fromstring(fh.readframes(length), dtype=WIDTH2DTYPE[width])
+        fh.close()
     return Stream([Trace(header=header, data=data)])
 
 
@@ -13,6 +13,7 @@ from obspy import Stream
 from obspy.core.trace import Trace
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict
+from obspy.core.util.base import _fromFile, _openFile
 from struct import unpack
 import numpy as np
 
@@ -66,8 +67,8 @@ def isY(filename):
     """
     try:
         # get first tag (16 bytes)
-        fh = open(filename, 'rb')
-        _, tag_type, _, _ = __parseTag(fh)
+        with _openFile(filename) as fh:
+            _, tag_type, _, _ = __parseTag(fh)
     except:
         return False
     # The first tag in a Y-file must be the TAG_Y_FILE tag (tag type 0)
@@ -115,7 +116,14 @@ def readY(filename, headonly=False, **kwargs):  # @UnusedVariable
     # The last tag in the file must be a TAG_DATA_INT32 (7) tag. This tag must
     # be followed by an array of LONG's. The number of entries in the array
     # must agree with what was described in the TAG_SERIES_INFO data.
-    fh = open(filename, 'rb')
+    with _openFile(filename) as fh:
+        return _readY(fh)
+
+
+def _readY(fh):
+    """
+    Reads all tags of an opened Nanometrics Y file, see :func:`readY`.
+    """
     trace = Trace()
     trace.stats.y = AttribDict()
     count = -1
@@ -318,7 +326,7 @@ def readY(filename, headonly=False, **kwargs):  # @UnusedVariable
             trace.stats.y.tag_station_response = params
         elif tag_type == 7:
             # TAG_DATA_INT32
-            trace.data = np.fromfile(fh, dtype=np.int32, count=count)
+            trace.data = _fromFile(fh, np.int32, count)
             # break loop as TAG_DATA_INT32 should be the last tag in file
             break
         else:
@@ -98,6 +98,7 @@ ENTRY_POINTS = {
         'TSPAIR = obspy.core.ascii',
         'SLIST = obspy.core.ascii',
         'PICKLE = obspy.core.stream',
+        'OBSPYBIN = obspy.core.binary',
         'CSS = obspy.css.core',
         'DATAMARK = obspy.datamark.core',
         'GSE1 = obspy.gse2.core',
@@ -129,6 +130,11 @@ ENTRY_POINTS = {
         'readFormat = obspy.core.stream:readPickle',
         'writeFormat = obspy.core.stream:writePickle',
     ],
+    'obspy.plugin.waveform.OBSPYBIN': [
+        'isFormat = obspy.core.binary:isOBSPYBIN',
+        'readFormat = obspy.core.binary:readOBSPYBIN',
+        'writeFormat = obspy.core.binary:writeOBSPYBIN',
+    ],
     'obspy.plugin.waveform.CSS': [
         'isFormat = obspy.css.core:isCSS',
         'readFormat = obspy.css.core:readCSS',